@@ -199,6 +199,41 @@ CREATE TABLE ledger_line (
     CHECK (debit >= 0 AND credit >= 0 AND (debit + credit > 0))
 );
 
+-- Saldos materializados por (cuenta, período, centro de costo): se actualizan en la misma transacción
+-- que las ledger_line contabilizadas; el balance de comprobación no recorre ledger_line
+CREATE TABLE account_balance (
+    balance_id UNIQUEIDENTIFIER PRIMARY KEY DEFAULT NEWID(),
+    entity_id UNIQUEIDENTIFIER NOT NULL REFERENCES accounting_entity(entity_id),
+    account_id UNIQUEIDENTIFIER NOT NULL REFERENCES account(account_id),
+    period_id UNIQUEIDENTIFIER NOT NULL REFERENCES fiscal_period(period_id),
+    cost_center_id UNIQUEIDENTIFIER REFERENCES cost_center(cost_center_id),
+    -- cost_center_id con un centinela en lugar de NULL: clave única de una sola fila sin centro de costo
+    -- y destino del upsert (INSERT ... ON CONFLICT / MERGE) que suma los incrementos
+    cost_center_key UNIQUEIDENTIFIER NOT NULL DEFAULT '00000000-0000-0000-0000-000000000000',
+    debit_total DECIMAL(18, 2) NOT NULL DEFAULT 0,
+    credit_total DECIMAL(18, 2) NOT NULL DEFAULT 0,
+    line_count INT NOT NULL DEFAULT 0,
+    updated_at DATETIME2 NOT NULL DEFAULT SYSDATETIME(),
+    CONSTRAINT ux_account_balance_clave UNIQUE (account_id, period_id, cost_center_key),
+    CHECK (cost_center_key = COALESCE(cost_center_id, '00000000-0000-0000-0000-000000000000'))
+);
+CREATE INDEX ix_account_balance_period ON account_balance (entity_id, period_id);
+
+-- Saldos acumulados (desde el inicio) de cada cuenta al cierre de un período: los reportes de períodos
+-- posteriores parten del cierre más cercano en lugar de volver a sumar ledger_line
+CREATE TABLE period_closing_balance (
+    closing_balance_id UNIQUEIDENTIFIER PRIMARY KEY DEFAULT NEWID(),
+    entity_id UNIQUEIDENTIFIER NOT NULL REFERENCES accounting_entity(entity_id),
+    period_id UNIQUEIDENTIFIER NOT NULL REFERENCES fiscal_period(period_id),
+    account_id UNIQUEIDENTIFIER NOT NULL REFERENCES account(account_id),
+    cost_center_id UNIQUEIDENTIFIER REFERENCES cost_center(cost_center_id),
+    debit_total DECIMAL(18, 2) NOT NULL DEFAULT 0,
+    credit_total DECIMAL(18, 2) NOT NULL DEFAULT 0,
+    line_count INT NOT NULL DEFAULT 0,
+    created_at DATETIME2 NOT NULL DEFAULT SYSDATETIME(),
+    UNIQUE (period_id, account_id, cost_center_id)
+);
+
 -- =========================
 -- Plantillas de asientos
 -- =========================
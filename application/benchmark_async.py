@@ -0,0 +1,144 @@
+# application/benchmark_async.py
+# Prueba de carga: emisión de facturas independientes por el camino síncrono (un hilo, varios hilos)
+# y por el asíncrono (varias tareas en un event loop), cada uno sobre una base SQLite nueva.
+# Reporta facturas/s y verifica que el stock consumido cuadre con los movimientos registrados.
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from typing import List
+from sqlalchemy import func, select
+from domain.repositories.lote_repository import ConflictoConcurrencia
+from domain.services.async_factura_service import AsyncFacturaService
+from domain.services.async_inventario_service import AsyncInventarioService
+from domain.services.factura_service import FacturaService
+from domain.services.inventario_service import InventarioService
+from domain.value_objects.direccion import Direccion
+from infrastructure.persistence.database import (
+    ConfiguracionBD, crear_engine, crear_engine_async, crear_sesiones, crear_sesiones_async
+)
+from infrastructure.persistence.modelos import Base, LoteDB, MovimientoInventarioDB
+from infrastructure.persistence.unidad_de_trabajo import UnidadDeTrabajoSQL
+from infrastructure.persistence.unidad_de_trabajo_async import UnidadDeTrabajoAsync
+
+N_FACTURAS = 2_000
+CONCURRENCIA = 16  # Hilos del camino síncrono y tareas simultáneas del asíncrono
+PRODUCTOS = 50
+BODEGA = 1
+LOTES_POR_PRODUCTO = 20
+CANTIDAD_POR_LOTE = 100
+
+def facturas() -> List[dict]:
+    # Tres líneas por factura sobre productos repartidos: la mayoría no compite por los mismos lotes
+    return [{
+        'id_sucursal': 1,
+        'id_bodega': BODEGA,
+        'ruc_emisor': '1790012345001',
+        'identificacion_adquiriente': '0912345678',
+        'direccion_matriz': Direccion('Av. Amazonas', 'Quito'),
+        'razon_social_emisor': 'Prometeo S.A.',
+        'lineas': [{'id_producto': 1 + (i * 3 + k) % PRODUCTOS, 'cantidad': 1 + (i + k) % 3,
+                    'precio_unitario': '2.50'} for k in range(3)],
+    } for i in range(N_FACTURAS)]
+
+def nueva_base(nombre: str) -> ConfiguracionBD:
+    config = ConfiguracionBD(url=f"sqlite:///{os.path.join(tempfile.mkdtemp(), nombre)}")
+    engine = crear_engine(config)
+    Base.metadata.create_all(engine)
+    sesiones = crear_sesiones(engine)
+    session = sesiones()
+    inicio = date(2024, 1, 1)
+    session.add_all([
+        LoteDB(id_producto=p, id_bodega=BODEGA, fecha_entrada=inicio + timedelta(days=i),
+               cantidad_restante=CANTIDAD_POR_LOTE, costo_unitario=1 + i % 7, version=0)
+        for p in range(1, PRODUCTOS + 1) for i in range(LOTES_POR_PRODUCTO)
+    ])
+    session.commit()
+    sesiones.remove()
+    engine.dispose()
+    return config
+
+def verificar(config: ConfiguracionBD, resultados: Counter):
+    engine = crear_engine(config)
+    sesiones = crear_sesiones(engine)
+    session = sesiones()
+    minimo = session.scalar(select(func.min(LoteDB.cantidad_restante)))
+    restante = session.scalar(select(func.sum(LoteDB.cantidad_restante)))
+    despachado = session.scalar(select(func.coalesce(func.sum(MovimientoInventarioDB.cantidad), 0))
+                                .where(MovimientoInventarioDB.tipo_movimiento == 'SALIDA'))
+    sesiones.remove()
+    engine.dispose()
+    assert minimo >= 0, "Lote con cantidad_restante negativa"
+    assert PRODUCTOS * LOTES_POR_PRODUCTO * CANTIDAD_POR_LOTE == restante + despachado, \
+        "El stock consumido no cuadra con los movimientos"
+    assert despachado == resultados['unidades'], "Movimientos de facturas no confirmadas"
+
+def reportar(camino: str, duracion: float, resultados: Counter):
+    print(f"{camino:<26} {N_FACTURAS / duracion:8.0f} facturas/s ({duracion:.2f}s); "
+          f"emitidas {resultados['emitidas']}, fallidas {resultados['fallidas']}")
+
+def sincrono(lote_datos: List[dict], hilos: int):
+    config = nueva_base(f'sincrono_{hilos}.db')
+    engine = crear_engine(config)
+    sesiones = crear_sesiones(engine)
+    uow = UnidadDeTrabajoSQL(sesiones)
+    inventario = InventarioService(uow.lotes)
+    uow.al_revertir(inventario.indice_lotes.limpiar)
+    service = FacturaService(uow.facturas, inventario)
+    resultados, cerrojo = Counter(), threading.Lock()
+
+    def cajero(porcion: List[dict]):
+        locales = Counter()
+        for datos in porcion:
+            try:
+                uow.ejecutar(lambda: service.crear_y_emitir_factura(datos), reintentos=20)
+                locales['emitidas'] += 1
+                locales['unidades'] += sum(linea['cantidad'] for linea in datos['lineas'])
+            except (ValueError, ConflictoConcurrencia):
+                locales['fallidas'] += 1
+        with cerrojo:
+            resultados.update(locales)
+
+    trabajadores = [threading.Thread(target=cajero, args=(lote_datos[h::hilos],)) for h in range(hilos)]
+    inicio = time.perf_counter()
+    for trabajador in trabajadores:
+        trabajador.start()
+    for trabajador in trabajadores:
+        trabajador.join()
+    duracion = time.perf_counter() - inicio
+    engine.dispose()
+    reportar(f"Síncrono, {hilos} hilo(s):", duracion, resultados)
+    verificar(config, resultados)
+
+async def asincrono(lote_datos: List[dict], tareas: int):
+    config = nueva_base(f'asincrono_{tareas}.db')
+    engine = crear_engine_async(config)
+    uow = UnidadDeTrabajoAsync(crear_sesiones_async(engine))
+    service = AsyncFacturaService(uow.facturas, AsyncInventarioService(uow.lotes))
+
+    inicio = time.perf_counter()
+    emision = await service.crear_y_emitir_facturas(
+        lote_datos, lambda operacion: uow.ejecutar(operacion, reintentos=20), concurrencia=tareas)
+    duracion = time.perf_counter() - inicio
+    await engine.dispose()
+
+    resultados = Counter()
+    for resultado, datos in zip(emision, lote_datos):
+        if resultado.exitosa:
+            resultados['emitidas'] += 1
+            resultados['unidades'] += sum(linea['cantidad'] for linea in datos['lineas'])
+        else:
+            resultados['fallidas'] += 1
+    reportar(f"Asíncrono, {tareas} tarea(s):", duracion, resultados)
+    verificar(config, resultados)
+
+if __name__ == '__main__':
+    lote_datos = facturas()
+    print(f"{N_FACTURAS} facturas de 3 líneas, {PRODUCTOS} productos, {os.cpu_count()} CPU")
+    sincrono(lote_datos, 1)
+    sincrono(lote_datos, CONCURRENCIA)
+    asyncio.run(asincrono(lote_datos, 1))
+    asyncio.run(asincrono(lote_datos, CONCURRENCIA))
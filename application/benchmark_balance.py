@@ -0,0 +1,164 @@
+# application/benchmark_balance.py
+# Balance de comprobación sobre un libro mayor generado en SQLite (N_LINEAS ledger_line, 12 períodos,
+# plan de cuentas de 4 niveles): recorriendo ledger_line y subiendo la jerarquía cuenta por cuenta,
+# contra balance_de_comprobacion (account_balance + árbol de cuentas en memoria). Después contabiliza
+# más asientos por el camino normal (saldos incrementales) y verifica que ambos resultados coincidan.
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy import func, select
+from domain.entities.asiento_contable import AsientoContable
+from domain.services.balance_comprobacion import BalanceComprobacionService
+from domain.services.contabilizacion import ContabilizadorDocumentos, CuentasContabilizacion
+from infrastructure.persistence.database import ConfiguracionBD, crear_engine, crear_sesiones
+from infrastructure.persistence.modelos import AccountDB, Base, FiscalPeriodDB, JournalEntryDB, LedgerLineDB
+from infrastructure.persistence.unidad_de_trabajo import UnidadDeTrabajoSQL
+
+N_LINEAS = 10_000_000
+LINEAS_POR_ASIENTO = 4  # Dos al debe y dos al haber
+RAMAS = (5, 4, 5, 10)  # Hijos por nivel: 5 raíces ... 1000 cuentas imputables
+CENTROS_COSTO = 8
+PERIODOS = 12
+ASIENTOS_INCREMENTALES = 2_000
+ENTIDAD = uuid4()
+
+def plan_de_cuentas(session) -> List[UUID]:
+    # Devuelve las cuentas imputables (hojas)
+    ahora, niveles = datetime.now(), [[(None, '')]]
+    for nivel, ramas in enumerate(RAMAS, start=1):
+        siguiente = []
+        for padre, codigo_padre in niveles[-1]:
+            for k in range(1, ramas + 1):
+                codigo = f"{codigo_padre}{'.' if codigo_padre else ''}{k:02d}" if nivel > 1 else str(k)
+                cuenta = AccountDB(account_id=uuid4(), entity_id=ENTIDAD, account_code=codigo,
+                                   account_name=f"Cuenta {codigo}", category='ASSET', normal_side='DEBIT',
+                                   parent_account_id=padre, is_postable=nivel == len(RAMAS), currency_code='USD',
+                                   level=nivel, created_at=ahora)
+                session.add(cuenta)
+                siguiente.append((cuenta.account_id, codigo))
+        niveles.append(siguiente)
+    return [id_cuenta for id_cuenta, _ in niveles[-1]]
+
+def nueva_base() -> Tuple[ConfiguracionBD, List[UUID], List[UUID]]:
+    config = ConfiguracionBD(url=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'balance.db')}")
+    engine = crear_engine(config)
+    Base.metadata.create_all(engine)
+    sesiones = crear_sesiones(engine)
+    session = sesiones()
+    hojas = plan_de_cuentas(session)
+    periodos = []
+    for mes in range(1, PERIODOS + 1):
+        periodo = FiscalPeriodDB(period_id=uuid4(), entity_id=ENTIDAD, period_code=f"2025-{mes:02d}",
+                                 start_date=date(2025, mes, 1), end_date=date(2025, mes, 28), created_at=datetime.now())
+        session.add(periodo)
+        periodos.append(periodo.period_id)
+    session.commit()
+    sesiones.remove()
+    engine.dispose()
+    return config, hojas, periodos
+
+def generar_libro(config: ConfiguracionBD, hojas: List[UUID], periodos: List[UUID], n_lineas: int = N_LINEAS):
+    # Inserción directa por DB-API: el formato de SQLAlchemy en SQLite (Uuid como hex de 32, fechas ISO)
+    engine = crear_engine(config)
+    conexion = engine.raw_connection()
+    cursor = conexion.cursor()
+    azar, ahora = random.Random(7), str(datetime.now())
+    centros = [uuid4().hex for _ in range(CENTROS_COSTO)]
+    hojas_hex = [h.hex for h in hojas]
+    periodos_hex = [p.hex for p in periodos]
+    por_bloque = 100_000 // LINEAS_POR_ASIENTO
+    for inicio in range(0, n_lineas // LINEAS_POR_ASIENTO, por_bloque):
+        asientos, lineas = [], []
+        for _ in range(min(por_bloque, n_lineas // LINEAS_POR_ASIENTO - inicio)):
+            id_asiento, mes = uuid4().hex, azar.randrange(PERIODOS)
+            asientos.append((id_asiento, ENTIDAD.hex, periodos_hex[mes], f"2025-{mes + 1:02d}-15", ahora))
+            a, b = azar.randrange(1, 100_000), azar.randrange(1, 100_000)
+            centro = centros[azar.randrange(CENTROS_COSTO)]
+            for debe, haber in ((a, 0), (b, 0), (0, a + b // 2), (0, b - b // 2)):
+                lineas.append((uuid4().hex, id_asiento, hojas_hex[azar.randrange(len(hojas))],
+                               str(Decimal(debe).scaleb(-2)), str(Decimal(haber).scaleb(-2)), centro, ahora))
+        cursor.executemany("INSERT INTO journal_entry (entry_id, entity_id, period_id, entry_date, is_posted, "
+                           "created_at) VALUES (?, ?, ?, ?, 1, ?)", [(e, n, p, f, c) for e, n, p, f, c in asientos])
+        cursor.executemany("INSERT INTO ledger_line (line_id, entry_id, account_id, debit, credit, currency_code, "
+                           "cost_center_id, created_at) VALUES (?, ?, ?, ?, ?, 'USD', ?, ?)", lineas)
+        conexion.commit()
+    conexion.close()
+    engine.dispose()
+
+def balance_recorriendo(uow: UnidadDeTrabajoSQL, *ids_periodo: UUID) -> Dict[UUID, Tuple[int, int]]:
+    # Referencia: GROUP BY sobre ledger_line de los períodos y, por cada cuenta, sumar a todos sus ancestros
+    filas = uow.session.execute(
+        select(LedgerLineDB.account_id, func.sum(LedgerLineDB.debit), func.sum(LedgerLineDB.credit))
+        .join(JournalEntryDB, JournalEntryDB.entry_id == LedgerLineDB.entry_id)
+        .where(JournalEntryDB.entity_id == ENTIDAD, JournalEntryDB.period_id.in_(ids_periodo),
+               JournalEntryDB.is_posted == True)
+        .group_by(LedgerLineDB.account_id)
+    ).all()
+    padres = dict(uow.session.execute(select(AccountDB.account_id, AccountDB.parent_account_id)
+                                      .where(AccountDB.entity_id == ENTIDAD)).all())
+    totales: Dict[UUID, Tuple[int, int]] = {}
+    for id_cuenta, debe, haber in filas:
+        debe, haber = int(round(debe * 100)) * 10_000, int(round(haber * 100)) * 10_000
+        while id_cuenta is not None:
+            d, h = totales.get(id_cuenta, (0, 0))
+            totales[id_cuenta] = (d + debe, h + haber)
+            id_cuenta = padres[id_cuenta]
+    return totales
+
+def contabilizar_mas(uow: UnidadDeTrabajoSQL, hojas: List[UUID], periodos: List[UUID]) -> float:
+    # Asientos por el camino normal: ledger_line y account_balance en la misma transacción
+    contabilizador = ContabilizadorDocumentos(uow.asientos, uow.cuentas_producto, uow.periodos,
+                                              CuentasContabilizacion(hojas[0], hojas[1]), id_entidad=ENTIDAD,
+                                              saldo_repo=uow.saldos)
+    azar, asientos = random.Random(11), []
+    for _ in range(ASIENTOS_INCREMENTALES):
+        asiento = AsientoContable(id_entidad=ENTIDAD, id_periodo=periodos[0], fecha=date(2025, 1, 20),
+                                  descripcion='Incremental')
+        importe = azar.randrange(1, 100_000) * 10_000
+        asiento.registrar(azar.choice(hojas), importe)
+        asiento.registrar(azar.choice(hojas), -importe)
+        asientos.append(asiento)
+    inicio = time.perf_counter()
+    with uow:
+        contabilizador.guardar(asientos)
+    return time.perf_counter() - inicio
+
+def medir(funcion, *argumentos):
+    inicio = time.perf_counter()
+    resultado = funcion(*argumentos)
+    return time.perf_counter() - inicio, resultado
+
+if __name__ == '__main__':
+    config, hojas, periodos = nueva_base()
+    generacion, _ = medir(generar_libro, config, hojas, periodos, N_LINEAS)
+    engine = crear_engine(config)
+    uow = UnidadDeTrabajoSQL(crear_sesiones(engine))
+    servicio = BalanceComprobacionService(uow.saldos, uow.cuentas_contables, uow.periodos)
+    with uow:
+        reconstruccion, _ = medir(uow.saldos.reconstruir, ENTIDAD)
+    incremental = contabilizar_mas(uow, hojas, periodos)
+
+    with uow:
+        recorriendo, esperado = medir(balance_recorriendo, uow, periodos[0])
+        frio, filas = medir(servicio.balance_de_comprobacion, ENTIDAD, periodos[0])
+        caliente, filas = medir(servicio.balance_de_comprobacion, ENTIDAD, periodos[0])
+        por_nivel, raices = medir(servicio.balance_de_comprobacion, ENTIDAD, periodos[0], 1)
+    engine.dispose()
+
+    obtenido = {f.cuenta.id_cuenta: (f.debe.micros, f.haber.micros) for f in filas}
+    assert obtenido == esperado, "El balance desde account_balance no coincide con ledger_line"
+    assert sum(f.debe.micros for f in raices) == sum(f.haber.micros for f in raices), "El balance no cuadra"
+
+    print(f"{N_LINEAS} ledger_line, {PERIODOS} períodos, {len(filas)} cuentas con movimiento en el período")
+    print(f"Generar libro: {generacion:.1f}s; reconstruir account_balance (una vez): {reconstruccion:.1f}s")
+    print(f"Contabilizar {ASIENTOS_INCREMENTALES} asientos con saldos incrementales: "
+          f"{incremental / ASIENTOS_INCREMENTALES * 1e3:.3f} ms/asiento")
+    print(f"Recorriendo ledger_line + jerarquía: {recorriendo * 1e3:9.1f} ms")
+    print(f"balance_de_comprobacion (frío):     {frio * 1e3:9.1f} ms (incluye cargar el plan de cuentas)")
+    print(f"balance_de_comprobacion:            {caliente * 1e3:9.1f} ms")
+    print(f"balance_de_comprobacion, nivel 1:   {por_nivel * 1e3:9.1f} ms")
@@ -0,0 +1,87 @@
+# application/benchmark_cierre.py
+# Cierre de períodos sobre el libro mayor generado de benchmark_balance (N_LINEAS ledger_line en 12 períodos):
+# cierra los 11 primeros en orden y compara el saldo acumulado al último período desde el cierre más cercano
+# contra volver a sumar ledger_line desde el inicio. Verifica además que un período cerrado rechace asientos
+# y que un asiento descuadrado impida el cierre (sin dejar el período marcado como cerrado).
+import time
+from datetime import date
+from application.benchmark_balance import (
+    ENTIDAD, balance_recorriendo, generar_libro, medir, nueva_base
+)
+from domain.entities.asiento_contable import AsientoContable
+from domain.services.balance_comprobacion import BalanceComprobacionService
+from domain.services.cierre_periodo import CierrePeriodoService
+from domain.services.contabilizacion import ContabilizadorDocumentos, CuentasContabilizacion
+from infrastructure.persistence.database import crear_engine, crear_sesiones
+from infrastructure.persistence.unidad_de_trabajo import UnidadDeTrabajoSQL
+
+N_LINEAS = 2_000_000
+
+def rechaza(operacion) -> str:
+    try:
+        operacion()
+    except ValueError as e:
+        return str(e)
+    raise AssertionError("Se esperaba ValueError")
+
+if __name__ == '__main__':
+    config, hojas, periodos = nueva_base()
+    generacion, _ = medir(generar_libro, config, hojas, periodos, N_LINEAS)
+    engine = crear_engine(config)
+    uow = UnidadDeTrabajoSQL(crear_sesiones(engine))
+    cierres = CierrePeriodoService(uow.periodos, uow.asientos, uow.saldos)
+    servicio = BalanceComprobacionService(uow.saldos, uow.cuentas_contables, uow.periodos)
+
+    with uow:
+        uow.saldos.reconstruir(ENTIDAD, periodos[-1])  # El período abierto, como si se hubiera contabilizado en línea
+    with uow:
+        cierre, cerrados = medir(cierres.cerrar_hasta, ENTIDAD, periodos[-2])
+    with uow:
+        recorriendo, esperado = medir(balance_recorriendo, uow, *periodos)
+        frio, filas = medir(servicio.balance_acumulado, ENTIDAD, periodos[-1])
+        caliente, filas = medir(servicio.balance_acumulado, ENTIDAD, periodos[-1])
+    obtenido = {f.cuenta.id_cuenta: (f.debe.micros, f.haber.micros) for f in filas}
+    assert obtenido == esperado, "El saldo acumulado desde el cierre no coincide con ledger_line"
+
+    # Un período cerrado no admite asientos
+    contabilizador = ContabilizadorDocumentos(uow.asientos, uow.cuentas_producto, uow.periodos,
+                                              CuentasContabilizacion(hojas[0], hojas[1]), id_entidad=ENTIDAD,
+                                              saldo_repo=uow.saldos)
+    with uow:
+        motivo_fecha = rechaza(lambda: contabilizador.periodo(ENTIDAD, date(2025, 1, 20)))
+        asiento = AsientoContable(id_entidad=ENTIDAD, id_periodo=periodos[0], fecha=date(2025, 1, 20),
+                                  descripcion='Fuera de plazo')
+        asiento.registrar(hojas[0], 1_000_000)
+        asiento.registrar(hojas[1], -1_000_000)
+        motivo_lote = rechaza(lambda: contabilizador.guardar([asiento]))
+
+    # Un asiento descuadrado impide cerrar el último período y la transacción se revierte completa
+    descuadrado = AsientoContable(id_entidad=ENTIDAD, id_periodo=periodos[-1], fecha=date(2025, 12, 20),
+                                  descripcion='Descuadrado')
+    descuadrado.registrar(hojas[0], 1_000_000)
+    descuadrado.registrar(hojas[1], -990_000)
+
+    def cerrar_con_descuadre():
+        with uow:
+            uow.asientos.guardar_muchos([descuadrado])
+            cierres.cerrar(ENTIDAD, periodos[-1])
+
+    motivo_descuadre = rechaza(cerrar_con_descuadre)
+    with uow:
+        assert not uow.periodos.obtener_cerrados([periodos[-1]]), "El cierre fallido dejó el período cerrado"
+        inicio = time.perf_counter()
+        cierres.cerrar(ENTIDAD, periodos[-1])
+        ultimo = time.perf_counter() - inicio
+    with uow:
+        solo_cierre, filas = medir(servicio.balance_acumulado, ENTIDAD, periodos[-1])
+    assert {f.cuenta.id_cuenta: (f.debe.micros, f.haber.micros) for f in filas} == esperado
+    engine.dispose()
+
+    print(f"{N_LINEAS} ledger_line, {len(periodos)} períodos; generar libro: {generacion:.1f}s")
+    print(f"Cerrar {len(cerrados)} períodos en orden: {cierre:.1f}s ({cierre / len(cerrados) * 1e3:.0f} ms/período); "
+          f"último período: {ultimo * 1e3:.0f} ms")
+    print(f"Saldo acumulado al período {len(periodos)}:")
+    print(f"  recorriendo ledger_line desde el inicio: {recorriendo * 1e3:9.1f} ms")
+    print(f"  balance_acumulado (cierre + 1 período):  {frio * 1e3:9.1f} ms frío, {caliente * 1e3:.1f} ms")
+    print(f"  balance_acumulado (solo cierre):         {solo_cierre * 1e3:9.1f} ms")
+    print(f"Rechazos: {motivo_fecha} / {motivo_lote} / {motivo_descuadre[:60]}...")
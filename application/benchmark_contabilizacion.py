@@ -0,0 +1,129 @@
+# application/benchmark_contabilizacion.py
+# Costo de la contabilización automática en la emisión sobre SQLite: sin asientos, con asientos escritos
+# en INSERT multi-fila (AsientoContableRepositorySQL) y con un INSERT por fila (journal_entry y cada
+# ledger_line por separado), factura por factura y por bloques. Verifica que debe y haber cuadren.
+import os
+import tempfile
+import time
+from datetime import date, datetime
+from typing import List, Optional, Sequence
+from uuid import uuid4
+from sqlalchemy import func, insert, select
+from domain.entities.asiento_contable import AsientoContable
+from domain.services.contabilizacion import ContabilizadorDocumentos, CuentasContabilizacion
+from domain.services.factura_service import FacturaService
+from domain.services.inventario_service import InventarioService
+from domain.value_objects.direccion import Direccion
+from infrastructure.persistence.database import ConfiguracionBD, crear_engine, crear_sesiones
+from infrastructure.persistence.modelos import (
+    Base, FiscalPeriodDB, JournalEntryDB, LedgerLineDB, LoteDB, ProductDB
+)
+from infrastructure.persistence.sql_repository import AsientoContableRepositorySQL
+from infrastructure.persistence.unidad_de_trabajo import UnidadDeTrabajoSQL
+
+N_FACTURAS = 2_000
+TAMANO_BLOQUE = 500
+PRODUCTOS = 50
+BODEGA = 1
+LOTES_POR_PRODUCTO = 20
+CANTIDAD_POR_LOTE = 100
+ENTIDAD = uuid4()
+CUENTAS = CuentasContabilizacion(id_cuenta_por_cobrar=uuid4(), id_cuenta_iva=uuid4())
+
+class AsientosFilaPorFila(AsientoContableRepositorySQL):
+    # Referencia: una sentencia por journal_entry y otra por cada ledger_line
+    def guardar_muchos(self, asientos: Sequence[AsientoContable]):
+        ahora = datetime.now()
+        for a in asientos:
+            self.session.execute(insert(JournalEntryDB).values(
+                entry_id=a.id_asiento, entity_id=a.id_entidad, period_id=a.id_periodo, entry_date=a.fecha,
+                description=a.descripcion, is_posted=a.contabilizado, created_at=ahora))
+            for l in a.lineas:
+                self.session.execute(insert(LedgerLineDB).values(
+                    line_id=l.id_linea, entry_id=a.id_asiento, account_id=l.id_cuenta, debit=l.debe.a_decimal(),
+                    credit=l.haber.a_decimal(), currency_code=a.moneda, created_at=ahora))
+
+def facturas() -> List[dict]:
+    return [{
+        'id_sucursal': 1,
+        'id_bodega': BODEGA,
+        'ruc_emisor': '1790012345001',
+        'identificacion_adquiriente': '0912345678',
+        'direccion_matriz': Direccion('Av. Amazonas', 'Quito'),
+        'razon_social_emisor': 'Prometeo S.A.',
+        'id_entidad': ENTIDAD,
+        'lineas': [{'id_producto': 1 + (i * 3 + k) % PRODUCTOS, 'cantidad': 1 + (i + k) % 3,
+                    'precio_unitario': '2.50'} for k in range(3)],
+    } for i in range(N_FACTURAS)]
+
+def nueva_base(nombre: str) -> ConfiguracionBD:
+    config = ConfiguracionBD(url=f"sqlite:///{os.path.join(tempfile.mkdtemp(), nombre)}")
+    engine = crear_engine(config)
+    Base.metadata.create_all(engine)
+    sesiones = crear_sesiones(engine)
+    session = sesiones()
+    hoy, ahora = date.today(), datetime.now()
+    session.add(FiscalPeriodDB(period_id=uuid4(), entity_id=ENTIDAD, period_code=f"{hoy:%Y}",
+                               start_date=date(hoy.year, 1, 1), end_date=date(hoy.year, 12, 31), created_at=ahora))
+    session.add_all([
+        ProductDB(product_id=uuid4(), entity_id=ENTIDAD, code=str(p), name=f"Producto {p}", type='GOOD',
+                  revenue_account_id=uuid4(), cost_account_id=uuid4(), inventory_account_id=uuid4(),
+                  created_at=ahora)
+        for p in range(1, PRODUCTOS + 1)
+    ])
+    session.add_all([
+        LoteDB(id_producto=p, id_bodega=BODEGA, fecha_entrada=date(2024, 1, 1 + i),
+               cantidad_restante=CANTIDAD_POR_LOTE, costo_unitario=1 + i % 7, version=0)
+        for p in range(1, PRODUCTOS + 1) for i in range(LOTES_POR_PRODUCTO)
+    ])
+    session.commit()
+    sesiones.remove()
+    engine.dispose()
+    return config
+
+def emitir(lote_datos: List[dict], escritura: Optional[type], por_bloques: bool) -> float:
+    # escritura: None (sin asientos) o la clase del repositorio de asientos
+    config = nueva_base('contabilizacion.db')
+    engine = crear_engine(config)
+    uow = UnidadDeTrabajoSQL(crear_sesiones(engine))
+    inventario = InventarioService(uow.lotes)
+    uow.al_revertir(inventario.indice_lotes.limpiar)
+    contabilizador = None
+    if escritura is not None:
+        contabilizador = ContabilizadorDocumentos(escritura(uow.sesiones), uow.cuentas_producto, uow.periodos,
+                                                  CUENTAS, id_entidad=ENTIDAD)
+    service = FacturaService(uow.facturas, inventario, contabilizador=contabilizador,
+                             punto_de_guardado=uow.punto_de_guardado)
+
+    inicio = time.perf_counter()
+    if por_bloques:
+        with uow:
+            resultados = list(service.crear_y_emitir_facturas(lote_datos, tamano_bloque=TAMANO_BLOQUE))
+        assert all(r.exitosa for r in resultados), next(r.error for r in resultados if not r.exitosa)
+    else:
+        for datos in lote_datos:
+            uow.ejecutar(lambda: service.crear_y_emitir_factura(datos))
+    duracion = time.perf_counter() - inicio
+
+    session = uow.session
+    asientos = session.scalar(select(func.count()).select_from(JournalEntryDB))
+    debe, haber = session.execute(select(func.coalesce(func.sum(LedgerLineDB.debit), 0),
+                                         func.coalesce(func.sum(LedgerLineDB.credit), 0))).one()
+    uow.sesiones.remove()
+    engine.dispose()
+    assert asientos == (len(lote_datos) if escritura is not None else 0), "Facturas sin asiento"
+    assert debe == haber, f"Debe {debe} y haber {haber} no cuadran"
+    return duracion
+
+if __name__ == '__main__':
+    lote_datos = facturas()
+    print(f"{N_FACTURAS} facturas de 3 líneas (~9 ledger_line por asiento), SQLite")
+    for por_bloques, modo in ((False, "una transacción por factura"), (True, f"bloques de {TAMANO_BLOQUE}")):
+        base = emitir(lote_datos, None, por_bloques)
+        multifila = emitir(lote_datos, AsientoContableRepositorySQL, por_bloques)
+        fila_a_fila = emitir(lote_datos, AsientosFilaPorFila, por_bloques)
+        print(f"{modo}:")
+        print(f"  Sin asientos:            {base / N_FACTURAS * 1e3:6.3f} ms/factura")
+        print(f"  INSERT multi-fila:       {multifila / N_FACTURAS * 1e3:6.3f} ms/factura (+{multifila / base - 1:.0%})")
+        print(f"  INSERT fila por fila:    {fila_a_fila / N_FACTURAS * 1e3:6.3f} ms/factura "
+              f"(+{fila_a_fila / base - 1:.0%})")
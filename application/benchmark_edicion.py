@@ -0,0 +1,80 @@
+# application/benchmark_edicion.py
+# Costo por línea al armar una factura y una nota de crédito: línea por línea con las seis invariantes después
+# de cada una (y otra vez al aplicar el descuento global y al emitir), contra una sesión de edición que las
+# verifica una sola vez al cerrar. La forma de pago cubre de antemano el total para que cada verificación pase.
+import time
+from decimal import Decimal
+from domain.aggregates.factura_aggregate import FacturaAggregate
+from domain.aggregates.nota_credito_aggregate import NotaCreditoAggregate
+from domain.entities.linea_factura import LineaFactura
+from domain.entities.linea_nota_credito import LineaNotaCredito
+from domain.value_objects.direccion import Direccion
+from domain.value_objects.forma_pago import FormaPago
+from domain.value_objects.money import Money
+from domain.value_objects.precio import Precio
+
+LINEAS = (10, 100, 1_000)
+REPETICIONES = 20
+DIRECCION = Direccion('Av. Amazonas', 'Quito')
+
+def nueva_factura() -> FacturaAggregate:
+    aggregate = FacturaAggregate.crear_nueva(1, '1790012345001', '0912345678', DIRECCION, 'Prometeo S.A.',
+                                             id_bodega=1)
+    aggregate.root.forma_pago = FormaPago(tipo='Efectivo', valor=Money.de_decimal('1000000000'))
+    return aggregate
+
+def nueva_nota() -> NotaCreditoAggregate:
+    return NotaCreditoAggregate.crear_nueva(1, '1790012345001', 1, '0912345678', DIRECCION, 'Prometeo S.A.',
+                                            'Devolución')
+
+def lineas_factura(n: int):
+    return [LineaFactura(id_producto=1 + i % 50, descripcion='', cantidad=1 + i % 3,
+                         precio_unitario=Precio.de_decimal(Decimal('2.50'))) for i in range(n)]
+
+def lineas_nota(n: int):
+    return [LineaNotaCredito(id_producto=1 + i % 50, descripcion='', cantidad=1 + i % 3,
+                             valor_item_cobrado=Money.de_decimal('2.50')) for i in range(n)]
+
+def factura_sin_sesion(lineas):
+    aggregate = nueva_factura()
+    for linea in lineas:
+        aggregate.agregar_linea(linea)
+    aggregate.aplicar_descuento_global(Decimal('5'))
+    aggregate._verificar_invariantes()  # La verificación de emitir, sin inventario
+
+def factura_con_sesion(lineas):
+    aggregate = nueva_factura()
+    with aggregate.edicion():
+        for linea in lineas:
+            aggregate.agregar_linea(linea)
+        aggregate.aplicar_descuento_global(Decimal('5'))
+
+def nota_sin_sesion(lineas):
+    aggregate = nueva_nota()
+    for linea in lineas:
+        aggregate.agregar_linea(linea)
+    aggregate._verificar_invariantes()
+
+def nota_con_sesion(lineas):
+    aggregate = nueva_nota()
+    with aggregate.edicion():
+        for linea in lineas:
+            aggregate.agregar_linea(linea)
+
+def por_linea(armar, lineas) -> float:
+    mejor = float('inf')
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        armar(lineas)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor / len(lineas)
+
+if __name__ == '__main__':
+    print(f"µs por línea (mejor de {REPETICIONES}), líneas agregadas una a una")
+    print(f"{'líneas':>7} {'factura antes':>14} {'después':>9} {'nota antes':>11} {'después':>9}")
+    for n in LINEAS:
+        factura, nota = lineas_factura(n), lineas_nota(n)
+        tiempos = [por_linea(armar, lineas) * 1e6 for armar, lineas in (
+            (factura_sin_sesion, factura), (factura_con_sesion, factura),
+            (nota_sin_sesion, nota), (nota_con_sesion, nota))]
+        print(f"{n:>7} {tiempos[0]:>14.2f} {tiempos[1]:>9.2f} {tiempos[2]:>11.2f} {tiempos[3]:>9.2f}")
@@ -0,0 +1,81 @@
+# application/benchmark_emision_masiva.py
+# Emisión de fin de mes sobre SQLite: FacturaService.crear_y_emitir_factura en un bucle (una transacción por
+# factura) contra crear_y_emitir_facturas (lotes FIFO precargados y una escritura por bloque), cada uno sobre
+# una base nueva con los mismos lotes. Reporta facturas/s y verifica que ambos caminos dejen el mismo stock.
+import time
+from collections import Counter
+from typing import List
+from sqlalchemy import select
+from application.benchmark_async import BODEGA, N_FACTURAS, facturas, nueva_base, verificar
+from domain.services.factura_service import FacturaService
+from domain.services.inventario_service import InventarioService
+from infrastructure.persistence.database import ConfiguracionBD, crear_engine, crear_sesiones
+from infrastructure.persistence.modelos import LoteDB
+from infrastructure.persistence.unidad_de_trabajo import UnidadDeTrabajoSQL
+
+TAMANO_BLOQUE = 500
+
+def servicio(config: ConfiguracionBD):
+    engine = crear_engine(config)
+    uow = UnidadDeTrabajoSQL(crear_sesiones(engine))
+    inventario = InventarioService(uow.lotes)
+    uow.al_revertir(inventario.indice_lotes.limpiar)
+    return engine, uow, FacturaService(uow.facturas, inventario, punto_de_guardado=uow.punto_de_guardado)
+
+def una_por_una(lote_datos: List[dict]) -> tuple:
+    config = nueva_base('una_por_una.db')
+    engine, uow, service = servicio(config)
+    resultados = Counter()
+    inicio = time.perf_counter()
+    for datos in lote_datos:
+        try:
+            with uow:
+                service.crear_y_emitir_factura(datos)
+            resultados['emitidas'] += 1
+            resultados['unidades'] += sum(linea['cantidad'] for linea in datos['lineas'])
+        except ValueError:
+            resultados['fallidas'] += 1
+    duracion = time.perf_counter() - inicio
+    engine.dispose()
+    return config, duracion, resultados
+
+def por_bloques(lote_datos: List[dict]) -> tuple:
+    config = nueva_base('por_bloques.db')
+    engine, uow, service = servicio(config)
+    resultados = Counter()
+    inicio = time.perf_counter()
+    with uow:
+        for resultado in service.crear_y_emitir_facturas(iter(lote_datos), tamano_bloque=TAMANO_BLOQUE):
+            if resultado.exitosa:
+                resultados['emitidas'] += 1
+                resultados['unidades'] += sum(l['cantidad'] for l in lote_datos[resultado.posicion]['lineas'])
+            else:
+                resultados['fallidas'] += 1
+    duracion = time.perf_counter() - inicio
+    engine.dispose()
+    return config, duracion, resultados
+
+def stock(config: ConfiguracionBD) -> List[tuple]:
+    engine = crear_engine(config)
+    sesiones = crear_sesiones(engine)
+    filas = sesiones().execute(
+        select(LoteDB.id_producto, LoteDB.fecha_entrada, LoteDB.cantidad_restante)
+        .where(LoteDB.id_bodega == BODEGA).order_by(LoteDB.id_producto, LoteDB.fecha_entrada)
+    ).all()
+    sesiones.remove()
+    engine.dispose()
+    return [tuple(f) for f in filas]
+
+if __name__ == '__main__':
+    lote_datos = facturas()
+    config_uno, uno, resultados_uno = una_por_una(lote_datos)
+    config_bloques, bloques, resultados_bloques = por_bloques(lote_datos)
+    verificar(config_uno, resultados_uno)
+    verificar(config_bloques, resultados_bloques)
+    assert resultados_uno == resultados_bloques, (resultados_uno, resultados_bloques)
+    assert resultados_bloques['emitidas'] == N_FACTURAS, resultados_bloques
+    assert stock(config_uno) == stock(config_bloques), "Ambos caminos deben consumir los mismos lotes"
+
+    print(f"{N_FACTURAS} facturas de 3 líneas; bloques de {TAMANO_BLOQUE}")
+    print(f"crear_y_emitir_factura en bucle: {N_FACTURAS / uno:8.0f} facturas/s ({uno:.2f}s)")
+    print(f"crear_y_emitir_facturas:         {N_FACTURAS / bloques:8.0f} facturas/s ({bloques:.2f}s)")
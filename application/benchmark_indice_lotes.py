@@ -0,0 +1,91 @@
+# application/benchmark_indice_lotes.py
+# Despacho FIFO sobre SQLite con cada vez más lotes abiertos del producto: el recorrido anterior (leer todos los
+# lotes abiertos en cada línea y recorrer la lista) contra InventarioService con IndiceLotesFIFO (la cola se
+# llena una vez y cada despacho toca solo los lotes que consume). El recorrido crece con los lotes; el índice
+# se mantiene plano, salvo la carga inicial de la cola que se reporta aparte. Verifica que ambos dejen el mismo stock.
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import List
+from sqlalchemy import func, select
+from domain.entities.movimiento_inventario import MovimientoInventario
+from domain.repositories.lote_repository import LoteRepository
+from domain.services.inventario_service import InventarioService
+from infrastructure.persistence.database import ConfiguracionBD, crear_engine, crear_sesiones
+from infrastructure.persistence.modelos import Base, LoteDB
+from infrastructure.persistence.unidad_de_trabajo import UnidadDeTrabajoSQL
+
+LOTES = (1_000, 10_000, 50_000)
+N_DESPACHOS = 100
+CANTIDAD = 15  # Lotes de 10: cada despacho consume dos
+PRODUCTO = 1
+BODEGA = 1
+
+def nueva_base(lotes: int) -> ConfiguracionBD:
+    config = ConfiguracionBD(url=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'indice_lotes.db')}")
+    engine = crear_engine(config)
+    Base.metadata.create_all(engine)
+    sesiones = crear_sesiones(engine)
+    session = sesiones()
+    inicio = date(2020, 1, 1)
+    session.execute(LoteDB.__table__.insert(), [
+        {'id_producto': PRODUCTO, 'id_bodega': BODEGA, 'fecha_entrada': inicio + timedelta(days=i // 10),
+         'cantidad_restante': 10, 'cantidad_inicial': 10, 'costo_unitario': 1 + i % 7, 'version': 0}
+        for i in range(lotes)
+    ])
+    session.commit()
+    sesiones.remove()
+    engine.dispose()
+    return config
+
+def salida_recorriendo(lote_repo: LoteRepository, cantidad: int, factura_id: int) -> List[MovimientoInventario]:
+    # Referencia: registrar_salida_fifo antes del índice
+    movimientos = []
+    cantidad_pendiente = cantidad
+    for lote in lote_repo.obtener_lotes_antiguos(PRODUCTO, BODEGA):
+        if cantidad_pendiente <= 0:
+            break
+        despacho = min(lote.cantidad_restante, cantidad_pendiente)
+        lote.cantidad_restante -= despacho
+        lote_repo.actualizar(lote)
+        movimientos.append(MovimientoInventario(PRODUCTO, BODEGA, 'SALIDA', despacho, lote.costo_unitario,
+                                                id_factura=factura_id))
+        cantidad_pendiente -= despacho
+    if cantidad_pendiente > 0:
+        raise ValueError("Stock insuficiente en FIFO.")
+    return movimientos
+
+def despachar(lotes: int, con_indice: bool):
+    # Devuelve (carga de la cola, segundos por despacho, stock restante); todo en una transacción
+    config = nueva_base(lotes)
+    engine = crear_engine(config)
+    uow = UnidadDeTrabajoSQL(crear_sesiones(engine))
+    inventario = InventarioService(uow.lotes)
+    carga = 0.0
+    with uow:
+        if con_indice:
+            inicio = time.perf_counter()
+            inventario.precargar_lotes([(PRODUCTO, BODEGA)])
+            carga = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        for i in range(N_DESPACHOS):
+            if con_indice:
+                inventario.registrar_salida_fifo(PRODUCTO, BODEGA, CANTIDAD, factura_id=i + 1, columnar=True)
+            else:
+                salida_recorriendo(uow.lotes, CANTIDAD, factura_id=i + 1)
+        duracion = time.perf_counter() - inicio
+    with uow:
+        restante = uow.session.scalar(select(func.sum(LoteDB.cantidad_restante)))
+    engine.dispose()
+    assert restante == lotes * 10 - N_DESPACHOS * CANTIDAD, "El despacho no consumió lo pedido"
+    return carga, duracion / N_DESPACHOS, restante
+
+if __name__ == '__main__':
+    print(f"{N_DESPACHOS} despachos de {CANTIDAD} unidades (dos lotes por despacho), SQLite")
+    print(f"{'lotes abiertos':>15} {'recorriendo':>14} {'índice':>12} {'carga de la cola':>18}")
+    for lotes in LOTES:
+        _, antes, restante_antes = despachar(lotes, con_indice=False)
+        carga, despues, restante_despues = despachar(lotes, con_indice=True)
+        assert restante_antes == restante_despues
+        print(f"{lotes:>15} {antes * 1e3:>11.2f} ms {despues * 1e3:>9.3f} ms {carga * 1e3:>15.1f} ms")
@@ -0,0 +1,117 @@
+# application/benchmark_instrumentacion.py
+# Costo de la instrumentación en la emisión de facturas (repositorio de lotes en memoria, sin base de datos):
+# desactivada, activa con el registro en memoria y activa con el exportador Prometheus. Con la
+# instrumentación desactivada solo quedan las comprobaciones `if metricas.activa:`; se estima su costo
+# multiplicando los puntos recorridos por emisión por lo que cuesta una comprobación.
+import timeit
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Sequence, Tuple
+from domain.entities.lote import Lote
+from domain.entities.movimiento_inventario import MovimientoInventario
+from domain.repositories.lote_repository import LoteRepository
+from domain.services.factura_service import construir_factura, lineas_desde
+from domain.services.instrumentacion import Etiquetas, SinkMetricas, metricas
+from domain.services.inventario_service import InventarioService
+from domain.value_objects.direccion import Direccion
+from domain.value_objects.forma_pago import FormaPago
+from domain.value_objects.money import Money
+from infrastructure.metricas.sinks import ExportadorPrometheus, RegistroMetricas
+
+N_FACTURAS = 20_000
+PRODUCTOS = 10
+LOTES_POR_PRODUCTO = 20_000
+BODEGA = 1
+
+class LotesEnMemoria(LoteRepository):
+    def __init__(self):
+        inicio = date(2024, 1, 1)
+        self.lotes = {
+            (p, BODEGA): [Lote(id_lote=p * LOTES_POR_PRODUCTO + i, id_producto=p, id_bodega=BODEGA,
+                               fecha_entrada=inicio + timedelta(minutes=i), cantidad_restante=10,
+                               costo_unitario=Money.de_decimal(1 + i % 7)) for i in range(LOTES_POR_PRODUCTO)]
+            for p in range(1, PRODUCTOS + 1)
+        }
+
+    def obtener_lotes_antiguos(self, producto_id: int, bodega_id: int) -> List[Lote]:
+        return [l for l in self.lotes.get((producto_id, bodega_id), []) if not l.agotado]
+
+    def obtener_lotes_antiguos_muchos(self, pares: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], List[Lote]]:
+        return {par: self.obtener_lotes_antiguos(*par) for par in pares}
+
+    def actualizar(self, lote: Lote):
+        pass
+
+    def actualizar_muchos(self, lotes: Sequence[Lote], movimientos: Sequence[MovimientoInventario] = (),
+                          nuevos: Sequence[Lote] = ()):
+        pass
+
+class ContadorEventos(SinkMetricas):
+    # Cuenta llamadas al sink: una por punto instrumentado recorrido
+    def __init__(self):
+        self.eventos = 0
+
+    def contar(self, nombre: str, valor: int = 1, etiquetas: Etiquetas = ()):
+        self.eventos += 1
+
+    def observar(self, nombre: str, valor: float, etiquetas: Etiquetas = ()):
+        self.eventos += 1
+
+def datos_factura(i: int) -> dict:
+    # Tres líneas de 15 unidades: cada una consume dos lotes de 10
+    return {
+        'id_sucursal': 1,
+        'id_bodega': BODEGA,
+        'ruc_emisor': '1790012345001',
+        'identificacion_adquiriente': '0912345678',
+        'direccion_matriz': Direccion('Av. Amazonas', 'Quito'),
+        'razon_social_emisor': 'Prometeo S.A.',
+        'lineas': [{'id_producto': 1 + (i + k) % PRODUCTOS, 'cantidad': 15, 'precio_unitario': '2.50'}
+                   for k in range(3)],
+    }
+
+def emitir_todas(lote_datos: List[dict]) -> float:
+    inventario = InventarioService(LotesEnMemoria())
+    inicio = time.perf_counter()
+    for i, datos in enumerate(lote_datos):
+        aggregate = construir_factura(datos)
+        aggregate.root.id_factura = i + 1  # Sin repositorio de facturas: el id que le daría guardar
+        with aggregate.edicion():
+            aggregate.agregar_lineas(list(lineas_desde(datos)))
+            aggregate.root.forma_pago = FormaPago('Efectivo', aggregate.root.totales.valor_total)
+            aggregate.emitir(inventario)
+    return time.perf_counter() - inicio
+
+def mejor_de(repeticiones: int, lote_datos: List[dict]) -> float:
+    return min(emitir_todas(lote_datos) for _ in range(repeticiones))
+
+if __name__ == '__main__':
+    lote_datos = [datos_factura(i) for i in range(N_FACTURAS)]
+
+    metricas.desactivar()
+    desactivada = mejor_de(3, lote_datos)
+
+    registro = RegistroMetricas()
+    metricas.activar(registro)
+    en_memoria = mejor_de(3, lote_datos)
+    metricas.activar(ExportadorPrometheus())
+    prometheus = mejor_de(3, lote_datos)
+    contador = ContadorEventos()
+    metricas.activar(contador)
+    emitir_todas(lote_datos)
+    metricas.desactivar()
+
+    puntos = contador.eventos / N_FACTURAS
+    comprobacion = min(timeit.repeat('if metricas.activa: pass', globals={'metricas': metricas},
+                                     number=1_000_000, repeat=5)) / 1_000_000
+    por_factura = desactivada / N_FACTURAS
+
+    print(f"{N_FACTURAS} facturas de 3 líneas (2 lotes por línea), mejor de 3")
+    print(f"Desactivada:          {por_factura * 1e6:7.1f} µs/factura")
+    print(f"Registro en memoria:  {en_memoria / N_FACTURAS * 1e6:7.1f} µs/factura (+{en_memoria / desactivada - 1:.1%})")
+    print(f"Exportador Prometheus:{prometheus / N_FACTURAS * 1e6:7.1f} µs/factura (+{prometheus / desactivada - 1:.1%})")
+    print(f"Desactivada: ~{puntos:.0f} comprobaciones por factura x {comprobacion * 1e9:.0f} ns = "
+          f"{puntos * comprobacion * 1e9:.0f} ns ({puntos * comprobacion / por_factura:.2%} de una emisión)")
+    emision = registro.histograma('emision_segundos', documento='factura')
+    print(f"emision_segundos (factura): promedio {emision.promedio * 1e6:.1f} µs; "
+          f"lotes_por_linea promedio {registro.histograma('lotes_por_linea').promedio:.2f}")
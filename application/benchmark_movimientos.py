@@ -0,0 +1,32 @@
+# application/benchmark_movimientos.py
+# Memoria por movimiento: lista de MovimientoInventario frente a MovimientosBatch columnar
+import tracemalloc
+from domain.entities.movimiento_inventario import MovimientoInventario
+from domain.entities.movimientos_batch import MovimientosBatch
+from domain.value_objects.money import Money
+
+N = 1_000_000
+COSTOS = [Money.de_decimal(f"{c}.{c:02d}") for c in range(1, 100)]
+
+def medir(construir) -> float:
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    resultado = construir()
+    usado = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    del resultado
+    return usado / N
+
+def lista_objetos():
+    return [MovimientoInventario(i % 5000, i % 20, 'SALIDA', 1 + i % 7, COSTOS[i % 99], 100_000 + i // 3)
+            for i in range(N)]
+
+def columnar():
+    batch = MovimientosBatch()
+    for i in range(N):
+        batch.agregar(i % 5000, i % 20, 'SALIDA', 1 + i % 7, COSTOS[i % 99], 100_000 + i // 3)
+    return batch
+
+if __name__ == '__main__':
+    print(f"MovimientoInventario (lista): {medir(lista_objetos):.1f} bytes/movimiento")
+    print(f"MovimientosBatch (columnas):  {medir(columnar):.1f} bytes/movimiento")
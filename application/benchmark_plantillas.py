@@ -0,0 +1,62 @@
+# application/benchmark_plantillas.py
+# Evaluación de una plantilla de asiento (6 líneas) sobre los totales de muchas facturas: interpretando
+# cada expresión en cada uso (tokenizar, parsear y recorrer), con la plantilla compilada documento por
+# documento y con la plantilla compilada evaluada por lotes. Verifica que los tres den los mismos importes.
+import time
+from datetime import datetime
+from typing import List
+from uuid import uuid4
+from domain.entities.plantilla_asiento import LADO_CREDITO, LADO_DEBITO, LineaPlantilla, PlantillaAsiento
+from domain.entities.totales_factura import TotalesFactura
+from domain.services.expresiones_monto import compilar_expresion
+from domain.services.plantillas_asiento import PlantillaCompilada
+from domain.value_objects.money import Money
+
+N_DOCUMENTOS = 20_000
+EXPRESIONES = [
+    (LADO_DEBITO, 'valor_total'),
+    (LADO_CREDITO, 'valor_subtotal - descuento_comercial'),
+    (LADO_CREDITO, 'valor_iva'),
+    (LADO_CREDITO, 'valor_ice'),
+    (LADO_DEBITO, 'redondear(valor_subtotal * 1.75%)'),  # Retención de renta
+    (LADO_CREDITO, 'redondear(valor_subtotal * 1.75%)'),
+]
+
+def plantilla() -> PlantillaAsiento:
+    return PlantillaAsiento(id_plantilla=uuid4(), id_entidad=uuid4(), codigo='VENTA', nombre='Venta con retención',
+                            actualizado_en=datetime.now(),
+                            lineas=[LineaPlantilla(id_linea=uuid4(), lado_normal=lado, expresion_monto=expresion,
+                                                   id_cuenta=uuid4()) for lado, expresion in EXPRESIONES])
+
+def documentos() -> List[TotalesFactura]:
+    totales = []
+    for i in range(N_DOCUMENTOS):
+        subtotal = Money.de_decimal(10 + i % 997)
+        iva, ice = subtotal.por_porcentaje(15).redondear(), Money.de_decimal(i % 3)
+        totales.append(TotalesFactura(i, valor_subtotal=subtotal, valor_iva=iva, valor_ice=ice,
+                                      valor_total=subtotal + iva + ice))
+    return totales
+
+def interpretando(p: PlantillaAsiento, docs: List[TotalesFactura]) -> List[tuple]:
+    return [tuple(compilar_expresion(l.expresion_monto).evaluar(t) for l in p.lineas) for t in docs]
+
+def medir(funcion, *argumentos):
+    inicio = time.perf_counter()
+    resultado = funcion(*argumentos)
+    return time.perf_counter() - inicio, resultado
+
+if __name__ == '__main__':
+    p, docs = plantilla(), documentos()
+    interpretada, esperado = medir(interpretando, p, docs)
+    compilacion, compilada = medir(PlantillaCompilada, p)
+    por_documento, resultado = medir(lambda: [compilada.evaluar(t) for t in docs])
+    assert resultado == esperado, "La plantilla compilada no coincide con la interpretada"
+    por_lote, resultado = medir(compilada.evaluar_lote, docs)
+    assert resultado == esperado, "La evaluación por lotes no coincide con la interpretada"
+
+    print(f"{N_DOCUMENTOS} documentos, plantilla de {len(p.lineas)} líneas")
+    print(f"Interpretando cada vez:   {interpretada / N_DOCUMENTOS * 1e6:7.2f} µs/documento")
+    print(f"Compilada, por documento: {por_documento / N_DOCUMENTOS * 1e6:7.2f} µs/documento "
+          f"({interpretada / por_documento:.0f}x); compilar: {compilacion * 1e6:.0f} µs una vez")
+    print(f"Compilada, por lotes:     {por_lote / N_DOCUMENTOS * 1e6:7.2f} µs/documento "
+          f"({interpretada / por_lote:.0f}x)")
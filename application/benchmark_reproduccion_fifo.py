@@ -0,0 +1,104 @@
+# application/benchmark_reproduccion_fifo.py
+# Reproducción FIFO de 1M movimientos sintéticos: secuencial frente a un pool de procesos por producto.
+# Con --sqlite mide además el recorrido completo: lectura en streaming, reproducción y escritura por lotes.
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+from sqlalchemy import insert
+from domain.entities.historial_fifo import HistorialFIFO
+from domain.repositories.movimiento_inventario_repository import MovimientoInventarioRepository
+from domain.services.reproduccion_fifo import ReproductorCostosFIFO
+from domain.value_objects.money import Money
+
+N_MOVIMIENTOS = 1_000_000
+PRODUCTOS = 2_000
+BODEGAS = 2
+INICIO = date(2024, 1, 1)
+DESDE = date(2024, 3, 1)
+
+def generar() -> List[tuple]:
+    # (id_movimiento, id_producto, id_bodega, tipo, cantidad, costo_micros, fecha). Cada par recibe compras
+    # y ventas alternadas; además una compra retroactiva por par, registrada al final con fecha anterior
+    # a DESDE, que desplaza la cola FIFO y cambia el costo de las ventas posteriores.
+    azar = random.Random(7)
+    por_par = N_MOVIMIENTOS // (PRODUCTOS * BODEGAS)
+    filas, id_movimiento = [], 0
+    for producto in range(1, PRODUCTOS + 1):
+        for bodega in range(1, BODEGAS + 1):
+            stock = 0
+            for k in range(por_par - 1):
+                fecha = INICIO + timedelta(days=k * 180 // por_par)
+                id_movimiento += 1
+                if stock < 10 or k % 3 == 0:
+                    cantidad = azar.randint(10, 40)
+                    filas.append((id_movimiento, producto, bodega, 'ENTRADA', cantidad, azar.randint(1, 90) * 10**6, fecha))
+                    stock += cantidad
+                else:
+                    cantidad = azar.randint(1, min(stock, 15))
+                    filas.append((id_movimiento, producto, bodega, 'SALIDA', cantidad, 0, fecha))
+                    stock -= cantidad
+            id_movimiento += 1
+            filas.append((id_movimiento, producto, bodega, 'ENTRADA', 25, 5 * 10**6, DESDE - timedelta(days=30)))
+    return filas
+
+class RepositorioEnMemoria(MovimientoInventarioRepository):
+    def __init__(self, filas: List[tuple]):
+        self.historiales: Dict[tuple, HistorialFIFO] = {}
+        for id_movimiento, producto, bodega, tipo, cantidad, costo, fecha in sorted(
+                filas, key=lambda f: (f[1], f[2], f[6], f[0])):
+            historial = self.historiales.setdefault((producto, bodega), HistorialFIFO(producto, bodega))
+            historial.agregar(id_movimiento, tipo, cantidad, costo, fecha)
+        self.escritos = 0
+
+    def iterar_historiales(self, productos: Optional[Iterable[int]] = None,
+                           id_bodega: Optional[int] = None) -> Iterator[HistorialFIFO]:
+        return iter(self.historiales.values())
+
+    def actualizar_costos(self, ids: Sequence[int], costos_micros: Sequence[int]):
+        self.escritos += len(ids)
+
+def medir(reproductor: ReproductorCostosFIFO) -> tuple:
+    inicio = time.perf_counter()
+    resultado = reproductor.recalcular(DESDE)
+    assert not resultado.fallidos, resultado.fallidos
+    return time.perf_counter() - inicio, resultado.corregidos
+
+def en_sqlite(filas: List[tuple]):
+    from infrastructure.persistence.database import ConfiguracionBD, crear_engine, crear_sesiones
+    from infrastructure.persistence.modelos import Base, MovimientoInventarioDB
+    from infrastructure.persistence.unidad_de_trabajo import UnidadDeTrabajoSQL
+
+    ruta = os.path.join(tempfile.mkdtemp(), 'reproduccion.db')
+    engine = crear_engine(ConfiguracionBD(url=f"sqlite:///{ruta}"))
+    Base.metadata.create_all(engine)
+    sesiones = crear_sesiones(engine)
+    uow = UnidadDeTrabajoSQL(sesiones)
+    with uow:
+        uow.session.execute(insert(MovimientoInventarioDB), [
+            {'id_movimiento': i, 'id_producto': p, 'id_bodega': b, 'tipo_movimiento': t, 'cantidad': c,
+             'costo_unitario_aplicado': Money(m).a_decimal(), 'fecha': f} for i, p, b, t, c, m, f in filas
+        ])
+    reproductor = ReproductorCostosFIFO(uow.movimientos)
+    inicio = time.perf_counter()
+    resultado = uow.ejecutar(lambda: reproductor.recalcular(DESDE))
+    duracion = time.perf_counter() - inicio
+    assert not resultado.fallidos, resultado.fallidos
+    print(f"SQLite extremo a extremo ({reproductor.procesos} procesos): {duracion:.2f}s, {resultado.corregidos} costos corregidos")
+
+if __name__ == '__main__':
+    filas = generar()
+    repo = RepositorioEnMemoria(filas)
+    print(f"{len(filas)} movimientos, {len(repo.historiales)} pares (producto, bodega), {os.cpu_count()} CPU")
+
+    secuencial, corregidos = medir(ReproductorCostosFIFO(repo, procesos=1))
+    print(f"Secuencial:            {secuencial:.2f}s ({len(filas) / secuencial:,.0f} mov/s), {corregidos} corregidos")
+    for procesos in sorted({2, 4, os.cpu_count() or 1} - {1}):
+        duracion, corregidos = medir(ReproductorCostosFIFO(repo, procesos=procesos))
+        print(f"Pool de {procesos} procesos:    {duracion:.2f}s ({len(filas) / duracion:,.0f} mov/s), "
+              f"{corregidos} corregidos, x{secuencial / duracion:.2f}")
+    if '--sqlite' in sys.argv:
+        en_sqlite(filas)
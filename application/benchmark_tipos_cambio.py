@@ -0,0 +1,120 @@
+# application/benchmark_tipos_cambio.py
+# Conversión de importes a la fecha de cada línea sobre exchange_rate en SQLite (MONEDAS contra la moneda base,
+# tasas diarias de AÑOS años): una consulta "última tasa en o antes de la fecha" por línea, contra
+# TiposCambioService por línea y en lote. Verifica que coincidan, el cruce entre dos monedas no base
+# y que refrescar() lea solo las filas nuevas.
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import List, Tuple
+from uuid import uuid4
+from sqlalchemy import select
+from domain.services.tipos_cambio import TiposCambioService
+from domain.value_objects.money import ESCALA, Money, dividir_redondeando
+from infrastructure.persistence.database import ConfiguracionBD, crear_engine, crear_sesiones
+from infrastructure.persistence.modelos import AccountingEntityDB, Base, ExchangeRateDB
+from infrastructure.persistence.unidad_de_trabajo import UnidadDeTrabajoSQL
+
+MONEDAS = ('EUR', 'GBP', 'JPY', 'COP', 'PEN', 'MXN', 'BRL', 'CLP', 'CNY', 'CAD')
+BASE = 'USD'
+AÑOS = 10
+N_LINEAS = 50_000
+INICIO = date(2016, 1, 1)
+ENTIDAD = uuid4()
+
+def nueva_base() -> ConfiguracionBD:
+    config = ConfiguracionBD(url=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'tipos_cambio.db')}")
+    engine = crear_engine(config)
+    Base.metadata.create_all(engine)
+    sesiones = crear_sesiones(engine)
+    session = sesiones()
+    ahora, azar = datetime.now(), random.Random(3)
+    session.add(AccountingEntityDB(entity_id=ENTIDAD, name='Entidad', base_currency=BASE, created_at=ahora))
+    filas = []
+    for moneda in MONEDAS:
+        tasa = Decimal(azar.uniform(0.5, 5000)).quantize(Decimal('0.000001'))
+        for dia in range(0, AÑOS * 365):
+            if dia and azar.random() < 0.3:  # Sin cotización fines de semana y feriados: vale la última anterior
+                continue
+            tasa = (tasa * Decimal(azar.uniform(0.99, 1.01))).quantize(Decimal('0.000001'))
+            fecha = INICIO + timedelta(days=dia)  # Cargada al cierre de su día
+            filas.append({'rate_id': uuid4(), 'from_currency': moneda, 'to_currency': BASE, 'rate_date': fecha,
+                          'rate': tasa, 'created_at': datetime(fecha.year, fecha.month, fecha.day, 18)})
+    session.execute(ExchangeRateDB.__table__.insert(), filas)
+    session.commit()
+    sesiones.remove()
+    engine.dispose()
+    return config
+
+def lineas(n: int) -> Tuple[List[int], List[str], List[date]]:
+    azar = random.Random(5)
+    return ([azar.randrange(1, 10_000_000) * 10_000 for _ in range(n)], [azar.choice(MONEDAS) for _ in range(n)],
+            [INICIO + timedelta(days=azar.randrange(1, AÑOS * 365)) for _ in range(n)])
+
+def por_consulta(uow: UnidadDeTrabajoSQL, micros, monedas, fechas) -> List[int]:
+    # Referencia: la última tasa en o antes de la fecha, una consulta por línea
+    resultado = []
+    for m, moneda, fecha in zip(micros, monedas, fechas):
+        tasa = uow.session.scalar(
+            select(ExchangeRateDB.rate)
+            .where(ExchangeRateDB.from_currency == moneda, ExchangeRateDB.to_currency == BASE,
+                   ExchangeRateDB.rate_date <= fecha)
+            .order_by(ExchangeRateDB.rate_date.desc()).limit(1)
+        )
+        resultado.append(dividir_redondeando(m * Money.de_decimal(tasa).micros, ESCALA))
+    return resultado
+
+def medir(funcion, *argumentos):
+    inicio = time.perf_counter()
+    resultado = funcion(*argumentos)
+    return time.perf_counter() - inicio, resultado
+
+if __name__ == '__main__':
+    config = nueva_base()
+    engine = crear_engine(config)
+    uow = UnidadDeTrabajoSQL(crear_sesiones(engine))
+    micros, monedas, fechas = lineas(N_LINEAS)
+    servicio = TiposCambioService(uow.tipos_cambio, ENTIDAD)
+
+    with uow:
+        consulta, esperado = medir(por_consulta, uow, micros, monedas, fechas)
+        carga, filas = medir(servicio.refrescar)
+        por_linea, obtenido = medir(lambda: [servicio.convertir(Money(m, moneda), BASE, f).micros
+                                             for m, moneda, f in zip(micros, monedas, fechas)])
+        assert obtenido == esperado, "La conversión en memoria no coincide con la consulta por línea"
+        # En lote: un llamado por moneda de origen, las líneas de cada moneda juntas
+        inicio, en_lote = time.perf_counter(), [0] * N_LINEAS
+        for moneda in MONEDAS:
+            posiciones = [i for i, m in enumerate(monedas) if m == moneda]
+            convertidos = servicio.convertir_lote([micros[i] for i in posiciones], moneda, BASE,
+                                                  [fechas[i] for i in posiciones])
+            for i, valor in zip(posiciones, convertidos):
+                en_lote[i] = valor
+        lote = time.perf_counter() - inicio
+        assert en_lote == esperado, "La conversión en lote no coincide con la consulta por línea"
+
+        # Cruce EUR -> JPY por la moneda base: EUR->USD y la inversa de JPY->USD, con un solo redondeo
+        fecha = date(2020, 6, 15)
+        eur, jpy = servicio.tasa('EUR', BASE, fecha)[0], servicio.tasa('JPY', BASE, fecha)[0]
+        cruce = servicio.convertir(Money(100 * ESCALA, 'EUR'), 'JPY', fecha)
+        assert cruce.micros == dividir_redondeando(100 * ESCALA * eur, jpy), "Tasa cruzada incorrecta"
+
+        # Refresco incremental: la tasa nueva y las del último día, dentro de la ventana de solapamiento
+        uow.session.add(ExchangeRateDB(rate_id=uuid4(), from_currency='EUR', to_currency=BASE,
+                                       rate_date=INICIO + timedelta(days=AÑOS * 365), rate=Decimal('1.5'),
+                                       created_at=datetime.now() + timedelta(seconds=1)))
+    with uow:
+        refresco, leidas = medir(servicio.refrescar)
+        nueva = servicio.convertir(Money(ESCALA, 'EUR'), BASE, INICIO + timedelta(days=AÑOS * 365 + 3))
+        assert nueva.micros == Money.de_decimal('1.5').micros and 1 < leidas <= len(MONEDAS) + 1, (nueva, leidas)
+    engine.dispose()
+
+    print(f"{filas} tasas ({len(MONEDAS)} monedas contra {BASE}, {AÑOS} años); {N_LINEAS} líneas")
+    print(f"Una consulta por línea:    {consulta / N_LINEAS * 1e6:8.2f} µs/línea")
+    print(f"Carga inicial del servicio: {carga * 1e3:7.1f} ms; refresco incremental: {refresco * 1e3:.1f} ms")
+    print(f"convertir por línea:       {por_linea / N_LINEAS * 1e6:8.2f} µs/línea")
+    print(f"convertir_lote:            {lote / N_LINEAS * 1e6:8.2f} µs/línea")
+    print(f"100 EUR = {cruce} al {fecha} (cruce por {BASE})")
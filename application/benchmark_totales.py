@@ -0,0 +1,44 @@
+# application/benchmark_totales.py
+# Cálculo de totales de factura: aritmética Decimal (implementación anterior) frente a Money en enteros
+import time
+from decimal import Decimal
+from domain.entities.linea_factura import LineaFactura
+from domain.entities.totales_factura import TotalesFactura
+from domain.value_objects.precio import Precio
+
+N_LINEAS = 200
+N_FACTURAS = 2_000
+TARIFAS = (Decimal('12'), Decimal('0'), Decimal('15'))
+
+def totales_decimal(lineas):
+    # Réplica de TotalesFactura antes de Money: Decimal sin cuantizar en cada operación
+    bases = {}
+    subtotal = Decimal('0.00')
+    for tarifa, valor in lineas:
+        bases[tarifa] = bases.get(tarifa, Decimal('0.00')) + valor
+        subtotal += valor
+    iva = sum((base * (tarifa / 100) for tarifa, base in bases.items()), Decimal('0.00'))
+    return subtotal + iva
+
+def totales_money(lineas):
+    totales = TotalesFactura(0)
+    totales.actualizar_desde_lineas(lineas)
+    return totales.valor_total
+
+def medir(funcion, argumento) -> float:
+    inicio = time.perf_counter()
+    for _ in range(N_FACTURAS):
+        funcion(argumento)
+    return time.perf_counter() - inicio
+
+if __name__ == '__main__':
+    precios = [Decimal(f"{1 + i % 50}.{i % 1000:03d}") for i in range(N_LINEAS)]
+    lineas = [LineaFactura(id_producto=i, descripcion='', cantidad=1 + i % 9, precio_unitario=Precio.de_decimal(p),
+                           porcentaje_iva=TARIFAS[i % 3]) for i, p in enumerate(precios)]
+    lineas_decimal = [(TARIFAS[i % 3], (1 + i % 9) * p) for i, p in enumerate(precios)]
+
+    antes = medir(totales_decimal, lineas_decimal)
+    despues = medir(totales_money, lineas)
+    total = N_FACTURAS * N_LINEAS
+    print(f"Decimal: {antes:.3f}s ({antes / total * 1e9:.0f} ns/línea) total={totales_decimal(lineas_decimal)}")
+    print(f"Money:   {despues:.3f}s ({despues / total * 1e9:.0f} ns/línea) total={totales_money(lineas)}")
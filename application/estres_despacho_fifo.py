@@ -0,0 +1,90 @@
+# application/estres_despacho_fifo.py
+# Despachos FIFO concurrentes sobre los mismos lotes: varios hilos (cajeros) venden los mismos productos
+# de la misma bodega. Verifica que ningún lote quede con cantidad_restante negativa y que el stock
+# consumido cuadre con los movimientos registrados; reporta el rendimiento alcanzado.
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from sqlalchemy import func, select
+from domain.repositories.lote_repository import ConflictoConcurrencia
+from domain.services.inventario_service import InventarioService
+from infrastructure.persistence.database import ConfiguracionBD, crear_engine, crear_sesiones
+from infrastructure.persistence.modelos import Base, LoteDB, MovimientoInventarioDB
+from infrastructure.persistence.unidad_de_trabajo import UnidadDeTrabajoSQL
+
+N_HILOS = 8
+DESPACHOS_POR_HILO = 200
+PRODUCTOS = 4
+BODEGA = 1
+LOTES_POR_PRODUCTO = 50
+CANTIDAD_POR_LOTE = 20  # Stock total menor que la demanda: también se prueba el agotamiento
+
+def poblar(sesiones):
+    session = sesiones()
+    inicio = date(2024, 1, 1)
+    session.add_all([
+        LoteDB(id_producto=p, id_bodega=BODEGA, fecha_entrada=inicio + timedelta(days=i),
+               cantidad_restante=CANTIDAD_POR_LOTE, costo_unitario=1 + i % 7, version=0)
+        for p in range(1, PRODUCTOS + 1) for i in range(LOTES_POR_PRODUCTO)
+    ])
+    session.commit()
+    sesiones.remove()
+
+def cajero(uow: UnidadDeTrabajoSQL, service: InventarioService, semilla: int, resultados: Counter, cerrojo):
+    azar = random.Random(semilla)
+    locales = Counter()
+    for i in range(DESPACHOS_POR_HILO):
+        producto_id = azar.randint(1, PRODUCTOS)
+        cantidad = azar.randint(1, 5)
+        try:
+            uow.ejecutar(lambda: service.registrar_salida_fifo(producto_id, BODEGA, cantidad, semilla * 10_000 + i),
+                         reintentos=20)
+            locales['despachos'] += 1
+            locales['unidades'] += cantidad
+        except ConflictoConcurrencia:
+            locales['conflictos_agotados'] += 1
+        except ValueError:
+            locales['sin_stock'] += 1
+    with cerrojo:
+        resultados.update(locales)
+
+if __name__ == '__main__':
+    directorio = tempfile.mkdtemp()
+    config = ConfiguracionBD(url=f"sqlite:///{os.path.join(directorio, 'estres.db')}")
+    engine = crear_engine(config)
+    Base.metadata.create_all(engine)
+    sesiones = crear_sesiones(engine)
+    poblar(sesiones)
+
+    uow = UnidadDeTrabajoSQL(sesiones)
+    service = InventarioService(uow.lotes)
+    uow.al_revertir(service.indice_lotes.limpiar)
+
+    resultados, cerrojo = Counter(), threading.Lock()
+    hilos = [threading.Thread(target=cajero, args=(uow, service, s, resultados, cerrojo)) for s in range(N_HILOS)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+
+    session = sesiones()
+    minimo = session.scalar(select(func.min(LoteDB.cantidad_restante)))
+    restante = session.scalar(select(func.sum(LoteDB.cantidad_restante)))
+    despachado = session.scalar(select(func.coalesce(func.sum(MovimientoInventarioDB.cantidad), 0))
+                                .where(MovimientoInventarioDB.tipo_movimiento == 'SALIDA'))
+    inicial = PRODUCTOS * LOTES_POR_PRODUCTO * CANTIDAD_POR_LOTE
+
+    operaciones = N_HILOS * DESPACHOS_POR_HILO
+    print(f"{N_HILOS} hilos, {operaciones} despachos en {duracion:.2f}s ({operaciones / duracion:.0f} despachos/s)")
+    print(f"Exitosos: {resultados['despachos']}, sin stock: {resultados['sin_stock']}, "
+          f"reintentos agotados: {resultados['conflictos_agotados']}")
+    print(f"Mínimo cantidad_restante: {minimo}; stock inicial {inicial} = restante {restante} + despachado {despachado}")
+    assert minimo >= 0, "Lote con cantidad_restante negativa"
+    assert inicial == restante + despachado, "El stock consumido no cuadra con los movimientos"
+    assert despachado == resultados['unidades'], "Movimientos de despachos no confirmados"
@@ -1,14 +1,33 @@
 # application/main.py
+from domain.services.indice_devoluciones import IndiceDevoluciones
 from domain.services.inventario_service import InventarioService
-from infrastructure.persistence.sql_repository import ProductoRepositorySQL, LoteRepositorySQL
+from domain.services.nota_credito_service import NotaCreditoService
+from infrastructure.persistence.cache import ProductoRepositoryCache
+from infrastructure.persistence.database import ConfiguracionBD, crear_engine, crear_sesiones
+from infrastructure.persistence.modelos import Base
+from infrastructure.persistence.unidad_de_trabajo import UnidadDeTrabajoSQL
 
-producto_repo = ProductoRepositorySQL()
-lote_repo = LoteRepositorySQL()
-service = InventarioService(lote_repo)
+config = ConfiguracionBD.desde_entorno()  # PROMETEO_DB_URL, PROMETEO_DB_POOL_SIZE, ...
+engine = crear_engine(config)
+Base.metadata.create_all(engine)
+sesiones = crear_sesiones(engine)
+
+uow = UnidadDeTrabajoSQL(sesiones)
+service = InventarioService(uow.lotes)
+uow.al_revertir(service.indice_lotes.limpiar)
+productos = ProductoRepositoryCache(uow.productos)  # Catálogo cacheado; el stock se lee siempre de la base
+uow.al_confirmar(productos.confirmar)  # Invalida lo guardado, ya visible para los demás hilos
+uow.al_revertir(productos.revertir)
+devoluciones = IndiceDevoluciones(uow.notas_credito)
+uow.al_revertir(devoluciones.revertir)  # Descontó las unidades de notas que no llegaron a confirmarse
+uow.al_confirmar(devoluciones.confirmar)
+notas_credito = NotaCreditoService(uow.notas_credito, uow.facturas, service, indice_devoluciones=devoluciones)
 
 # Registrar salida FIFO
 try:
-    movimientos = service.registrar_salida_fifo(producto_id=1, bodega_id=1, cantidad=10, factura_id=100)
+    # Transacción propia, repetida si otro cajero consumió los mismos lotes entre la lectura y la escritura
+    movimientos = uow.ejecutar(
+        lambda: service.registrar_salida_fifo(producto_id=1, bodega_id=1, cantidad=10, factura_id=100))
     print("Movimientos registrados:", movimientos)
 except ValueError as e:
-    print(e)
\ No newline at end of file
+    print(e)
@@ -0,0 +1,32 @@
+# conftest.py
+# Fixtures compartidas: una base SQLite en memoria por prueba y la unidad de trabajo sobre ella
+from datetime import date
+from decimal import Decimal
+import pytest
+from infrastructure.persistence.database import ConfiguracionBD, crear_engine, crear_sesiones
+from infrastructure.persistence.modelos import Base, LoteDB
+from infrastructure.persistence.unidad_de_trabajo import UnidadDeTrabajoSQL
+
+@pytest.fixture
+def engine():
+    engine = crear_engine(ConfiguracionBD(url='sqlite://'))
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def uow(engine):
+    return UnidadDeTrabajoSQL(crear_sesiones(engine))
+
+@pytest.fixture
+def crear_lotes(uow):
+    # crear_lotes((producto, bodega, cantidad, costo), ...): lotes de apertura en orden de entrada
+    def crear(*lotes):
+        with uow:
+            filas = [LoteDB(id_producto=producto, id_bodega=bodega, fecha_entrada=date(2024, 1, 1 + i),
+                            cantidad_restante=cantidad, costo_unitario=Decimal(costo), version=0)
+                     for i, (producto, bodega, cantidad, costo) in enumerate(lotes)]
+            uow.session.add_all(filas)
+            uow.session.flush()
+            return [f.id_lote for f in filas]
+    return crear
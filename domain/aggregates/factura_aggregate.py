@@ -1,67 +1,130 @@
 # domain/aggregates/factura_aggregate.py
+from contextlib import contextmanager
 from datetime import date
-from typing import List
+from decimal import Decimal
+from typing import List, Optional, Tuple, Union
 from domain.entities.factura import Factura
 from domain.entities.totales_factura import TotalesFactura
 from domain.entities.linea_factura import LineaFactura
-from domain.entities.direccion import Direccion
+from domain.value_objects.direccion import Direccion
+from domain.value_objects.ruc import RUC
 from domain.services.inventario_service import InventarioService
+from domain.entities.bases_impuestos import Bases
 from domain.entities.movimiento_inventario import MovimientoInventario
+from domain.entities.movimientos_batch import MovimientosBatch
+from domain.specifications.specification import SpecificationCompilada
+from domain.services.instrumentacion import metricas, reloj
 from domain.specifications.factura_specifications import (
     FacturaTieneLineas, FacturaTotalValido, FormaPagoValida,
     FechaEmisionValida, FechaCaducidadValida, FechaAutorizacionValida
 )
 
+_ETIQUETAS = (('documento', 'factura'),)
+
 class FacturaAggregate:
+    # Las mismas invariantes para toda factura: se compilan una vez por día (las de fecha fijan "hoy")
+    _validaciones = (
+        FacturaTieneLineas(),
+        FacturaTotalValido(),
+        FormaPagoValida(),
+        FechaEmisionValida(),
+        FechaCaducidadValida(),
+        FechaAutorizacionValida()
+    )
+    _compiladas: Optional[Tuple[date, SpecificationCompilada]] = None
+
     def __init__(self, factura: Factura, totales: TotalesFactura):
         self.root = factura
         self.root.totales = totales
-        self._validaciones = [
-            FacturaTieneLineas(),
-            FacturaTotalValido(),
-            FormaPagoValida(),
-            FechaEmisionValida(),
-            FechaCaducidadValida(),
-            FechaAutorizacionValida()
-        ]
+        if self.root.lineas:
+            self.root._actualizar_totales()  # Reconstruir bases por tarifa de una factura ya existente
+        self._en_edicion = False
+        self._pendiente_verificar = False
+        self._verificada_el: Optional[date] = None  # Día de la última verificación completa
 
     def agregar_linea(self, linea: LineaFactura):
         self.root.agregar_linea(linea)
-        self._verificar_invariantes()
+        self._marcar_modificado()
+
+    def agregar_lineas(self, lineas: List[LineaFactura], bases: Optional[Bases] = None):
+        self.root.agregar_lineas(lineas, bases)
+        self._marcar_modificado()
 
     def aplicar_descuento_global(self, porcentaje: Decimal):
         for linea in self.root.lineas:
-            linea.aplicar_descuento(porcentaje)
-        self.root._actualizar_totales()
-        self._verificar_invariantes()
+            self.root.aplicar_descuento_linea(linea, porcentaje)
+        self._marcar_modificado()
 
-    def emitir(self, inventario_service: InventarioService) -> List['MovimientoInventario']:
-        self._verificar_invariantes()
-        movimientos = []
-        for linea in self.root.lineas:
-            movs = inventario_service.registrar_salida_fifo(
-                producto_id=linea.id_producto,
-                bodega_id=self.root.id_bodega,
-                cantidad=linea.cantidad,
-                factura_id=self.root.id_factura
-            )
-            movimientos.extend(movs)
-        return movimientos
+    @contextmanager
+    def edicion(self):
+        # Sesión de edición: la factura se modifica sin validar y las invariantes se verifican
+        # una sola vez al cerrar el bloque (o antes, si se emite dentro del bloque)
+        if self._en_edicion:
+            yield self
+            return
+        self._en_edicion = True
+        try:
+            yield self
+        finally:
+            self._en_edicion = False
+        if self._pendiente_verificar:
+            self._verificar_invariantes()
+
+    def _marcar_modificado(self):
+        self._pendiente_verificar = True
+        if not self._en_edicion:
+            self._verificar_invariantes()
+
+    def emitir(self, inventario_service: InventarioService,
+               columnar: bool = False) -> Union[List['MovimientoInventario'], MovimientosBatch]:
+        inicio = reloj() if metricas.activa else None
+        # Sin cambios desde la última verificación no se repite, salvo que haya cambiado el día (reglas de fecha)
+        if self._pendiente_verificar or self._verificada_el != date.today():
+            self._verificar_invariantes()
+        movimientos = MovimientosBatch()
+        # Emisión atómica: lotes y movimientos en una sola escritura
+        with inventario_service.unidad_de_trabajo() as unidad:
+            for linea in self.root.lineas:
+                movs = inventario_service.registrar_salida_fifo(
+                    producto_id=linea.id_producto,
+                    bodega_id=self.root.id_bodega,
+                    cantidad=linea.cantidad,
+                    factura_id=self.root.id_factura,
+                    columnar=True
+                )
+                movimientos.extender(movs)
+            # Una factura nueva aún no tiene id: los movimientos lo toman al escribirse, después de guardarla
+            unidad.vincular_documento(self.root, 'id_factura')
+        if inicio is not None:
+            metricas.observar('emision_segundos', reloj() - inicio, _ETIQUETAS)
+        return movimientos if columnar else list(movimientos)
 
     def _verificar_invariantes(self):
-        errors = []
-        for spec in self._validaciones:
-            if not spec.is_satisfied_by(self.root):
-                errors.append(f"Validación fallida: {spec.__class__.__name__}")
+        invariantes = self._invariantes()
+        if metricas.activa:
+            fallas = invariantes.fallas_medidas(self.root, _ETIQUETAS)
+        else:
+            fallas = invariantes.fallas(self.root)
+        errors = [f"Validación fallida: {nombre}" for nombre in fallas]
         if errors:
             raise ValueError("; ".join(errors))
+        self._pendiente_verificar = False
+        self._verificada_el = date.today()
+
+    @classmethod
+    def _invariantes(cls) -> SpecificationCompilada:
+        hoy, compiladas = date.today(), cls._compiladas
+        if compiladas is None or compiladas[0] != hoy:
+            compiladas = cls._compiladas = (hoy, SpecificationCompilada.desde(cls._validaciones, hoy=hoy))
+        return compiladas[1]
 
     @classmethod
     def crear_nueva(cls, id_sucursal: int, ruc_emisor: str, adquiriente: str, direccion: Direccion, 
                     razon_social: str, fecha_emision: date = None, fecha_caducidad: date = None, 
-                    fecha_autorizacion: date = None):
+                    fecha_autorizacion: date = None, id_bodega: int = None):
         factura = Factura(
             id_sucursal=id_sucursal,
+            id_bodega=id_bodega,
             ruc_emisor=RUC(ruc_emisor),
             identificacion_adquiriente=adquiriente,
             razon_social_emisor=razon_social,
@@ -72,5 +135,5 @@ class FacturaAggregate:
         )
         totales = TotalesFactura(0)
         aggregate = cls(factura, totales)
-        aggregate._verificar_invariantes()
+        aggregate._pendiente_verificar = True  # Sin líneas aún: se valida al cerrar la edición o al emitir
         return aggregate
@@ -1,58 +1,126 @@
 # domain/aggregates/nota_credito_aggregate.py
-from typing import List
-from uuid import uuid4
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import date
 from domain.entities.nota_credito import NotaCredito
 from domain.entities.totales_nota_credito import TotalesNotaCredito
 from domain.entities.linea_nota_credito import LineaNotaCredito
-from domain.entities.motivo_modificacion import MotivoModificacion
-from domain.entities.direccion import Direccion
+from domain.value_objects.motivo_modificacion import MotivoModificacion
+from domain.value_objects.direccion import Direccion
+from domain.value_objects.ruc import RUC
 from domain.services.inventario_service import InventarioService
 from domain.aggregates.factura_aggregate import FacturaAggregate
+from domain.entities.bases_impuestos import Bases
 from domain.entities.movimiento_inventario import MovimientoInventario
+from domain.entities.movimientos_batch import MovimientosBatch
+from domain.value_objects.money import Money
+from domain.specifications.specification import SpecificationCompilada
+from domain.services.instrumentacion import metricas, reloj
 from domain.specifications.nota_credito_specifications import (
     NotaCreditoTieneLineas, NotaCreditoTotalValido, MotivoModificacionValido,
     FechaEmisionValida, FechaCaducidadValida, FechaAutorizacionValida
 )
 
+_ETIQUETAS = (('documento', 'nota_credito'),)
+
 class NotaCreditoAggregate:
+    # Invariantes compiladas como en FacturaAggregate: una vez por día, compartidas por todas las notas
+    _validaciones = (
+        NotaCreditoTieneLineas(),
+        NotaCreditoTotalValido(),
+        MotivoModificacionValido(),
+        FechaEmisionValida(),
+        FechaCaducidadValida(),
+        FechaAutorizacionValida()
+    )
+    _compiladas: Optional[Tuple[date, SpecificationCompilada]] = None
+
     def __init__(self, nota_credito: NotaCredito, totales: TotalesNotaCredito):
         self.root = nota_credito
         self.root.totales = totales
-        self._validaciones = [
-            NotaCreditoTieneLineas(),
-            NotaCreditoTotalValido(),
-            MotivoModificacionValido(),
-            FechaEmisionValida(),
-            FechaCaducidadValida(),
-            FechaAutorizacionValida()
-        ]
+        if self.root.lineas:
+            self.root._actualizar_totales()
+        self._en_edicion = False
+        self._pendiente_verificar = False
+        self._verificada_el: Optional[date] = None  # Día de la última verificación completa
 
     def agregar_linea(self, linea: LineaNotaCredito):
         self.root.agregar_linea(linea)
-        self._verificar_invariantes()
+        self._marcar_modificado()
+
+    def agregar_lineas(self, lineas: List[LineaNotaCredito], bases: Optional[Bases] = None):
+        self.root.agregar_lineas(lineas, bases)
+        self._marcar_modificado()
+
+    @contextmanager
+    def edicion(self):
+        # Igual que FacturaAggregate.edicion
+        if self._en_edicion:
+            yield self
+            return
+        self._en_edicion = True
+        try:
+            yield self
+        finally:
+            self._en_edicion = False
+        if self._pendiente_verificar:
+            self._verificar_invariantes()
 
-    def emitir(self, inventario_service: InventarioService, bodega_id: int, factura_agg: 'FacturaAggregate') -> List['MovimientoInventario']:
-        self._verificar_invariantes()
-        movimientos = []
-        for linea in self.root.lineas:
-            movs = inventario_service.registrar_entrada(
-                producto_id=linea.id_producto,
-                bodega_id=bodega_id,
-                cantidad=linea.cantidad,
-                costo_unitario=linea.valor_item_cobrado,
-                nota_credito_id=self.root.id_nota_credito
-            )
-            movimientos.extend(movs)
-        return movimientos
+    def _marcar_modificado(self):
+        self._pendiente_verificar = True
+        if not self._en_edicion:
+            self._verificar_invariantes()
+
+    def emitir(self, inventario_service: InventarioService, bodega_id: int, factura_agg: 'FacturaAggregate',
+               costos_vendidos: Dict[int, Money],
+               columnar: bool = False) -> Union[List['MovimientoInventario'], MovimientosBatch]:
+        # costos_vendidos: FacturaRepository.obtener_costos_vendidos de la factura modificada. Lo devuelto
+        # reingresa al costo al que salió, no al precio de venta.
+        inicio = reloj() if metricas.activa else None
+        # Sin cambios desde la última verificación no se repite, salvo que haya cambiado el día (reglas de fecha)
+        if self._pendiente_verificar or self._verificada_el != date.today():
+            self._verificar_invariantes()
+        movimientos = MovimientosBatch()
+        # Todas las entradas de la nota se escriben juntas o ninguna
+        with inventario_service.unidad_de_trabajo() as unidad:
+            for linea in self.root.lineas:
+                costo = costos_vendidos.get(linea.id_producto)
+                if costo is None:
+                    raise ValueError(f"Factura {factura_agg.root.id_factura} sin salidas del producto "
+                                     f"{linea.id_producto}: no hay costo para reingresar la devolución.")
+                movs = inventario_service.registrar_entrada(
+                    producto_id=linea.id_producto,
+                    bodega_id=bodega_id,
+                    cantidad=linea.cantidad,
+                    costo_unitario=costo,
+                    nota_credito_id=self.root.id_nota_credito,
+                    fecha=self.root.fecha_emision,
+                    columnar=True
+                )
+                movimientos.extender(movs)
+            unidad.vincular_documento(self.root, 'id_nota_credito')  # Id asignado al guardar la nota
+        if inicio is not None:
+            metricas.observar('emision_segundos', reloj() - inicio, _ETIQUETAS)
+        return movimientos if columnar else list(movimientos)
 
     def _verificar_invariantes(self):
-        errors = []
-        for spec in self._validaciones:
-            if not spec.is_satisfied_by(self.root):
-                errors.append(f"Validación fallida: {spec.__class__.__name__}")
+        invariantes = self._invariantes()
+        if metricas.activa:
+            fallas = invariantes.fallas_medidas(self.root, _ETIQUETAS)
+        else:
+            fallas = invariantes.fallas(self.root)
+        errors = [f"Validación fallida: {nombre}" for nombre in fallas]
         if errors:
             raise ValueError("; ".join(errors))
+        self._pendiente_verificar = False
+        self._verificada_el = date.today()
+
+    @classmethod
+    def _invariantes(cls) -> SpecificationCompilada:
+        hoy, compiladas = date.today(), cls._compiladas
+        if compiladas is None or compiladas[0] != hoy:
+            compiladas = cls._compiladas = (hoy, SpecificationCompilada.desde(cls._validaciones, hoy=hoy))
+        return compiladas[1]
 
     @classmethod
     def crear_nueva(cls, id_sucursal: int, ruc_emisor: str, id_factura_modificada: int, adquiriente: str, 
@@ -72,5 +140,5 @@ class NotaCreditoAggregate:
         )
         totales = TotalesNotaCredito(0)
         aggregate = cls(nota_credito, totales)
-        aggregate._verificar_invariantes()  # Validar al crear
+        aggregate._pendiente_verificar = True  # Se valida al cerrar la edición o al emitir
         return aggregate
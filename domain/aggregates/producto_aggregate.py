@@ -1,14 +1,55 @@
 # domain/aggregates/producto_aggregate.py
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
 from domain.entities.producto import Producto
 from domain.entities.inventario import Inventario  # Entity similar para stock
 
 class ProductoAggregate:
     def __init__(self, producto: Producto, inventarios: list[Inventario]):
         self.root = producto
-        self.inventarios = inventarios  # Lista de inventarios por bodega
+        self.inventarios = []  # Lista de inventarios por bodega; agregar solo vía agregar_inventario
+        self._por_bodega: Dict[int, Inventario] = {}
+        # Resumen mantenido en cada ajuste, sin recorrer la lista
+        self._stock_total = 0
+        self._stock_por_sucursal: Dict[Optional[int], int] = {}
+        for inventario in inventarios:
+            self.agregar_inventario(inventario)
+
+    def agregar_inventario(self, inventario: Inventario):
+        if inventario.id_bodega in self._por_bodega:
+            raise ValueError("La bodega ya tiene inventario para este producto.")
+        self.inventarios.append(inventario)
+        self._por_bodega[inventario.id_bodega] = inventario
+        self._acumular(inventario.id_sucursal, inventario.cantidad_stock)
+
+    def inventario_en(self, bodega_id: int) -> Optional[Inventario]:
+        return self._por_bodega.get(bodega_id)
 
     def ajustar_stock(self, bodega_id: int, cantidad: int):
-        inventario = next((inv for inv in self.inventarios if inv.id_bodega == bodega_id), None)
+        inventario = self._por_bodega.get(bodega_id)
         if not inventario:
             raise ValueError("Bodega no encontrada.")
-        inventario.cantidad_stock += cantidad
\ No newline at end of file
+        inventario.cantidad_stock += cantidad
+        self._acumular(inventario.id_sucursal, cantidad)
+
+    def ajustar_stock_muchos(self, ajustes: Mapping[int, int]):
+        # Todo o nada: se validan todas las bodegas antes de modificar alguna
+        faltantes = [bodega_id for bodega_id in ajustes if bodega_id not in self._por_bodega]
+        if faltantes:
+            raise ValueError(f"Bodegas no encontradas: {faltantes}")
+        for bodega_id, cantidad in ajustes.items():
+            inventario = self._por_bodega[bodega_id]
+            inventario.cantidad_stock += cantidad
+            self._acumular(inventario.id_sucursal, cantidad)
+
+    @property
+    def stock_total(self) -> int:
+        return self._stock_total
+
+    @property
+    def stock_por_sucursal(self) -> Mapping[Optional[int], int]:
+        return MappingProxyType(self._stock_por_sucursal)  # Vista de solo lectura, siempre actualizada
+
+    def _acumular(self, id_sucursal: Optional[int], delta: int):
+        self._stock_total += delta
+        self._stock_por_sucursal[id_sucursal] = self._stock_por_sucursal.get(id_sucursal, 0) + delta
@@ -0,0 +1,56 @@
+# domain/entities/asiento_contable.py
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Optional
+from uuid import UUID, uuid4
+from domain.value_objects.money import Money
+
+@dataclass(slots=True)
+class LineaAsiento:
+    # Fila de ledger_line: exactamente un lado positivo, importes a centavos (DECIMAL(18, 2))
+    id_cuenta: UUID
+    debe: Money
+    haber: Money
+    id_socio: Optional[UUID] = None
+    id_centro_costo: Optional[UUID] = None
+    id_proyecto: Optional[UUID] = None
+    monto_extranjero: Optional[Money] = None
+    id_linea: UUID = field(default_factory=uuid4)
+
+@dataclass
+class AsientoContable:
+    # Fila de journal_entry con sus ledger_line. Los ids se generan aquí: el asiento y sus líneas
+    # se insertan por lotes sin esperar identificadores de la base
+    id_entidad: UUID
+    id_periodo: UUID
+    fecha: date
+    descripcion: str
+    moneda: str = "USD"
+    lineas: List[LineaAsiento] = field(default_factory=list)
+    contabilizado: bool = True
+    id_asiento: UUID = field(default_factory=uuid4)
+
+    def registrar(self, id_cuenta: UUID, micros: int, id_socio: Optional[UUID] = None):
+        # Positivo al debe, negativo al haber; un importe nulo a centavos no genera línea
+        importe, cero = Money(abs(micros), self.moneda).redondear(), Money.cero(self.moneda)
+        if not importe.micros:
+            return
+        if micros > 0:
+            self.lineas.append(LineaAsiento(id_cuenta, importe, cero, id_socio=id_socio))
+        else:
+            self.lineas.append(LineaAsiento(id_cuenta, cero, importe, id_socio=id_socio))
+
+    @property
+    def total_debe(self) -> Money:
+        return Money(sum(l.debe.micros for l in self.lineas), self.moneda)
+
+    @property
+    def total_haber(self) -> Money:
+        return Money(sum(l.haber.micros for l in self.lineas), self.moneda)
+
+    def verificar_cuadre(self):
+        if not self.lineas:
+            raise ValueError(f"Asiento sin líneas: {self.descripcion}")
+        if self.total_debe != self.total_haber:
+            raise ValueError(f"Asiento descuadrado ({self.descripcion}): "
+                             f"debe {self.total_debe}, haber {self.total_haber}")
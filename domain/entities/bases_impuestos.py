@@ -0,0 +1,52 @@
+# domain/entities/bases_impuestos.py
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+from domain.entities.codigo_impuesto import TIPO_EXENTO, TIPO_NO_OBJETO
+from domain.value_objects.money import aplicar_porcentaje, redondear_a_centavos
+
+# Bases de un documento agrupadas por (tipo de base, tarifa de IVA): [base, ICE] en micro-unidades.
+# Lo comparten TotalesFactura, TotalesNotaCredito y MotorImpuestos.
+Clave = Tuple[str, Decimal]
+Bases = Dict[Clave, List[int]]
+
+def ice_linea(valor_micros: int, tarifa_ice: Decimal) -> int:
+    return redondear_a_centavos(aplicar_porcentaje(valor_micros, tarifa_ice)) if tarifa_ice else 0
+
+def bases_por_grupo(lineas: Iterable, moneda: str) -> Bases:
+    # Una sola pasada sobre las líneas
+    bases: Bases = {}
+    for linea in lineas:
+        if linea.valor_total.moneda != moneda:
+            raise ValueError(f"Línea en {linea.valor_total.moneda}, totales en {moneda}.")
+        valor = linea.valor_total.micros
+        clave = (linea.tipo_impuesto, linea.porcentaje_iva)
+        acumulado = bases.get(clave)
+        if acumulado is None:
+            acumulado = bases[clave] = [0, 0]
+        acumulado[0] += valor
+        acumulado[1] += ice_linea(valor, linea.tarifa_ice)
+    return bases
+
+def sumar_en(destino: Bases, clave: Clave, base: int, ice: int):
+    acumulado = destino.get(clave)
+    if acumulado is None:
+        acumulado = destino[clave] = [0, 0]
+    acumulado[0] += base
+    acumulado[1] += ice
+
+def resumir(bases: Bases) -> Dict[str, int]:
+    # O(número de grupos). El ICE forma parte de la base del IVA; el IVA se redondea a centavos por tarifa
+    resumen = {'subtotal': 0, 'gravada': 0, 'tarifa_0': 0, 'exenta': 0, 'no_objeto': 0, 'iva': 0, 'ice': 0}
+    for (tipo, tarifa), (base, ice) in bases.items():
+        resumen['subtotal'] += base
+        resumen['ice'] += ice
+        if tipo == TIPO_EXENTO:
+            resumen['exenta'] += base
+        elif tipo == TIPO_NO_OBJETO:
+            resumen['no_objeto'] += base
+        elif tarifa:
+            resumen['gravada'] += base
+            resumen['iva'] += redondear_a_centavos(aplicar_porcentaje(base + ice, tarifa))
+        else:
+            resumen['tarifa_0'] += base
+    return resumen
@@ -0,0 +1,30 @@
+# domain/entities/codigo_impuesto.py
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+# Clasificación de la base imponible de una línea (formulario de totales del SRI)
+TIPO_IVA = 'IVA'
+TIPO_EXENTO = 'EXENTO'
+TIPO_NO_OBJETO = 'NO_OBJETO'
+TIPO_ICE = 'ICE'
+
+@dataclass(frozen=True)
+class CodigoImpuesto:
+    # Fila de tax_code. La tabla no guarda el tipo de impuesto: se deduce del prefijo del código
+    # ('ICE...', 'EXENTO...', 'NO_OBJETO...'; cualquier otro es una tarifa de IVA)
+    codigo: str
+    nombre: str
+    tarifa: Decimal
+    id_tax_code: Optional[UUID] = None
+    id_entidad: Optional[UUID] = None
+    id_cuenta: Optional[UUID] = None
+
+    @property
+    def tipo(self) -> str:
+        codigo = self.codigo.upper()
+        for tipo in (TIPO_ICE, TIPO_EXENTO, TIPO_NO_OBJETO):
+            if codigo.startswith(tipo):
+                return tipo
+        return TIPO_IVA
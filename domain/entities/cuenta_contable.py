@@ -0,0 +1,17 @@
+# domain/entities/cuenta_contable.py
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+@dataclass(frozen=True)
+class CuentaContable:
+    # Fila de account
+    id_cuenta: UUID
+    id_entidad: UUID
+    codigo: str  # e.g., '1100.01'
+    nombre: str
+    categoria: str
+    lado_normal: str
+    id_cuenta_padre: Optional[UUID] = None
+    nivel: int = 1
+    imputable: bool = True
@@ -0,0 +1,13 @@
+# domain/entities/cuentas_producto.py
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+@dataclass(frozen=True)
+class CuentasProducto:
+    # Cuentas de la fila de product (esquema contable) que corresponde a un producto del inventario:
+    # product.code es el id_producto de Productos
+    id_producto: int
+    id_cuenta_ingreso: Optional[UUID] = None
+    id_cuenta_costo: Optional[UUID] = None
+    id_cuenta_inventario: Optional[UUID] = None
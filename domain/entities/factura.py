@@ -6,37 +6,63 @@ from decimal import Decimal
 from domain.value_objects.direccion import Direccion
 from domain.value_objects.ruc import RUC
 from domain.value_objects.forma_pago import FormaPago
+from domain.value_objects.money import Money
 from domain.entities.linea_factura import LineaFactura
+from domain.entities.bases_impuestos import Bases
 from domain.entities.totales_factura import TotalesFactura
 
 @dataclass
 class Factura:
-    id_factura: Optional[int] = None  # None para nuevas facturas
     id_sucursal: int
-    id_bodega: Optional[int] = None
-    ruc_emisor: RUC = field(default_factory=lambda: RUC("0000000000000"))  # Placeholder
     identificacion_adquiriente: str
     razon_social_emisor: str
     direccion_matriz: Direccion
+    id_factura: Optional[int] = None  # None para nuevas facturas
+    id_bodega: Optional[int] = None
+    ruc_emisor: RUC = field(default_factory=lambda: RUC("0000000000000"))  # Placeholder
     fecha_emision: date = field(default_factory=date.today)
     fecha_caducidad: Optional[date] = field(default_factory=lambda: date.today() + timedelta(days=30))
     fecha_autorizacion: date = field(default_factory=date.today)
-    forma_pago: FormaPago = field(default_factory=lambda: FormaPago("Efectivo", Decimal('0.00')))
+    forma_pago: FormaPago = field(default_factory=lambda: FormaPago("Efectivo", Money.cero()))
     lineas: List[LineaFactura] = field(default_factory=list)
     totales: Optional[TotalesFactura] = None  # Se crea en aggregate
 
     def agregar_linea(self, linea: LineaFactura):
         self.lineas.append(linea)
-        self._actualizar_totales()
+        self._totales_actuales().agregar_linea(linea)
+
+    def agregar_lineas(self, lineas: List[LineaFactura], bases: Optional[Bases] = None):
+        self.lineas.extend(lineas)
+        self._totales_actuales().agregar_lineas(lineas, bases)
+
+    def quitar_linea(self, linea: LineaFactura):
+        posicion = next((i for i, actual in enumerate(self.lineas) if actual is linea), None)
+        if posicion is None:
+            raise ValueError("Línea no pertenece a la factura.")
+        del self.lineas[posicion]
+        self._totales_actuales().quitar_linea(linea)
+
+    def aplicar_descuento_linea(self, linea: LineaFactura, porcentaje: Decimal):
+        valor_anterior = linea.valor_total
+        linea.aplicar_descuento(porcentaje)
+        self._totales_actuales().reemplazar_linea(valor_anterior, linea)
+
+    def verificar_totales(self):
+        if not self._totales_actuales().verificar(self.lineas):
+            raise ValueError("Totales de factura no coinciden con las líneas.")
 
     def _actualizar_totales(self):
+        # Recalculo completo; las operaciones sobre líneas actualizan los totales de forma incremental
+        self._totales_actuales().actualizar_desde_lineas(self.lineas)
+
+    def _totales_actuales(self) -> TotalesFactura:
         if not self.totales:
             self.totales = TotalesFactura(self.id_factura or 0)  # Temporal ID
-        self.totales.actualizar_desde_lineas(self.lineas)
+        return self.totales
 
     def validar_emision(self):
         if not self.lineas:
             raise ValueError("Factura debe tener al menos una línea.")
-        if self.totales.valor_total <= 0:
+        if not self.totales.valor_total.es_positivo():
             raise ValueError("Total de factura inválido.")
         # Aquí: Chequear stock en bodega vía service (no en entity)
\ No newline at end of file
@@ -0,0 +1,77 @@
+# domain/entities/historial_fifo.py
+from array import array
+from collections import Counter
+from datetime import date
+from typing import Iterable, Optional, Tuple
+from domain.entities.movimientos_batch import _CODIGOS_TIPO
+
+ENTRADA = _CODIGOS_TIPO['ENTRADA']
+SALIDA = _CODIGOS_TIPO['SALIDA']
+
+class HistorialFIFO:
+    # Movimientos de un (producto, bodega) en orden cronológico (fecha, id_movimiento), en columnas.
+    # Es la entrada de la reproducción FIFO: se envía a otros procesos y array se serializa como bytes.
+    # fecha es el ordinal de la fecha (date.toordinal); 0 si el movimiento no tiene fecha.
+    # La apertura son las capas (cantidad, costo) de stock anterior a todo movimiento registrado: inventario
+    # inicial o lotes cargados directamente, sin un movimiento ENTRADA que los respalde.
+    __slots__ = ('id_producto', 'id_bodega', 'id_movimiento', 'tipo', 'cantidad', 'costo_micros', 'fecha',
+                 'apertura_cantidad', 'apertura_costo')
+
+    def __init__(self, id_producto: int, id_bodega: int):
+        self.id_producto = id_producto
+        self.id_bodega = id_bodega
+        self.id_movimiento = array('q')
+        self.tipo = array('b')
+        self.cantidad = array('q')
+        self.costo_micros = array('q')
+        self.fecha = array('l')
+        self.apertura_cantidad = array('q')
+        self.apertura_costo = array('q')
+
+    def agregar(self, id_movimiento: int, tipo_movimiento: str, cantidad: int, costo_micros: int,
+                fecha: Optional[date] = None):
+        self.id_movimiento.append(id_movimiento)
+        self.tipo.append(_CODIGOS_TIPO[tipo_movimiento])
+        self.cantidad.append(cantidad)
+        self.costo_micros.append(costo_micros)
+        self.fecha.append(fecha.toordinal() if fecha is not None else 0)
+
+    def __len__(self) -> int:
+        return len(self.cantidad)
+
+    def abrir_desde_lotes(self, lotes: Iterable[Tuple[int, Optional[int], int, int]]):
+        # lotes: (cantidad_restante, cantidad_inicial, costo_micros, fecha_entrada ordinal) del par en orden FIFO.
+        # El stock de apertura es lo que hay hoy en los lotes menos las entradas más las salidas registradas;
+        # se toma de los lotes más antiguos con su cantidad inicial. Un lote que creó una ENTRADA del historial
+        # (misma fecha y costo) ya entra a la cola con ella y no aporta a la apertura. Lotes sin
+        # cantidad_inicial (anteriores a la columna) solo aportan lo que les queda; el faltante va primero,
+        # al costo del lote de apertura más antiguo.
+        lotes = list(lotes)
+        apertura = sum(restante for restante, _, _, _ in lotes)
+        respaldados = Counter()
+        for tipo, cantidad, costo, fecha in zip(self.tipo, self.cantidad, self.costo_micros, self.fecha):
+            if tipo == ENTRADA:
+                apertura -= cantidad
+                respaldados[fecha, costo] += 1
+            else:
+                apertura += cantidad
+        sin_entrada = []
+        for lote in lotes:
+            clave = (lote[3], lote[2])
+            if respaldados[clave]:
+                respaldados[clave] -= 1
+            else:
+                sin_entrada.append(lote)
+        capas = []
+        for restante, inicial, costo, _ in sin_entrada:
+            if apertura <= 0:
+                break
+            capa = min(restante if inicial is None else inicial, apertura)
+            if capa > 0:
+                capas.append((capa, costo))
+                apertura -= capa
+        if apertura > 0 and lotes:
+            capas.insert(0, (apertura, (sin_entrada or lotes)[0][2]))
+        for cantidad, costo in capas:
+            self.apertura_cantidad.append(cantidad)
+            self.apertura_costo.append(costo)
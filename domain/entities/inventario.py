@@ -0,0 +1,11 @@
+# domain/entities/inventario.py
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class Inventario:
+    id_producto: int
+    id_bodega: int
+    cantidad_stock: int = 0
+    id_sucursal: Optional[int] = None
+    id_inventario: Optional[int] = None  # None para nuevos
@@ -3,25 +3,33 @@
 from dataclasses import dataclass, field
 from decimal import Decimal
 from typing import Optional
+from domain.entities.codigo_impuesto import TIPO_IVA
+from domain.value_objects.money import Money
 from domain.value_objects.precio import Precio
 
-@dataclass
+@dataclass(slots=True)
 class LineaFactura:
-    id_linea_factura: Optional[int] = None  # None para nuevas
     id_producto: int
     descripcion: str
     cantidad: int
     precio_unitario: Precio
+    id_linea_factura: Optional[int] = None  # None para nuevas
     id_descuento: Optional[int] = None
-    valor_total: Decimal = field(init=False)
+    valor_total: Money = field(init=False)  # precioTotalSinImpuesto: redondeado a centavos
+    porcentaje_iva: Decimal = Decimal('12')
+    # tax_code de la línea; MotorImpuestos los resuelve y fija porcentaje_iva, tipo_impuesto y tarifa_ice
+    codigo_impuesto: Optional[str] = None
+    codigo_ice: Optional[str] = None
+    tipo_impuesto: str = TIPO_IVA
+    tarifa_ice: Decimal = Decimal('0')
 
     def __post_init__(self):
         if self.cantidad <= 0:
             raise ValueError("Cantidad debe ser positiva.")
-        self.valor_total = self.cantidad * self.precio_unitario.valor
+        self.valor_total = (self.precio_unitario.monto * self.cantidad).redondear()
 
     def aplicar_descuento(self, descuento_valor: Decimal):
         if descuento_valor < 0 or descuento_valor > 100:
             raise ValueError("Descuento inválido.")
         self.precio_unitario = self.precio_unitario.aplicar_descuento(descuento_valor)
-        self.valor_total = self.cantidad * self.precio_unitario.valor
\ No newline at end of file
+        self.valor_total = (self.precio_unitario.monto * self.cantidad).redondear()
\ No newline at end of file
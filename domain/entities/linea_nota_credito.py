@@ -2,23 +2,31 @@
 from dataclasses import dataclass, field
 from decimal import Decimal
 from typing import Optional
+from domain.entities.codigo_impuesto import TIPO_IVA
+from domain.value_objects.money import Money
 
-@dataclass
+@dataclass(slots=True)
 class LineaNotaCredito:
-    id_linea_nota_credito: Optional[int] = None  # None para nuevas
     id_producto: int
     descripcion: str
     cantidad: int
-    valor_item_cobrado: Decimal  # Valor original cobrado en factura
-    valor_total: Decimal = field(init=False)
+    valor_item_cobrado: Money  # Valor original cobrado en factura
+    id_linea_nota_credito: Optional[int] = None  # None para nuevas
+    valor_total: Money = field(init=False)
+    porcentaje_iva: Decimal = Decimal('12')
+    # tax_code de la línea; MotorImpuestos los resuelve y fija porcentaje_iva, tipo_impuesto y tarifa_ice
+    codigo_impuesto: Optional[str] = None
+    codigo_ice: Optional[str] = None
+    tipo_impuesto: str = TIPO_IVA
+    tarifa_ice: Decimal = Decimal('0')
 
     def __post_init__(self):
         if self.cantidad <= 0:
             raise ValueError("Cantidad debe ser positiva.")
-        self.valor_total = self.cantidad * self.valor_item_cobrado  # Ajustar lógica si hay descuentos/IVA
+        self.valor_total = (self.valor_item_cobrado * self.cantidad).redondear()  # Ajustar lógica si hay descuentos/IVA
 
-    def ajustar_valor(self, nuevo_valor: Decimal):
-        if nuevo_valor <= 0:
+    def ajustar_valor(self, nuevo_valor: Money):
+        if not nuevo_valor.es_positivo():
             raise ValueError("Valor inválido.")
         self.valor_item_cobrado = nuevo_valor
-        self.valor_total = self.cantidad * self.valor_item_cobrado
\ No newline at end of file
+        self.valor_total = (self.valor_item_cobrado * self.cantidad).redondear()
\ No newline at end of file
@@ -0,0 +1,19 @@
+# domain/entities/lote.py
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+from domain.value_objects.money import Money
+
+@dataclass
+class Lote:
+    id_lote: Optional[int]
+    id_producto: int
+    id_bodega: int
+    fecha_entrada: date
+    cantidad_restante: int
+    costo_unitario: Money
+    version: int = 0  # Control de concurrencia optimista: se incrementa en cada escritura
+
+    @property
+    def agotado(self) -> bool:
+        return self.cantidad_restante <= 0
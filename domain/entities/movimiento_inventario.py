@@ -1,17 +1,21 @@
-from decimal import Decimal
 from typing import Optional
+from domain.value_objects.money import Money
 
 class MovimientoInventario:
+    __slots__ = ('id_producto', 'id_bodega', 'tipo_movimiento', 'cantidad', 'costo_unitario_aplicado',
+                 'id_factura', 'fecha', 'observaciones', 'id_nota_credito')
+
     def __init__(
         self,
         id_producto: int,
         id_bodega: int,
         tipo_movimiento: str,
         cantidad: int,
-        costo_unitario_aplicado: Decimal,
+        costo_unitario_aplicado: Money,
         id_factura: Optional[int] = None,
         fecha: Optional[str] = None,
-        observaciones: Optional[str] = None
+        observaciones: Optional[str] = None,
+        id_nota_credito: Optional[int] = None  # Entradas por devolución
     ):
         self.id_producto = id_producto
         self.id_bodega = id_bodega
@@ -21,6 +25,7 @@ class MovimientoInventario:
         self.id_factura = id_factura
         self.fecha = fecha
         self.observaciones = observaciones
+        self.id_nota_credito = id_nota_credito
 
     def __repr__(self):
         return (
@@ -0,0 +1,124 @@
+# domain/entities/movimientos_batch.py
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from domain.entities.movimiento_inventario import MovimientoInventario
+from domain.value_objects.money import Money
+
+_TIPOS = ('ENTRADA', 'SALIDA')
+_CODIGOS_TIPO = {tipo: codigo for codigo, tipo in enumerate(_TIPOS)}
+_SIN_ID = -1
+
+class MovimientosBatch:
+    # Movimientos en columnas (array de enteros de 64 bits) en lugar de un objeto por movimiento.
+    # Pensado para despachos y reproducciones FIFO grandes; los MovimientoInventario se materializan
+    # solo al iterar o indexar. fecha/observaciones casi siempre son None y se guardan aparte.
+    # Los costos son los micros de Money; todos los movimientos de un batch comparten moneda. Un batch vacío
+    # toma la del primer movimiento o batch que recibe (la moneda del constructor vale solo para su costo_total).
+    __slots__ = ('id_producto', 'id_bodega', 'tipo', 'cantidad', 'costo_micros', 'id_factura', 'id_nota_credito',
+                 '_extras', 'moneda')
+
+    def __init__(self, moneda: str = "USD"):
+        self.moneda = moneda
+        self.id_producto = array('q')
+        self.id_bodega = array('q')
+        self.tipo = array('b')
+        self.cantidad = array('q')
+        self.costo_micros = array('q')
+        self.id_factura = array('q')
+        self.id_nota_credito = array('q')
+        self._extras: Dict[int, Tuple[Optional[str], Optional[str]]] = {}  # posición -> (fecha, observaciones)
+
+    @classmethod
+    def desde(cls, movimientos: Iterable[MovimientoInventario], moneda: str = "USD") -> 'MovimientosBatch':
+        batch = cls(moneda)
+        for movimiento in movimientos:
+            batch.agregar_movimiento(movimiento)
+        return batch
+
+    def agregar(self, id_producto: int, id_bodega: int, tipo_movimiento: str, cantidad: int,
+                costo_unitario: Money, id_factura: Optional[int] = None,
+                fecha: Optional[str] = None, observaciones: Optional[str] = None,
+                id_nota_credito: Optional[int] = None):
+        if not self.cantidad:
+            self.moneda = costo_unitario.moneda
+        elif costo_unitario.moneda != self.moneda:
+            raise ValueError(f"Costo en {costo_unitario.moneda}, movimientos en {self.moneda}.")
+        self.agregar_micros(id_producto, id_bodega, tipo_movimiento, cantidad, costo_unitario.micros, id_factura,
+                            id_nota_credito)
+        if fecha is not None or observaciones is not None:
+            self._extras[len(self.cantidad) - 1] = (fecha, observaciones)
+
+    def agregar_micros(self, id_producto: int, id_bodega: int, tipo_movimiento: str, cantidad: int,
+                       costo_micros: int, id_factura: Optional[int] = None, id_nota_credito: Optional[int] = None):
+        self.id_producto.append(id_producto)
+        self.id_bodega.append(id_bodega)
+        self.tipo.append(_CODIGOS_TIPO[tipo_movimiento])
+        self.cantidad.append(cantidad)
+        self.costo_micros.append(costo_micros)
+        self.id_factura.append(_SIN_ID if id_factura is None else id_factura)
+        self.id_nota_credito.append(_SIN_ID if id_nota_credito is None else id_nota_credito)
+
+    def agregar_movimiento(self, m: MovimientoInventario):
+        self.agregar(m.id_producto, m.id_bodega, m.tipo_movimiento, m.cantidad, m.costo_unitario_aplicado,
+                     m.id_factura, m.fecha, m.observaciones, m.id_nota_credito)
+
+    def extender(self, otro: 'MovimientosBatch'):
+        if not otro.cantidad:
+            return
+        if not self.cantidad:
+            self.moneda = otro.moneda
+        elif otro.moneda != self.moneda:
+            raise ValueError(f"Movimientos en {otro.moneda} y {self.moneda}.")
+        desplazamiento = len(self)
+        self.id_producto.extend(otro.id_producto)
+        self.id_bodega.extend(otro.id_bodega)
+        self.tipo.extend(otro.tipo)
+        self.cantidad.extend(otro.cantidad)
+        self.costo_micros.extend(otro.costo_micros)
+        self.id_factura.extend(otro.id_factura)
+        self.id_nota_credito.extend(otro.id_nota_credito)
+        for posicion, extra in otro._extras.items():
+            self._extras[desplazamiento + posicion] = extra
+
+    def __len__(self) -> int:
+        return len(self.cantidad)
+
+    def __getitem__(self, posicion: int) -> MovimientoInventario:
+        if posicion < 0:
+            posicion += len(self)
+        id_factura = self.id_factura[posicion]
+        id_nota_credito = self.id_nota_credito[posicion]
+        fecha, observaciones = self._extras.get(posicion, (None, None))
+        return MovimientoInventario(
+            id_producto=self.id_producto[posicion],
+            id_bodega=self.id_bodega[posicion],
+            tipo_movimiento=_TIPOS[self.tipo[posicion]],
+            cantidad=self.cantidad[posicion],
+            costo_unitario_aplicado=Money(self.costo_micros[posicion], self.moneda),
+            id_factura=None if id_factura == _SIN_ID else id_factura,
+            fecha=fecha,
+            observaciones=observaciones,
+            id_nota_credito=None if id_nota_credito == _SIN_ID else id_nota_credito,
+        )
+
+    def __iter__(self) -> Iterator[MovimientoInventario]:
+        for posicion in range(len(self)):
+            yield self[posicion]
+
+    def costo_total(self) -> Money:
+        # Suma exacta en enteros
+        return Money(sum(c * q for c, q in zip(self.costo_micros, self.cantidad)), self.moneda)
+
+    def costo_por_producto(self) -> Dict[int, int]:
+        # {id_producto: costo total en micros}, sin redondear
+        costos = defaultdict(int)
+        for producto, costo, cantidad in zip(self.id_producto, self.costo_micros, self.cantidad):
+            costos[producto] += costo * cantidad
+        return dict(costos)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(columna.itemsize * len(columna) for columna in
+                   (self.id_producto, self.id_bodega, self.tipo, self.cantidad, self.costo_micros, self.id_factura,
+                    self.id_nota_credito))
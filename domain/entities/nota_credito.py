@@ -5,38 +5,63 @@ from typing import List, Optional
 from domain.value_objects.ruc import RUC
 from domain.value_objects.direccion import Direccion
 from domain.value_objects.motivo_modificacion import MotivoModificacion
+from domain.value_objects.money import Money
 from domain.entities.linea_nota_credito import LineaNotaCredito
+from domain.entities.bases_impuestos import Bases
 from domain.entities.totales_nota_credito import TotalesNotaCredito
 
 @dataclass
 class NotaCredito:
-    id_nota_credito: Optional[int] = None  # None para nuevas
     id_sucursal: int
-    ruc_emisor: RUC = field(default_factory=lambda: RUC("0000000000000"))  # Placeholder
-    fecha_emision: date = field(default_factory=date.today)
-    fecha_caducidad: Optional[date] = field(default_factory=lambda: date.today() + timedelta(days=30))
-    fecha_autorizacion: date = field(default_factory=date.today)
     id_factura_modificada: int
     identificacion_adquiriente: str
     razon_social_emisor: str
     direccion_matriz: Direccion
+    id_nota_credito: Optional[int] = None  # None para nuevas
+    ruc_emisor: RUC = field(default_factory=lambda: RUC("0000000000000"))  # Placeholder
+    fecha_emision: date = field(default_factory=date.today)
+    fecha_caducidad: Optional[date] = field(default_factory=lambda: date.today() + timedelta(days=30))
+    fecha_autorizacion: date = field(default_factory=date.today)
     motivo_modificacion: MotivoModificacion = field(default_factory=lambda: MotivoModificacion(""))
     lineas: List[LineaNotaCredito] = field(default_factory=list)
     totales: Optional[TotalesNotaCredito] = None  # Se crea en aggregate
 
     def agregar_linea(self, linea: LineaNotaCredito):
         self.lineas.append(linea)
-        self._actualizar_totales()
+        self._totales_actuales().agregar_linea(linea)
+
+    def agregar_lineas(self, lineas: List[LineaNotaCredito], bases: Optional[Bases] = None):
+        self.lineas.extend(lineas)
+        self._totales_actuales().agregar_lineas(lineas, bases)
+
+    def quitar_linea(self, linea: LineaNotaCredito):
+        posicion = next((i for i, actual in enumerate(self.lineas) if actual is linea), None)
+        if posicion is None:
+            raise ValueError("Línea no pertenece a la nota de crédito.")
+        del self.lineas[posicion]
+        self._totales_actuales().quitar_linea(linea)
+
+    def ajustar_valor_linea(self, linea: LineaNotaCredito, nuevo_valor: Money):
+        valor_anterior = linea.valor_total
+        linea.ajustar_valor(nuevo_valor)
+        self._totales_actuales().reemplazar_linea(valor_anterior, linea)
+
+    def verificar_totales(self):
+        if not self._totales_actuales().verificar(self.lineas):
+            raise ValueError("Totales de nota de crédito no coinciden con las líneas.")
 
     def _actualizar_totales(self):
+        self._totales_actuales().actualizar_desde_lineas(self.lineas)
+
+    def _totales_actuales(self) -> TotalesNotaCredito:
         if not self.totales:
             self.totales = TotalesNotaCredito(self.id_nota_credito or 0)  # Temporal ID
-        self.totales.actualizar_desde_lineas(self.lineas)
+        return self.totales
 
     def validar_emision(self):
         if not self.lineas:
             raise ValueError("Nota de crédito debe tener al menos una línea.")
-        if self.totales.valor_total <= 0:
+        if not self.totales.valor_total.es_positivo():
             raise ValueError("Total de nota de crédito inválido.")
         if not self.motivo_modificacion.descripcion:
             raise ValueError("Motivo requerido.")
@@ -0,0 +1,17 @@
+# domain/entities/periodo_fiscal.py
+from dataclasses import dataclass
+from datetime import date
+from uuid import UUID
+
+@dataclass(frozen=True)
+class PeriodoFiscal:
+    # Fila de fiscal_period
+    id_periodo: UUID
+    id_entidad: UUID
+    codigo: str  # e.g., '2025-08'
+    fecha_inicio: date
+    fecha_fin: date
+    cerrado: bool = False
+
+    def contiene(self, fecha: date) -> bool:
+        return self.fecha_inicio <= fecha <= self.fecha_fin
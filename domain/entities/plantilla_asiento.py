@@ -0,0 +1,34 @@
+# domain/entities/plantilla_asiento.py
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+# journal_template_line.normal_side
+LADO_DEBITO = 'DEBIT'
+LADO_CREDITO = 'CREDIT'
+
+@dataclass(frozen=True)
+class LineaPlantilla:
+    # Fila de journal_template_line
+    id_linea: UUID
+    lado_normal: str
+    expresion_monto: str  # Sobre los totales del documento, ver domain/services/expresiones_monto.py
+    id_cuenta: Optional[UUID] = None
+    categoria_cuenta: Optional[str] = None  # Si no hay cuenta fija
+    moneda: Optional[str] = None
+    id_centro_costo: Optional[UUID] = None
+    id_proyecto: Optional[UUID] = None
+    tipo_socio: Optional[str] = None
+
+@dataclass
+class PlantillaAsiento:
+    # Fila de journal_template con sus líneas
+    id_plantilla: UUID
+    id_entidad: UUID
+    codigo: str
+    nombre: str
+    lineas: List[LineaPlantilla] = field(default_factory=list)
+    activa: bool = True
+    # Último cambio de la plantilla o de cualquiera de sus líneas: versión de la plantilla compilada
+    actualizado_en: Optional[datetime] = None
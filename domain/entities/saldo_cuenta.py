@@ -0,0 +1,55 @@
+# domain/entities/saldo_cuenta.py
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from domain.entities.asiento_contable import AsientoContable
+
+ClaveSaldo = Tuple[UUID, UUID, Optional[UUID]]  # (cuenta, período, centro de costo)
+
+@dataclass
+class SaldoCuenta:
+    # Fila de account_balance, o el incremento que un lote de asientos le suma. Importes en micros
+    id_entidad: UUID
+    id_cuenta: UUID
+    id_periodo: UUID
+    id_centro_costo: Optional[UUID] = None
+    debe: int = 0
+    haber: int = 0
+    lineas: int = 0
+
+    @property
+    def clave(self) -> ClaveSaldo:
+        return self.id_cuenta, self.id_periodo, self.id_centro_costo
+
+def saldos_de(asientos: Iterable[AsientoContable]) -> List[SaldoCuenta]:
+    # Incrementos agregados por (cuenta, período, centro de costo) de los asientos contabilizados:
+    # un lote de miles de líneas suele tocar solo decenas de saldos
+    saldos: Dict[ClaveSaldo, SaldoCuenta] = {}
+    for asiento in asientos:
+        if not asiento.contabilizado:
+            continue
+        for linea in asiento.lineas:
+            clave = (linea.id_cuenta, asiento.id_periodo, linea.id_centro_costo)
+            saldo = saldos.get(clave)
+            if saldo is None:
+                saldo = saldos[clave] = SaldoCuenta(asiento.id_entidad, *clave)
+            saldo.debe += linea.debe.micros
+            saldo.haber += linea.haber.micros
+            saldo.lineas += 1
+    return list(saldos.values())
+
+def saldos_de_cierre(id_periodo: UUID, anteriores: Iterable[SaldoCuenta],
+                     del_periodo: Iterable[SaldoCuenta]) -> List[SaldoCuenta]:
+    # Saldos acumulados al cierre de id_periodo: los del cierre anterior más el movimiento del período,
+    # por (cuenta, centro de costo)
+    cierre: Dict[Tuple[UUID, Optional[UUID]], SaldoCuenta] = {}
+    for saldo in (*anteriores, *del_periodo):
+        clave = (saldo.id_cuenta, saldo.id_centro_costo)
+        acumulado = cierre.get(clave)
+        if acumulado is None:
+            acumulado = cierre[clave] = SaldoCuenta(saldo.id_entidad, saldo.id_cuenta, id_periodo,
+                                                    saldo.id_centro_costo)
+        acumulado.debe += saldo.debe
+        acumulado.haber += saldo.haber
+        acumulado.lineas += saldo.lineas
+    return list(cierre.values())
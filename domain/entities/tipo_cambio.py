@@ -0,0 +1,19 @@
+# domain/entities/tipo_cambio.py
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+
+@dataclass(frozen=True)
+class TipoCambio:
+    # Fila de exchange_rate: 1 moneda_origen = tasa moneda_destino, vigente desde fecha
+    moneda_origen: str
+    moneda_destino: str
+    fecha: date
+    tasa: int  # Micros (DECIMAL(15, 6))
+    actualizado_en: Optional[datetime] = None  # updated_at, o created_at si nunca se actualizó
+
+    def __post_init__(self):
+        if self.tasa <= 0:
+            raise ValueError(f"Tipo de cambio {self.moneda_origen}/{self.moneda_destino} al {self.fecha} no positivo.")
+        if self.moneda_origen == self.moneda_destino:
+            raise ValueError(f"Tipo de cambio de {self.moneda_origen} a sí misma.")
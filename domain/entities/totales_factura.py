@@ -1,22 +1,75 @@
 # domain/entities/totales_factura.py
-from dataclasses import dataclass
-from decimal import Decimal
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+from domain.entities.bases_impuestos import Bases, bases_por_grupo, ice_linea, resumir, sumar_en
+from domain.value_objects.money import Money
 from .linea_factura import LineaFactura
 
 @dataclass
 class TotalesFactura:
     id_factura: int  # Referencia a root
-    base_imponible_12: Decimal = Decimal('0.00')
-    base_imponible_0: Decimal = Decimal('0.00')
-    descuento_comercial: Decimal = Decimal('0.00')
-    valor_subtotal: Decimal = Decimal('0.00')
-    valor_iva: Decimal = Decimal('0.00')
-    valor_ice: Decimal = Decimal('0.00')
-    valor_total: Decimal = Decimal('0.00')
-
-    def actualizar_desde_lineas(self, lineas: list['LineaFactura'], iva_porcentaje: Decimal = Decimal('12')):
-        self.valor_subtotal = sum(linea.valor_total for linea in lineas)
-        self.descuento_comercial = sum(linea.valor_total * (Decimal('0.00')) for linea in lineas)  # Lógica de descuentos globales
-        base_iva = self.valor_subtotal - self.descuento_comercial  # Asumir todo grava 12%
-        self.valor_iva = base_iva * (iva_porcentaje / 100)
-        self.valor_total = self.valor_subtotal - self.descuento_comercial + self.valor_iva + self.valor_ice
\ No newline at end of file
+    base_imponible_12: Money = Money.cero()  # Gravada con IVA distinto de 0 (cualquier tarifa)
+    base_imponible_0: Money = Money.cero()
+    base_imponible_exenta_iva: Money = Money.cero()
+    base_imponible_no_objeto_iva: Money = Money.cero()
+    descuento_comercial: Money = Money.cero()
+    valor_subtotal: Money = Money.cero()
+    valor_iva: Money = Money.cero()
+    valor_ice: Money = Money.cero()  # Suma del ICE de las líneas
+    valor_total: Money = Money.cero()
+    moneda: str = "USD"
+    # Base e ICE acumulados por (tipo de base, tarifa); permite actualizar los totales por línea sin volver a sumar todas
+    _bases: Bases = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def agregar_linea(self, linea: 'LineaFactura'):
+        self._acumular(linea, linea.valor_total.micros)
+
+    def quitar_linea(self, linea: 'LineaFactura'):
+        self._acumular(linea, -linea.valor_total.micros)
+
+    def reemplazar_linea(self, valor_anterior: Money, linea: 'LineaFactura'):
+        # Para cambios de valor en una línea ya sumada (e.g., descuento)
+        self._verificar_moneda(linea.valor_total)
+        nuevo, anterior = linea.valor_total.micros, valor_anterior.micros
+        sumar_en(self._bases, (linea.tipo_impuesto, linea.porcentaje_iva), nuevo - anterior,
+                 ice_linea(nuevo, linea.tarifa_ice) - ice_linea(anterior, linea.tarifa_ice))
+        self._recalcular_impuestos()
+
+    def agregar_lineas(self, lineas: Iterable['LineaFactura'], bases: Optional[Bases] = None):
+        # Varias líneas con un solo recalculo; bases ya agrupadas si vienen de MotorImpuestos
+        for clave, (base, ice) in (bases if bases is not None else bases_por_grupo(lineas, self.moneda)).items():
+            sumar_en(self._bases, clave, base, ice)
+        self._recalcular_impuestos()
+
+    def actualizar_desde_lineas(self, lineas: list['LineaFactura']):
+        # Recalculo completo: reconstruye las bases desde cero, sumando enteros
+        self._bases = bases_por_grupo(lineas, self.moneda)
+        self._recalcular_impuestos()
+
+    def verificar(self, lineas: list['LineaFactura']) -> bool:
+        # Modo verificación: compara los totales incrementales contra un recalculo completo
+        esperado = TotalesFactura(self.id_factura, moneda=self.moneda)
+        esperado.actualizar_desde_lineas(lineas)
+        return esperado == self
+
+    def _acumular(self, linea: 'LineaFactura', delta: int):
+        self._verificar_moneda(linea.valor_total)
+        sumar_en(self._bases, (linea.tipo_impuesto, linea.porcentaje_iva), delta, ice_linea(delta, linea.tarifa_ice))
+        self._recalcular_impuestos()
+
+    def _verificar_moneda(self, valor: Money):
+        if valor.moneda != self.moneda:
+            raise ValueError(f"Línea en {valor.moneda}, totales en {self.moneda}.")
+
+    def _recalcular_impuestos(self):
+        # O(número de grupos), no O(número de líneas)
+        resumen, moneda = resumir(self._bases), self.moneda
+        self.descuento_comercial = Money.cero(moneda)  # Lógica de descuentos globales
+        self.valor_subtotal = Money(resumen['subtotal'], moneda)
+        self.base_imponible_12 = Money(resumen['gravada'], moneda)
+        self.base_imponible_0 = Money(resumen['tarifa_0'], moneda)
+        self.base_imponible_exenta_iva = Money(resumen['exenta'], moneda)
+        self.base_imponible_no_objeto_iva = Money(resumen['no_objeto'], moneda)
+        self.valor_iva = Money(resumen['iva'], moneda)
+        self.valor_ice = Money(resumen['ice'], moneda)
+        self.valor_total = self.valor_subtotal - self.descuento_comercial + self.valor_iva + self.valor_ice
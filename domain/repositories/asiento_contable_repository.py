@@ -0,0 +1,18 @@
+# domain/repositories/asiento_contable_repository.py
+from abc import ABC, abstractmethod
+from typing import List, Sequence
+from uuid import UUID
+from domain.entities.asiento_contable import AsientoContable
+
+class AsientoContableRepository(ABC):
+    @abstractmethod
+    def guardar_muchos(self, asientos: Sequence[AsientoContable]):
+        pass  # INSERT multi-fila de journal_entry y de todas sus ledger_line, en la transacción actual
+
+    @abstractmethod
+    def contar_sin_contabilizar(self, id_entidad: UUID, id_periodo: UUID) -> int:
+        pass  # Asientos vigentes del período con is_posted = 0
+
+    @abstractmethod
+    def obtener_descuadrados(self, id_entidad: UUID, id_periodo: UUID, limite: int = 10) -> List[UUID]:
+        pass  # Hasta `limite` asientos contabilizados del período cuyo debe no coincide con el haber
@@ -0,0 +1,31 @@
+# domain/repositories/async_factura_repository.py
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Sequence
+from domain.aggregates.factura_aggregate import FacturaAggregate
+from domain.value_objects.money import Money
+
+class AsyncFacturaRepository(ABC):
+    # Contraparte de FacturaRepository para un event loop: mismas operaciones, con await
+    @abstractmethod
+    async def obtener_por_id(self, id: int) -> Optional[FacturaAggregate]:
+        pass
+
+    @abstractmethod
+    async def obtener_muchos(self, ids: Iterable[int]) -> List[FacturaAggregate]:
+        pass  # En el orden de ids, omitiendo los inexistentes; número fijo de consultas
+
+    @abstractmethod
+    async def bloquear(self, id_factura: int):
+        pass  # SELECT ... FOR UPDATE de la fila, hasta el commit
+
+    @abstractmethod
+    async def guardar(self, aggregate: FacturaAggregate):
+        pass  # Guardar en transacción: factura, líneas, totales
+
+    @abstractmethod
+    async def guardar_muchos(self, aggregates: Sequence[FacturaAggregate]):
+        pass  # Igual que guardar, con inserts por lotes en una sola transacción
+
+    @abstractmethod
+    async def obtener_costos_vendidos(self, id_factura: int) -> Dict[int, Money]:
+        pass  # {id_producto: costo unitario promedio ponderado de sus movimientos SALIDA}
@@ -0,0 +1,17 @@
+# domain/repositories/async_lote_repository.py
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Sequence, Tuple
+from domain.entities.lote import Lote
+from domain.entities.movimiento_inventario import MovimientoInventario
+
+class AsyncLoteRepository(ABC):
+    # Contraparte de LoteRepository para un event loop. Sin lecturas por par: AsyncInventarioService
+    # lee de una vez todos los lotes que una operación puede tocar antes de ejecutarla.
+    @abstractmethod
+    async def obtener_lotes_antiguos_muchos(self, pares: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], List[Lote]]:
+        pass  # Lotes con cantidad_restante > 0 por (producto, bodega), ordenados por fecha_entrada ascendente
+
+    @abstractmethod
+    async def actualizar_muchos(self, lotes: Sequence[Lote], movimientos: Sequence[MovimientoInventario] = (),
+                                nuevos: Sequence[Lote] = ()):
+        pass  # Mismo contrato que LoteRepository.actualizar_muchos, incluido ConflictoConcurrencia
@@ -0,0 +1,18 @@
+# domain/repositories/async_nota_credito_repository.py
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+from domain.aggregates.nota_credito_aggregate import NotaCreditoAggregate
+
+class AsyncNotaCreditoRepository(ABC):
+    # Contraparte de NotaCreditoRepository para un event loop
+    @abstractmethod
+    async def obtener_por_id(self, id: int) -> Optional[NotaCreditoAggregate]:
+        pass
+
+    @abstractmethod
+    async def guardar(self, aggregate: NotaCreditoAggregate):
+        pass  # Guardar en transacción: nota de crédito, líneas, totales
+
+    @abstractmethod
+    async def obtener_cantidades_acreditadas(self, id_factura: int) -> Dict[int, int]:
+        pass  # {id_producto: cantidad ya devuelta} sumando todas las notas de crédito de la factura
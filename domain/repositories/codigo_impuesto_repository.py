@@ -0,0 +1,10 @@
+# domain/repositories/codigo_impuesto_repository.py
+from abc import ABC, abstractmethod
+from typing import List
+from uuid import UUID
+from domain.entities.codigo_impuesto import CodigoImpuesto
+
+class CodigoImpuestoRepository(ABC):
+    @abstractmethod
+    def obtener_por_entidad(self, id_entidad: UUID) -> List[CodigoImpuesto]:
+        pass  # Todos los tax_code vigentes (sin deleted_at) de la entidad contable
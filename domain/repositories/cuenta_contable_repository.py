@@ -0,0 +1,10 @@
+# domain/repositories/cuenta_contable_repository.py
+from abc import ABC, abstractmethod
+from typing import List
+from uuid import UUID
+from domain.entities.cuenta_contable import CuentaContable
+
+class CuentaContableRepository(ABC):
+    @abstractmethod
+    def obtener_por_entidad(self, id_entidad: UUID) -> List[CuentaContable]:
+        pass  # Plan de cuentas vigente (sin deleted_at) de la entidad
@@ -0,0 +1,10 @@
+# domain/repositories/cuentas_producto_repository.py
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable
+from uuid import UUID
+from domain.entities.cuentas_producto import CuentasProducto
+
+class CuentasProductoRepository(ABC):
+    @abstractmethod
+    def obtener_cuentas(self, id_entidad: UUID, ids_producto: Iterable[int]) -> Dict[int, CuentasProducto]:
+        pass  # Una consulta para todos los productos; los que no tienen fila en product no aparecen
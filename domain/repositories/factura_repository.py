@@ -1,15 +1,43 @@
 # domain/repositories/factura_repository.py
 from abc import ABC, abstractmethod
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
 from domain.aggregates.factura_aggregate import FacturaAggregate
+from domain.value_objects.money import Money
 
 class FacturaRepository(ABC):
     @abstractmethod
     def obtener_por_id(self, id: int) -> FacturaAggregate:
         pass
 
+    @abstractmethod
+    def obtener_muchos(self, ids: Iterable[int]) -> List[FacturaAggregate]:
+        pass  # En el orden de ids, omitiendo los inexistentes; número fijo de consultas
+
+    @abstractmethod
+    def bloquear(self, id_factura: int):
+        pass  # SELECT ... FOR UPDATE de la fila: otra transacción que la bloquee espera hasta el commit
+
     @abstractmethod
     def guardar(self, aggregate: FacturaAggregate):
         pass  # Guardar en transacción: factura, líneas, totales
 
+    @abstractmethod
+    def guardar_muchos(self, aggregates: Sequence[FacturaAggregate]):
+        pass  # Igual que guardar, con inserts por lotes en una sola transacción
+
+    @abstractmethod
+    def iterar(self, fecha_desde: Optional[date] = None, fecha_hasta: Optional[date] = None,
+               tamano_bloque: int = 500) -> Iterator[FacturaAggregate]:
+        pass  # Por id ascendente, leyendo de a tamano_bloque: memoria constante sin importar cuántas sean
+
+    @abstractmethod
+    def obtener_fechas_emision(self, ids: Iterable[int]) -> Dict[int, date]:
+        pass  # {id_factura: fecha_emision}, sin cargar las facturas
+
+    @abstractmethod
+    def obtener_costos_vendidos(self, id_factura: int) -> Dict[int, Money]:
+        pass  # {id_producto: costo unitario promedio ponderado de sus movimientos SALIDA}: el costo FIFO facturado
+
 
     # Service: Un FacturaService orquesta creación/emisión, inyectando dependencies como InventarioService y repository.
\ No newline at end of file
@@ -0,0 +1,31 @@
+# domain/repositories/lote_repository.py
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Sequence, Tuple
+from domain.entities.lote import Lote
+from domain.entities.movimiento_inventario import MovimientoInventario
+
+class ConflictoConcurrencia(Exception):
+    # Otro proceso modificó los lotes desde que se leyeron; la transacción completa debe reintentarse
+    def __init__(self, lotes: Sequence[Lote]):
+        super().__init__(f"Lotes modificados concurrentemente: {sorted(l.id_lote for l in lotes)}")
+        self.lotes = list(lotes)
+
+class LoteRepository(ABC):
+    @abstractmethod
+    def obtener_lotes_antiguos(self, producto_id: int, bodega_id: int) -> List[Lote]:
+        pass  # Lotes con cantidad_restante > 0, ordenados por fecha_entrada ascendente
+
+    @abstractmethod
+    def obtener_lotes_antiguos_muchos(self, pares: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], List[Lote]]:
+        pass  # Igual que obtener_lotes_antiguos, para varios (producto, bodega) en una sola consulta
+
+    @abstractmethod
+    def actualizar(self, lote: Lote):
+        pass
+
+    @abstractmethod
+    def actualizar_muchos(self, lotes: Sequence[Lote], movimientos: Sequence[MovimientoInventario] = (),
+                          nuevos: Sequence[Lote] = ()):
+        # Solo escribe lotes cuya version no cambió desde que se leyeron (y la incrementa); si no, ConflictoConcurrencia.
+        # Los nuevos se insertan y reciben su id_lote.
+        pass  # En una sola transacción: UPDATE por lotes de cantidad_restante + INSERT multi-fila de lotes y movimientos
@@ -0,0 +1,15 @@
+# domain/repositories/movimiento_inventario_repository.py
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, Optional, Sequence
+from domain.entities.historial_fifo import HistorialFIFO
+
+class MovimientoInventarioRepository(ABC):
+    @abstractmethod
+    def iterar_historiales(self, productos: Optional[Iterable[int]] = None,
+                           id_bodega: Optional[int] = None) -> Iterator[HistorialFIFO]:
+        # Un historial por (producto, bodega), agrupados por producto; en streaming, sin cargar toda la tabla.
+        pass  # Cada historial incluye su stock de apertura (HistorialFIFO.abrir_desde_lotes)
+
+    @abstractmethod
+    def actualizar_costos(self, ids: Sequence[int], costos_micros: Sequence[int]):
+        pass  # UPDATE por lotes de costo_unitario_aplicado (micros de Money)
@@ -0,0 +1,27 @@
+# domain/repositories/nota_credito_repository.py
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional
+from domain.aggregates.nota_credito_aggregate import NotaCreditoAggregate
+
+class NotaCreditoRepository(ABC):
+    @abstractmethod
+    def obtener_por_id(self, id: int) -> NotaCreditoAggregate:
+        pass
+
+    @abstractmethod
+    def obtener_muchos(self, ids: Iterable[int]) -> List[NotaCreditoAggregate]:
+        pass  # En el orden de ids, omitiendo los inexistentes; número fijo de consultas
+
+    @abstractmethod
+    def guardar(self, aggregate: NotaCreditoAggregate):
+        pass  # Guardar en transacción: nota de crédito, líneas, totales
+
+    @abstractmethod
+    def iterar(self, fecha_desde: Optional[date] = None, fecha_hasta: Optional[date] = None,
+               tamano_bloque: int = 500) -> Iterator[NotaCreditoAggregate]:
+        pass  # Por id ascendente, leyendo de a tamano_bloque: memoria constante sin importar cuántas sean
+
+    @abstractmethod
+    def obtener_cantidades_acreditadas(self, id_factura: int) -> Dict[int, int]:
+        pass  # {id_producto: cantidad ya devuelta} sumando todas las notas de crédito de la factura
@@ -0,0 +1,18 @@
+# domain/repositories/periodo_fiscal_repository.py
+from abc import ABC, abstractmethod
+from typing import Iterable, List
+from uuid import UUID
+from domain.entities.periodo_fiscal import PeriodoFiscal
+
+class PeriodoFiscalRepository(ABC):
+    @abstractmethod
+    def obtener_por_entidad(self, id_entidad: UUID) -> List[PeriodoFiscal]:
+        pass  # Períodos vigentes (sin deleted_at) de la entidad, ordenados por fecha_inicio
+
+    @abstractmethod
+    def obtener_cerrados(self, ids_periodo: Iterable[UUID]) -> List[PeriodoFiscal]:
+        pass  # Los períodos cerrados de entre los indicados
+
+    @abstractmethod
+    def cerrar(self, id_periodo: UUID):
+        pass  # Marca is_closed en la transacción actual; ValueError si no existe o ya estaba cerrado
@@ -0,0 +1,15 @@
+# domain/repositories/plantilla_asiento_repository.py
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+from domain.entities.plantilla_asiento import PlantillaAsiento
+
+class PlantillaAsientoRepository(ABC):
+    @abstractmethod
+    def obtener_muchos(self, ids: Iterable[UUID]) -> Dict[UUID, PlantillaAsiento]:
+        pass  # Plantillas vigentes (sin deleted_at) con sus líneas, por template_id
+
+    @abstractmethod
+    def obtener_versiones(self, ids: Iterable[UUID]) -> Dict[UUID, Optional[datetime]]:
+        pass  # Solo actualizado_en de cada plantilla vigente, sin leer expresiones: consulta barata por uso
@@ -1,12 +1,27 @@
 # domain/repositories/producto_repository.py
 from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List
 from domain.aggregates.producto_aggregate import ProductoAggregate
+from domain.entities.inventario import Inventario
+from domain.entities.producto import Producto
 
 class ProductoRepository(ABC):
     @abstractmethod
     def obtener_por_id(self, id: int) -> ProductoAggregate:
         pass
 
+    @abstractmethod
+    def obtener_muchos(self, ids: Iterable[int]) -> List[ProductoAggregate]:
+        pass  # Producto con sus inventarios por bodega, en el orden de ids
+
+    @abstractmethod
+    def obtener_productos(self, ids: Iterable[int]) -> Dict[int, Producto]:
+        pass  # Solo catálogo y precio (datos cacheables), sin inventarios
+
+    @abstractmethod
+    def obtener_inventarios(self, ids: Iterable[int]) -> Dict[int, List[Inventario]]:
+        pass  # Stock vivo por producto; nunca debe servirse desde caché
+
     @abstractmethod
     def guardar(self, aggregate: ProductoAggregate):
         pass
\ No newline at end of file
@@ -0,0 +1,38 @@
+# domain/repositories/saldo_cuenta_repository.py
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+from domain.entities.saldo_cuenta import SaldoCuenta
+
+class SaldoCuentaRepository(ABC):
+    @abstractmethod
+    def acumular(self, saldos: Sequence[SaldoCuenta]):
+        pass  # Suma los incrementos a account_balance (crea las filas que falten), en la transacción actual
+
+    @abstractmethod
+    def obtener_totales(self, id_entidad: UUID, id_periodo: UUID,
+                        id_centro_costo: Optional[UUID] = None) -> Dict[UUID, Tuple[int, int]]:
+        pass  # id_cuenta -> (debe, haber) en micros del período; todos los centros de costo si no se indica
+
+    @abstractmethod
+    def obtener_totales_periodos(self, id_entidad: UUID, ids_periodo: Iterable[UUID],
+                                 id_centro_costo: Optional[UUID] = None) -> Dict[UUID, Tuple[int, int]]:
+        pass  # Como obtener_totales, sumando varios períodos en una sola consulta
+
+    @abstractmethod
+    def reconstruir(self, id_entidad: UUID, id_periodo: Optional[UUID] = None) -> List[SaldoCuenta]:
+        pass  # Recalcula los saldos desde ledger_line (carga inicial o reparación); todos los períodos si no se indica.
+              # Devuelve las filas escritas
+
+    @abstractmethod
+    def guardar_cierre(self, saldos: Sequence[SaldoCuenta]):
+        pass  # INSERT multi-fila en period_closing_balance (saldos acumulados al cierre de su id_periodo)
+
+    @abstractmethod
+    def obtener_cierre(self, id_entidad: UUID, id_periodo: UUID) -> List[SaldoCuenta]:
+        pass  # Saldos acumulados al cierre del período, por cuenta y centro de costo
+
+    @abstractmethod
+    def obtener_totales_cierre(self, id_entidad: UUID, id_periodo: UUID,
+                               id_centro_costo: Optional[UUID] = None) -> Dict[UUID, Tuple[int, int]]:
+        pass  # id_cuenta -> (debe, haber) acumulados al cierre del período
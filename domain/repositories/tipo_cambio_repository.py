@@ -0,0 +1,15 @@
+# domain/repositories/tipo_cambio_repository.py
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+from domain.entities.tipo_cambio import TipoCambio
+
+class TipoCambioRepository(ABC):
+    @abstractmethod
+    def obtener_desde(self, desde: Optional[datetime] = None) -> List[TipoCambio]:
+        pass  # Tasas creadas o actualizadas en o después de `desde` (todas si no se indica)
+
+    @abstractmethod
+    def obtener_moneda_base(self, id_entidad: UUID) -> str:
+        pass  # accounting_entity.base_currency; ValueError si la entidad no existe
@@ -0,0 +1,70 @@
+# domain/services/arbol_cuentas.py
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from domain.entities.cuenta_contable import CuentaContable
+
+class ArbolCuentas:
+    # Índice en memoria del plan de cuentas de una entidad: cada cuenta es una posición en arreglos
+    # (padre, profundidad) y _orden recorre las cuentas de las más profundas a las raíces. Así los
+    # subtotales de toda la jerarquía se acumulan en una sola pasada, sin recursión ni consultas.
+    def __init__(self, cuentas: Iterable[CuentaContable]):
+        self.cuentas: List[CuentaContable] = sorted(cuentas, key=lambda c: c.codigo)
+        self._posicion: Dict[UUID, int] = {c.id_cuenta: i for i, c in enumerate(self.cuentas)}
+        self._padre: List[int] = [self._posicion.get(c.id_cuenta_padre, -1) for c in self.cuentas]
+        for cuenta, padre in zip(self.cuentas, self._padre):
+            if cuenta.id_cuenta_padre is not None and padre < 0:
+                raise ValueError(f"Cuenta {cuenta.codigo}: la cuenta padre no pertenece al plan de cuentas.")
+        self.profundidad: List[int] = self._profundidades()
+        self._orden: List[int] = sorted(range(len(self.cuentas)), key=lambda i: -self.profundidad[i])
+
+    def __len__(self) -> int:
+        return len(self.cuentas)
+
+    def cuenta(self, id_cuenta: UUID) -> CuentaContable:
+        return self.cuentas[self._indice(id_cuenta)]
+
+    def acumular(self, totales: Dict[UUID, Tuple[int, int]]) -> Tuple[List[int], List[int]]:
+        # totales: id_cuenta -> (debe, haber) propios; devuelve debe y haber de cada posición con sus descendientes
+        debe, haber = [0] * len(self.cuentas), [0] * len(self.cuentas)
+        for id_cuenta, (d, h) in totales.items():
+            i = self._indice(id_cuenta)
+            debe[i] += d
+            haber[i] += h
+        padre = self._padre
+        for i in self._orden:
+            p = padre[i]
+            if p >= 0:
+                debe[p] += debe[i]
+                haber[p] += haber[i]
+        return debe, haber
+
+    def subtotales(self, totales: Dict[UUID, Tuple[int, int]],
+                   nivel: Optional[int] = None) -> List[Tuple[CuentaContable, int, int]]:
+        # (cuenta, debe, haber) acumulados, en orden de código; solo las del nivel indicado (account.level)
+        # y solo las que tienen movimiento
+        debe, haber = self.acumular(totales)
+        return [(c, debe[i], haber[i]) for i, c in enumerate(self.cuentas)
+                if (nivel is None or c.nivel == nivel) and (debe[i] or haber[i])]
+
+    def _indice(self, id_cuenta: UUID) -> int:
+        try:
+            return self._posicion[id_cuenta]
+        except KeyError:
+            raise ValueError(f"Cuenta {id_cuenta} no pertenece al plan de cuentas.") from None
+
+    def _profundidades(self) -> List[int]:
+        # Iterativo: sube hasta una cuenta de profundidad conocida y baja asignando; detecta ciclos
+        profundidad = [-1] * len(self.cuentas)
+        for inicio in range(len(self.cuentas)):
+            camino, i, visitadas = [], inicio, set()
+            while i >= 0 and profundidad[i] < 0:
+                if i in visitadas:
+                    raise ValueError(f"Ciclo en el plan de cuentas en la cuenta {self.cuentas[i].codigo}.")
+                visitadas.add(i)
+                camino.append(i)
+                i = self._padre[i]
+            base = profundidad[i] if i >= 0 else -1
+            for j in reversed(camino):
+                base += 1
+                profundidad[j] = base
+        return profundidad
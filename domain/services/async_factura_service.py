@@ -0,0 +1,63 @@
+# domain/services/async_factura_service.py
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+from uuid import UUID
+from domain.aggregates.factura_aggregate import FacturaAggregate
+from domain.repositories.async_factura_repository import AsyncFacturaRepository
+from domain.services.async_inventario_service import AsyncInventarioService
+from domain.services.contabilizacion import ContabilizadorDocumentos
+from domain.services.factura_service import ResultadoEmision, emitir_desde_datos, pares_inventario
+from domain.services.motor_impuestos import MotorImpuestos
+
+class AsyncFacturaService:
+    # Misma construcción, impuestos y validaciones que FacturaService; solo cambia el acceso a datos.
+    # El motor de impuestos lee su catálogo con un repositorio síncrono: conviene cargarlo al iniciar
+    # (motor_impuestos.codigos(id_entidad)) para que el event loop no se bloquee en la primera factura.
+    # Con contabilizador, el asiento se escribe en la transacción de la factura; sus repositorios son síncronos y
+    # en_sincrono los ejecuta sobre la sesión de la tarea (UnidadDeTrabajoAsync.en_sincrono y sus asientos,
+    # periodos, cuentas_producto y saldos).
+    def __init__(self, factura_repo: AsyncFacturaRepository, inventario_service: AsyncInventarioService,
+                 motor_impuestos: Optional[MotorImpuestos] = None, id_entidad: Optional[UUID] = None,
+                 contabilizador: Optional[ContabilizadorDocumentos] = None,
+                 en_sincrono: Optional[Callable[[Callable[[], Any]], Awaitable[Any]]] = None):
+        if contabilizador is not None and en_sincrono is None:
+            raise ValueError("El contabilizador requiere en_sincrono para escribir en la transacción de la tarea.")
+        self.factura_repo = factura_repo
+        self.inventario_service = inventario_service
+        self.motor_impuestos = motor_impuestos
+        self.id_entidad = id_entidad
+        self.contabilizador = contabilizador
+        self.en_sincrono = en_sincrono
+
+    async def crear_y_emitir_factura(self, datos: dict) -> FacturaAggregate:
+        async with self.inventario_service.operacion(pares_inventario(datos)) as inventario:
+            aggregate, movimientos = emitir_desde_datos(datos, inventario, self.motor_impuestos, self.id_entidad)
+            await self.factura_repo.guardar(aggregate)  # Antes que los lotes, como en FacturaService
+            if self.contabilizador is not None:
+                id_entidad = datos.get('id_entidad', self.id_entidad)
+                await self.en_sincrono(lambda: self.contabilizador.guardar(
+                    [self.contabilizador.asiento_factura(aggregate, movimientos, id_entidad)]))
+        return aggregate
+
+    async def crear_y_emitir_facturas(self, lote_datos: Iterable[dict],
+                                      en_transaccion: Callable[[Callable[[], Awaitable[FacturaAggregate]]],
+                                                               Awaitable[FacturaAggregate]],
+                                      concurrencia: int = 16) -> List[ResultadoEmision]:
+        # Facturas independientes emitidas a la vez en el mismo event loop, cada una en su propia transacción
+        # (en_transaccion, e.g. UnidadDeTrabajoAsync.ejecutar); a lo sumo `concurrencia` conexiones en uso.
+        # Una factura fallida se reporta y no detiene el resto.
+        if concurrencia <= 0:
+            raise ValueError("La concurrencia debe ser positiva.")
+        semaforo = asyncio.Semaphore(concurrencia)
+
+        async def emitir(posicion: int, datos: dict) -> ResultadoEmision:
+            async with semaforo:
+                try:
+                    aggregate = await en_transaccion(lambda: self.crear_y_emitir_factura(datos))
+                except (ValueError, KeyError) as e:
+                    return ResultadoEmision(posicion, error=str(e))
+                except Exception as e:  # Su transacción ya se revirtió; las demás siguen
+                    return ResultadoEmision(posicion, error=f"Error al persistir la factura: {e}")
+            return ResultadoEmision(posicion, aggregate=aggregate)
+
+        return list(await asyncio.gather(*(emitir(p, d) for p, d in enumerate(lote_datos))))
@@ -0,0 +1,75 @@
+# domain/services/async_inventario_service.py
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from domain.entities.lote import Lote
+from domain.entities.movimiento_inventario import MovimientoInventario
+from domain.entities.movimientos_batch import MovimientosBatch
+from domain.repositories.async_lote_repository import AsyncLoteRepository
+from domain.repositories.lote_repository import LoteRepository
+from domain.services.instrumentacion import metricas, reloj
+from domain.services.inventario_service import _POLITICAS_FUSION, FUSION_NUNCA, InventarioService
+from domain.value_objects.money import Money
+
+_LECTURA = (('consulta', 'obtener_lotes_antiguos_muchos'),)
+
+class _LotesDeOperacion(LoteRepository):
+    # LoteRepository síncrono de una sola operación: sirve los lotes leídos antes de empezarla y retiene
+    # las escrituras, que AsyncInventarioService hace después con await. InventarioService, el índice FIFO
+    # y la unidad de trabajo corren así sin E/S dentro del event loop.
+    def __init__(self, lotes_por_par: Dict[Tuple[int, int], List[Lote]]):
+        self._lotes_por_par = lotes_por_par
+        self.escrituras: List[Tuple[Sequence[Lote], Sequence[MovimientoInventario], Sequence[Lote]]] = []
+
+    def obtener_lotes_antiguos(self, producto_id: int, bodega_id: int) -> List[Lote]:
+        return self.obtener_lotes_antiguos_muchos([(producto_id, bodega_id)])[(producto_id, bodega_id)]
+
+    def obtener_lotes_antiguos_muchos(self, pares: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], List[Lote]]:
+        pares = set(pares)
+        faltantes = pares - self._lotes_por_par.keys()
+        if faltantes:
+            raise LookupError(f"Lotes no leídos al iniciar la operación: {sorted(faltantes)}")
+        return {par: self._lotes_por_par[par] for par in pares}
+
+    def actualizar(self, lote: Lote):
+        self.actualizar_muchos([lote])
+
+    def actualizar_muchos(self, lotes: Sequence[Lote], movimientos: Sequence[MovimientoInventario] = (),
+                          nuevos: Sequence[Lote] = ()):
+        self.escrituras.append((list(lotes), movimientos, list(nuevos)))
+
+class AsyncInventarioService:
+    # Cada operación trabaja con sus propias copias de los lotes: las tareas concurrentes del event loop
+    # no comparten objetos Lote y los conflictos entre ellas los detecta la version al escribir,
+    # igual que entre hilos o procesos. Sin caché entre operaciones: una consulta de lotes por operación.
+    def __init__(self, lote_repo: AsyncLoteRepository, politica_fusion: str = FUSION_NUNCA):
+        if politica_fusion not in _POLITICAS_FUSION:
+            raise ValueError(f"Política de fusión de lotes desconocida: {politica_fusion}")
+        self.lote_repo = lote_repo
+        self.politica_fusion = politica_fusion
+
+    @asynccontextmanager
+    async def operacion(self, pares: Iterable[Tuple[int, int]]) -> AsyncIterator[InventarioService]:
+        # Lee los lotes de los pares (producto, bodega), entrega un InventarioService en memoria sobre ellos
+        # y, si el bloque termina sin error, escribe todo lo registrado en la transacción actual
+        inicio = reloj() if metricas.activa else None
+        lotes = _LotesDeOperacion(await self.lote_repo.obtener_lotes_antiguos_muchos(set(pares)))
+        if inicio is not None:
+            metricas.observar('lotes_lectura_segundos', reloj() - inicio, _LECTURA)
+        inventario = InventarioService(lotes, politica_fusion=self.politica_fusion)
+        with inventario.unidad_de_trabajo():
+            yield inventario
+        for lotes_modificados, movimientos, nuevos in lotes.escrituras:
+            await self.lote_repo.actualizar_muchos(lotes_modificados, movimientos, nuevos)
+
+    async def registrar_salida_fifo(self, producto_id: int, bodega_id: int, cantidad: int, factura_id: int,
+                                    columnar: bool = False) -> Union[List[MovimientoInventario], MovimientosBatch]:
+        async with self.operacion([(producto_id, bodega_id)]) as inventario:
+            return inventario.registrar_salida_fifo(producto_id, bodega_id, cantidad, factura_id, columnar=columnar)
+
+    async def registrar_entrada(self, producto_id: int, bodega_id: int, cantidad: int, costo_unitario: Money,
+                                nota_credito_id: Optional[int] = None, fecha: Optional[date] = None,
+                                columnar: bool = False) -> Union[List[MovimientoInventario], MovimientosBatch]:
+        async with self.operacion([(producto_id, bodega_id)]) as inventario:
+            return inventario.registrar_entrada(producto_id, bodega_id, cantidad, costo_unitario,
+                                                nota_credito_id=nota_credito_id, fecha=fecha, columnar=columnar)
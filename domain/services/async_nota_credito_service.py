@@ -0,0 +1,73 @@
+# domain/services/async_nota_credito_service.py
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+from domain.aggregates.nota_credito_aggregate import NotaCreditoAggregate
+from domain.repositories.async_factura_repository import AsyncFacturaRepository
+from domain.repositories.async_nota_credito_repository import AsyncNotaCreditoRepository
+from domain.services.async_inventario_service import AsyncInventarioService
+from domain.services.contabilizacion import ContabilizadorDocumentos
+from domain.services.indice_devoluciones import calcular_devolvibles, verificar_devolvibles
+from domain.services.nota_credito_service import agregar_lineas_y_validar, construir_nota_credito
+
+class AsyncNotaCreditoService:
+    # Mismas validaciones que NotaCreditoService. Las cantidades devolvibles se leen en cada emisión:
+    # un índice compartido entre tareas vería notas aún no confirmadas de otras transacciones.
+    # Las notas de una misma factura se serializan entre tareas con un asyncio.Lock y entre procesos con el
+    # bloqueo de la fila de la factura; después de guardar, la suma de la base decide.
+    # Con contabilizador, el asiento inverso al de la factura se escribe en la misma transacción, como en
+    # AsyncFacturaService (en_sincrono: UnidadDeTrabajoAsync.en_sincrono).
+    def __init__(self, nc_repo: AsyncNotaCreditoRepository, factura_repo: AsyncFacturaRepository,
+                 inventario_service: AsyncInventarioService,
+                 contabilizador: Optional[ContabilizadorDocumentos] = None, id_entidad: Optional[UUID] = None,
+                 en_sincrono: Optional[Callable[[Callable[[], Any]], Awaitable[Any]]] = None):
+        if contabilizador is not None and en_sincrono is None:
+            raise ValueError("El contabilizador requiere en_sincrono para escribir en la transacción de la tarea.")
+        self.nc_repo = nc_repo
+        self.factura_repo = factura_repo
+        self.inventario_service = inventario_service
+        self.contabilizador = contabilizador
+        self.id_entidad = id_entidad
+        self.en_sincrono = en_sincrono
+        self._cerrojos_factura: Dict[int, List] = {}  # id_factura -> [asyncio.Lock, tareas que lo tienen o esperan]
+
+    @asynccontextmanager
+    async def _bloqueo(self, id_factura: int) -> AsyncIterator[None]:
+        # El cerrojo se descarta cuando lo suelta la última tarea que lo usa
+        entrada = self._cerrojos_factura.setdefault(id_factura, [asyncio.Lock(), 0])
+        entrada[1] += 1
+        try:
+            async with entrada[0]:
+                yield
+        finally:
+            entrada[1] -= 1
+            if entrada[1] == 0:
+                del self._cerrojos_factura[id_factura]
+
+    async def crear_y_emitir_nota_credito(self, datos: dict) -> NotaCreditoAggregate:
+        factura_agg = await self.factura_repo.obtener_por_id(datos['id_factura_modificada'])
+        if not factura_agg:
+            raise ValueError("Factura no existe.")
+        id_factura = factura_agg.root.id_factura
+        costos_vendidos = await self.factura_repo.obtener_costos_vendidos(id_factura)
+
+        aggregate = construir_nota_credito(datos)
+        bodega_id = factura_agg.root.id_bodega
+        async with self._bloqueo(id_factura):
+            await self.factura_repo.bloquear(id_factura)
+            devolvibles = calcular_devolvibles(factura_agg, await self.nc_repo.obtener_cantidades_acreditadas(id_factura))
+            with aggregate.edicion():  # Invariantes internas verificadas una sola vez, al emitir
+                agregar_lineas_y_validar(aggregate, factura_agg, devolvibles, datos)
+                pares = {(linea.id_producto, bodega_id) for linea in aggregate.root.lineas}
+                async with self.inventario_service.operacion(pares) as inventario:
+                    movimientos = aggregate.emitir(inventario, bodega_id, factura_agg, costos_vendidos,
+                                                   columnar=True)
+                    await self.nc_repo.guardar(aggregate)
+                    verificar_devolvibles(calcular_devolvibles(
+                        factura_agg, await self.nc_repo.obtener_cantidades_acreditadas(id_factura)))
+                    if self.contabilizador is not None:
+                        id_entidad = datos.get('id_entidad', self.id_entidad)
+                        await self.en_sincrono(lambda: self.contabilizador.guardar(
+                            [self.contabilizador.asiento_nota_credito(aggregate, movimientos, id_entidad)]))
+        return aggregate
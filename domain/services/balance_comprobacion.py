@@ -0,0 +1,72 @@
+# domain/services/balance_comprobacion.py
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from domain.entities.cuenta_contable import CuentaContable
+from domain.repositories.cuenta_contable_repository import CuentaContableRepository
+from domain.repositories.periodo_fiscal_repository import PeriodoFiscalRepository
+from domain.repositories.saldo_cuenta_repository import SaldoCuentaRepository
+from domain.services.arbol_cuentas import ArbolCuentas
+from domain.value_objects.money import Money
+
+@dataclass(frozen=True)
+class FilaBalance:
+    cuenta: CuentaContable
+    debe: Money
+    haber: Money
+
+    @property
+    def saldo(self) -> Money:
+        return self.debe - self.haber  # Positivo: saldo deudor
+
+class BalanceComprobacionService:
+    # Balance de comprobación desde account_balance (una fila por cuenta y centro de costo del período,
+    # no las ledger_line) y el árbol de cuentas en memoria. El árbol se construye una vez por entidad;
+    # invalidar() lo descarta tras cambios en el plan de cuentas. Los saldos acumulados parten del cierre
+    # más cercano (period_closing_balance) y suman solo los períodos abiertos posteriores.
+    def __init__(self, saldo_repo: SaldoCuentaRepository, cuenta_repo: CuentaContableRepository,
+                 periodo_repo: PeriodoFiscalRepository):
+        self.saldo_repo = saldo_repo
+        self.cuenta_repo = cuenta_repo
+        self.periodo_repo = periodo_repo
+        self._arboles: Dict[UUID, ArbolCuentas] = {}
+
+    def arbol(self, id_entidad: UUID) -> ArbolCuentas:
+        arbol = self._arboles.get(id_entidad)
+        if arbol is None:
+            arbol = self._arboles[id_entidad] = ArbolCuentas(self.cuenta_repo.obtener_por_entidad(id_entidad))
+        return arbol
+
+    def invalidar(self, id_entidad: Optional[UUID] = None):
+        if id_entidad is None:
+            self._arboles.clear()
+        else:
+            self._arboles.pop(id_entidad, None)
+
+    def balance_de_comprobacion(self, id_entidad: UUID, id_periodo: UUID, nivel: Optional[int] = None,
+                                id_centro_costo: Optional[UUID] = None, moneda: str = "USD") -> List[FilaBalance]:
+        # Cuentas con movimiento en el período, con los importes de sus subcuentas; solo las de `nivel` si se indica
+        totales = self.saldo_repo.obtener_totales(id_entidad, id_periodo, id_centro_costo)
+        return [FilaBalance(cuenta, Money(debe, moneda), Money(haber, moneda))
+                for cuenta, debe, haber in self.arbol(id_entidad).subtotales(totales, nivel)]
+
+    def balance_acumulado(self, id_entidad: UUID, id_periodo: UUID, nivel: Optional[int] = None,
+                          id_centro_costo: Optional[UUID] = None, moneda: str = "USD") -> List[FilaBalance]:
+        # Debe y haber desde el inicio hasta el fin del período: el cierre más cercano a id_periodo (inclusive)
+        # más account_balance de los períodos posteriores a ese cierre
+        periodos = sorted(self.periodo_repo.obtener_por_entidad(id_entidad), key=lambda p: p.fecha_inicio)
+        posicion = next((i for i, p in enumerate(periodos) if p.id_periodo == id_periodo), None)
+        if posicion is None:
+            raise ValueError(f"Período fiscal {id_periodo} no existe.")
+        cierre = next((i for i in range(posicion, -1, -1) if periodos[i].cerrado), -1)
+        totales: Dict[UUID, Tuple[int, int]] = {}
+        if cierre >= 0:
+            totales = self.saldo_repo.obtener_totales_cierre(id_entidad, periodos[cierre].id_periodo, id_centro_costo)
+        if cierre < posicion:
+            abiertos = [p.id_periodo for p in periodos[cierre + 1:posicion + 1]]
+            for id_cuenta, (debe, haber) in self.saldo_repo.obtener_totales_periodos(
+                    id_entidad, abiertos, id_centro_costo).items():
+                d, h = totales.get(id_cuenta, (0, 0))
+                totales[id_cuenta] = (d + debe, h + haber)
+        return [FilaBalance(cuenta, Money(debe, moneda), Money(haber, moneda))
+                for cuenta, debe, haber in self.arbol(id_entidad).subtotales(totales, nivel)]
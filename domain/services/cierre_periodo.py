@@ -0,0 +1,78 @@
+# domain/services/cierre_periodo.py
+from dataclasses import replace
+from typing import List, Optional, Tuple
+from uuid import UUID
+from domain.entities.periodo_fiscal import PeriodoFiscal
+from domain.entities.saldo_cuenta import SaldoCuenta, saldos_de_cierre
+from domain.repositories.asiento_contable_repository import AsientoContableRepository
+from domain.repositories.periodo_fiscal_repository import PeriodoFiscalRepository
+from domain.repositories.saldo_cuenta_repository import SaldoCuentaRepository
+
+class CierrePeriodoService:
+    # Cierre de períodos en orden: valida que todos los asientos estén contabilizados y cuadrados,
+    # recalcula account_balance del período desde ledger_line (una sola pasada, solo ese período) y
+    # escribe en period_closing_balance el saldo acumulado por cuenta = cierre anterior + movimiento del período.
+    # El período queda bloqueado para nuevos asientos (ContabilizadorDocumentos rechaza los períodos cerrados).
+    def __init__(self, periodo_repo: PeriodoFiscalRepository, asiento_repo: AsientoContableRepository,
+                 saldo_repo: SaldoCuentaRepository):
+        self.periodo_repo = periodo_repo
+        self.asiento_repo = asiento_repo
+        self.saldo_repo = saldo_repo
+
+    def cerrar(self, id_entidad: UUID, id_periodo: UUID) -> PeriodoFiscal:
+        periodos = self._periodos(id_entidad)
+        posicion = self._posicion(periodos, id_periodo)
+        if periodos[posicion].cerrado:
+            raise ValueError(f"Período {periodos[posicion].codigo} ya está cerrado.")
+        if posicion > 0 and not periodos[posicion - 1].cerrado:
+            raise ValueError(f"Período {periodos[posicion].codigo}: el período anterior "
+                             f"{periodos[posicion - 1].codigo} no está cerrado.")
+        cerrado, _ = self._cerrar(periodos, posicion, None)
+        return cerrado
+
+    def cerrar_hasta(self, id_entidad: UUID, id_periodo: UUID) -> List[PeriodoFiscal]:
+        # Cierra en orden todos los períodos abiertos hasta id_periodo inclusive (e.g., un ejercicio completo);
+        # cada cierre parte del anterior ya en memoria
+        periodos = self._periodos(id_entidad)
+        cerrados, anterior = [], None
+        for posicion in range(self._posicion(periodos, id_periodo) + 1):
+            if periodos[posicion].cerrado:
+                anterior = None
+            else:
+                periodo, anterior = self._cerrar(periodos, posicion, anterior)
+                cerrados.append(periodo)
+        return cerrados
+
+    def _cerrar(self, periodos: List[PeriodoFiscal], posicion: int,
+                anterior: Optional[List[SaldoCuenta]]) -> Tuple[PeriodoFiscal, List[SaldoCuenta]]:
+        periodo = periodos[posicion]
+        # Primero el bloqueo: desde aquí no entran asientos nuevos al período y un cierre simultáneo falla.
+        # Validar antes dejaría colarse un asiento entre la validación y el bloqueo, así que si la validación
+        # falla el período ya quedó marcado cerrado en esta transacción: quien llama debe revertirla ante el
+        # ValueError (UnidadDeTrabajoSQL lo hace al salir con excepción), nunca confirmarla
+        self.periodo_repo.cerrar(periodo.id_periodo)
+        sin_contabilizar = self.asiento_repo.contar_sin_contabilizar(periodo.id_entidad, periodo.id_periodo)
+        if sin_contabilizar:
+            raise ValueError(f"Período {periodo.codigo}: {sin_contabilizar} asientos sin contabilizar.")
+        descuadrados = self.asiento_repo.obtener_descuadrados(periodo.id_entidad, periodo.id_periodo)
+        if descuadrados:
+            raise ValueError(f"Período {periodo.codigo}: asientos descuadrados "
+                             f"({', '.join(str(i) for i in descuadrados)}).")
+        del_periodo = self.saldo_repo.reconstruir(periodo.id_entidad, periodo.id_periodo)
+        if anterior is None:
+            anterior = self.saldo_repo.obtener_cierre(periodo.id_entidad, periodos[posicion - 1].id_periodo) \
+                if posicion > 0 else []
+        cierre = saldos_de_cierre(periodo.id_periodo, anterior, del_periodo)
+        self.saldo_repo.guardar_cierre(cierre)
+        periodos[posicion] = replace(periodo, cerrado=True)
+        return periodos[posicion], cierre
+
+    def _periodos(self, id_entidad: UUID) -> List[PeriodoFiscal]:
+        return sorted(self.periodo_repo.obtener_por_entidad(id_entidad), key=lambda p: p.fecha_inicio)
+
+    @staticmethod
+    def _posicion(periodos: List[PeriodoFiscal], id_periodo: UUID) -> int:
+        for posicion, periodo in enumerate(periodos):
+            if periodo.id_periodo == id_periodo:
+                return posicion
+        raise ValueError(f"Período fiscal {id_periodo} no existe.")
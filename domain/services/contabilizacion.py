@@ -0,0 +1,182 @@
+# domain/services/contabilizacion.py
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from uuid import UUID
+from domain.aggregates.factura_aggregate import FacturaAggregate
+from domain.aggregates.nota_credito_aggregate import NotaCreditoAggregate
+from domain.entities.asiento_contable import AsientoContable
+from domain.entities.cuentas_producto import CuentasProducto
+from domain.entities.movimiento_inventario import MovimientoInventario
+from domain.entities.movimientos_batch import MovimientosBatch
+from domain.entities.periodo_fiscal import PeriodoFiscal
+from domain.entities.saldo_cuenta import saldos_de
+from domain.repositories.asiento_contable_repository import AsientoContableRepository
+from domain.repositories.cuentas_producto_repository import CuentasProductoRepository
+from domain.repositories.periodo_fiscal_repository import PeriodoFiscalRepository
+from domain.repositories.saldo_cuenta_repository import SaldoCuentaRepository
+from domain.value_objects.money import redondear_a_centavos
+
+Movimientos = Union[MovimientosBatch, Sequence[MovimientoInventario]]
+
+@dataclass(frozen=True)
+class CuentasContabilizacion:
+    # Cuentas de la entidad que no dependen del producto
+    id_cuenta_por_cobrar: UUID
+    id_cuenta_iva: UUID
+    id_cuenta_ice: Optional[UUID] = None
+    id_cuenta_descuentos: Optional[UUID] = None
+
+def descripcion_factura(factura_agg: FacturaAggregate) -> str:
+    return f"Factura {factura_agg.root.id_factura}"
+
+def descripcion_nota_credito(nc_agg: NotaCreditoAggregate) -> str:
+    return f"Nota de crédito {nc_agg.root.id_nota_credito} (factura {nc_agg.root.id_factura_modificada})"
+
+class ContabilizadorDocumentos:
+    # Asientos automáticos de la emisión:
+    #   factura:         cuentas por cobrar (total) + descuentos = ingresos por producto + IVA + ICE
+    #                    costo de ventas por producto = inventario por producto (costo FIFO de las salidas)
+    #   nota de crédito: lo inverso, con el costo de las entradas devueltas al inventario
+    # Cuentas de producto y períodos se cachean por entidad. Los asientos se escriben en lotes de
+    # ~lineas_por_lote ledger_line: una fila por línea de asiento, pero pocas sentencias por lote.
+    # Con saldo_repo, cada lote suma también sus incrementos a account_balance en la misma transacción.
+    # Los períodos cerrados no admiten asientos: se rechazan al resolver el período y, como la caché puede
+    # ser anterior al cierre, se vuelve a comprobar en la base antes de escribir cada lote.
+    def __init__(self, asiento_repo: AsientoContableRepository, cuentas_producto_repo: CuentasProductoRepository,
+                 periodo_repo: PeriodoFiscalRepository, cuentas: CuentasContabilizacion,
+                 id_entidad: Optional[UUID] = None, lineas_por_lote: int = 5_000,
+                 saldo_repo: Optional[SaldoCuentaRepository] = None):
+        if lineas_por_lote <= 0:
+            raise ValueError("Las líneas por lote deben ser positivas.")
+        self.asiento_repo = asiento_repo
+        self.cuentas_producto_repo = cuentas_producto_repo
+        self.periodo_repo = periodo_repo
+        self.cuentas = cuentas
+        self.id_entidad = id_entidad
+        self.lineas_por_lote = lineas_por_lote
+        self.saldo_repo = saldo_repo
+        self._cuentas_producto: Dict[UUID, Dict[int, CuentasProducto]] = {}
+        self._periodos: Dict[UUID, Tuple[List[date], List[PeriodoFiscal]]] = {}
+
+    def asiento_factura(self, factura_agg: FacturaAggregate, movimientos: Movimientos,
+                        id_entidad: Optional[UUID] = None) -> AsientoContable:
+        factura, totales = factura_agg.root, factura_agg.root.totales
+        importes = defaultdict(int)  # id_cuenta -> micros: positivo al debe, negativo al haber
+        importes[self.cuentas.id_cuenta_por_cobrar] += totales.valor_total.micros
+        self._registrar_impuestos(importes, totales, signo=-1)
+        self._registrar_documento(importes, id_entidad, factura.lineas, movimientos, signo=-1)
+        return self._asiento(importes, id_entidad, factura.fecha_emision, descripcion_factura(factura_agg),
+                             totales.moneda)
+
+    def asiento_nota_credito(self, nc_agg: NotaCreditoAggregate, movimientos: Movimientos,
+                             id_entidad: Optional[UUID] = None) -> AsientoContable:
+        nota, totales = nc_agg.root, nc_agg.root.totales
+        importes = defaultdict(int)
+        importes[self.cuentas.id_cuenta_por_cobrar] -= totales.valor_total.micros
+        self._registrar_impuestos(importes, totales, signo=1)
+        self._registrar_documento(importes, id_entidad, nota.lineas, movimientos, signo=1)
+        return self._asiento(importes, id_entidad, nota.fecha_emision, descripcion_nota_credito(nc_agg),
+                             totales.moneda)
+
+    def guardar(self, asientos: Iterable[AsientoContable]) -> int:
+        # Acumula asientos hasta lineas_por_lote líneas y escribe cada lote de una vez; devuelve cuántos escribió
+        lote, lineas, escritos = [], 0, 0
+        for asiento in asientos:
+            lote.append(asiento)
+            lineas += len(asiento.lineas)
+            if lineas >= self.lineas_por_lote:
+                self._escribir(lote)
+                escritos += len(lote)
+                lote, lineas = [], 0
+        if lote:
+            self._escribir(lote)
+            escritos += len(lote)
+        return escritos
+
+    def precargar_productos(self, id_entidad: Optional[UUID], ids_producto: Iterable[int]):
+        # Cuentas de todos los productos que aún no están en caché, en una sola consulta
+        id_entidad = self._entidad(id_entidad)
+        cache = self._cuentas_producto.setdefault(id_entidad, {})
+        faltantes = {i for i in ids_producto if i not in cache}
+        if faltantes:
+            cache.update(self.cuentas_producto_repo.obtener_cuentas(id_entidad, faltantes))
+
+    def limpiar(self):
+        # Tras cambiar el plan de cuentas, las cuentas de un producto o los períodos
+        self._cuentas_producto.clear()
+        self._periodos.clear()
+
+    def periodo(self, id_entidad: Optional[UUID], fecha: date) -> PeriodoFiscal:
+        id_entidad = self._entidad(id_entidad)
+        cache = self._periodos.get(id_entidad)
+        if cache is None:
+            periodos = sorted(self.periodo_repo.obtener_por_entidad(id_entidad), key=lambda p: p.fecha_inicio)
+            cache = self._periodos[id_entidad] = ([p.fecha_inicio for p in periodos], periodos)
+        inicios, periodos = cache
+        posicion = bisect_right(inicios, fecha) - 1
+        if posicion < 0 or not periodos[posicion].contiene(fecha):
+            raise ValueError(f"No existe período fiscal para {fecha}.")
+        if periodos[posicion].cerrado:
+            raise ValueError(f"Período {periodos[posicion].codigo} cerrado: no admite nuevos asientos.")
+        return periodos[posicion]
+
+    def _escribir(self, lote: List[AsientoContable]):
+        cerrados = self.periodo_repo.obtener_cerrados({a.id_periodo for a in lote})
+        if cerrados:
+            self._periodos.pop(cerrados[0].id_entidad, None)
+            raise ValueError(f"Período {cerrados[0].codigo} cerrado: no admite nuevos asientos.")
+        self.asiento_repo.guardar_muchos(lote)
+        if self.saldo_repo is not None:
+            self.saldo_repo.acumular(saldos_de(lote))
+
+    def _registrar_impuestos(self, importes: Dict[UUID, int], totales, signo: int):
+        importes[self.cuentas.id_cuenta_iva] += signo * totales.valor_iva.micros
+        if totales.valor_ice.micros:
+            if self.cuentas.id_cuenta_ice is None:
+                raise ValueError("Documento con ICE sin cuenta de ICE configurada.")
+            importes[self.cuentas.id_cuenta_ice] += signo * totales.valor_ice.micros
+        if totales.descuento_comercial.micros:
+            if self.cuentas.id_cuenta_descuentos is None:
+                raise ValueError("Documento con descuento sin cuenta de descuentos configurada.")
+            importes[self.cuentas.id_cuenta_descuentos] -= signo * totales.descuento_comercial.micros
+
+    def _registrar_documento(self, importes: Dict[UUID, int], id_entidad: Optional[UUID], lineas,
+                             movimientos: Movimientos, signo: int):
+        # signo -1 (venta): ingresos al haber, costo al debe; +1 (devolución): al revés
+        if not isinstance(movimientos, MovimientosBatch):
+            movimientos = MovimientosBatch.desde(movimientos)
+        costos = movimientos.costo_por_producto()
+        self.precargar_productos(id_entidad, [l.id_producto for l in lineas] + list(costos))
+        cuentas = self._cuentas_producto[self._entidad(id_entidad)]
+        for linea in lineas:
+            importes[self._cuenta(cuentas, linea.id_producto, 'id_cuenta_ingreso')] += signo * linea.valor_total.micros
+        for id_producto, costo in costos.items():
+            costo = redondear_a_centavos(costo)  # Por producto: costo e inventario redondean igual y el asiento cuadra
+            importes[self._cuenta(cuentas, id_producto, 'id_cuenta_costo')] -= signo * costo
+            importes[self._cuenta(cuentas, id_producto, 'id_cuenta_inventario')] += signo * costo
+
+    def _asiento(self, importes: Dict[UUID, int], id_entidad: Optional[UUID], fecha: date, descripcion: str,
+                 moneda: str) -> AsientoContable:
+        id_entidad = self._entidad(id_entidad)
+        asiento = AsientoContable(id_entidad=id_entidad, id_periodo=self.periodo(id_entidad, fecha).id_periodo,
+                                  fecha=fecha, descripcion=descripcion, moneda=moneda)
+        for id_cuenta, micros in importes.items():
+            asiento.registrar(id_cuenta, micros)
+        asiento.verificar_cuadre()
+        return asiento
+
+    @staticmethod
+    def _cuenta(cuentas: Dict[int, CuentasProducto], id_producto: int, atributo: str) -> UUID:
+        id_cuenta = getattr(cuentas.get(id_producto), atributo, None)
+        if id_cuenta is None:
+            raise ValueError(f"Producto {id_producto} sin cuenta contable ({atributo}).")
+        return id_cuenta
+
+    def _entidad(self, id_entidad: Optional[UUID]) -> UUID:
+        id_entidad = id_entidad or self.id_entidad
+        if id_entidad is None:
+            raise ValueError("Entidad contable no especificada.")
+        return id_entidad
@@ -0,0 +1,253 @@
+# domain/services/expresiones_monto.py
+import re
+from dataclasses import dataclass, fields
+from decimal import Decimal, InvalidOperation
+from itertools import repeat
+from operator import add, attrgetter, sub
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from domain.entities.totales_factura import TotalesFactura
+from domain.entities.totales_nota_credito import TotalesNotaCredito
+from domain.value_objects.money import ESCALA, Money, dividir_redondeando, redondear_a_centavos
+
+# Compilador de journal_template_line.amount_expression, sin eval:
+#   expresion := termino (('+' | '-') termino)*
+#   termino   := factor (('*' | '/') factor)*
+#   factor    := ('+' | '-') factor | primario
+#   primario  := numero ['%'] | campo | funcion '(' expresion (',' expresion)* ')' | '(' expresion ')'
+# Los campos son los importes de TotalesFactura / TotalesNotaCredito (e.g., valor_subtotal * 30% + valor_ice).
+# Todo se evalúa en micro-unidades enteras, como Money: * y / redondean a la micro-unidad (mitad hacia arriba)
+# y redondear() lleva a centavos. Las subexpresiones constantes se pliegan al compilar.
+
+CAMPOS_TOTALES = frozenset(
+    f.name for f in fields(TotalesFactura) if f.type in (Money, 'Money')
+) & frozenset(f.name for f in fields(TotalesNotaCredito) if f.type in (Money, 'Money'))
+
+LONGITUD_MAXIMA = 200  # amount_expression NVARCHAR(200)
+_PROFUNDIDAD_MAXIMA = 32
+
+_TOKEN = re.compile(r"\s*(?:(?P<numero>\d+(?:\.\d*)?|\.\d+)|(?P<nombre>[A-Za-z_][A-Za-z_0-9]*)|(?P<simbolo>[-+*/(),%]))")
+
+Escalar = Callable[[object], int]  # totales -> micros
+Columnar = Callable[[Dict[str, List[int]], int], Iterable[int]]  # (columnas por campo, n) -> micros por documento
+
+def _multiplicar(a: int, b: int) -> int:
+    return dividir_redondeando(a * b, ESCALA)
+
+def _dividir(a: int, b: int) -> int:
+    if b == 0:
+        raise ValueError("División por cero en la expresión de monto.")
+    if b < 0:
+        a, b = -a, -b
+    return dividir_redondeando(a * ESCALA, b)
+
+_OPERADORES = {'+': add, '-': sub, '*': _multiplicar, '/': _dividir}
+_FUNCIONES = {'redondear': (redondear_a_centavos, 1, 1), 'abs': (abs, 1, 1), 'min': (min, 2, None),
+              'max': (max, 2, None)}  # nombre -> (función, mínimo de argumentos, máximo)
+
+@dataclass(frozen=True)
+class ExpresionCompilada:
+    texto: str
+    campos: frozenset  # Campos de totales que lee
+    evaluar: Escalar
+    evaluar_columnas: Columnar
+    constante: Optional[int] = None  # Valor si la expresión no lee ningún campo
+
+def compilar_expresion(texto: str) -> ExpresionCompilada:
+    nodo = _Parser(texto).parsear()
+    campos = frozenset(_campos(nodo))
+    if nodo[0] == 'num':
+        valor = nodo[1]
+        return ExpresionCompilada(texto, campos, lambda totales: valor, lambda columnas, n: repeat(valor, n), valor)
+    return ExpresionCompilada(texto, campos, _escalar(nodo), _columnar(nodo))
+
+def columnas_de(documentos: Sequence, campos: Iterable[str]) -> Dict[str, List[int]]:
+    # Una pasada por campo sobre los totales del lote: micros por documento, en el orden de entrada
+    return {campo: [getattr(totales, campo).micros for totales in documentos] for campo in campos}
+
+class _Parser:
+    # Descenso recursivo sobre los tokens; el árbol son tuplas ('num', micros), ('campo', nombre),
+    # ('op', simbolo, izquierda, derecha), ('fn', nombre, argumentos)
+    def __init__(self, texto: str):
+        if not texto or not texto.strip():
+            raise ValueError("Expresión de monto vacía.")
+        if len(texto) > LONGITUD_MAXIMA:
+            raise ValueError(f"Expresión de monto de más de {LONGITUD_MAXIMA} caracteres.")
+        self.texto = texto
+        self.tokens = self._tokenizar(texto)
+        self.posicion = 0
+        self.profundidad = 0
+
+    def parsear(self) -> tuple:
+        nodo = self._expresion()
+        if self._actual() is not None:
+            self._error(f"símbolo inesperado '{self._actual()[1]}'")
+        return nodo
+
+    def _tokenizar(self, texto: str) -> List[Tuple[str, str, int]]:
+        tokens, inicio = [], 0
+        while inicio < len(texto):
+            coincidencia = _TOKEN.match(texto, inicio)
+            if coincidencia is None:
+                resto = texto[inicio:].lstrip()
+                if resto:
+                    raise ValueError(f"Expresión inválida '{texto}': carácter no permitido "
+                                     f"'{resto[0]}' (posición {len(texto) - len(resto)})")
+                break
+            tipo = coincidencia.lastgroup
+            tokens.append((tipo, coincidencia.group(tipo), coincidencia.start(tipo)))
+            inicio = coincidencia.end()
+        return tokens
+
+    def _actual(self) -> Optional[Tuple[str, str, int]]:
+        return self.tokens[self.posicion] if self.posicion < len(self.tokens) else None
+
+    def _es(self, simbolo: str) -> bool:
+        token = self._actual()
+        return token is not None and token[0] == 'simbolo' and token[1] == simbolo
+
+    def _consumir(self, simbolo: str):
+        if not self._es(simbolo):
+            self._error(f"se esperaba '{simbolo}'")
+        self.posicion += 1
+
+    def _error(self, motivo: str):
+        token = self._actual()
+        posicion = token[2] if token is not None else len(self.texto)
+        raise ValueError(f"Expresión inválida '{self.texto}': {motivo} (posición {posicion})")
+
+    def _expresion(self) -> tuple:
+        nodo = self._termino()
+        while self._es('+') or self._es('-'):
+            simbolo = self._actual()[1]
+            self.posicion += 1
+            nodo = _operacion(simbolo, nodo, self._termino())
+        return nodo
+
+    def _termino(self) -> tuple:
+        nodo = self._factor()
+        while self._es('*') or self._es('/'):
+            simbolo = self._actual()[1]
+            self.posicion += 1
+            nodo = _operacion(simbolo, nodo, self._factor())
+        return nodo
+
+    def _factor(self) -> tuple:
+        if self._es('+') or self._es('-'):
+            simbolo = self._actual()[1]
+            self.posicion += 1
+            operando = self._anidado(self._factor)
+            return operando if simbolo == '+' else _operacion('-', ('num', 0), operando)
+        return self._primario()
+
+    def _anidado(self, regla: Callable[[], tuple]) -> tuple:
+        self.profundidad += 1
+        if self.profundidad > _PROFUNDIDAD_MAXIMA:
+            self._error("anidamiento excesivo")
+        try:
+            return regla()
+        finally:
+            self.profundidad -= 1
+
+    def _primario(self) -> tuple:
+        token = self._actual()
+        if token is None:
+            self._error("expresión incompleta")
+        tipo, valor, _ = token
+        if tipo == 'numero':
+            self.posicion += 1
+            try:
+                micros = Money.de_decimal(Decimal(valor)).micros
+            except InvalidOperation:
+                self._error(f"número inválido '{valor}'")
+            if self._es('%'):
+                self.posicion += 1
+                micros = dividir_redondeando(micros, 100)
+            return ('num', micros)
+        if tipo == 'nombre':
+            self.posicion += 1
+            nombre = valor.lower()
+            if self._es('('):
+                return self._funcion(nombre)
+            if nombre not in CAMPOS_TOTALES:
+                self.posicion -= 1
+                self._error(f"campo desconocido '{valor}'")
+            return ('campo', nombre)
+        if self._es('('):
+            self.posicion += 1
+            nodo = self._anidado(self._expresion)
+            self._consumir(')')
+            return nodo
+        self._error(f"símbolo inesperado '{valor}'")
+
+    def _funcion(self, nombre: str) -> tuple:
+        if nombre not in _FUNCIONES:
+            self.posicion -= 1
+            self._error(f"función desconocida '{nombre}'")
+        _, minimo, maximo = _FUNCIONES[nombre]
+        self._consumir('(')
+        argumentos = [self._anidado(self._expresion)]
+        while self._es(','):
+            self.posicion += 1
+            argumentos.append(self._anidado(self._expresion))
+        self._consumir(')')
+        if len(argumentos) < minimo or (maximo is not None and len(argumentos) > maximo):
+            self._error(f"número de argumentos inválido para {nombre}()")
+        if all(a[0] == 'num' for a in argumentos):
+            return ('num', _FUNCIONES[nombre][0](*(a[1] for a in argumentos)))
+        return ('fn', nombre, tuple(argumentos))
+
+def _operacion(simbolo: str, izquierda: tuple, derecha: tuple) -> tuple:
+    if izquierda[0] == 'num' and derecha[0] == 'num':
+        return ('num', _OPERADORES[simbolo](izquierda[1], derecha[1]))
+    if simbolo == '/' and derecha == ('num', 0):
+        raise ValueError("División por cero en la expresión de monto.")
+    return ('op', simbolo, izquierda, derecha)
+
+def _campos(nodo: tuple) -> Iterable[str]:
+    if nodo[0] == 'campo':
+        yield nodo[1]
+    elif nodo[0] == 'op':
+        yield from _campos(nodo[2])
+        yield from _campos(nodo[3])
+    elif nodo[0] == 'fn':
+        for argumento in nodo[2]:
+            yield from _campos(argumento)
+
+def _escalar(nodo: tuple) -> Escalar:
+    # Una clausura por nodo; el operando constante de una operación se captura como entero
+    tipo = nodo[0]
+    if tipo == 'num':
+        valor = nodo[1]
+        return lambda totales: valor
+    if tipo == 'campo':
+        return attrgetter(nodo[1] + '.micros')
+    if tipo == 'op':
+        operador, izquierda, derecha = _OPERADORES[nodo[1]], nodo[2], nodo[3]
+        if derecha[0] == 'num':
+            a, c = _escalar(izquierda), derecha[1]
+            return lambda totales: operador(a(totales), c)
+        if izquierda[0] == 'num':
+            c, b = izquierda[1], _escalar(derecha)
+            return lambda totales: operador(c, b(totales))
+        a, b = _escalar(izquierda), _escalar(derecha)
+        return lambda totales: operador(a(totales), b(totales))
+    funcion, argumentos = _FUNCIONES[nodo[1]][0], [_escalar(a) for a in nodo[2]]
+    if len(argumentos) == 1:
+        a = argumentos[0]
+        return lambda totales: funcion(a(totales))
+    return lambda totales: funcion(*(a(totales) for a in argumentos))
+
+def _columnar(nodo: tuple) -> Columnar:
+    # Misma semántica sobre columnas: cada nodo es un map() perezoso y el lote se recorre una sola vez
+    tipo = nodo[0]
+    if tipo == 'num':
+        valor = nodo[1]
+        return lambda columnas, n: repeat(valor, n)
+    if tipo == 'campo':
+        campo = nodo[1]
+        return lambda columnas, n: columnas[campo]
+    if tipo == 'op':
+        operador, a, b = _OPERADORES[nodo[1]], _columnar(nodo[2]), _columnar(nodo[3])
+        return lambda columnas, n: map(operador, a(columnas, n), b(columnas, n))
+    funcion, argumentos = _FUNCIONES[nodo[1]][0], [_columnar(a) for a in nodo[2]]
+    return lambda columnas, n: map(funcion, *(a(columnas, n) for a in argumentos))
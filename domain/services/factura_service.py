@@ -1,41 +1,168 @@
+from contextlib import nullcontext
+from dataclasses import dataclass
 from decimal import Decimal
 from datetime import date
+from itertools import islice
+from typing import Callable, ContextManager, Iterable, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
 from domain.aggregates.factura_aggregate import FacturaAggregate
+from domain.entities.movimientos_batch import MovimientosBatch
 from domain.repositories.factura_repository import FacturaRepository
+from domain.services.contabilizacion import ContabilizadorDocumentos, descripcion_factura
 from domain.services.inventario_service import InventarioService
+from domain.services.motor_impuestos import MotorImpuestos
 from domain.entities.linea_factura import LineaFactura
+from domain.value_objects.forma_pago import FormaPago
+from domain.value_objects.money import Money
 from domain.value_objects.precio import Precio
 
+@dataclass
+class ResultadoEmision:
+    posicion: int  # Posición del dict en la entrada de crear_y_emitir_facturas
+    aggregate: Optional[FacturaAggregate] = None
+    error: Optional[str] = None
+
+    @property
+    def exitosa(self) -> bool:
+        return self.error is None
+
 class FacturaService:
-    def __init__(self, factura_repo: FacturaRepository, inventario_service: InventarioService):
+    def __init__(self, factura_repo: FacturaRepository, inventario_service: InventarioService,
+                 motor_impuestos: Optional[MotorImpuestos] = None, id_entidad: Optional[UUID] = None,
+                 contabilizador: Optional[ContabilizadorDocumentos] = None,
+                 punto_de_guardado: Optional[Callable[[], ContextManager]] = None):
         self.factura_repo = factura_repo
         self.inventario_service = inventario_service
+        # Con motor: porcentaje_iva/ICE salen de los tax_code de la entidad (datos['id_entidad'] o la por defecto)
+        self.motor_impuestos = motor_impuestos
+        self.id_entidad = id_entidad
+        # Con contabilizador: cada factura genera su asiento en la misma transacción que la factura
+        self.contabilizador = contabilizador
+        # Con punto de guardado (e.g., UnidadDeTrabajoSQL.punto_de_guardado): un bloque fallido deshace lo que
+        # ya escribió sin revertir la transacción del llamador ni los bloques anteriores
+        self.punto_de_guardado = punto_de_guardado
 
     def crear_y_emitir_factura(self, datos: dict) -> FacturaAggregate:
-        fecha_emision = datos.get('fecha_emision', date.today())
-        fecha_caducidad = datos.get('fecha_caducidad')
-        fecha_autorizacion = datos.get('fecha_autorizacion', date.today())
-
-        aggregate = FacturaAggregate.crear_nueva(
-            id_sucursal=datos['id_sucursal'],
-            ruc_emisor=datos['ruc_emisor'],
-            adquiriente=datos['identificacion_adquiriente'],
-            direccion=datos['direccion_matriz'],
-            razon_social=datos['razon_social_emisor'],
-            fecha_emision=fecha_emision,
-            fecha_caducidad=fecha_caducidad,
-            fecha_autorizacion=fecha_autorizacion
-        )
+        with self.inventario_service.unidad_de_trabajo():  # Si guardar falla, los lotes consumidos se revierten
+            aggregate, movimientos = self._construir_y_emitir(datos)
+            self.factura_repo.guardar(aggregate)
+            if self.contabilizador is not None:
+                self.contabilizador.guardar([self._asiento(aggregate, movimientos, datos)])
+        return aggregate
+
+    def crear_y_emitir_facturas(self, lote_datos: Iterable[dict], tamano_bloque: int = 500) -> Iterator[ResultadoEmision]:
+        # Streaming: consume la entrada por bloques y entrega un resultado por factura al persistir cada bloque.
+        # Una factura fallida se reporta y no detiene el resto del lote.
+        if tamano_bloque <= 0:
+            raise ValueError("Tamaño de bloque debe ser positivo.")
+        entrada = enumerate(lote_datos)
+        while True:
+            bloque = list(islice(entrada, tamano_bloque))
+            if not bloque:
+                break
+            yield from self._emitir_bloque(bloque)
+
+    def _emitir_bloque(self, bloque: List[Tuple[int, dict]]) -> List[ResultadoEmision]:
+        # Lotes FIFO precargados una sola vez por grupo (producto, bodega) del bloque
+        self.inventario_service.precargar_lotes(par for _, datos in bloque for par in pares_inventario(datos))
+
+        resultados = []
+        emitidas = []
+        asientos = []
+        escrito = False
+        try:
+            with self.punto_de_guardado() if self.punto_de_guardado is not None else nullcontext():
+                with self.inventario_service.unidad_de_trabajo():
+                    for posicion, datos in bloque:
+                        try:
+                            # Si falla la emisión o el asiento (e.g., producto sin cuentas), solo se revierte esta factura
+                            with self.inventario_service.unidad_de_trabajo():
+                                aggregate, movimientos = self._construir_y_emitir(datos)
+                                if self.contabilizador is not None:
+                                    asientos.append((aggregate, self._asiento(aggregate, movimientos, datos)))
+                        except (ValueError, KeyError) as e:
+                            resultados.append(ResultadoEmision(posicion, error=str(e)))
+                            continue
+                        emitidas.append(aggregate)
+                        resultados.append(ResultadoEmision(posicion, aggregate=aggregate))
+                    escrito = bool(emitidas)
+                    if emitidas:
+                        self.factura_repo.guardar_muchos(emitidas)
+                    if asientos:
+                        for aggregate, asiento in asientos:
+                            asiento.descripcion = descripcion_factura(aggregate)  # id_factura asignado al guardar
+                        self.contabilizador.guardar(asiento for _, asiento in asientos)
+        except Exception as e:
+            if escrito and self.punto_de_guardado is None:
+                raise  # Facturas o asientos ya escritos: solo revirtiendo la transacción del llamador se deshacen
+            # Error inesperado (emisión o persistencia): el bloque completo se revirtió y nada quedó escrito.
+            # Cada posición del bloque se reporta, también las que no se alcanzaron a procesar.
+            fallidas = {r.posicion: r.error for r in resultados if not r.exitosa}
+            error = f"Bloque revertido: {type(e).__name__}: {e}"
+            return [ResultadoEmision(posicion, error=fallidas.get(posicion, error)) for posicion, _ in bloque]
+        return resultados
+
+    def _construir_y_emitir(self, datos: dict) -> Tuple[FacturaAggregate, MovimientosBatch]:
+        return emitir_desde_datos(datos, self.inventario_service, self.motor_impuestos, self.id_entidad)
+
+    def _asiento(self, aggregate: FacturaAggregate, movimientos: MovimientosBatch, datos: dict):
+        return self.contabilizador.asiento_factura(aggregate, movimientos, datos.get('id_entidad', self.id_entidad))
+
+# Construcción compartida con AsyncFacturaService: mismo aggregate, mismas validaciones, distinto acceso a datos
+
+def emitir_desde_datos(datos: dict, inventario_service: InventarioService,
+                       motor_impuestos: Optional[MotorImpuestos] = None,
+                       id_entidad: Optional[UUID] = None) -> Tuple[FacturaAggregate, MovimientosBatch]:
+    # Devuelve también los movimientos de la emisión: su costo FIFO alimenta el asiento contable
+    aggregate = construir_factura(datos)
+    lineas = list(lineas_desde(datos))
+    with aggregate.edicion():  # Invariantes verificadas una sola vez, al emitir
+        if motor_impuestos is not None:
+            motor_impuestos.agregar_lineas(datos.get('id_entidad', id_entidad), aggregate, lineas)
+        else:
+            aggregate.agregar_lineas(lineas)  # Un solo recalculo de impuestos para todas las líneas
+        aggregate.root.forma_pago = forma_pago_desde(datos, aggregate.root.totales.valor_total)
+        movimientos = aggregate.emitir(inventario_service, columnar=True)
+    return aggregate, movimientos
+
+def construir_factura(datos: dict) -> FacturaAggregate:
+    fecha_emision = datos.get('fecha_emision', date.today())
+    fecha_caducidad = datos.get('fecha_caducidad')
+    fecha_autorizacion = datos.get('fecha_autorizacion', date.today())
+
+    aggregate = FacturaAggregate.crear_nueva(
+        id_sucursal=datos['id_sucursal'],
+        ruc_emisor=datos['ruc_emisor'],
+        adquiriente=datos['identificacion_adquiriente'],
+        direccion=datos['direccion_matriz'],
+        razon_social=datos['razon_social_emisor'],
+        fecha_emision=fecha_emision,
+        fecha_caducidad=fecha_caducidad,
+        fecha_autorizacion=fecha_autorizacion,
+        id_bodega=datos.get('id_bodega')
+    )
+    return aggregate
+
+def forma_pago_desde(datos: dict, valor_total: Money) -> FormaPago:
+    # datos['forma_pago'] = {'tipo': ..., 'valor': ...}; sin forma de pago (o sin valor) se paga el total en efectivo
+    datos_pago = datos.get('forma_pago') or {}
+    valor = datos_pago.get('valor')
+    return FormaPago(
+        tipo=datos_pago.get('tipo', 'Efectivo'),
+        valor=valor_total if valor is None else Money.de_decimal(Decimal(str(valor)), valor_total.moneda),
+    )
 
-        # Ejemplo: Agregar línea
-        linea = LineaFactura(
-            id_producto=1,
-            descripcion="Prod1",
-            cantidad=5,
-            precio_unitario=Precio(Decimal('10.00'))
+def lineas_desde(datos: dict) -> Iterator[LineaFactura]:
+    for datos_linea in datos.get('lineas', ()):
+        yield LineaFactura(
+            id_producto=datos_linea['id_producto'],
+            descripcion=datos_linea.get('descripcion', ''),
+            cantidad=datos_linea['cantidad'],
+            precio_unitario=Precio.de_decimal(Decimal(str(datos_linea['precio_unitario']))),  # Entrada: Decimal -> Money
+            codigo_impuesto=datos_linea.get('codigo_impuesto'),
+            codigo_ice=datos_linea.get('codigo_ice'),
         )
-        aggregate.agregar_linea(linea)
 
-        movimientos = aggregate.emitir(self.inventario_service)
-        self.factura_repo.guardar(aggregate)
-        return aggregate
\ No newline at end of file
+def pares_inventario(datos: dict) -> Set[Tuple[int, int]]:
+    # (producto, bodega) cuyos lotes FIFO consume la factura
+    return {(linea['id_producto'], datos.get('id_bodega')) for linea in datos.get('lineas', ())}
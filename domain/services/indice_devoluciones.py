@@ -0,0 +1,104 @@
+# domain/services/indice_devoluciones.py
+import threading
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Set
+from domain.aggregates.factura_aggregate import FacturaAggregate
+from domain.repositories.nota_credito_repository import NotaCreditoRepository
+
+def calcular_devolvibles(factura_agg: FacturaAggregate, acreditadas: Dict[int, int]) -> Dict[int, int]:
+    cantidades = defaultdict(int)
+    for linea in factura_agg.root.lineas:
+        cantidades[linea.id_producto] += linea.cantidad
+    for id_producto, acreditada in acreditadas.items():
+        cantidades[id_producto] -= acreditada
+    return dict(cantidades)
+
+def verificar_devolvibles(devolvibles: Dict[int, int]):
+    # Con lo acreditado leído después de guardar la nota: ningún producto puede quedar por debajo de cero
+    excedidos = sorted(id_producto for id_producto, cantidad in devolvibles.items() if cantidad < 0)
+    if excedidos:
+        raise ValueError(f"Cantidad acreditada supera la facturada para los productos {excedidos}.")
+
+class IndiceDevoluciones:
+    # Cantidad aún devolvible por producto de cada factura: facturado (sumando todas sus líneas) menos lo ya
+    # acreditado. Es un atajo para rechazar pronto: la que decide es verificar_en_base, que relee de la base
+    # la suma de las notas (incluida la recién guardada) dentro de la transacción, con la factura bloqueada.
+    # LRU acotada por factura. Lo descontado por notas aún sin confirmar se descarta con revertir()
+    # (registrado con UnidadDeTrabajoSQL.al_revertir) y se da por bueno con confirmar() (al_confirmar).
+    def __init__(self, nc_repo: NotaCreditoRepository, capacidad: int = 10_000):
+        if capacidad <= 0:
+            raise ValueError("La capacidad del índice debe ser positiva.")
+        self.nc_repo = nc_repo
+        self.capacidad = capacidad
+        self._devolvibles: OrderedDict = OrderedDict()  # id_factura -> {id_producto: devolvible}
+        self._cerrojo = threading.Lock()  # Protege _devolvibles y _cerrojos_factura
+        self._cerrojos_factura: Dict[int, List] = {}  # id_factura -> [Lock, hilos que lo tienen o esperan]
+        self._local = threading.local()
+
+    @property
+    def _pendientes(self) -> Set[int]:
+        # Facturas descontadas por notas de este hilo cuya transacción aún no termina
+        pendientes = getattr(self._local, 'pendientes', None)
+        if pendientes is None:
+            pendientes = self._local.pendientes = set()
+        return pendientes
+
+    @contextmanager
+    def bloqueo(self, id_factura: int) -> Iterator[None]:
+        # Serializa entre hilos la validación y el descuento de las notas de una misma factura. El cerrojo
+        # se descarta cuando lo suelta el último hilo que lo usa
+        with self._cerrojo:
+            entrada = self._cerrojos_factura.setdefault(id_factura, [threading.Lock(), 0])
+            entrada[1] += 1
+        try:
+            with entrada[0]:
+                yield
+        finally:
+            with self._cerrojo:
+                entrada[1] -= 1
+                if entrada[1] == 0:
+                    del self._cerrojos_factura[id_factura]
+
+    def cantidades_devolvibles(self, factura_agg: FacturaAggregate) -> Dict[int, int]:
+        id_factura = factura_agg.root.id_factura
+        with self._cerrojo:
+            cantidades = self._devolvibles.get(id_factura)
+            if cantidades is not None:
+                self._devolvibles.move_to_end(id_factura)
+                return dict(cantidades)
+        cantidades = calcular_devolvibles(factura_agg, self.nc_repo.obtener_cantidades_acreditadas(id_factura))
+        self._guardar(id_factura, cantidades)
+        return dict(cantidades)
+
+    def verificar_en_base(self, factura_agg: FacturaAggregate):
+        # Después de guardar la nota, en su transacción: ValueError si con ella se acredita más de lo facturado
+        # (e.g., otro proceso emitió una nota que este índice aún no veía)
+        id_factura = factura_agg.root.id_factura
+        cantidades = calcular_devolvibles(factura_agg, self.nc_repo.obtener_cantidades_acreditadas(id_factura))
+        try:
+            verificar_devolvibles(cantidades)
+        except ValueError:
+            self.limpiar(id_factura)
+            raise
+        self._guardar(id_factura, cantidades)
+        self._pendientes.add(id_factura)
+
+    def limpiar(self, id_factura: int):
+        with self._cerrojo:
+            self._devolvibles.pop(id_factura, None)
+
+    def confirmar(self):
+        self._pendientes.clear()
+
+    def revertir(self):
+        for id_factura in self._pendientes:
+            self.limpiar(id_factura)
+        self._pendientes.clear()
+
+    def _guardar(self, id_factura: int, cantidades: Dict[int, int]):
+        with self._cerrojo:
+            self._devolvibles[id_factura] = cantidades
+            self._devolvibles.move_to_end(id_factura)
+            while len(self._devolvibles) > self.capacidad:
+                self._devolvibles.popitem(last=False)
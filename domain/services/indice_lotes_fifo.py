@@ -0,0 +1,160 @@
+# domain/services/indice_lotes_fifo.py
+import heapq
+import threading
+from itertools import count
+from typing import Dict, Iterable, List, Optional, Tuple
+from domain.entities.lote import Lote
+from domain.repositories.lote_repository import LoteRepository
+from domain.services.instrumentacion import metricas, reloj
+from domain.value_objects.money import Money
+
+_LECTURA_POR_PAR = (('consulta', 'obtener_lotes_antiguos'),)
+_LECTURA_MUCHOS = (('consulta', 'obtener_lotes_antiguos_muchos'),)
+
+class _ColaLotes:
+    __slots__ = ('heap', 'presentes', 'por_id', 'ultimo', 'por_costo')
+
+    def __init__(self):
+        self.heap: List[Tuple] = []  # (fecha_entrada, secuencia, lote)
+        self.presentes = set()       # id() de los lotes que están en el heap
+        self.por_id: Dict[int, Lote] = {}  # id_lote -> copia de este hilo, también las ya agotadas
+        self.ultimo: Optional[Tuple] = None       # Entrada del heap del lote más reciente (el final de la cola)
+        self.por_costo: Dict[Money, Tuple] = {}   # Costo -> entrada del lote más reciente con ese costo
+
+    def registrar(self, entrada: Tuple):
+        clave = entrada[:2]
+        if self.ultimo is None or clave > self.ultimo[:2]:
+            self.ultimo = entrada
+        costo = entrada[2].costo_unitario
+        actual = self.por_costo.get(costo)
+        if actual is None or clave > actual[:2]:
+            self.por_costo[costo] = entrada
+
+    def recalcular_extremos(self):
+        self.ultimo, self.por_costo = None, {}
+        for entrada in self.heap:
+            if not entrada[2].agotado:
+                self.registrar(entrada)
+
+class IndiceLotesFIFO:
+    # Cola FIFO en memoria por (producto, bodega). Se llena una sola vez desde el repositorio
+    # y se mantiene al día al consumir o agregar lotes: un despacho solo toca los lotes que consume.
+    # Las colas son por hilo: cada hilo modifica sus propios objetos Lote y los conflictos entre hilos
+    # o procesos los detecta la version del lote al escribir (ver LoteRepository.actualizar_muchos).
+    # Un hilo no ve los lotes que otro crea después de llenar su cola: antes de declarar stock insuficiente,
+    # InventarioService llama a recargar().
+    def __init__(self, lote_repo: LoteRepository):
+        self.lote_repo = lote_repo
+        self._local = threading.local()
+        self._secuencia = count()  # Desempate estable para lotes con la misma fecha_entrada
+
+    @property
+    def _colas(self) -> Dict[Tuple[int, int], _ColaLotes]:
+        colas = getattr(self._local, 'colas', None)
+        if colas is None:
+            colas = self._local.colas = {}
+        return colas
+
+    def primero(self, producto_id: int, bodega_id: int) -> Optional[Lote]:
+        cola = self._cola(producto_id, bodega_id)
+        heap = cola.heap
+        while heap and heap[0][2].agotado:  # Los lotes agotados se descartan de forma perezosa
+            _, _, lote = heapq.heappop(heap)
+            cola.presentes.discard(id(lote))
+        return heap[0][2] if heap else None
+
+    def ultimo(self, producto_id: int, bodega_id: int) -> Optional[Lote]:
+        # Lote al final de la cola FIFO (el de fecha_entrada más reciente), si sigue abierto
+        entrada = self._cola(producto_id, bodega_id).ultimo
+        return entrada[2] if entrada is not None and not entrada[2].agotado else None
+
+    def mas_reciente_con_costo(self, producto_id: int, bodega_id: int, costo: Money) -> Optional[Lote]:
+        entrada = self._cola(producto_id, bodega_id).por_costo.get(costo)
+        return entrada[2] if entrada is not None and not entrada[2].agotado else None
+
+    def agregar(self, lote: Lote):
+        cola = self._cola(lote.id_producto, lote.id_bodega)
+        self._insertar(cola, lote)
+
+    def reinsertar(self, lote: Lote):
+        # Al revertir: vuelve a su cola solo si está en memoria; una cola invalidada se leerá de la base
+        cola = self._colas.get((lote.id_producto, lote.id_bodega))
+        if cola is not None:
+            self._insertar(cola, lote)
+
+    def descartar(self, lote: Lote):
+        # Lote nuevo revertido (ya agotado): deja de ser el final de la cola o el más reciente de su costo
+        cola = self._colas.get((lote.id_producto, lote.id_bodega))
+        if cola is None:
+            return
+        ultimo, mas_reciente = cola.ultimo, cola.por_costo.get(lote.costo_unitario)
+        if (ultimo is not None and ultimo[2] is lote) or (mas_reciente is not None and mas_reciente[2] is lote):
+            cola.recalcular_extremos()
+
+    def recargar(self, producto_id: int, bodega_id: int) -> List[Lote]:
+        # Relee los lotes abiertos del par: agrega los que no estaban en la cola (creados por otro hilo o
+        # proceso) y devuelve las copias de esta cola que otro escritor ya modificó (su version cambió)
+        cola = self._cola(producto_id, bodega_id)
+        desactualizados = []
+        for lote in self._leer(producto_id, bodega_id):
+            propio = cola.por_id.get(lote.id_lote)
+            if propio is None:
+                self._insertar(cola, lote)
+            elif propio.version != lote.version:
+                desactualizados.append(propio)
+        return desactualizados
+
+    def precargar(self, pares: Iterable[Tuple[int, int]]):
+        # Carga en una sola consulta las colas de todos los pares (producto, bodega) que aún no están en memoria
+        faltantes = [par for par in set(pares) if par not in self._colas]
+        if not faltantes:
+            return
+        inicio = reloj() if metricas.activa else None
+        lotes_por_par = self.lote_repo.obtener_lotes_antiguos_muchos(faltantes)
+        if inicio is not None:
+            metricas.observar('lotes_lectura_segundos', reloj() - inicio, _LECTURA_MUCHOS)
+        for par in faltantes:
+            self._colas[par] = self._nueva_cola(lotes_por_par.get(par, []))
+
+    def invalidar(self, producto_id: int, bodega_id: int):
+        self._colas.pop((producto_id, bodega_id), None)
+
+    def limpiar(self):
+        self._colas.clear()
+
+    def _cola(self, producto_id: int, bodega_id: int) -> _ColaLotes:
+        clave = (producto_id, bodega_id)
+        cola = self._colas.get(clave)
+        if cola is None:
+            cola = self._colas[clave] = self._nueva_cola(self._leer(producto_id, bodega_id))
+        return cola
+
+    def _leer(self, producto_id: int, bodega_id: int) -> List[Lote]:
+        inicio = reloj() if metricas.activa else None
+        lotes = self.lote_repo.obtener_lotes_antiguos(producto_id, bodega_id)
+        if inicio is not None:
+            metricas.observar('lotes_lectura_segundos', reloj() - inicio, _LECTURA_POR_PAR)
+        return lotes
+
+    def _nueva_cola(self, lotes: Iterable[Lote]) -> _ColaLotes:
+        cola = _ColaLotes()
+        for lote in lotes:
+            if not lote.agotado:
+                entrada = (lote.fecha_entrada, next(self._secuencia), lote)
+                cola.heap.append(entrada)
+                cola.presentes.add(id(lote))
+                cola.por_id[lote.id_lote] = lote
+                cola.registrar(entrada)
+        heapq.heapify(cola.heap)
+        return cola
+
+    def _insertar(self, cola: _ColaLotes, lote: Lote):
+        if lote.agotado or id(lote) in cola.presentes:
+            return
+        if lote.id_lote is not None:
+            if cola.por_id.setdefault(lote.id_lote, lote) is not lote:
+                return  # Otra copia del mismo lote ya está en la cola
+        entrada = (lote.fecha_entrada, next(self._secuencia), lote)
+        heapq.heappush(cola.heap, entrada)
+        cola.presentes.add(id(lote))
+        cola.registrar(entrada)
@@ -0,0 +1,47 @@
+# domain/services/instrumentacion.py
+import time
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+
+Etiquetas = Tuple[Tuple[str, str], ...]  # (('documento', 'factura'),): hashable, sin dict por llamada
+
+reloj = time.perf_counter
+
+class SinkMetricas(ABC):
+    @abstractmethod
+    def contar(self, nombre: str, valor: int = 1, etiquetas: Etiquetas = ()):
+        pass  # Contador acumulado (e.g., llamadas a actualizar)
+
+    @abstractmethod
+    def observar(self, nombre: str, valor: float, etiquetas: Etiquetas = ()):
+        pass  # Una observación de una distribución: duraciones en segundos (*_segundos) o tamaños
+
+class Metricas:
+    # Punto único de instrumentación del dominio; el sink (registro en memoria, logging, Prometheus) se
+    # conecta desde la aplicación. Los puntos instrumentados preguntan `if metricas.activa:` antes de
+    # tomar el reloj o armar etiquetas: desactivada cuesta una lectura de atributo por punto.
+    __slots__ = ('activa', 'sink')
+
+    def __init__(self):
+        self.activa = False
+        self.sink: Optional[SinkMetricas] = None
+
+    def activar(self, sink: SinkMetricas):
+        self.sink = sink
+        self.activa = True
+
+    def desactivar(self):
+        self.activa = False
+        self.sink = None
+
+    def contar(self, nombre: str, valor: int = 1, etiquetas: Etiquetas = ()):
+        sink = self.sink  # Otro hilo pudo desactivar entre la pregunta y la medición
+        if sink is not None:
+            sink.contar(nombre, valor, etiquetas)
+
+    def observar(self, nombre: str, valor: float, etiquetas: Etiquetas = ()):
+        sink = self.sink
+        if sink is not None:
+            sink.observar(nombre, valor, etiquetas)
+
+metricas = Metricas()
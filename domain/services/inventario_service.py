@@ -1,38 +1,135 @@
 # domain/services/inventario_service.py
-from decimal import Decimal
-from typing import List
+import threading
+from contextlib import contextmanager
+from datetime import date
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 from domain.entities.movimiento_inventario import MovimientoInventario
+from domain.entities.movimientos_batch import MovimientosBatch
 from domain.entities.lote import Lote
-from domain.repositories.lote_repository import LoteRepository  # Definido abajo
+from domain.repositories.lote_repository import ConflictoConcurrencia, LoteRepository
+from domain.services.indice_lotes_fifo import IndiceLotesFIFO
+from domain.services.instrumentacion import metricas
+from domain.services.unidad_trabajo_inventario import UnidadTrabajoInventario
+from domain.value_objects.money import Money
+
+# Política para entradas (compras, devoluciones) del mismo costo que un lote abierto
+FUSION_NUNCA = 'NUNCA'              # Siempre un lote nuevo
+FUSION_ULTIMO = 'ULTIMO'            # Sumar al último lote de la cola si tiene el mismo costo: FIFO exacto
+FUSION_MISMO_COSTO = 'MISMO_COSTO'  # Sumar al lote más reciente de igual costo: menos lotes, FIFO aproximado
+_POLITICAS_FUSION = (FUSION_NUNCA, FUSION_ULTIMO, FUSION_MISMO_COSTO)
 
 class InventarioService:
-    def __init__(self, lote_repo: LoteRepository):
+    def __init__(self, lote_repo: LoteRepository, indice_lotes: Optional[IndiceLotesFIFO] = None,
+                 politica_fusion: str = FUSION_NUNCA):
+        if politica_fusion not in _POLITICAS_FUSION:
+            raise ValueError(f"Política de fusión de lotes desconocida: {politica_fusion}")
         self.lote_repo = lote_repo
+        self.indice_lotes = indice_lotes or IndiceLotesFIFO(lote_repo)
+        self.politica_fusion = politica_fusion
+        self._local = threading.local()  # La unidad de trabajo en curso es propia de cada hilo
+
+    @property
+    def _unidad_actual(self) -> Optional[UnidadTrabajoInventario]:
+        return getattr(self._local, 'unidad', None)
+
+    @_unidad_actual.setter
+    def _unidad_actual(self, unidad: Optional[UnidadTrabajoInventario]):
+        self._local.unidad = unidad
 
-    def registrar_salida_fifo(self, producto_id: int, bodega_id: int, cantidad: int, factura_id: int) -> List[MovimientoInventario]:
-        movimientos = []
+    @contextmanager
+    def unidad_de_trabajo(self) -> Iterator[UnidadTrabajoInventario]:
+        # Todo lo registrado dentro del bloque se escribe de una vez al salir; si hay error no se escribe nada
+        unidad = UnidadTrabajoInventario(self.lote_repo, self.indice_lotes, padre=self._unidad_actual)
+        self._unidad_actual = unidad
+        try:
+            yield unidad
+        except BaseException:
+            self._unidad_actual = unidad.padre
+            unidad.revertir()
+            raise
+        self._unidad_actual = unidad.padre
+        unidad.confirmar()
+
+    def precargar_lotes(self, pares: Iterable[Tuple[int, int]]):
+        self.indice_lotes.precargar(pares)
+
+    def registrar_salida_fifo(self, producto_id: int, bodega_id: int, cantidad: int, factura_id: int,
+                              columnar: bool = False) -> Union[List[MovimientoInventario], MovimientosBatch]:
+        # columnar=True devuelve un MovimientosBatch (para despachos grandes) en lugar de una lista de objetos
+        movimientos = MovimientosBatch()
         cantidad_pendiente = cantidad
-        lotes = self.lote_repo.obtener_lotes_antiguos(producto_id, bodega_id)
-
-        for lote in lotes:
-            if cantidad_pendiente <= 0:
-                break
-            despacho = min(lote.cantidad_restante, cantidad_pendiente)
-            lote.cantidad_restante -= despacho
-            self.lote_repo.actualizar(lote)
-
-            movimiento = MovimientoInventario(
-                id_producto=producto_id,
-                id_bodega=bodega_id,
-                tipo_movimiento='SALIDA',
-                cantidad=despacho,
-                costo_unitario_aplicado=lote.costo_unitario,
-                id_factura=factura_id,
-                # ... otros campos
-            )
-            movimientos.append(movimiento)
-            cantidad_pendiente -= despacho
-
-        if cantidad_pendiente > 0:
-            raise ValueError("Stock insuficiente en FIFO.")
-        return movimientos
\ No newline at end of file
+        desactualizados = None
+
+        with self.unidad_de_trabajo() as unidad:
+            while cantidad_pendiente > 0:
+                lote = self.indice_lotes.primero(producto_id, bodega_id)
+                if lote is None and desactualizados is None:
+                    # La cola de este hilo puede no ver lotes creados por otro: se relee una vez antes de fallar
+                    desactualizados = self.indice_lotes.recargar(producto_id, bodega_id)
+                    lote = self.indice_lotes.primero(producto_id, bodega_id)
+                if lote is None:
+                    break
+                despacho = min(lote.cantidad_restante, cantidad_pendiente)
+                unidad.registrar_lote(lote)
+                lote.cantidad_restante -= despacho
+
+                movimientos.agregar(  # El batch toma la moneda del costo del lote
+                    id_producto=producto_id,
+                    id_bodega=bodega_id,
+                    tipo_movimiento='SALIDA',
+                    cantidad=despacho,
+                    costo_unitario=lote.costo_unitario,
+                    id_factura=factura_id,
+                )
+                cantidad_pendiente -= despacho
+
+            if cantidad_pendiente > 0:
+                if desactualizados:
+                    # Otro escritor cambió lotes de esta cola (e.g., sumó una entrada): no es falta de stock,
+                    # la transacción se repite con la cola releída
+                    self.indice_lotes.invalidar(producto_id, bodega_id)
+                    raise ConflictoConcurrencia(desactualizados)
+                raise ValueError("Stock insuficiente en FIFO.")
+            unidad.registrar_movimientos(movimientos)
+        if metricas.activa:
+            metricas.observar('lotes_por_linea', len(movimientos))  # Un movimiento por lote consumido
+        return movimientos if columnar else list(movimientos)
+
+    def registrar_entrada(self, producto_id: int, bodega_id: int, cantidad: int, costo_unitario: Money,
+                          nota_credito_id: Optional[int] = None, fecha: Optional[date] = None,
+                          columnar: bool = False) -> Union[List[MovimientoInventario], MovimientosBatch]:
+        # Compra o devolución: un lote nuevo al final de la cola FIFO, o se suma a uno abierto según la política.
+        # Fusionar evita que las devoluciones llenen la cola de lotes diminutos que cada despacho debe recorrer.
+        if cantidad <= 0:
+            raise ValueError("La cantidad de una entrada debe ser positiva.")
+        fecha_entrada = fecha or date.today()
+        movimientos = MovimientosBatch(costo_unitario.moneda)
+
+        with self.unidad_de_trabajo() as unidad:
+            lote = self._lote_para_fusionar(producto_id, bodega_id, costo_unitario, fecha_entrada)
+            if lote is not None:
+                unidad.registrar_lote(lote)
+                lote.cantidad_restante += cantidad
+            else:
+                lote = Lote(id_lote=None, id_producto=producto_id, id_bodega=bodega_id, fecha_entrada=fecha_entrada,
+                            cantidad_restante=cantidad, costo_unitario=costo_unitario)
+                unidad.registrar_lote_nuevo(lote)
+                self.indice_lotes.agregar(lote)
+
+            movimientos.agregar(producto_id, bodega_id, 'ENTRADA', cantidad, costo_unitario,
+                                fecha=fecha_entrada, id_nota_credito=nota_credito_id)
+            unidad.registrar_movimientos(movimientos)
+        return movimientos if columnar else list(movimientos)
+
+    def _lote_para_fusionar(self, producto_id: int, bodega_id: int, costo_unitario: Money,
+                            fecha_entrada: date) -> Optional[Lote]:
+        if self.politica_fusion == FUSION_NUNCA:
+            return None
+        if self.politica_fusion == FUSION_ULTIMO:
+            lote = self.indice_lotes.ultimo(producto_id, bodega_id)
+            if lote is None or lote.costo_unitario != costo_unitario:
+                return None
+        else:
+            lote = self.indice_lotes.mas_reciente_con_costo(producto_id, bodega_id, costo_unitario)
+        # Una entrada con fecha anterior al lote (retroactiva) no puede adelantarse en la cola
+        return lote if lote is not None and lote.fecha_entrada <= fecha_entrada else None
@@ -0,0 +1,59 @@
+# domain/services/motor_impuestos.py
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+from domain.entities.bases_impuestos import Bases, bases_por_grupo
+from domain.entities.codigo_impuesto import CodigoImpuesto, TIPO_ICE, TIPO_IVA
+from domain.repositories.codigo_impuesto_repository import CodigoImpuestoRepository
+
+class MotorImpuestos:
+    # Resuelve el tax_code de cada línea y calcula bases, IVA e ICE agrupando por (tipo, tarifa).
+    # Los códigos de cada entidad se cargan una sola vez; invalidar() los descarta tras un cambio en tax_code.
+    def __init__(self, codigo_repo: CodigoImpuestoRepository):
+        self.codigo_repo = codigo_repo
+        self._codigos: Dict[UUID, Dict[str, CodigoImpuesto]] = {}
+
+    def codigos(self, id_entidad: UUID) -> Dict[str, CodigoImpuesto]:
+        codigos = self._codigos.get(id_entidad)
+        if codigos is None:
+            codigos = {c.codigo: c for c in self.codigo_repo.obtener_por_entidad(id_entidad)}
+            self._codigos[id_entidad] = codigos
+        return codigos
+
+    def invalidar(self, id_entidad: Optional[UUID] = None):
+        if id_entidad is None:
+            self._codigos.clear()
+        else:
+            self._codigos.pop(id_entidad, None)
+
+    def resolver(self, id_entidad: UUID, lineas: Sequence):
+        # Fija porcentaje_iva, tipo_impuesto y tarifa_ice de cada línea a partir de sus códigos.
+        # Las líneas sin codigo_impuesto conservan su porcentaje_iva actual.
+        codigos = self.codigos(id_entidad)
+        for linea in lineas:
+            if linea.codigo_impuesto is not None:
+                codigo = self._buscar(codigos, linea.codigo_impuesto)
+                if codigo.tipo == TIPO_ICE:
+                    raise ValueError(f"El código {codigo.codigo} es de ICE, no de IVA.")
+                linea.tipo_impuesto = codigo.tipo
+                linea.porcentaje_iva = codigo.tarifa if codigo.tipo == TIPO_IVA else Decimal('0')
+            if linea.codigo_ice is not None:
+                codigo = self._buscar(codigos, linea.codigo_ice)
+                if codigo.tipo != TIPO_ICE:
+                    raise ValueError(f"El código {codigo.codigo} no es de ICE.")
+                linea.tarifa_ice = codigo.tarifa
+
+    def calcular_bases(self, lineas: Sequence, moneda: str = "USD") -> Bases:
+        return bases_por_grupo(lineas, moneda)
+
+    def agregar_lineas(self, id_entidad: UUID, aggregate, lineas: List):
+        # Resuelve y suma todas las líneas al documento (factura o nota de crédito) con un solo recalculo
+        self.resolver(id_entidad, lineas)
+        aggregate.agregar_lineas(lineas, self.calcular_bases(lineas, aggregate.root.totales.moneda))
+
+    @staticmethod
+    def _buscar(codigos: Dict[str, CodigoImpuesto], codigo: str) -> CodigoImpuesto:
+        try:
+            return codigos[codigo]
+        except KeyError:
+            raise ValueError(f"Código de impuesto desconocido: {codigo}") from None
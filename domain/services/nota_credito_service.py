@@ -1,64 +1,107 @@
-from decimal import Decimal
 from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterator, Optional
+from uuid import UUID
+from domain.aggregates.factura_aggregate import FacturaAggregate
 from domain.aggregates.nota_credito_aggregate import NotaCreditoAggregate
 from domain.repositories.nota_credito_repository import NotaCreditoRepository
 from domain.repositories.factura_repository import FacturaRepository
+from domain.services.contabilizacion import ContabilizadorDocumentos
 from domain.services.inventario_service import InventarioService
+from domain.services.indice_devoluciones import IndiceDevoluciones
 from domain.specifications.nota_credito_specifications import (
     LineasValidasContraFactura, FechaEmisionPosteriorFactura, PlazoNotaCreditoValido
 )
+from domain.specifications.specification import SpecificationCompilada
+from domain.value_objects.money import Money
 from domain.aggregates.nota_credito_aggregate import LineaNotaCredito
 
 class NotaCreditoService:
-    def __init__(self, nc_repo: NotaCreditoRepository, factura_repo: FacturaRepository, inventario_service: InventarioService):
+    def __init__(self, nc_repo: NotaCreditoRepository, factura_repo: FacturaRepository, inventario_service: InventarioService,
+                 indice_devoluciones: Optional[IndiceDevoluciones] = None,
+                 contabilizador: Optional[ContabilizadorDocumentos] = None, id_entidad: Optional[UUID] = None):
         self.nc_repo = nc_repo
         self.factura_repo = factura_repo
         self.inventario_service = inventario_service
+        self.indice_devoluciones = indice_devoluciones or IndiceDevoluciones(nc_repo)
+        self.contabilizador = contabilizador  # Asiento inverso al de la factura, en la misma transacción
+        self.id_entidad = id_entidad
 
     def crear_y_emitir_nota_credito(self, datos: dict) -> NotaCreditoAggregate:
         factura_agg = self.factura_repo.obtener_por_id(datos['id_factura_modificada'])
         if not factura_agg:
             raise ValueError("Factura no existe.")
 
-        fecha_emision = datos.get('fecha_emision', date.today())
-        fecha_caducidad = datos.get('fecha_caducidad')
-        fecha_autorizacion = datos.get('fecha_autorizacion', date.today())
+        aggregate = construir_nota_credito(datos)
+        costos_vendidos = self.factura_repo.obtener_costos_vendidos(factura_agg.root.id_factura)
+        # Validar contra lo devolvible y descontarlo es una sola sección crítica por factura: entre hilos con el
+        # cerrojo del índice y entre procesos con el bloqueo de la fila de la factura, hasta el commit
+        with self.indice_devoluciones.bloqueo(factura_agg.root.id_factura):
+            self.factura_repo.bloquear(factura_agg.root.id_factura)
+            # Si guardar o la verificación fallan, los lotes de las entradas se revierten
+            with self.inventario_service.unidad_de_trabajo():
+                with aggregate.edicion():  # Invariantes internas verificadas una sola vez, al emitir
+                    agregar_lineas_y_validar(aggregate, factura_agg,
+                                             self.indice_devoluciones.cantidades_devolvibles(factura_agg), datos)
+                    movimientos = aggregate.emitir(self.inventario_service, factura_agg.root.id_bodega, factura_agg,
+                                                   costos_vendidos, columnar=True)
+                self.nc_repo.guardar(aggregate)
+                self.indice_devoluciones.verificar_en_base(factura_agg)
+                if self.contabilizador is not None:
+                    asiento = self.contabilizador.asiento_nota_credito(aggregate, movimientos,
+                                                                       datos.get('id_entidad', self.id_entidad))
+                    self.contabilizador.guardar([asiento])
+        return aggregate
 
-        aggregate = NotaCreditoAggregate.crear_nueva(
-            id_sucursal=datos['id_sucursal'],
-            ruc_emisor=datos['ruc_emisor'],
-            id_factura_modificada=datos['id_factura_modificada'],
-            adquiriente=datos['identificacion_adquiriente'],
-            direccion=datos['direccion_matriz'],
-            razon_social=datos['razon_social_emisor'],
-            motivo=datos['motivo'],
-            fecha_emision=fecha_emision,
-            fecha_caducidad=fecha_caducidad,
-            fecha_autorizacion=fecha_autorizacion
-        )
+# Construcción y validación compartidas con AsyncNotaCreditoService
 
-        # Ejemplo: Agregar línea
-        linea = LineaNotaCredito(
-            id_producto=1,
-            descripcion="Devolución Prod1",
-            cantidad=2,
-            valor_item_cobrado=Decimal('10.00')
-        )
-        aggregate.agregar_linea(linea)
+def construir_nota_credito(datos: dict) -> NotaCreditoAggregate:
+    fecha_emision = datos.get('fecha_emision', date.today())
+    fecha_caducidad = datos.get('fecha_caducidad')
+    fecha_autorizacion = datos.get('fecha_autorizacion', date.today())
 
-        # Validaciones externas
-        validaciones_externas = [
-            LineasValidasContraFactura(factura_agg),
-            FechaEmisionPosteriorFactura(factura_agg),
-            PlazoNotaCreditoValido(factura_agg, max_dias=30)
-        ]
-        errors = []
-        for spec in validaciones_externas:
-            if not spec.is_satisfied_by(aggregate.root):
-                errors.append(f"Validación externa fallida: {spec.__class__.__name__}")
-        if errors:
-            raise ValueError("; ".join(errors))
+    return NotaCreditoAggregate.crear_nueva(
+        id_sucursal=datos['id_sucursal'],
+        ruc_emisor=datos['ruc_emisor'],
+        id_factura_modificada=datos['id_factura_modificada'],
+        adquiriente=datos['identificacion_adquiriente'],
+        direccion=datos['direccion_matriz'],
+        razon_social=datos['razon_social_emisor'],
+        motivo=datos['motivo'],
+        fecha_emision=fecha_emision,
+        fecha_caducidad=fecha_caducidad,
+        fecha_autorizacion=fecha_autorizacion
+    )
 
-        movimientos = aggregate.emitir(self.inventario_service, factura_agg.root.id_bodega, factura_agg)
-        self.nc_repo.guardar(aggregate)
-        return aggregate
\ No newline at end of file
+def agregar_lineas_y_validar(aggregate: NotaCreditoAggregate, factura_agg: FacturaAggregate,
+                             devolvibles: Dict[int, int], datos: dict):
+    # Dentro de aggregate.edicion()
+    aggregate.agregar_lineas(list(lineas_nota_desde(datos, factura_agg)))  # Un solo recalculo de impuestos
+
+    # Validaciones externas
+    validaciones_externas = [
+        LineasValidasContraFactura(factura_agg, devolvibles),
+        FechaEmisionPosteriorFactura(factura_agg),
+        PlazoNotaCreditoValido(factura_agg, max_dias=30)
+    ]
+    errors = [f"Validación externa fallida: {nombre}"
+              for nombre in SpecificationCompilada.desde(validaciones_externas).fallas(aggregate.root)]
+    if errors:
+        raise ValueError("; ".join(errors))
+
+def lineas_nota_desde(datos: dict, factura_agg: FacturaAggregate) -> Iterator[LineaNotaCredito]:
+    # Sin valor_item_cobrado se acredita el precio unitario con que se facturó el producto
+    precios = {}
+    for linea in factura_agg.root.lineas:
+        precios.setdefault(linea.id_producto, linea.precio_unitario.monto)
+    for datos_linea in datos.get('lineas', ()):
+        valor = datos_linea.get('valor_item_cobrado')
+        yield LineaNotaCredito(
+            id_producto=datos_linea['id_producto'],
+            descripcion=datos_linea.get('descripcion', ''),
+            cantidad=datos_linea['cantidad'],
+            valor_item_cobrado=precios.get(datos_linea['id_producto'], Money.cero()) if valor is None
+            else Money.de_decimal(Decimal(str(valor))),  # Entrada: Decimal -> Money
+            codigo_impuesto=datos_linea.get('codigo_impuesto'),
+            codigo_ice=datos_linea.get('codigo_ice'),
+        )
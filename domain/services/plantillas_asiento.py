@@ -0,0 +1,89 @@
+# domain/services/plantillas_asiento.py
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+from domain.entities.plantilla_asiento import PlantillaAsiento
+from domain.repositories.plantilla_asiento_repository import PlantillaAsientoRepository
+from domain.services.expresiones_monto import ExpresionCompilada, columnas_de, compilar_expresion
+
+class PlantillaCompilada:
+    # Expresiones de todas las líneas ya compiladas; evalúa contra los totales de un documento
+    # (TotalesFactura / TotalesNotaCredito) y devuelve un importe en micros por línea, en el orden de la plantilla.
+    # Las líneas con la misma expresión (e.g., el debe y el haber de una retención) se evalúan una sola vez.
+    def __init__(self, plantilla: PlantillaAsiento):
+        self.plantilla = plantilla
+        self.version = plantilla.actualizado_en
+        unicas: Dict[str, ExpresionCompilada] = {}
+        for linea in plantilla.lineas:
+            if linea.expresion_monto not in unicas:
+                unicas[linea.expresion_monto] = self._compilar(plantilla, linea)
+        self.expresiones: Tuple[ExpresionCompilada, ...] = tuple(unicas[l.expresion_monto] for l in plantilla.lineas)
+        self.campos = frozenset().union(*(e.campos for e in unicas.values()))
+        self._unicas = tuple(unicas.values())
+        posicion = {texto: i for i, texto in enumerate(unicas)}
+        self._posiciones = tuple(posicion[l.expresion_monto] for l in plantilla.lineas)
+
+    def evaluar(self, totales) -> Tuple[int, ...]:
+        valores = [e.evaluar(totales) for e in self._unicas]
+        return tuple(valores[i] for i in self._posiciones)
+
+    def evaluar_lote(self, documentos: Sequence) -> List[Tuple[int, ...]]:
+        # Una columna por campo leído (una sola pasada por los documentos) y un map() por expresión
+        n = len(documentos)
+        if not self._posiciones:
+            return [()] * n
+        columnas = columnas_de(documentos, self.campos)
+        por_expresion = [list(e.evaluar_columnas(columnas, n)) for e in self._unicas]
+        return list(zip(*(por_expresion[i] for i in self._posiciones)))
+
+    @staticmethod
+    def _compilar(plantilla: PlantillaAsiento, linea) -> ExpresionCompilada:
+        try:
+            return compilar_expresion(linea.expresion_monto)
+        except ValueError as e:
+            raise ValueError(f"Plantilla {plantilla.codigo}, línea {linea.id_linea}: {e}") from None
+
+class CompiladorPlantillas:
+    # Compila cada plantilla una sola vez y la guarda por template_id. Cada uso pregunta al repositorio
+    # solo la versión (actualizado_en); si cambió, se vuelve a leer y compilar únicamente esa plantilla.
+    def __init__(self, plantilla_repo: PlantillaAsientoRepository):
+        self.plantilla_repo = plantilla_repo
+        self._compiladas: Dict[UUID, PlantillaCompilada] = {}
+        self.compilaciones = 0
+
+    def obtener(self, id_plantilla: UUID) -> PlantillaCompilada:
+        compilada = self.obtener_muchos([id_plantilla]).get(id_plantilla)
+        if compilada is None:
+            raise ValueError(f"Plantilla de asiento {id_plantilla} no existe.")
+        return compilada
+
+    def obtener_muchos(self, ids: Iterable[UUID]) -> Dict[UUID, PlantillaCompilada]:
+        ids = set(ids)
+        versiones = self.plantilla_repo.obtener_versiones(ids)
+        for id_plantilla in ids - versiones.keys():
+            self._compiladas.pop(id_plantilla, None)  # Eliminada
+        compiladas, desactualizadas = {}, []
+        for id_plantilla, version in versiones.items():
+            compilada = self._compiladas.get(id_plantilla)
+            if compilada is not None and compilada.version == version:
+                compiladas[id_plantilla] = compilada
+            else:
+                desactualizadas.append(id_plantilla)
+        if desactualizadas:
+            for id_plantilla, plantilla in self.plantilla_repo.obtener_muchos(desactualizadas).items():
+                compiladas[id_plantilla] = self.compilar(plantilla)
+        return compiladas
+
+    def compilar(self, plantilla: PlantillaAsiento) -> PlantillaCompilada:
+        # Para una plantilla ya leída: reutiliza la compilada si es de la misma versión
+        compilada = self._compiladas.get(plantilla.id_plantilla)
+        if compilada is None or compilada.version != plantilla.actualizado_en:
+            compilada = PlantillaCompilada(plantilla)
+            self._compiladas[plantilla.id_plantilla] = compilada
+            self.compilaciones += 1
+        return compilada
+
+    def invalidar(self, id_plantilla: Optional[UUID] = None):
+        if id_plantilla is None:
+            self._compiladas.clear()
+        else:
+            self._compiladas.pop(id_plantilla, None)
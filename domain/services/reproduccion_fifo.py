@@ -0,0 +1,118 @@
+# domain/services/reproduccion_fifo.py
+import os
+from array import array
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from domain.entities.historial_fifo import ENTRADA, HistorialFIFO
+from domain.repositories.movimiento_inventario_repository import MovimientoInventarioRepository
+from domain.value_objects.money import dividir_redondeando
+
+Cambios = Tuple[array, array]  # (id_movimiento, nuevo costo en micros)
+
+def reproducir(historial: HistorialFIFO, desde_ordinal: int) -> Cambios:
+    # Consume las entradas en orden FIFO y recalcula el costo de cada salida con fecha >= desde.
+    # Una salida que cruza varias entradas recibe su costo promedio ponderado (una fila por movimiento).
+    ids, costos = array('q'), array('q')
+    # [cantidad_restante, costo_micros] por entrada, la más antigua primero; parte del stock de apertura
+    cola = deque([cantidad, costo] for cantidad, costo in zip(historial.apertura_cantidad, historial.apertura_costo))
+    id_movimiento, tipos, cantidades = historial.id_movimiento, historial.tipo, historial.cantidad
+    costos_actuales, fechas = historial.costo_micros, historial.fecha
+    for k in range(len(historial)):
+        cantidad = cantidades[k]
+        if tipos[k] == ENTRADA:
+            cola.append([cantidad, costos_actuales[k]])
+            continue
+        if cantidad <= 0:
+            continue
+        pendiente, total = cantidad, 0
+        while pendiente:
+            if not cola:
+                raise ValueError(f"Stock insuficiente al reproducir el movimiento {id_movimiento[k]} "
+                                 f"(producto {historial.id_producto}, bodega {historial.id_bodega}).")
+            entrada = cola[0]
+            tomado = min(entrada[0], pendiente)
+            total += tomado * entrada[1]
+            pendiente -= tomado
+            entrada[0] -= tomado
+            if not entrada[0]:
+                cola.popleft()
+        if fechas[k] >= desde_ordinal:
+            costo = dividir_redondeando(total, cantidad)
+            if costo != costos_actuales[k]:
+                ids.append(id_movimiento[k])
+                costos.append(costo)
+    return ids, costos
+
+@dataclass
+class ResultadoReproduccion:
+    corregidos: int = 0  # Movimientos cuyo costo cambió
+    fallidos: Dict[Tuple[int, int], str] = field(default_factory=dict)  # (producto, bodega) -> error; sin cambios
+
+def _reproducir_bloque(historiales: List[HistorialFIFO], desde_ordinal: int) -> Tuple[array, array, dict]:
+    # Tarea de un proceso del pool: debe ser una función de módulo para poder serializarse.
+    # Un par que no se puede reproducir (e.g., historial incompleto) se reporta y no detiene a los demás.
+    ids, costos, fallidos = array('q'), array('q'), {}
+    for historial in historiales:
+        try:
+            ids_historial, costos_historial = reproducir(historial, desde_ordinal)
+        except ValueError as e:
+            fallidos[(historial.id_producto, historial.id_bodega)] = str(e)
+            continue
+        ids.extend(ids_historial)
+        costos.extend(costos_historial)
+    return ids, costos, fallidos
+
+class ReproductorCostosFIFO:
+    # Recalcula costo_unitario_aplicado de las salidas desde una fecha (compra retroactiva, devolución)
+    # reproduciendo el FIFO de cada (producto, bodega) sobre su historial completo.
+    # Los productos son independientes: se reparten por bloques entre procesos. La lectura y la escritura
+    # de los costos corregidos ocurren en el proceso principal, dentro de la transacción actual.
+    def __init__(self, movimiento_repo: MovimientoInventarioRepository, procesos: Optional[int] = None,
+                 movimientos_por_bloque: int = 50_000):
+        self.movimiento_repo = movimiento_repo
+        self.procesos = procesos or os.cpu_count() or 1
+        self.movimientos_por_bloque = movimientos_por_bloque
+
+    def recalcular(self, desde: date, productos: Optional[Iterable[int]] = None,
+                   id_bodega: Optional[int] = None) -> ResultadoReproduccion:
+        desde_ordinal = desde.toordinal()
+        bloques = self._bloques(self.movimiento_repo.iterar_historiales(productos, id_bodega))
+        resultado = ResultadoReproduccion()
+        if self.procesos == 1:
+            for bloque in bloques:
+                self._escribir(_reproducir_bloque(bloque, desde_ordinal), resultado)
+            return resultado
+
+        with ProcessPoolExecutor(self.procesos) as pool:
+            pendientes = set()
+            for bloque in bloques:
+                if len(pendientes) >= 2 * self.procesos:  # No leer más rápido de lo que se procesa
+                    listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                    for f in listos:
+                        self._escribir(f.result(), resultado)
+                pendientes.add(pool.submit(_reproducir_bloque, bloque, desde_ordinal))
+            for f in pendientes:
+                self._escribir(f.result(), resultado)
+        return resultado
+
+    def _bloques(self, historiales: Iterable[HistorialFIFO]) -> Iterator[List[HistorialFIFO]]:
+        # Agrupa historiales hasta ~movimientos_por_bloque; un producto nunca se reparte entre dos bloques
+        bloque, tamano = [], 0
+        for historial in historiales:
+            if tamano >= self.movimientos_por_bloque and bloque[-1].id_producto != historial.id_producto:
+                yield bloque
+                bloque, tamano = [], 0
+            bloque.append(historial)
+            tamano += len(historial)
+        if bloque:
+            yield bloque
+
+    def _escribir(self, cambios: Tuple[array, array, dict], resultado: ResultadoReproduccion):
+        ids, costos, fallidos = cambios
+        if ids:
+            self.movimiento_repo.actualizar_costos(ids, costos)
+        resultado.corregidos += len(ids)
+        resultado.fallidos.update(fallidos)
@@ -0,0 +1,152 @@
+# domain/services/tipos_cambio.py
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from uuid import UUID
+from domain.entities.tipo_cambio import TipoCambio
+from domain.repositories.tipo_cambio_repository import TipoCambioRepository
+from domain.value_objects.money import ESCALA, Money, dividir_redondeando
+
+Fraccion = Tuple[int, int]  # (numerador, denominador): micros destino = micros origen * n / d
+
+class _SeriePar:
+    # Tasas de un par ordenadas por fecha (ordinal), en arreglos paralelos para bisect
+    __slots__ = ('dias', 'tasas')
+
+    def __init__(self):
+        self.dias: List[int] = []
+        self.tasas: List[int] = []
+
+    def poner(self, dia: int, tasa: int) -> bool:
+        # Devuelve si cambió algo; en orden de fecha cada fila se agrega al final
+        i = bisect_left(self.dias, dia)
+        if i < len(self.dias) and self.dias[i] == dia:
+            if self.tasas[i] == tasa:
+                return False
+            self.tasas[i] = tasa
+        else:
+            self.dias.insert(i, dia)
+            self.tasas.insert(i, tasa)
+        return True
+
+    def vigente(self, dia: int) -> Optional[Tuple[int, int]]:
+        # (día, tasa) de la última tasa en o antes de dia
+        i = bisect_right(self.dias, dia) - 1
+        return (self.dias[i], self.tasas[i]) if i >= 0 else None
+
+class TiposCambioService:
+    # Tipos de cambio en memoria: una serie ordenada por par (origen, destino) y búsqueda binaria de la
+    # última tasa en o antes de la fecha. Si no hay tasa del par se usa la inversa y, si tampoco, el cruce
+    # por la moneda base de la entidad (origen -> base -> destino). Las conversiones son una fracción entera
+    # exacta con un solo redondeo a la micro-unidad. refrescar() trae solo las filas nuevas o actualizadas
+    # desde la última carga: created_at/updated_at en o después del más reciente ya leído menos `solapamiento`,
+    # para no perder filas de transacciones que confirmaron tarde con una marca anterior (las ya leídas se
+    # vuelven a leer y no cambian nada). Se llama sola cada refresco_segundos (None: solo a mano).
+    # exchange_rate no tiene deleted_at: una tasa borrada físicamente sigue en memoria hasta recrear el servicio.
+    def __init__(self, tipo_cambio_repo: TipoCambioRepository, id_entidad: UUID,
+                 refresco_segundos: Optional[float] = 300.0, solapamiento: timedelta = timedelta(minutes=5),
+                 max_resueltas: int = 100_000):
+        if max_resueltas <= 0:
+            raise ValueError("max_resueltas debe ser positivo.")
+        self.tipo_cambio_repo = tipo_cambio_repo
+        self.id_entidad = id_entidad
+        self.refresco_segundos = refresco_segundos
+        self.solapamiento = solapamiento
+        self.max_resueltas = max_resueltas
+        self.moneda_base: Optional[str] = None
+        self._series: Dict[Tuple[str, str], _SeriePar] = {}
+        self._resueltas: Dict[Tuple[str, str, int], Fraccion] = {}  # Acotado: se descartan las más antiguas
+        self._version: Optional[datetime] = None
+        self._refrescado: Optional[float] = None
+
+    def refrescar(self) -> int:
+        # Devuelve cuántas filas leyó
+        if self.moneda_base is None:
+            self.moneda_base = self.tipo_cambio_repo.obtener_moneda_base(self.id_entidad)
+        desde = self._version - self.solapamiento if self._version is not None else None
+        filas = self.tipo_cambio_repo.obtener_desde(desde)
+        if filas:
+            self._cargar(filas)
+        self._refrescado = time.monotonic()
+        return len(filas)
+
+    def tasa(self, origen: str, destino: str, fecha: date) -> Fraccion:
+        self._vigentes()
+        return self._fraccion(origen, destino, fecha.toordinal())
+
+    def convertir(self, monto: Money, destino: str, fecha: date) -> Money:
+        numerador, denominador = self.tasa(monto.moneda, destino, fecha)
+        return Money(dividir_redondeando(monto.micros * numerador, denominador), destino)
+
+    def convertir_lote(self, micros: Sequence[int], origen: str, destino: str,
+                       fechas: Union[date, Sequence[date]]) -> List[int]:
+        # Importes en micros de origen a destino, con una fecha común o una por importe; la tasa se
+        # resuelve una vez por fecha distinta
+        self._vigentes()
+        if isinstance(fechas, date):
+            numerador, denominador = self._fraccion(origen, destino, fechas.toordinal())
+            if numerador == denominador:
+                return list(micros)
+            return [dividir_redondeando(m * numerador, denominador) for m in micros]
+        if len(fechas) != len(micros):
+            raise ValueError("Importes y fechas de distinta longitud.")
+        por_fecha: Dict[date, Fraccion] = {}
+        resultado = []
+        for m, fecha in zip(micros, fechas):
+            fraccion = por_fecha.get(fecha)
+            if fraccion is None:
+                fraccion = por_fecha[fecha] = self._fraccion(origen, destino, fecha.toordinal())
+            resultado.append(dividir_redondeando(m * fraccion[0], fraccion[1]))
+        return resultado
+
+    def _vigentes(self):
+        if self._refrescado is None or (self.refresco_segundos is not None
+                                        and time.monotonic() - self._refrescado >= self.refresco_segundos):
+            self.refrescar()
+
+    def _cargar(self, filas: Sequence[TipoCambio]):
+        cambios = False
+        for fila in filas:
+            serie = self._series.get((fila.moneda_origen, fila.moneda_destino))
+            if serie is None:
+                serie = self._series[(fila.moneda_origen, fila.moneda_destino)] = _SeriePar()
+            cambios |= serie.poner(fila.fecha.toordinal(), fila.tasa)
+            if fila.actualizado_en is not None and (self._version is None or fila.actualizado_en > self._version):
+                self._version = fila.actualizado_en
+        if cambios:
+            self._resueltas.clear()  # Las fracciones resueltas pueden depender de las tasas nuevas
+
+    def _fraccion(self, origen: str, destino: str, dia: int) -> Fraccion:
+        clave = (origen, destino, dia)
+        fraccion = self._resueltas.get(clave)
+        if fraccion is None:
+            fraccion = self._resolver(origen, destino, dia)
+            if len(self._resueltas) >= self.max_resueltas:
+                del self._resueltas[next(iter(self._resueltas))]
+            self._resueltas[clave] = fraccion
+        return fraccion
+
+    def _resolver(self, origen: str, destino: str, dia: int) -> Fraccion:
+        if origen == destino:
+            return 1, 1
+        directa = self._directa(origen, destino, dia)
+        if directa is not None:
+            return directa
+        base = self.moneda_base
+        if base not in (origen, destino):
+            hacia_base, desde_base = self._directa(origen, base, dia), self._directa(base, destino, dia)
+            if hacia_base is not None and desde_base is not None:
+                return hacia_base[0] * desde_base[0], hacia_base[1] * desde_base[1]
+        raise ValueError(f"Sin tipo de cambio {origen}/{destino} al {date.fromordinal(dia)}.")
+
+    def _directa(self, origen: str, destino: str, dia: int) -> Optional[Fraccion]:
+        # La tasa del par o la inversa, la más reciente de las dos
+        serie, inversa = self._series.get((origen, destino)), self._series.get((destino, origen))
+        tasa = serie.vigente(dia) if serie is not None else None
+        tasa_inversa = inversa.vigente(dia) if inversa is not None else None
+        if tasa is not None and (tasa_inversa is None or tasa[0] >= tasa_inversa[0]):
+            return tasa[1], ESCALA
+        if tasa_inversa is not None:
+            return ESCALA, tasa_inversa[1]
+        return None
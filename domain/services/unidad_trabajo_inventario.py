@@ -0,0 +1,110 @@
+# domain/services/unidad_trabajo_inventario.py
+from typing import Dict, List, Optional, Tuple
+from domain.entities.lote import Lote
+from domain.entities.movimiento_inventario import MovimientoInventario
+from domain.entities.movimientos_batch import MovimientosBatch
+from domain.repositories.lote_repository import ConflictoConcurrencia, LoteRepository
+from domain.services.indice_lotes_fifo import IndiceLotesFIFO
+from domain.services.instrumentacion import metricas, reloj
+
+class UnidadTrabajoInventario:
+    # Acumula los cambios de lotes y los movimientos de una operación (e.g., FacturaAggregate.emitir)
+    # y los confirma en una sola llamada al repositorio. Una unidad anidada se integra en su padre
+    # al confirmar, o revierte solo sus propios cambios si falla.
+    def __init__(self, lote_repo: LoteRepository, indice_lotes: IndiceLotesFIFO,
+                 padre: Optional['UnidadTrabajoInventario'] = None):
+        self.lote_repo = lote_repo
+        self.indice_lotes = indice_lotes
+        self.padre = padre
+        self._originales: Dict[int, Tuple[Lote, int]] = {}  # id(lote) -> (lote, cantidad_restante original)
+        self._nuevos: Dict[int, Lote] = {}  # id(lote) -> lote creado en esta unidad, aún sin id_lote
+        self.movimientos = MovimientosBatch()  # Columnar: sin un objeto por movimiento pendiente
+        self._documentos: List[Tuple[object, str, int, int]] = []  # (documento, columna de id, desde, hasta)
+
+    @property
+    def lotes_modificados(self) -> List[Lote]:
+        # Los lotes nuevos se insertan con su cantidad final: no necesitan UPDATE
+        return [lote for clave, (lote, _) in self._originales.items() if clave not in self._nuevos]
+
+    @property
+    def lotes_nuevos(self) -> List[Lote]:
+        return list(self._nuevos.values())
+
+    def registrar_lote(self, lote: Lote):
+        # Llamar antes de modificar el lote, para poder revertirlo
+        if id(lote) not in self._originales:
+            self._originales[id(lote)] = (lote, lote.cantidad_restante)
+
+    def registrar_lote_nuevo(self, lote: Lote):
+        self._nuevos[id(lote)] = lote
+
+    def registrar_movimiento(self, movimiento: MovimientoInventario):
+        self.movimientos.agregar_movimiento(movimiento)
+
+    def registrar_movimientos(self, movimientos: MovimientosBatch):
+        self.movimientos.extender(movimientos)
+
+    def vincular_documento(self, documento, columna: str):
+        # Los movimientos ya registrados en la unidad toman getattr(documento, columna) ('id_factura' o
+        # 'id_nota_credito') al escribirse: un documento nuevo recibe su id al guardarlo, después de emitir
+        # y antes de que la unidad raíz escriba
+        self._documentos.append((documento, columna, 0, len(self.movimientos)))
+
+    def confirmar(self):
+        if self.padre is not None:
+            self.padre._absorber(self)
+        elif self._originales or self._nuevos or self.movimientos:
+            inicio = reloj() if metricas.activa else None
+            try:
+                lotes, nuevos = self.lotes_modificados, self.lotes_nuevos
+                self._asignar_documentos()
+                self.lote_repo.actualizar_muchos(lotes, self.movimientos, nuevos)
+            except ConflictoConcurrencia as e:
+                if inicio is not None:
+                    metricas.contar('conflictos_concurrencia_total')
+                self.revertir()
+                for lote in e.lotes:  # Copias desactualizadas: el reintento las vuelve a leer de la base
+                    self.indice_lotes.invalidar(lote.id_producto, lote.id_bodega)
+                raise
+            except Exception:
+                self.revertir()
+                raise
+            if inicio is not None:
+                metricas.observar('lotes_actualizar_segundos', reloj() - inicio)
+                metricas.contar('lotes_actualizar_total')
+                metricas.contar('lotes_escritos_total', len(lotes) + len(nuevos))
+        self._limpiar()
+
+    def revertir(self):
+        for lote, cantidad in self._originales.values():
+            lote.cantidad_restante = cantidad
+            self.indice_lotes.reinsertar(lote)  # Si el índice ya lo había descartado por agotado
+        for lote in self._nuevos.values():
+            lote.cantidad_restante = 0  # Nunca existió: agotado, el índice lo descarta
+            self.indice_lotes.descartar(lote)
+        self._limpiar()
+
+    def _asignar_documentos(self):
+        for documento, columna, desde, hasta in self._documentos:
+            id_documento = getattr(documento, columna)
+            if id_documento is None:
+                raise ValueError(f"Movimientos sin {columna}: el documento debe guardarse antes de confirmar "
+                                 f"el inventario.")
+            ids = getattr(self.movimientos, columna)
+            for posicion in range(desde, hasta):
+                ids[posicion] = id_documento
+
+    def _absorber(self, hija: 'UnidadTrabajoInventario'):
+        for clave, original in hija._originales.items():
+            self._originales.setdefault(clave, original)  # Conservar la cantidad más antigua
+        self._nuevos.update(hija._nuevos)
+        desplazamiento = len(self.movimientos)
+        self._documentos.extend((documento, columna, desplazamiento + desde, desplazamiento + hasta)
+                                for documento, columna, desde, hasta in hija._documentos)
+        self.movimientos.extender(hija.movimientos)
+
+    def _limpiar(self):
+        self._originales = {}
+        self._nuevos = {}
+        self.movimientos = MovimientosBatch()
+        self._documentos = []
@@ -1,28 +1,11 @@
 # domain/specifications/factura_specifications.py
-from abc import ABC, abstractmethod
 from datetime import date
 from typing import Optional
 from decimal import Decimal
 from domain.entities.factura import Factura
 from domain.entities.linea_factura import LineaFactura
 from domain.value_objects.forma_pago import FormaPago
-
-class Specification(ABC):
-    @abstractmethod
-    def is_satisfied_by(self, candidate) -> bool:
-        pass
-
-    def __and__(self, other: 'Specification') -> 'CompositeSpecification':
-        return CompositeSpecification(self, other, lambda x, y: x and y)
-
-class CompositeSpecification(Specification):
-    def __init__(self, left: Specification, right: Specification, operator):
-        self.left = left
-        self.right = right
-        self.operator = operator
-
-    def is_satisfied_by(self, candidate) -> bool:
-        return self.operator(self.left.is_satisfied_by(candidate), self.right.is_satisfied_by(candidate))
+from domain.specifications.specification import Specification, EspecificacionFecha
 
 class FacturaTieneLineas(Specification):
     def is_satisfied_by(self, factura: Factura) -> bool:
@@ -30,15 +13,15 @@ class FacturaTieneLineas(Specification):
 
 class FacturaTotalValido(Specification):
     def is_satisfied_by(self, factura: Factura) -> bool:
-        return factura.totales.valor_total > 0
+        return factura.totales.valor_total.es_positivo()
 
 class FormaPagoValida(Specification):
     def is_satisfied_by(self, factura: Factura) -> bool:
         return factura.forma_pago.valor >= factura.totales.valor_total
 
-class FechaEmisionValida(Specification):
+class FechaEmisionValida(EspecificacionFecha):
     def is_satisfied_by(self, factura: Factura) -> bool:
-        today = date.today()
+        today = self.hoy()
         return factura.fecha_emision >= today
 
 class FechaCaducidadValida(Specification):
@@ -47,8 +30,8 @@ class FechaCaducidadValida(Specification):
             return True  # Opcional
         return factura.fecha_caducidad > factura.fecha_emision
 
-class FechaAutorizacionValida(Specification):
+class FechaAutorizacionValida(EspecificacionFecha):
     def is_satisfied_by(self, factura: Factura) -> bool:
-        today = date.today()
+        today = self.hoy()
         return factura.fecha_autorizacion <= factura.fecha_emision and factura.fecha_autorizacion <= today
 
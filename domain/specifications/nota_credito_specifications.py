@@ -1,28 +1,12 @@
 # domain/specifications/nota_credito_specifications.py
-from abc import ABC, abstractmethod
 from datetime import date, datetime
-from typing import Optional
+from collections import defaultdict
+from typing import Dict, Optional
 from decimal import Decimal
 from domain.entities.nota_credito import NotaCredito
 from domain.aggregates.factura_aggregate import FacturaAggregate
 from domain.entities.linea_nota_credito import LineaNotaCredito
-
-class Specification(ABC):
-    @abstractmethod
-    def is_satisfied_by(self, candidate) -> bool:
-        pass
-
-    def __and__(self, other: 'Specification') -> 'CompositeSpecification':
-        return CompositeSpecification(self, other, lambda x, y: x and y)
-
-class CompositeSpecification(Specification):
-    def __init__(self, left: Specification, right: Specification, operator):
-        self.left = left
-        self.right = right
-        self.operator = operator
-
-    def is_satisfied_by(self, candidate) -> bool:
-        return self.operator(self.left.is_satisfied_by(candidate), self.right.is_satisfied_by(candidate))
+from domain.specifications.specification import Specification, EspecificacionFecha
 
 class NotaCreditoTieneLineas(Specification):
     def is_satisfied_by(self, nota_credito: NotaCredito) -> bool:
@@ -30,30 +14,33 @@ class NotaCreditoTieneLineas(Specification):
 
 class NotaCreditoTotalValido(Specification):
     def is_satisfied_by(self, nota_credito: NotaCredito) -> bool:
-        return nota_credito.totales.valor_total > 0
+        return nota_credito.totales.valor_total.es_positivo()
 
 class MotivoModificacionValido(Specification):
     def is_satisfied_by(self, nota_credito: NotaCredito) -> bool:
         return bool(nota_credito.motivo_modificacion.descripcion.strip())
 
 class LineasValidasContraFactura(Specification):
-    def __init__(self, factura_agg: Optional[FacturaAggregate]):
+    def __init__(self, factura_agg: Optional[FacturaAggregate], cantidades_devolvibles: Optional[Dict[int, int]] = None):
         self.factura_agg = factura_agg
+        self.cantidades_devolvibles = cantidades_devolvibles  # De IndiceDevoluciones; si falta, solo lo facturado
 
     def is_satisfied_by(self, nota_credito: NotaCredito) -> bool:
         if not self.factura_agg:
             return False
-        factura = self.factura_agg.root
-        factura_cantidades = {linea.id_producto: linea.cantidad for linea in factura.lineas}
+        cantidades_max = self.cantidades_devolvibles
+        if cantidades_max is None:
+            cantidades_max = defaultdict(int)
+            for linea in self.factura_agg.root.lineas:
+                cantidades_max[linea.id_producto] += linea.cantidad
+        solicitadas = defaultdict(int)
         for linea_nota in nota_credito.lineas:
-            cantidad_max = factura_cantidades.get(linea_nota.id_producto, 0)
-            if linea_nota.cantidad > cantidad_max:
-                return False
-        return True
+            solicitadas[linea_nota.id_producto] += linea_nota.cantidad
+        return all(cantidad <= cantidades_max.get(id_producto, 0) for id_producto, cantidad in solicitadas.items())
 
-class FechaEmisionValida(Specification):
+class FechaEmisionValida(EspecificacionFecha):
     def is_satisfied_by(self, nota_credito: NotaCredito) -> bool:
-        today = date.today()
+        today = self.hoy()
         return nota_credito.fecha_emision >= today
 
 class FechaCaducidadValida(Specification):
@@ -62,9 +49,9 @@ class FechaCaducidadValida(Specification):
             return True  # Opcional
         return nota_credito.fecha_caducidad > nota_credito.fecha_emision
 
-class FechaAutorizacionValida(Specification):
+class FechaAutorizacionValida(EspecificacionFecha):
     def is_satisfied_by(self, nota_credito: NotaCredito) -> bool:
-        today = date.today()
+        today = self.hoy()
         return nota_credito.fecha_autorizacion <= nota_credito.fecha_emision and nota_credito.fecha_autorizacion <= today
 
 class FechaEmisionPosteriorFactura(Specification):
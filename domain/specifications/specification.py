@@ -0,0 +1,132 @@
+# domain/specifications/specification.py
+from abc import ABC, abstractmethod
+from copy import copy
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from domain.services.instrumentacion import Etiquetas, metricas, reloj
+
+class Specification(ABC):
+    @abstractmethod
+    def is_satisfied_by(self, candidate) -> bool:
+        pass
+
+    def __and__(self, other: 'Specification') -> 'AndSpecification':
+        return AndSpecification(self, other)
+
+    def __or__(self, other: 'Specification') -> 'OrSpecification':
+        return OrSpecification(self, other)
+
+    def __invert__(self) -> 'NotSpecification':
+        return NotSpecification(self)
+
+    @property
+    def nombre(self) -> str:
+        return self.__class__.__name__
+
+    def con_fecha(self, hoy: date) -> 'Specification':
+        return self  # Solo las reglas que dependen de la fecha actual devuelven una copia fijada
+
+    def compilar(self, hoy: Optional[date] = None) -> 'SpecificationCompilada':
+        return SpecificationCompilada.desde([self], hoy)
+
+    def evaluate_many(self, candidates: Iterable) -> Dict[int, List[str]]:
+        return SpecificationCompilada.desde([self], date.today()).evaluate_many(candidates)
+
+class CompositeSpecification(Specification):
+    def __init__(self, left: Specification, right: Specification):
+        self.left = left
+        self.right = right
+
+class AndSpecification(CompositeSpecification):
+    def is_satisfied_by(self, candidate) -> bool:
+        return self.left.is_satisfied_by(candidate) and self.right.is_satisfied_by(candidate)
+
+    def con_fecha(self, hoy: date) -> 'AndSpecification':
+        return AndSpecification(self.left.con_fecha(hoy), self.right.con_fecha(hoy))
+
+class OrSpecification(CompositeSpecification):
+    def is_satisfied_by(self, candidate) -> bool:
+        return self.left.is_satisfied_by(candidate) or self.right.is_satisfied_by(candidate)
+
+    @property
+    def nombre(self) -> str:
+        return f"({self.left.nombre} | {self.right.nombre})"
+
+    def con_fecha(self, hoy: date) -> 'OrSpecification':
+        return OrSpecification(self.left.con_fecha(hoy), self.right.con_fecha(hoy))
+
+class NotSpecification(Specification):
+    def __init__(self, spec: Specification):
+        self.spec = spec
+
+    def is_satisfied_by(self, candidate) -> bool:
+        return not self.spec.is_satisfied_by(candidate)
+
+    @property
+    def nombre(self) -> str:
+        return f"~{self.spec.nombre}"
+
+    def con_fecha(self, hoy: date) -> 'NotSpecification':
+        return NotSpecification(self.spec.con_fecha(hoy))
+
+class EspecificacionFecha(Specification):
+    # Base para reglas que comparan contra la fecha actual; con_fecha fija "hoy" para todo un lote
+    def __init__(self, hoy: Optional[date] = None):
+        self._hoy = hoy
+
+    def hoy(self) -> date:
+        return self._hoy or date.today()
+
+    def con_fecha(self, hoy: date) -> 'EspecificacionFecha':
+        fijada = copy(self)
+        fijada._hoy = hoy
+        return fijada
+
+class SpecificationCompilada:
+    # Conjunción aplanada: una lista ordenada de (nombre, chequeo) sin composición anidada
+    def __init__(self, chequeos: List[Tuple[str, Callable[[object], bool]]]):
+        self.chequeos = chequeos
+
+    @classmethod
+    def desde(cls, specs: Iterable[Specification], hoy: Optional[date] = None) -> 'SpecificationCompilada':
+        chequeos = []
+        pendientes = list(reversed(list(specs)))
+        while pendientes:
+            spec = pendientes.pop()
+            if isinstance(spec, AndSpecification):
+                pendientes.extend((spec.right, spec.left))  # Conserva el orden izquierda -> derecha
+                continue
+            if hoy is not None:
+                spec = spec.con_fecha(hoy)
+            chequeos.append((spec.nombre, spec.is_satisfied_by))
+        return cls(chequeos)
+
+    def is_satisfied_by(self, candidate) -> bool:
+        for _, chequeo in self.chequeos:
+            if not chequeo(candidate):
+                return False
+        return True
+
+    def fallas(self, candidate) -> List[str]:
+        # Evalúa todos los chequeos para reportar cada regla incumplida
+        return [nombre for nombre, chequeo in self.chequeos if not chequeo(candidate)]
+
+    def fallas_medidas(self, candidate, etiquetas: Etiquetas = ()) -> List[str]:
+        # Igual que fallas, con la duración de cada chequeo en especificacion_segundos (instrumentación activa)
+        fallas = []
+        for nombre, chequeo in self.chequeos:
+            inicio = reloj()
+            cumple = chequeo(candidate)
+            metricas.observar('especificacion_segundos', reloj() - inicio, etiquetas + (('especificacion', nombre),))
+            if not cumple:
+                fallas.append(nombre)
+        return fallas
+
+    def evaluate_many(self, candidates: Iterable) -> Dict[int, List[str]]:
+        # Fallas por posición del candidato en la entrada; los candidatos válidos no aparecen
+        resultado = {}
+        for posicion, candidate in enumerate(candidates):
+            fallas = self.fallas(candidate)
+            if fallas:
+                resultado[posicion] = fallas
+        return resultado
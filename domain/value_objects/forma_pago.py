@@ -1,12 +1,12 @@
 # domain/value_objects/forma_pago.py
 from dataclasses import dataclass
-from decimal import Decimal
+from domain.value_objects.money import Money
 
 @dataclass(frozen=True)
 class FormaPago:
     tipo: str  # e.g., 'Efectivo', 'Tarjeta'
-    valor: Decimal
+    valor: Money
 
     def __post_init__(self):
-        if self.valor < 0:
+        if self.valor.micros < 0:
             raise ValueError("Valor de pago no puede ser negativo.")
\ No newline at end of file
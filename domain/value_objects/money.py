@@ -0,0 +1,99 @@
+# domain/value_objects/money.py
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+from typing import Tuple, Union
+
+ESCALA = 10 ** 6  # Micro-unidades: 6 decimales, la precisión de precios unitarios del SRI
+MICROS_POR_CENTAVO = 10 ** 4
+
+def dividir_redondeando(numerador: int, denominador: int) -> int:
+    # División entera con redondeo "mitad hacia arriba" (alejándose de cero), como exige el SRI
+    cociente, resto = divmod(abs(numerador), denominador)
+    if 2 * resto >= denominador:
+        cociente += 1
+    return cociente if numerador >= 0 else -cociente
+
+@lru_cache(maxsize=None)
+def _fraccion_porcentaje(porcentaje: Decimal) -> Tuple[int, int]:
+    numerador, denominador = Decimal(porcentaje).as_integer_ratio()
+    return numerador, denominador * 100
+
+def aplicar_porcentaje(micros: int, porcentaje: Decimal) -> int:
+    # micros * porcentaje / 100 en enteros exactos, redondeado a la micro-unidad
+    numerador, denominador = _fraccion_porcentaje(porcentaje)
+    return dividir_redondeando(micros * numerador, denominador)
+
+def redondear_a_centavos(micros: int) -> int:
+    return dividir_redondeando(micros, MICROS_POR_CENTAVO) * MICROS_POR_CENTAVO
+
+@dataclass(frozen=True, slots=True)
+class Money:
+    # Importe en micro-unidades enteras. Decimal solo al entrar (de_decimal) o salir (a_decimal)
+    # del dominio: persistencia y serialización.
+    micros: int
+    moneda: str = "USD"
+
+    @classmethod
+    def de_decimal(cls, valor: Union[Decimal, int, str], moneda: str = "USD") -> 'Money':
+        return cls(int((Decimal(valor) * ESCALA).to_integral_value(ROUND_HALF_UP)), moneda)
+
+    @classmethod
+    def cero(cls, moneda: str = "USD") -> 'Money':
+        return cls(0, moneda)
+
+    def a_decimal(self) -> Decimal:
+        return Decimal(self.micros).scaleb(-6)
+
+    def redondear(self) -> 'Money':
+        # A centavos (2 decimales), regla de redondeo de valores totales e impuestos del SRI
+        return Money(redondear_a_centavos(self.micros), self.moneda)
+
+    def por_porcentaje(self, porcentaje: Decimal) -> 'Money':
+        return Money(aplicar_porcentaje(self.micros, porcentaje), self.moneda)
+
+    def es_positivo(self) -> bool:
+        return self.micros > 0
+
+    def __add__(self, otro: 'Money') -> 'Money':
+        self._verificar_moneda(otro)
+        return Money(self.micros + otro.micros, self.moneda)
+
+    def __sub__(self, otro: 'Money') -> 'Money':
+        self._verificar_moneda(otro)
+        return Money(self.micros - otro.micros, self.moneda)
+
+    def __neg__(self) -> 'Money':
+        return Money(-self.micros, self.moneda)
+
+    def __mul__(self, cantidad: int) -> 'Money':
+        if not isinstance(cantidad, int):
+            return NotImplemented  # Tasas y porcentajes van por por_porcentaje, con redondeo explícito
+        return Money(self.micros * cantidad, self.moneda)
+
+    __rmul__ = __mul__
+
+    def __lt__(self, otro: 'Money') -> bool:
+        self._verificar_moneda(otro)
+        return self.micros < otro.micros
+
+    def __le__(self, otro: 'Money') -> bool:
+        self._verificar_moneda(otro)
+        return self.micros <= otro.micros
+
+    def __gt__(self, otro: 'Money') -> bool:
+        self._verificar_moneda(otro)
+        return self.micros > otro.micros
+
+    def __ge__(self, otro: 'Money') -> bool:
+        self._verificar_moneda(otro)
+        return self.micros >= otro.micros
+
+    def __str__(self) -> str:
+        return f"{self.a_decimal().quantize(Decimal('0.01'), ROUND_HALF_UP)} {self.moneda}"
+
+    def _verificar_moneda(self, otro: 'Money'):
+        if not isinstance(otro, Money):
+            raise TypeError("Solo se puede operar Money con Money.")
+        if otro.moneda != self.moneda:
+            raise ValueError(f"Monedas distintas: {self.moneda} y {otro.moneda}.")
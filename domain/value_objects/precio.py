@@ -0,0 +1,27 @@
+# domain/value_objects/precio.py
+from dataclasses import dataclass
+from decimal import Decimal
+from domain.value_objects.money import Money
+
+@dataclass(frozen=True)
+class Precio:
+    monto: Money
+
+    def __post_init__(self):
+        if self.monto.micros < 0:
+            raise ValueError("El precio no puede ser negativo.")
+
+    @classmethod
+    def de_decimal(cls, valor: Decimal, moneda: str = "USD") -> 'Precio':
+        return cls(Money.de_decimal(valor, moneda))
+
+    @property
+    def valor(self) -> Decimal:
+        return self.monto.a_decimal()  # Solo para persistencia/serialización
+
+    @property
+    def moneda(self) -> str:
+        return self.monto.moneda
+
+    def aplicar_descuento(self, porcentaje: Decimal) -> 'Precio':
+        return Precio(self.monto - self.monto.por_porcentaje(porcentaje))
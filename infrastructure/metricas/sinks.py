@@ -0,0 +1,126 @@
+# infrastructure/metricas/sinks.py
+import logging
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterator, Optional, Tuple
+from domain.services.instrumentacion import Etiquetas, SinkMetricas
+
+# Límites de los histogramas: duraciones de 1 µs a 5 s (una especificación tarda µs, una emisión ms);
+# el resto de observaciones son tamaños pequeños (lotes por línea)
+LIMITES_SEGUNDOS = tuple(m * 10.0 ** e for e in range(-6, 1) for m in (1, 2.5, 5))
+LIMITES_TAMANO = (1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+class Histograma:
+    __slots__ = ('limites', 'conteos', 'cantidad', 'suma', 'minimo', 'maximo')
+
+    def __init__(self, limites: Tuple[float, ...]):
+        self.limites = limites
+        self.conteos = [0] * (len(limites) + 1)  # No acumulados; el último es +Inf
+        self.cantidad = 0
+        self.suma = 0.0
+        self.minimo = float('inf')
+        self.maximo = float('-inf')
+
+    def agregar(self, valor: float):
+        self.conteos[bisect_left(self.limites, valor)] += 1
+        self.cantidad += 1
+        self.suma += valor
+        self.minimo = min(self.minimo, valor)
+        self.maximo = max(self.maximo, valor)
+
+    @property
+    def promedio(self) -> float:
+        return self.suma / self.cantidad if self.cantidad else 0.0
+
+class RegistroMetricas(SinkMetricas):
+    # Acumula en memoria contadores e histogramas por (nombre, etiquetas); consultable desde pruebas y benchmarks
+    def __init__(self):
+        self._cerrojo = threading.Lock()
+        self._contadores: Dict[Tuple[str, Etiquetas], int] = defaultdict(int)
+        self._histogramas: Dict[Tuple[str, Etiquetas], Histograma] = {}
+
+    def contar(self, nombre: str, valor: int = 1, etiquetas: Etiquetas = ()):
+        with self._cerrojo:
+            self._contadores[nombre, etiquetas] += valor
+
+    def observar(self, nombre: str, valor: float, etiquetas: Etiquetas = ()):
+        with self._cerrojo:
+            histograma = self._histogramas.get((nombre, etiquetas))
+            if histograma is None:
+                limites = LIMITES_SEGUNDOS if nombre.endswith('_segundos') else LIMITES_TAMANO
+                histograma = self._histogramas[nombre, etiquetas] = Histograma(limites)
+            histograma.agregar(valor)
+
+    def contador(self, nombre: str, **etiquetas: str) -> int:
+        return self._contadores.get((nombre, tuple(etiquetas.items())), 0)
+
+    def histograma(self, nombre: str, **etiquetas: str) -> Optional[Histograma]:
+        return self._histogramas.get((nombre, tuple(etiquetas.items())))
+
+    def contadores(self) -> Iterator[Tuple[str, Etiquetas, int]]:
+        with self._cerrojo:
+            copia = sorted(self._contadores.items())
+        return ((nombre, etiquetas, valor) for (nombre, etiquetas), valor in copia)
+
+    def histogramas(self) -> Iterator[Tuple[str, Etiquetas, Histograma]]:
+        with self._cerrojo:
+            copia = sorted(self._histogramas.items(), key=lambda item: item[0])
+        return ((nombre, etiquetas, h) for (nombre, etiquetas), h in copia)
+
+    def limpiar(self):
+        with self._cerrojo:
+            self._contadores.clear()
+            self._histogramas.clear()
+
+class SinkLogging(SinkMetricas):
+    # Una línea de log por evento: para depurar una emisión puntual, no para producción con volumen
+    def __init__(self, logger: Optional[logging.Logger] = None, nivel: int = logging.DEBUG):
+        self.logger = logger or logging.getLogger('prometeo.metricas')
+        self.nivel = nivel
+
+    def contar(self, nombre: str, valor: int = 1, etiquetas: Etiquetas = ()):
+        if self.logger.isEnabledFor(self.nivel):
+            self.logger.log(self.nivel, "%s%s +%d", nombre, _formatear_etiquetas(etiquetas), valor)
+
+    def observar(self, nombre: str, valor: float, etiquetas: Etiquetas = ()):
+        if self.logger.isEnabledFor(self.nivel):
+            self.logger.log(self.nivel, "%s%s %.9g", nombre, _formatear_etiquetas(etiquetas), valor)
+
+class ExportadorPrometheus(RegistroMetricas):
+    # Registro en memoria que se expone en el formato de texto de Prometheus (versión 0.0.4):
+    # contadores como counter e histogramas como histogram con buckets acumulados, _sum y _count
+    def __init__(self, prefijo: str = 'prometeo_'):
+        super().__init__()
+        self.prefijo = prefijo
+
+    def texto(self) -> str:
+        lineas, tipos = [], set()
+        for nombre, etiquetas, valor in self.contadores():
+            nombre = self.prefijo + nombre
+            if nombre not in tipos:
+                tipos.add(nombre)
+                lineas.append(f"# TYPE {nombre} counter")
+            lineas.append(f"{nombre}{_formatear_etiquetas(etiquetas)} {valor}")
+        for nombre, etiquetas, histograma in self.histogramas():
+            nombre = self.prefijo + nombre
+            if nombre not in tipos:
+                tipos.add(nombre)
+                lineas.append(f"# TYPE {nombre} histogram")
+            acumulado = 0
+            for limite, conteo in zip(histograma.limites + (float('inf'),), histograma.conteos):
+                acumulado += conteo
+                le = '+Inf' if limite == float('inf') else f"{limite:g}"
+                lineas.append(f"{nombre}_bucket{_formatear_etiquetas(etiquetas + (('le', le),))} {acumulado}")
+            lineas.append(f"{nombre}_sum{_formatear_etiquetas(etiquetas)} {histograma.suma:.9g}")
+            lineas.append(f"{nombre}_count{_formatear_etiquetas(etiquetas)} {histograma.cantidad}")
+        return "\n".join(lineas) + "\n"
+
+def _formatear_etiquetas(etiquetas: Etiquetas) -> str:
+    if not etiquetas:
+        return ''
+    pares = ','.join(f'{clave}="{_escapar(valor)}"' for clave, valor in etiquetas)
+    return '{' + pares + '}'
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,74 @@
+# infrastructure/persistence/async_sql_repository.py
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+from sqlalchemy.ext.asyncio import async_scoped_session
+from sqlalchemy.orm import Session
+from domain.aggregates.factura_aggregate import FacturaAggregate
+from domain.aggregates.nota_credito_aggregate import NotaCreditoAggregate
+from domain.entities.lote import Lote
+from domain.entities.movimiento_inventario import MovimientoInventario
+from domain.repositories.async_factura_repository import AsyncFacturaRepository
+from domain.repositories.async_lote_repository import AsyncLoteRepository
+from domain.repositories.async_nota_credito_repository import AsyncNotaCreditoRepository
+from domain.value_objects.money import Money
+from infrastructure.persistence.sql_repository import (
+    FacturaRepositorySQL, LoteRepositorySQL, NotaCreditoRepositorySQL, _RepositorioSQL
+)
+
+T = TypeVar('T')
+
+class _RepositorioAsyncSQL:
+    # Cada llamada ejecuta el repositorio síncrono equivalente con AsyncSession.run_sync sobre la sesión
+    # de la tarea actual: mismas consultas, mappers y control de versiones, sin bloquear el event loop
+    # (la E/S del driver asíncrono se espera desde dentro, y las cargas perezosas también funcionan).
+    _sincrono: type = _RepositorioSQL
+
+    def __init__(self, sesiones: async_scoped_session):
+        self._sesiones = sesiones
+
+    async def _ejecutar(self, operacion: Callable[[_RepositorioSQL], T]) -> T:
+        return await self._sesiones().run_sync(lambda session: operacion(self._sincrono(lambda: session)))
+
+class AsyncFacturaRepositorySQL(_RepositorioAsyncSQL, AsyncFacturaRepository):
+    _sincrono = FacturaRepositorySQL
+
+    async def obtener_por_id(self, id: int) -> Optional[FacturaAggregate]:
+        return await self._ejecutar(lambda repo: repo.obtener_por_id(id))
+
+    async def obtener_muchos(self, ids: Iterable[int]) -> List[FacturaAggregate]:
+        ids = list(ids)
+        return await self._ejecutar(lambda repo: repo.obtener_muchos(ids))
+
+    async def bloquear(self, id_factura: int):
+        await self._ejecutar(lambda repo: repo.bloquear(id_factura))
+
+    async def guardar(self, aggregate: FacturaAggregate):
+        await self._ejecutar(lambda repo: repo.guardar(aggregate))
+
+    async def guardar_muchos(self, aggregates: Sequence[FacturaAggregate]):
+        await self._ejecutar(lambda repo: repo.guardar_muchos(aggregates))
+
+    async def obtener_costos_vendidos(self, id_factura: int) -> Dict[int, Money]:
+        return await self._ejecutar(lambda repo: repo.obtener_costos_vendidos(id_factura))
+
+class AsyncLoteRepositorySQL(_RepositorioAsyncSQL, AsyncLoteRepository):
+    _sincrono = LoteRepositorySQL
+
+    async def obtener_lotes_antiguos_muchos(self, pares: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], List[Lote]]:
+        pares = set(pares)
+        return await self._ejecutar(lambda repo: repo.obtener_lotes_antiguos_muchos(pares))
+
+    async def actualizar_muchos(self, lotes: Sequence[Lote], movimientos: Sequence[MovimientoInventario] = (),
+                                nuevos: Sequence[Lote] = ()):
+        await self._ejecutar(lambda repo: repo.actualizar_muchos(lotes, movimientos, nuevos))
+
+class AsyncNotaCreditoRepositorySQL(_RepositorioAsyncSQL, AsyncNotaCreditoRepository):
+    _sincrono = NotaCreditoRepositorySQL
+
+    async def obtener_por_id(self, id: int) -> Optional[NotaCreditoAggregate]:
+        return await self._ejecutar(lambda repo: repo.obtener_por_id(id))
+
+    async def guardar(self, aggregate: NotaCreditoAggregate):
+        await self._ejecutar(lambda repo: repo.guardar(aggregate))
+
+    async def obtener_cantidades_acreditadas(self, id_factura: int) -> Dict[int, int]:
+        return await self._ejecutar(lambda repo: repo.obtener_cantidades_acreditadas(id_factura))
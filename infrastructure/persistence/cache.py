@@ -0,0 +1,137 @@
+# infrastructure/persistence/cache.py
+import threading
+import time
+from collections import OrderedDict
+from copy import copy
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set
+from domain.aggregates.producto_aggregate import ProductoAggregate
+from domain.entities.inventario import Inventario
+from domain.entities.producto import Producto
+from domain.repositories.producto_repository import ProductoRepository
+
+_AUSENTE = object()
+
+class CacheLRU:
+    # LRU acotada con expiración por TTL. Segura entre hilos: la comparten todas las peticiones del proceso
+    def __init__(self, capacidad: int = 10_000, ttl_segundos: float = 300.0,
+                 reloj: Callable[[], float] = time.monotonic):
+        if capacidad <= 0:
+            raise ValueError("La capacidad de la caché debe ser positiva.")
+        self.capacidad = capacidad
+        self.ttl_segundos = ttl_segundos
+        self._reloj = reloj
+        self._entradas: OrderedDict = OrderedDict()  # clave -> (expira_en, valor), de menos a más reciente
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0  # Por capacidad; las entradas vencidas cuentan como fallos, no como desalojos
+
+    def obtener(self, clave: Hashable, defecto=None):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                if entrada[0] > self._reloj():
+                    self._entradas.move_to_end(clave)
+                    self.aciertos += 1
+                    return entrada[1]
+                del self._entradas[clave]
+            self.fallos += 1
+            return defecto
+
+    def guardar(self, clave: Hashable, valor):
+        with self._lock:
+            self._entradas[clave] = (self._reloj() + self.ttl_segundos, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+                self.desalojos += 1
+
+    def invalidar(self, clave: Hashable):
+        with self._lock:
+            self._entradas.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {'aciertos': self.aciertos, 'fallos': self.fallos,
+                    'desalojos': self.desalojos, 'tamano': len(self._entradas)}
+
+class ProductoRepositoryCache(ProductoRepository):
+    # Decorador de lectura a través: solo el catálogo (nombre, precio, ...) se cachea; los inventarios
+    # se leen siempre del repositorio interno para que el stock nunca quede desactualizado.
+    # Se entregan copias: modificar un Producto devuelto (e.g., actualizar_precio) no altera la caché.
+    # guardar invalida la entrada recién después del commit (confirmar, registrado con
+    # UnidadDeTrabajoSQL.al_confirmar): hasta entonces los demás hilos leen la versión confirmada y el hilo
+    # que guardó lee la suya del repositorio interno. revertir (al_revertir) descarta lo pendiente sin tocar la caché.
+    def __init__(self, interno: ProductoRepository, cache: Optional[CacheLRU] = None):
+        self.interno = interno
+        self.cache = cache or CacheLRU()
+        self._local = threading.local()
+
+    @property
+    def _pendientes(self) -> Set[int]:
+        # Productos guardados en la transacción de este hilo, aún sin confirmar
+        pendientes = getattr(self._local, 'pendientes', None)
+        if pendientes is None:
+            pendientes = self._local.pendientes = set()
+        return pendientes
+
+    def obtener_por_id(self, id: int) -> Optional[ProductoAggregate]:
+        agregados = self.obtener_muchos([id])
+        return agregados[0] if agregados else None
+
+    def obtener_muchos(self, ids: Iterable[int]) -> List[ProductoAggregate]:
+        ids = list(ids)
+        productos = self.obtener_productos(ids)
+        inventarios = self.interno.obtener_inventarios(productos.keys())
+        return [ProductoAggregate(productos[i], inventarios.get(i, [])) for i in ids if i in productos]
+
+    def obtener_productos(self, ids: Iterable[int]) -> Dict[int, Producto]:
+        productos = {}
+        faltantes = []
+        pendientes = self._pendientes
+        for id in ids:
+            if id in pendientes:
+                faltantes.append(id)
+                continue
+            producto = self.cache.obtener(id, _AUSENTE)
+            if producto is _AUSENTE:
+                faltantes.append(id)
+            elif producto is not None:
+                productos[id] = copy(producto)
+        if faltantes:
+            cargados = self.interno.obtener_productos(faltantes)
+            for id in faltantes:
+                producto = cargados.get(id)
+                if id not in pendientes:
+                    self.cache.guardar(id, producto)  # También los inexistentes, para no reconsultarlos
+                if producto is not None:
+                    productos[id] = copy(producto)
+        return productos
+
+    def obtener_inventarios(self, ids: Iterable[int]) -> Dict[int, List[Inventario]]:
+        return self.interno.obtener_inventarios(ids)
+
+    def guardar(self, aggregate: ProductoAggregate):
+        self.interno.guardar(aggregate)
+        self._pendientes.add(aggregate.root.id_producto)
+
+    def confirmar(self):
+        for id_producto in self._pendientes:
+            self.cache.invalidar(id_producto)
+        self._pendientes.clear()
+
+    def revertir(self):
+        self._pendientes.clear()
+
+    def invalidar(self, id_producto: int):
+        self.cache.invalidar(id_producto)
+
+    def limpiar(self):
+        self.cache.limpiar()
+
+    def estadisticas(self) -> Dict[str, int]:
+        return self.cache.estadisticas()
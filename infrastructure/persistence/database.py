@@ -0,0 +1,76 @@
+# infrastructure/persistence/database.py
+import os
+from dataclasses import dataclass
+import asyncio
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_scoped_session, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+@dataclass(frozen=True)
+class ConfiguracionBD:
+    url: str = 'sqlite:///prometeo.db'
+    pool_size: int = 10
+    max_overflow: int = 20
+    pool_timeout: int = 30      # Segundos esperando una conexión libre
+    pool_recycle: int = 1800    # Segundos antes de reciclar una conexión (evita cortes del servidor)
+    echo: bool = False
+
+    @classmethod
+    def desde_entorno(cls, prefijo: str = 'PROMETEO_DB_') -> 'ConfiguracionBD':
+        entorno = os.environ
+        return cls(
+            url=entorno.get(f'{prefijo}URL', cls.url),
+            pool_size=int(entorno.get(f'{prefijo}POOL_SIZE', cls.pool_size)),
+            max_overflow=int(entorno.get(f'{prefijo}MAX_OVERFLOW', cls.max_overflow)),
+            pool_timeout=int(entorno.get(f'{prefijo}POOL_TIMEOUT', cls.pool_timeout)),
+            pool_recycle=int(entorno.get(f'{prefijo}POOL_RECYCLE', cls.pool_recycle)),
+            echo=entorno.get(f'{prefijo}ECHO', '').lower() in ('1', 'true', 'si'),
+        )
+
+def crear_engine(config: ConfiguracionBD) -> Engine:
+    if config.url.startswith('sqlite'):
+        opciones = {'connect_args': {'check_same_thread': False}}
+        if config.url in ('sqlite://', 'sqlite:///:memory:'):
+            opciones['poolclass'] = StaticPool  # La BD en memoria vive en una única conexión compartida
+        return create_engine(config.url, echo=config.echo, **opciones)
+    return create_engine(
+        config.url,
+        echo=config.echo,
+        pool_size=config.pool_size,
+        max_overflow=config.max_overflow,
+        pool_timeout=config.pool_timeout,
+        pool_recycle=config.pool_recycle,
+        pool_pre_ping=True,
+    )
+
+def crear_sesiones(engine: Engine) -> scoped_session:
+    # Registro de sesiones por hilo: cada petición/unidad de trabajo obtiene la suya
+    return scoped_session(sessionmaker(bind=engine, expire_on_commit=False))
+
+# Driver asíncrono por defecto para cada dialecto, si la URL no indica uno
+_DRIVERS_ASYNC = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg', 'mysql': 'mysql+aiomysql'}
+
+def crear_engine_async(config: ConfiguracionBD) -> AsyncEngine:
+    url = make_url(config.url)
+    url = url.set(drivername=_DRIVERS_ASYNC.get(url.drivername, url.drivername))
+    if url.get_backend_name() == 'sqlite':
+        opciones = {}
+        if url.database in (None, '', ':memory:'):
+            opciones['poolclass'] = StaticPool
+        return create_async_engine(url, echo=config.echo, **opciones)
+    return create_async_engine(
+        url,
+        echo=config.echo,
+        pool_size=config.pool_size,
+        max_overflow=config.max_overflow,
+        pool_timeout=config.pool_timeout,
+        pool_recycle=config.pool_recycle,
+        pool_pre_ping=True,
+    )
+
+def crear_sesiones_async(engine: AsyncEngine) -> async_scoped_session:
+    # Registro de sesiones por tarea de asyncio: cada petición concurrente del event loop obtiene la suya
+    return async_scoped_session(async_sessionmaker(bind=engine, expire_on_commit=False),
+                                scopefunc=asyncio.current_task)
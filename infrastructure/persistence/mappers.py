@@ -0,0 +1,243 @@
+# infrastructure/persistence/mappers.py
+from typing import Optional
+from domain.aggregates.factura_aggregate import FacturaAggregate
+from domain.aggregates.nota_credito_aggregate import NotaCreditoAggregate
+from domain.aggregates.producto_aggregate import ProductoAggregate
+from domain.entities.factura import Factura
+from domain.entities.inventario import Inventario
+from domain.entities.linea_factura import LineaFactura
+from domain.entities.linea_nota_credito import LineaNotaCredito
+from domain.entities.nota_credito import NotaCredito
+from domain.entities.producto import Producto
+from domain.entities.totales_factura import TotalesFactura
+from domain.entities.totales_nota_credito import TotalesNotaCredito
+from domain.value_objects.direccion import Direccion
+from domain.value_objects.forma_pago import FormaPago
+from domain.value_objects.money import Money
+from domain.value_objects.motivo_modificacion import MotivoModificacion
+from domain.value_objects.precio import Precio
+from domain.value_objects.ruc import RUC
+from infrastructure.persistence.modelos import (
+    FacturaDB, InventarioDB, LineaFacturaDB, LineaNotaCreditoDB, NotaCreditoDB, ProductoDB,
+    TotalesFacturaDB, TotalesNotaCreditoDB
+)
+
+# Los mappers solo traducen entre filas ya cargadas y el dominio: nunca consultan la base.
+# Las relaciones de los modelos (selectin/joined) garantizan que hijos y totales ya están en memoria.
+# Son también el borde de los importes: Numeric/Decimal en la base, Money en el dominio.
+
+def _money(valor, moneda: str = "USD") -> Money:
+    return Money.de_decimal(valor, moneda) if valor is not None else Money.cero(moneda)
+
+class FacturaMapper:
+    @staticmethod
+    def a_dominio(fila: FacturaDB) -> FacturaAggregate:
+        factura = Factura(
+            id_factura=fila.id_factura,
+            id_sucursal=fila.id_sucursal,
+            id_bodega=fila.id_bodega,
+            ruc_emisor=RUC(fila.ruc_emisor),
+            identificacion_adquiriente=fila.identificacion_adquiriente,
+            razon_social_emisor=fila.razon_social_emisor,
+            direccion_matriz=Direccion(fila.direccion_calle, fila.direccion_ciudad,
+                                       fila.direccion_pais, fila.direccion_codigo_postal),
+            fecha_emision=fila.fecha_emision,
+            fecha_caducidad=fila.fecha_caducidad,
+            fecha_autorizacion=fila.fecha_autorizacion,
+            forma_pago=FormaPago(fila.forma_pago_tipo, _money(fila.forma_pago_valor)),
+            lineas=[LineaFactura(
+                id_linea_factura=l.id_linea_factura,
+                id_producto=l.id_producto,
+                descripcion=l.descripcion,
+                cantidad=l.cantidad,
+                precio_unitario=Precio.de_decimal(l.precio_unitario, l.moneda),
+                id_descuento=l.id_descuento,
+                porcentaje_iva=l.porcentaje_iva,
+                codigo_impuesto=l.codigo_impuesto,
+                codigo_ice=l.codigo_ice,
+                tipo_impuesto=l.tipo_impuesto,
+                tarifa_ice=l.tarifa_ice,
+            ) for l in fila.lineas],
+        )
+        # Los totales (ICE incluido) se recalculan desde las líneas
+        return FacturaAggregate(factura, TotalesFactura(fila.id_factura))
+
+    @staticmethod
+    def a_fila(aggregate: FacturaAggregate, fila: Optional[FacturaDB] = None) -> FacturaDB:
+        # Sin fila: crea una nueva; con fila persistente: la actualiza y reemplaza sus hijos (delete-orphan)
+        factura = aggregate.root
+        fila = fila or FacturaDB()
+        fila.id_factura = factura.id_factura
+        fila.id_sucursal = factura.id_sucursal
+        fila.id_bodega = factura.id_bodega
+        fila.ruc_emisor = factura.ruc_emisor.numero
+        fila.identificacion_adquiriente = factura.identificacion_adquiriente
+        fila.razon_social_emisor = factura.razon_social_emisor
+        fila.direccion_calle = factura.direccion_matriz.calle
+        fila.direccion_ciudad = factura.direccion_matriz.ciudad
+        fila.direccion_pais = factura.direccion_matriz.pais
+        fila.direccion_codigo_postal = factura.direccion_matriz.codigo_postal
+        fila.fecha_emision = factura.fecha_emision
+        fila.fecha_caducidad = factura.fecha_caducidad
+        fila.fecha_autorizacion = factura.fecha_autorizacion
+        fila.forma_pago_tipo = factura.forma_pago.tipo
+        fila.forma_pago_valor = factura.forma_pago.valor.a_decimal()
+        fila.lineas = [LineaFacturaDB(
+            id_producto=l.id_producto,
+            descripcion=l.descripcion,
+            cantidad=l.cantidad,
+            precio_unitario=l.precio_unitario.valor,
+            moneda=l.precio_unitario.moneda,
+            id_descuento=l.id_descuento,
+            valor_total=l.valor_total.a_decimal(),
+            porcentaje_iva=l.porcentaje_iva,
+            codigo_impuesto=l.codigo_impuesto,
+            codigo_ice=l.codigo_ice,
+            tipo_impuesto=l.tipo_impuesto,
+            tarifa_ice=l.tarifa_ice,
+        ) for l in factura.lineas]
+        t = factura.totales
+        totales = fila.totales or TotalesFacturaDB()  # Se actualiza en sitio: misma clave primaria
+        totales.base_imponible_12 = t.base_imponible_12.a_decimal()
+        totales.base_imponible_0 = t.base_imponible_0.a_decimal()
+        totales.base_imponible_exenta_iva = t.base_imponible_exenta_iva.a_decimal()
+        totales.base_imponible_no_objeto_iva = t.base_imponible_no_objeto_iva.a_decimal()
+        totales.descuento_comercial = t.descuento_comercial.a_decimal()
+        totales.valor_subtotal = t.valor_subtotal.a_decimal()
+        totales.valor_iva = t.valor_iva.a_decimal()
+        totales.valor_ice = t.valor_ice.a_decimal()
+        totales.valor_total = t.valor_total.a_decimal()
+        fila.totales = totales
+        return fila
+
+class NotaCreditoMapper:
+    @staticmethod
+    def a_dominio(fila: NotaCreditoDB) -> NotaCreditoAggregate:
+        nota_credito = NotaCredito(
+            id_nota_credito=fila.id_nota_credito,
+            id_sucursal=fila.id_sucursal,
+            ruc_emisor=RUC(fila.ruc_emisor),
+            fecha_emision=fila.fecha_emision,
+            fecha_caducidad=fila.fecha_caducidad,
+            fecha_autorizacion=fila.fecha_autorizacion,
+            id_factura_modificada=fila.id_factura_modificada,
+            identificacion_adquiriente=fila.identificacion_adquiriente,
+            razon_social_emisor=fila.razon_social_emisor,
+            direccion_matriz=Direccion(fila.direccion_calle, fila.direccion_ciudad,
+                                       fila.direccion_pais, fila.direccion_codigo_postal),
+            motivo_modificacion=MotivoModificacion(fila.motivo_modificacion),
+            lineas=[LineaNotaCredito(
+                id_linea_nota_credito=l.id_linea_nota_credito,
+                id_producto=l.id_producto,
+                descripcion=l.descripcion,
+                cantidad=l.cantidad,
+                valor_item_cobrado=_money(l.valor_item_cobrado),
+                porcentaje_iva=l.porcentaje_iva,
+                codigo_impuesto=l.codigo_impuesto,
+                codigo_ice=l.codigo_ice,
+                tipo_impuesto=l.tipo_impuesto,
+                tarifa_ice=l.tarifa_ice,
+            ) for l in fila.lineas],
+        )
+        return NotaCreditoAggregate(nota_credito, TotalesNotaCredito(fila.id_nota_credito))
+
+    @staticmethod
+    def a_fila(aggregate: NotaCreditoAggregate, fila: Optional[NotaCreditoDB] = None) -> NotaCreditoDB:
+        nota = aggregate.root
+        fila = fila or NotaCreditoDB()
+        fila.id_nota_credito = nota.id_nota_credito
+        fila.id_sucursal = nota.id_sucursal
+        fila.id_factura_modificada = nota.id_factura_modificada
+        fila.ruc_emisor = nota.ruc_emisor.numero
+        fila.identificacion_adquiriente = nota.identificacion_adquiriente
+        fila.razon_social_emisor = nota.razon_social_emisor
+        fila.direccion_calle = nota.direccion_matriz.calle
+        fila.direccion_ciudad = nota.direccion_matriz.ciudad
+        fila.direccion_pais = nota.direccion_matriz.pais
+        fila.direccion_codigo_postal = nota.direccion_matriz.codigo_postal
+        fila.motivo_modificacion = nota.motivo_modificacion.descripcion
+        fila.fecha_emision = nota.fecha_emision
+        fila.fecha_caducidad = nota.fecha_caducidad
+        fila.fecha_autorizacion = nota.fecha_autorizacion
+        fila.lineas = [LineaNotaCreditoDB(
+            id_producto=l.id_producto,
+            descripcion=l.descripcion,
+            cantidad=l.cantidad,
+            valor_item_cobrado=l.valor_item_cobrado.a_decimal(),
+            valor_total=l.valor_total.a_decimal(),
+            porcentaje_iva=l.porcentaje_iva,
+            codigo_impuesto=l.codigo_impuesto,
+            codigo_ice=l.codigo_ice,
+            tipo_impuesto=l.tipo_impuesto,
+            tarifa_ice=l.tarifa_ice,
+        ) for l in nota.lineas]
+        t = nota.totales
+        totales = fila.totales or TotalesNotaCreditoDB()
+        totales.base_imponible_12 = t.base_imponible_12.a_decimal()
+        totales.base_imponible_0 = t.base_imponible_0.a_decimal()
+        totales.base_imponible_exenta_iva = t.base_imponible_exenta_iva.a_decimal()
+        totales.base_imponible_no_objeto_iva = t.base_imponible_no_objeto_iva.a_decimal()
+        totales.descuento_comercial = t.descuento_comercial.a_decimal()
+        totales.valor_subtotal = t.valor_subtotal.a_decimal()
+        totales.valor_iva = t.valor_iva.a_decimal()
+        totales.valor_ice = t.valor_ice.a_decimal()
+        totales.valor_total = t.valor_total.a_decimal()
+        fila.totales = totales
+        return fila
+
+class ProductoMapper:
+    @staticmethod
+    def a_dominio(fila: ProductoDB) -> ProductoAggregate:
+        return ProductoAggregate(ProductoMapper.producto_a_dominio(fila),
+                                 [ProductoMapper.inventario_a_dominio(i) for i in fila.inventarios])
+
+    @staticmethod
+    def producto_a_dominio(fila: ProductoDB) -> Producto:
+        return Producto(
+            id_producto=fila.id_producto,
+            nombre=fila.nombre_producto,
+            descripcion=fila.descripcion,
+            precio_base=Precio.de_decimal(fila.precio_base, fila.moneda),
+            codigo_barras=fila.codigo_barras,
+            marca=fila.marca,
+            id_linea=fila.id_linea,
+            id_categoria=fila.id_categoria,
+        )
+
+    @staticmethod
+    def inventario_a_dominio(fila: InventarioDB) -> Inventario:
+        return Inventario(id_producto=fila.id_producto, id_bodega=fila.id_bodega, cantidad_stock=fila.cantidad_stock,
+                          id_sucursal=fila.id_sucursal, id_inventario=fila.id_inventario)
+
+    @staticmethod
+    def a_fila(aggregate: ProductoAggregate, fila: Optional[ProductoDB] = None) -> ProductoDB:
+        producto = aggregate.root
+        fila = fila or ProductoDB()
+        fila.id_producto = producto.id_producto
+        fila.nombre_producto = producto.nombre
+        fila.descripcion = producto.descripcion
+        fila.precio_base = producto.precio_base.valor
+        fila.moneda = producto.precio_base.moneda
+        fila.codigo_barras = producto.codigo_barras
+        fila.marca = producto.marca
+        fila.id_linea = producto.id_linea
+        fila.id_categoria = producto.id_categoria
+        # Los inventarios conservan su id: se actualizan en sitio y solo los nuevos se insertan
+        actuales = {i.id_inventario: i for i in fila.inventarios}
+        filas_inventario = []
+        for inventario in aggregate.inventarios:
+            fila_inventario = actuales.get(inventario.id_inventario) or InventarioDB()
+            fila_inventario.id_bodega = inventario.id_bodega
+            fila_inventario.id_sucursal = inventario.id_sucursal
+            fila_inventario.cantidad_stock = inventario.cantidad_stock
+            filas_inventario.append(fila_inventario)
+        fila.inventarios = filas_inventario
+        return fila
+
+    @staticmethod
+    def asignar_ids(aggregate: ProductoAggregate, fila: ProductoDB):
+        # Tras el flush: copia las claves generadas a las entidades nuevas
+        aggregate.root.id_producto = fila.id_producto
+        for inventario, fila_inventario in zip(aggregate.inventarios, fila.inventarios):
+            inventario.id_producto = fila.id_producto
+            inventario.id_inventario = fila_inventario.id_inventario
@@ -0,0 +1,328 @@
+# infrastructure/persistence/modelos.py
+from sqlalchemy import Boolean, Column, Integer, String, Numeric, Date, DateTime, ForeignKey, Index, UniqueConstraint, Uuid
+from uuid import UUID
+from sqlalchemy.orm import declarative_base, relationship
+
+Base = declarative_base()
+
+SIN_CENTRO_COSTO = UUID(int=0)  # cost_center_key de los saldos sin centro de costo
+
+class ProductoDB(Base):
+    __tablename__ = 'Productos'
+    id_producto = Column(Integer, primary_key=True)
+    nombre_producto = Column(String(100), nullable=False)
+    descripcion = Column(String(255))
+    precio_base = Column(Numeric(18, 6), nullable=False, default=0)
+    moneda = Column(String(3), nullable=False, default='USD')
+    codigo_barras = Column(String(50))
+    marca = Column(String(100))
+    id_linea = Column(Integer)
+    id_categoria = Column(Integer)
+    inventarios = relationship('InventarioDB', lazy='selectin', cascade='all, delete-orphan',
+                               order_by='InventarioDB.id_bodega')
+
+class InventarioDB(Base):
+    __tablename__ = 'Inventarios'
+    id_inventario = Column(Integer, primary_key=True)
+    id_producto = Column(Integer, ForeignKey('Productos.id_producto'), nullable=False, index=True)
+    id_bodega = Column(Integer, nullable=False)
+    id_sucursal = Column(Integer)
+    cantidad_stock = Column(Integer, nullable=False, default=0)
+
+class LoteDB(Base):
+    __tablename__ = 'Lotes'
+    id_lote = Column(Integer, primary_key=True)
+    id_producto = Column(Integer, nullable=False, index=True)
+    id_bodega = Column(Integer, nullable=False, index=True)
+    fecha_entrada = Column(Date, nullable=False)
+    cantidad_restante = Column(Integer, nullable=False)
+    # Cantidad al crear el lote (por defecto la restante del INSERT): la apertura de la reproducción FIFO.
+    # NULL en lotes anteriores a la columna
+    cantidad_inicial = Column(Integer, default=lambda contexto: contexto.get_current_parameters()['cantidad_restante'])
+    costo_unitario = Column(Numeric(18, 6), nullable=False)
+    version = Column(Integer, nullable=False, default=0)
+
+class MovimientoInventarioDB(Base):
+    __tablename__ = 'MovimientosInventario'
+    __table_args__ = (Index('ix_movimientos_historial', 'id_producto', 'id_bodega', 'fecha', 'id_movimiento'),)
+    id_movimiento = Column(Integer, primary_key=True)
+    id_producto = Column(Integer, nullable=False)
+    id_bodega = Column(Integer, nullable=False)
+    tipo_movimiento = Column(String(10), nullable=False)  # 'ENTRADA' o 'SALIDA'
+    cantidad = Column(Integer, nullable=False)
+    costo_unitario_aplicado = Column(Numeric(18, 6), nullable=False)
+    id_factura = Column(Integer, index=True)  # Costo de lo vendido al emitir notas de crédito
+    id_nota_credito = Column(Integer)
+    fecha = Column(Date)
+    observaciones = Column(String(255))
+
+class FacturaDB(Base):
+    __tablename__ = 'Facturas'
+    id_factura = Column(Integer, primary_key=True)
+    id_sucursal = Column(Integer, nullable=False)
+    id_bodega = Column(Integer)
+    ruc_emisor = Column(String(13), nullable=False)
+    identificacion_adquiriente = Column(String(20), nullable=False)
+    razon_social_emisor = Column(String(300), nullable=False)
+    direccion_calle = Column(String(300))
+    direccion_ciudad = Column(String(100))
+    direccion_pais = Column(String(100))
+    direccion_codigo_postal = Column(String(20))
+    fecha_emision = Column(Date, nullable=False)
+    fecha_caducidad = Column(Date)
+    fecha_autorizacion = Column(Date, nullable=False)
+    forma_pago_tipo = Column(String(50))
+    forma_pago_valor = Column(Numeric(18, 2))
+    # Carga ansiosa: una consulta para las raíces, una (SELECT ... IN) para todas sus líneas y JOIN para totales
+    lineas = relationship('LineaFacturaDB', lazy='selectin', cascade='all, delete-orphan',
+                          order_by='LineaFacturaDB.id_linea_factura')
+    totales = relationship('TotalesFacturaDB', lazy='joined', uselist=False, cascade='all, delete-orphan')
+
+class LineaFacturaDB(Base):
+    __tablename__ = 'LineasFactura'
+    id_linea_factura = Column(Integer, primary_key=True)
+    id_factura = Column(Integer, ForeignKey('Facturas.id_factura'), nullable=False, index=True)
+    id_producto = Column(Integer, nullable=False)
+    descripcion = Column(String(300))
+    cantidad = Column(Integer, nullable=False)
+    precio_unitario = Column(Numeric(18, 6), nullable=False)
+    moneda = Column(String(3), nullable=False, default='USD')
+    id_descuento = Column(Integer)
+    valor_total = Column(Numeric(18, 6), nullable=False)
+    porcentaje_iva = Column(Numeric(5, 2), nullable=False)
+    codigo_impuesto = Column(String(50))  # tax_code.code; NULL = tarifa fijada a mano
+    codigo_ice = Column(String(50))
+    tipo_impuesto = Column(String(10), nullable=False, default='IVA')
+    tarifa_ice = Column(Numeric(5, 2), nullable=False, default=0)
+
+class TotalesFacturaDB(Base):
+    __tablename__ = 'TotalesFactura'
+    id_factura = Column(Integer, ForeignKey('Facturas.id_factura'), primary_key=True)
+    base_imponible_12 = Column(Numeric(18, 2), nullable=False, default=0)
+    base_imponible_0 = Column(Numeric(18, 2), nullable=False, default=0)
+    base_imponible_exenta_iva = Column(Numeric(18, 2), nullable=False, default=0)
+    base_imponible_no_objeto_iva = Column(Numeric(18, 2), nullable=False, default=0)
+    descuento_comercial = Column(Numeric(18, 2), nullable=False, default=0)
+    valor_subtotal = Column(Numeric(18, 2), nullable=False, default=0)
+    valor_iva = Column(Numeric(18, 2), nullable=False, default=0)
+    valor_ice = Column(Numeric(18, 2), nullable=False, default=0)
+    valor_total = Column(Numeric(18, 2), nullable=False, default=0)
+
+class NotaCreditoDB(Base):
+    __tablename__ = 'NotasCredito'
+    id_nota_credito = Column(Integer, primary_key=True)
+    id_sucursal = Column(Integer, nullable=False)
+    id_factura_modificada = Column(Integer, ForeignKey('Facturas.id_factura'), nullable=False, index=True)
+    ruc_emisor = Column(String(13), nullable=False)
+    identificacion_adquiriente = Column(String(20), nullable=False)
+    razon_social_emisor = Column(String(300), nullable=False)
+    direccion_calle = Column(String(300))
+    direccion_ciudad = Column(String(100))
+    direccion_pais = Column(String(100))
+    direccion_codigo_postal = Column(String(20))
+    motivo_modificacion = Column(String(300), nullable=False)
+    fecha_emision = Column(Date, nullable=False)
+    fecha_caducidad = Column(Date)
+    fecha_autorizacion = Column(Date, nullable=False)
+    lineas = relationship('LineaNotaCreditoDB', lazy='selectin', cascade='all, delete-orphan',
+                          order_by='LineaNotaCreditoDB.id_linea_nota_credito')
+    totales = relationship('TotalesNotaCreditoDB', lazy='joined', uselist=False, cascade='all, delete-orphan')
+
+class LineaNotaCreditoDB(Base):
+    __tablename__ = 'LineasNotaCredito'
+    id_linea_nota_credito = Column(Integer, primary_key=True)
+    id_nota_credito = Column(Integer, ForeignKey('NotasCredito.id_nota_credito'), nullable=False, index=True)
+    id_producto = Column(Integer, nullable=False)
+    descripcion = Column(String(300))
+    cantidad = Column(Integer, nullable=False)
+    valor_item_cobrado = Column(Numeric(18, 6), nullable=False)
+    valor_total = Column(Numeric(18, 6), nullable=False)
+    porcentaje_iva = Column(Numeric(5, 2), nullable=False)
+    codigo_impuesto = Column(String(50))  # tax_code.code; NULL = tarifa fijada a mano
+    codigo_ice = Column(String(50))
+    tipo_impuesto = Column(String(10), nullable=False, default='IVA')
+    tarifa_ice = Column(Numeric(5, 2), nullable=False, default=0)
+
+class TotalesNotaCreditoDB(Base):
+    __tablename__ = 'TotalesNotaCredito'
+    id_nota_credito = Column(Integer, ForeignKey('NotasCredito.id_nota_credito'), primary_key=True)
+    base_imponible_12 = Column(Numeric(18, 2), nullable=False, default=0)
+    base_imponible_0 = Column(Numeric(18, 2), nullable=False, default=0)
+    base_imponible_exenta_iva = Column(Numeric(18, 2), nullable=False, default=0)
+    base_imponible_no_objeto_iva = Column(Numeric(18, 2), nullable=False, default=0)
+    descuento_comercial = Column(Numeric(18, 2), nullable=False, default=0)
+    valor_subtotal = Column(Numeric(18, 2), nullable=False, default=0)
+    valor_iva = Column(Numeric(18, 2), nullable=False, default=0)
+    valor_ice = Column(Numeric(18, 2), nullable=False, default=0)
+    valor_total = Column(Numeric(18, 2), nullable=False, default=0)
+
+class TaxCodeDB(Base):
+    # Tabla del esquema contable (accounting_prometheus.sql)
+    __tablename__ = 'tax_code'
+    __table_args__ = (UniqueConstraint('entity_id', 'code'),)
+    tax_code_id = Column(Uuid, primary_key=True)
+    entity_id = Column(Uuid, nullable=False, index=True)
+    code = Column(String(50), nullable=False)
+    name = Column(String(100), nullable=False)
+    rate = Column(Numeric(5, 2), nullable=False)
+    account_id = Column(Uuid)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime)
+    deleted_at = Column(DateTime)
+
+class AccountingEntityDB(Base):
+    __tablename__ = 'accounting_entity'
+    entity_id = Column(Uuid, primary_key=True)
+    name = Column(String, nullable=False)
+    base_currency = Column(String(3), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime)
+    deleted_at = Column(DateTime)
+
+class ExchangeRateDB(Base):
+    __tablename__ = 'exchange_rate'
+    __table_args__ = (UniqueConstraint('from_currency', 'to_currency', 'rate_date'),)
+    rate_id = Column(Uuid, primary_key=True)
+    from_currency = Column(String(3), nullable=False)
+    to_currency = Column(String(3), nullable=False)
+    rate_date = Column(Date, nullable=False)
+    rate = Column(Numeric(15, 6), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime)
+
+class FiscalPeriodDB(Base):
+    __tablename__ = 'fiscal_period'
+    __table_args__ = (UniqueConstraint('entity_id', 'period_code'),)
+    period_id = Column(Uuid, primary_key=True)
+    entity_id = Column(Uuid, nullable=False, index=True)
+    period_code = Column(String(50), nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    is_closed = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime)
+    deleted_at = Column(DateTime)
+
+class ProductDB(Base):
+    # product del esquema contable; code enlaza con Productos.id_producto
+    __tablename__ = 'product'
+    __table_args__ = (UniqueConstraint('entity_id', 'code'),)
+    product_id = Column(Uuid, primary_key=True)
+    entity_id = Column(Uuid, nullable=False, index=True)
+    code = Column(String(50), nullable=False)
+    name = Column(String(100), nullable=False)
+    type = Column(String(50))
+    unit_price = Column(Numeric(18, 2))
+    cost_account_id = Column(Uuid)
+    revenue_account_id = Column(Uuid)
+    inventory_account_id = Column(Uuid)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime)
+    deleted_at = Column(DateTime)
+
+class JournalEntryDB(Base):
+    __tablename__ = 'journal_entry'
+    entry_id = Column(Uuid, primary_key=True)
+    entity_id = Column(Uuid, nullable=False, index=True)
+    period_id = Column(Uuid, ForeignKey('fiscal_period.period_id'), nullable=False, index=True)
+    entry_date = Column(Date, nullable=False)
+    description = Column(String(150))
+    is_posted = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime)
+    deleted_at = Column(DateTime)
+
+class LedgerLineDB(Base):
+    __tablename__ = 'ledger_line'
+    line_id = Column(Uuid, primary_key=True)
+    entry_id = Column(Uuid, ForeignKey('journal_entry.entry_id'), nullable=False, index=True)
+    account_id = Column(Uuid, nullable=False, index=True)
+    debit = Column(Numeric(18, 2), nullable=False, default=0)
+    credit = Column(Numeric(18, 2), nullable=False, default=0)
+    currency_code = Column(String(3), nullable=False)
+    amount_foreign = Column(Numeric(18, 2))
+    cost_center_id = Column(Uuid)
+    project_id = Column(Uuid)
+    partner_id = Column(Uuid)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime)
+
+class JournalTemplateDB(Base):
+    __tablename__ = 'journal_template'
+    __table_args__ = (UniqueConstraint('entity_id', 'code'),)
+    template_id = Column(Uuid, primary_key=True)
+    entity_id = Column(Uuid, nullable=False, index=True)
+    code = Column(String(50), nullable=False)
+    name = Column(String(100), nullable=False)
+    description = Column(String(150))
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime)
+    deleted_at = Column(DateTime)
+    lineas = relationship('JournalTemplateLineDB', lazy='selectin', order_by='JournalTemplateLineDB.created_at')
+
+class JournalTemplateLineDB(Base):
+    __tablename__ = 'journal_template_line'
+    line_id = Column(Uuid, primary_key=True)
+    template_id = Column(Uuid, ForeignKey('journal_template.template_id'), nullable=False, index=True)
+    account_id = Column(Uuid)
+    account_category = Column(String(50))
+    normal_side = Column(String(50), nullable=False)
+    amount_expression = Column(String(200), nullable=False)
+    currency_code = Column(String(3))
+    cost_center_id = Column(Uuid)
+    project_id = Column(Uuid)
+    partner_type = Column(String(50))
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime)
+
+class AccountDB(Base):
+    __tablename__ = 'account'
+    __table_args__ = (UniqueConstraint('entity_id', 'account_code'),)
+    account_id = Column(Uuid, primary_key=True)
+    entity_id = Column(Uuid, nullable=False, index=True)
+    account_code = Column(String(60), nullable=False)
+    account_name = Column(String(100), nullable=False)
+    description = Column(String(150))
+    category = Column(String(50), nullable=False)
+    normal_side = Column(String(50), nullable=False)
+    parent_account_id = Column(Uuid, ForeignKey('account.account_id'))
+    is_postable = Column(Boolean, nullable=False, default=True)
+    is_active = Column(Boolean, nullable=False, default=True)
+    currency_code = Column(String(3), nullable=False)
+    level = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime)
+    deleted_at = Column(DateTime)
+
+class AccountBalanceDB(Base):
+    # Saldos materializados por (cuenta, período, centro de costo). cost_center_key repite cost_center_id con
+    # SIN_CENTRO_COSTO en lugar de NULL: un UNIQUE no compara NULL, así la clave admite una sola fila sin centro
+    # y es el destino del upsert de SaldoCuentaRepositorySQL.acumular
+    __tablename__ = 'account_balance'
+    __table_args__ = (UniqueConstraint('account_id', 'period_id', 'cost_center_key', name='ux_account_balance_clave'),
+                      Index('ix_account_balance_period', 'entity_id', 'period_id'))
+    balance_id = Column(Uuid, primary_key=True)
+    entity_id = Column(Uuid, nullable=False)
+    account_id = Column(Uuid, nullable=False)
+    period_id = Column(Uuid, ForeignKey('fiscal_period.period_id'), nullable=False)
+    cost_center_id = Column(Uuid)
+    cost_center_key = Column(Uuid, nullable=False)
+    debit_total = Column(Numeric(18, 2), nullable=False, default=0)
+    credit_total = Column(Numeric(18, 2), nullable=False, default=0)
+    line_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
+
+class PeriodClosingBalanceDB(Base):
+    # Saldos acumulados por (cuenta, centro de costo) al cierre de un período
+    __tablename__ = 'period_closing_balance'
+    __table_args__ = (UniqueConstraint('period_id', 'account_id', 'cost_center_id'),)
+    closing_balance_id = Column(Uuid, primary_key=True)
+    entity_id = Column(Uuid, nullable=False)
+    period_id = Column(Uuid, ForeignKey('fiscal_period.period_id'), nullable=False)
+    account_id = Column(Uuid, nullable=False)
+    cost_center_id = Column(Uuid)
+    debit_total = Column(Numeric(18, 2), nullable=False, default=0)
+    credit_total = Column(Numeric(18, 2), nullable=False, default=0)
+    line_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
@@ -0,0 +1,721 @@
+# infrastructure/persistence/sql_repository.py
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session, lazyload, scoped_session
+from domain.aggregates.factura_aggregate import FacturaAggregate
+from domain.aggregates.nota_credito_aggregate import NotaCreditoAggregate
+from domain.aggregates.producto_aggregate import ProductoAggregate
+from domain.entities.asiento_contable import AsientoContable
+from domain.entities.codigo_impuesto import CodigoImpuesto
+from domain.entities.cuenta_contable import CuentaContable
+from domain.entities.cuentas_producto import CuentasProducto
+from domain.entities.historial_fifo import HistorialFIFO
+from domain.entities.inventario import Inventario
+from domain.entities.lote import Lote
+from domain.entities.movimiento_inventario import MovimientoInventario
+from domain.entities.periodo_fiscal import PeriodoFiscal
+from domain.entities.plantilla_asiento import LineaPlantilla, PlantillaAsiento
+from domain.entities.producto import Producto
+from domain.entities.saldo_cuenta import ClaveSaldo, SaldoCuenta
+from domain.entities.tipo_cambio import TipoCambio
+from domain.repositories.asiento_contable_repository import AsientoContableRepository
+from domain.repositories.codigo_impuesto_repository import CodigoImpuestoRepository
+from domain.repositories.cuenta_contable_repository import CuentaContableRepository
+from domain.repositories.cuentas_producto_repository import CuentasProductoRepository
+from domain.repositories.factura_repository import FacturaRepository
+from domain.repositories.lote_repository import ConflictoConcurrencia, LoteRepository
+from domain.repositories.movimiento_inventario_repository import MovimientoInventarioRepository
+from domain.repositories.nota_credito_repository import NotaCreditoRepository
+from domain.repositories.periodo_fiscal_repository import PeriodoFiscalRepository
+from domain.repositories.plantilla_asiento_repository import PlantillaAsientoRepository
+from domain.repositories.producto_repository import ProductoRepository
+from domain.repositories.saldo_cuenta_repository import SaldoCuentaRepository
+from domain.repositories.tipo_cambio_repository import TipoCambioRepository
+from domain.value_objects.money import Money, dividir_redondeando, redondear_a_centavos
+from infrastructure.persistence.mappers import FacturaMapper, NotaCreditoMapper, ProductoMapper
+from infrastructure.persistence.modelos import (
+    AccountBalanceDB, AccountDB, AccountingEntityDB, ExchangeRateDB, FacturaDB, FiscalPeriodDB, InventarioDB, JournalEntryDB, JournalTemplateDB,
+    JournalTemplateLineDB, LedgerLineDB, LineaNotaCreditoDB, LoteDB, MovimientoInventarioDB, NotaCreditoDB,
+    PeriodClosingBalanceDB, ProductDB, ProductoDB, SIN_CENTRO_COSTO, TaxCodeDB
+)
+
+class _RepositorioSQL:
+    # Los repositorios no guardan una sesión propia: cada llamada usa la sesión actual del registro
+    # (una por petición/unidad de trabajo), así todos comparten la misma transacción
+    def __init__(self, sesiones: scoped_session):
+        self._sesiones = sesiones
+
+    @property
+    def session(self) -> Session:
+        return self._sesiones()
+
+    def _filas_por_id(self, columna_id, ids: Iterable[int]) -> Dict[int, object]:
+        # Una consulta para las raíces; las relaciones selectin/joined del modelo cargan los hijos
+        # de todas ellas en un número fijo de consultas adicionales, sin importar cuántas sean
+        ids = {i for i in ids if i is not None}
+        if not ids:
+            return {}
+        modelo = columna_id.class_
+        filas = self.session.scalars(select(modelo).where(columna_id.in_(ids))).unique().all()
+        return {getattr(f, columna_id.key): f for f in filas}
+
+    def _iterar_por_bloques(self, columna_id, columna_fecha, fecha_desde: Optional[date], fecha_hasta: Optional[date],
+                            tamano_bloque: int, a_dominio) -> Iterator:
+        # Paginación por clave (id > último visto), no OFFSET: cada bloque cuesta lo mismo. El identity map
+        # de la sesión guarda referencias débiles: las filas de un bloque se liberan al pasar al siguiente.
+        filtros = []
+        if fecha_desde is not None:
+            filtros.append(columna_fecha >= fecha_desde)
+        if fecha_hasta is not None:
+            filtros.append(columna_fecha <= fecha_hasta)
+        ultimo = None
+        while True:
+            consulta = select(columna_id).where(*filtros).order_by(columna_id).limit(tamano_bloque)
+            if ultimo is not None:
+                consulta = consulta.where(columna_id > ultimo)
+            ids = self.session.scalars(consulta).all()
+            if not ids:
+                return
+            filas = self._filas_por_id(columna_id, ids)
+            aggregates = [a_dominio(filas[i]) for i in ids if i in filas]
+            yield from aggregates
+            ultimo = ids[-1]
+
+class ProductoRepositorySQL(_RepositorioSQL, ProductoRepository):
+    def obtener_por_id(self, id: int) -> Optional[ProductoAggregate]:
+        fila = self.session.get(ProductoDB, id)
+        return ProductoMapper.a_dominio(fila) if fila else None
+
+    def obtener_muchos(self, ids: Iterable[int]) -> List[ProductoAggregate]:
+        ids = list(ids)
+        filas = self._filas_por_id(ProductoDB.id_producto, ids)
+        return [ProductoMapper.a_dominio(filas[i]) for i in ids if i in filas]
+
+    def obtener_productos(self, ids: Iterable[int]) -> Dict[int, Producto]:
+        ids = set(ids)
+        if not ids:
+            return {}
+        filas = self.session.scalars(
+            select(ProductoDB).where(ProductoDB.id_producto.in_(ids)).options(lazyload(ProductoDB.inventarios))
+        ).all()
+        return {f.id_producto: ProductoMapper.producto_a_dominio(f) for f in filas}
+
+    def obtener_inventarios(self, ids: Iterable[int]) -> Dict[int, List[Inventario]]:
+        ids = set(ids)
+        resultado = {i: [] for i in ids}
+        if not ids:
+            return resultado
+        filas = self.session.scalars(
+            select(InventarioDB).where(InventarioDB.id_producto.in_(ids))
+            .order_by(InventarioDB.id_producto, InventarioDB.id_bodega)
+        ).all()
+        for f in filas:
+            resultado[f.id_producto].append(ProductoMapper.inventario_a_dominio(f))
+        return resultado
+
+    def guardar(self, aggregate: ProductoAggregate):
+        session = self.session
+        existente = session.get(ProductoDB, aggregate.root.id_producto) if aggregate.root.id_producto is not None else None
+        fila = ProductoMapper.a_fila(aggregate, existente)
+        session.add(fila)
+        session.flush()
+        ProductoMapper.asignar_ids(aggregate, fila)
+
+class LoteRepositorySQL(_RepositorioSQL, LoteRepository):
+    def obtener_lotes_antiguos(self, producto_id: int, bodega_id: int) -> List[Lote]:
+        filas = self.session.scalars(
+            select(LoteDB)
+            .where(LoteDB.id_producto == producto_id,
+                   LoteDB.id_bodega == bodega_id,
+                   LoteDB.cantidad_restante > 0)
+            .order_by(LoteDB.fecha_entrada, LoteDB.id_lote)
+        ).all()
+        return [self._a_dominio(f) for f in filas]
+
+    def obtener_lotes_antiguos_muchos(self, pares: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], List[Lote]]:
+        pares = set(pares)
+        resultado = {par: [] for par in pares}
+        if not pares:
+            return resultado
+        # IN por columna (portable) y filtrado exacto de pares en memoria
+        filas = self.session.scalars(
+            select(LoteDB)
+            .where(LoteDB.id_producto.in_({p for p, _ in pares}),
+                   LoteDB.id_bodega.in_({b for _, b in pares}),
+                   LoteDB.cantidad_restante > 0)
+            .order_by(LoteDB.fecha_entrada, LoteDB.id_lote)
+        ).all()
+        for f in filas:
+            par = (f.id_producto, f.id_bodega)
+            if par in resultado:
+                resultado[par].append(self._a_dominio(f))
+        return resultado
+
+    def actualizar(self, lote: Lote):
+        self.actualizar_muchos([lote])
+
+    def actualizar_muchos(self, lotes: Sequence[Lote], movimientos: Sequence[MovimientoInventario] = (),
+                          nuevos: Sequence[Lote] = ()):
+        # Se ejecuta en la transacción de la unidad de trabajo SQL actual
+        hoy = date.today()  # La reproducción FIFO ordena por fecha: todo movimiento queda fechado
+        filas_movimientos = [
+            {
+                'id_producto': m.id_producto,
+                'id_bodega': m.id_bodega,
+                'tipo_movimiento': m.tipo_movimiento,
+                'cantidad': m.cantidad,
+                'costo_unitario_aplicado': m.costo_unitario_aplicado.a_decimal(),
+                'id_factura': m.id_factura,
+                'id_nota_credito': m.id_nota_credito,
+                'fecha': m.fecha or hoy,
+                'observaciones': m.observaciones,
+            } for m in movimientos
+        ]
+        # Una salida siempre despacha una factura; una entrada sin nota de crédito es una compra
+        sin_factura = sum(1 for f in filas_movimientos
+                          if f['tipo_movimiento'] == 'SALIDA' and f['id_factura'] is None)
+        if sin_factura:
+            raise ValueError(f"{sin_factura} movimientos de SALIDA sin id_factura.")
+        if lotes:
+            self._actualizar_con_version(lotes)
+        if nuevos:
+            # INSERT multi-fila con RETURNING, en el orden de los parámetros
+            ids = self.session.scalars(insert(LoteDB).returning(LoteDB.id_lote, sort_by_parameter_order=True), [
+                {
+                    'id_producto': l.id_producto,
+                    'id_bodega': l.id_bodega,
+                    'fecha_entrada': l.fecha_entrada,
+                    'cantidad_restante': l.cantidad_restante,
+                    'costo_unitario': l.costo_unitario.a_decimal(),
+                    'version': 0,
+                } for l in nuevos
+            ]).all()
+            for lote, id_lote in zip(nuevos, ids):
+                lote.id_lote = id_lote
+                lote.version = 0
+        if filas_movimientos:
+            self.session.execute(insert(MovimientoInventarioDB), filas_movimientos)
+
+    def _actualizar_con_version(self, lotes: Sequence[Lote]):
+        # UPDATE ... WHERE id_lote = ? AND version = ? en un solo executemany. En orden de id_lote para que
+        # dos transacciones que tocan los mismos lotes tomen los bloqueos de fila en el mismo orden.
+        lotes = sorted(lotes, key=lambda l: l.id_lote)
+        tabla = LoteDB.__table__
+        sentencia = (
+            update(tabla)
+            .where(tabla.c.id_lote == bindparam('b_id_lote'), tabla.c.version == bindparam('b_version'))
+            .values(cantidad_restante=bindparam('b_cantidad_restante'), version=tabla.c.version + 1)
+        )
+        parametros = [
+            {'b_id_lote': l.id_lote, 'b_version': l.version, 'b_cantidad_restante': l.cantidad_restante} for l in lotes
+        ]
+        if self.session.get_bind().dialect.supports_sane_multi_rowcount:
+            actualizadas = self.session.execute(sentencia, parametros).rowcount
+        else:
+            actualizadas = sum(self.session.execute(sentencia, p).rowcount for p in parametros)
+        if actualizadas != len(lotes):
+            # Los que sí se escribieron quedan en version + 1 con nuestra cantidad dentro de esta transacción.
+            # Otro escritor también deja version + 1: si ninguno se distingue, todos se reportan como conflicto.
+            escritas = {f.id_lote: (f.version, f.cantidad_restante) for f in self.session.execute(
+                select(LoteDB.id_lote, LoteDB.version, LoteDB.cantidad_restante)
+                .where(LoteDB.id_lote.in_([l.id_lote for l in lotes]))
+            )}
+            conflictos = [l for l in lotes if escritas.get(l.id_lote) != (l.version + 1, l.cantidad_restante)]
+            raise ConflictoConcurrencia(conflictos or lotes)
+        for lote in lotes:
+            lote.version += 1
+
+    @staticmethod
+    def _a_dominio(f: LoteDB) -> Lote:
+        return Lote(id_lote=f.id_lote, id_producto=f.id_producto, id_bodega=f.id_bodega,
+                    fecha_entrada=f.fecha_entrada, cantidad_restante=f.cantidad_restante,
+                    costo_unitario=Money.de_decimal(f.costo_unitario), version=f.version)
+
+class MovimientoInventarioRepositorySQL(_RepositorioSQL, MovimientoInventarioRepository):
+    def iterar_historiales(self, productos: Optional[Iterable[int]] = None,
+                           id_bodega: Optional[int] = None, pares_por_lectura: int = 1_000) -> Iterator[HistorialFIFO]:
+        # Los historiales salen con su stock de apertura, calculado desde los lotes de cada tramo de
+        # pares_por_lectura pares (una consulta de lotes por tramo)
+        tramo = []
+        for historial in self._historiales(productos, id_bodega):
+            tramo.append(historial)
+            if len(tramo) >= pares_por_lectura:
+                yield from self._con_apertura(tramo)
+                tramo = []
+        if tramo:
+            yield from self._con_apertura(tramo)
+
+    def _con_apertura(self, historiales: List[HistorialFIFO]) -> List[HistorialFIFO]:
+        lotes = defaultdict(list)
+        for id_producto, bodega, restante, inicial, costo, fecha in self.session.execute(
+            select(LoteDB.id_producto, LoteDB.id_bodega, LoteDB.cantidad_restante, LoteDB.cantidad_inicial,
+                   LoteDB.costo_unitario, LoteDB.fecha_entrada)
+            .where(LoteDB.id_producto.in_({h.id_producto for h in historiales}),
+                   LoteDB.id_bodega.in_({h.id_bodega for h in historiales}))
+            .order_by(LoteDB.id_producto, LoteDB.id_bodega, LoteDB.fecha_entrada, LoteDB.id_lote)
+        ):
+            lotes[(id_producto, bodega)].append((restante, inicial, Money.de_decimal(costo).micros,
+                                                 fecha.toordinal()))
+        for historial in historiales:
+            historial.abrir_desde_lotes(lotes.get((historial.id_producto, historial.id_bodega), ()))
+        return historiales
+
+    def _historiales(self, productos: Optional[Iterable[int]], id_bodega: Optional[int]) -> Iterator[HistorialFIFO]:
+        # Una sola consulta por columnas (sin objetos ORM), leída por tramos con yield_per.
+        # Movimientos antiguos sin fecha: antes que todos, en orden de registro.
+        m = MovimientoInventarioDB
+        consulta = (
+            select(m.id_producto, m.id_bodega, m.id_movimiento, m.tipo_movimiento, m.cantidad,
+                   m.costo_unitario_aplicado, m.fecha)
+            .order_by(m.id_producto, m.id_bodega, m.fecha.asc().nulls_first(), m.id_movimiento)
+            .execution_options(yield_per=10_000)
+        )
+        if productos is not None:
+            consulta = consulta.where(m.id_producto.in_(set(productos)))
+        if id_bodega is not None:
+            consulta = consulta.where(m.id_bodega == id_bodega)
+        historial = None
+        for id_producto, bodega, id_movimiento, tipo, cantidad, costo, fecha in self.session.execute(consulta):
+            if historial is None or historial.id_producto != id_producto or historial.id_bodega != bodega:
+                if historial is not None:
+                    yield historial
+                historial = HistorialFIFO(id_producto, bodega)
+            historial.agregar(id_movimiento, tipo, cantidad, Money.de_decimal(costo).micros, fecha)
+        if historial is not None:
+            yield historial
+
+    def actualizar_costos(self, ids: Sequence[int], costos_micros: Sequence[int]):
+        tabla = MovimientoInventarioDB.__table__
+        sentencia = (
+            update(tabla)
+            .where(tabla.c.id_movimiento == bindparam('b_id_movimiento'))
+            .values(costo_unitario_aplicado=bindparam('b_costo'))
+        )
+        self.session.execute(sentencia, [
+            {'b_id_movimiento': i, 'b_costo': Money(c).a_decimal()} for i, c in zip(ids, costos_micros)
+        ])
+
+class FacturaRepositorySQL(_RepositorioSQL, FacturaRepository):
+    def obtener_por_id(self, id: int) -> Optional[FacturaAggregate]:
+        fila = self.session.get(FacturaDB, id)
+        return FacturaMapper.a_dominio(fila) if fila else None
+
+    def obtener_muchos(self, ids: Iterable[int]) -> List[FacturaAggregate]:
+        ids = list(ids)
+        filas = self._filas_por_id(FacturaDB.id_factura, ids)
+        return [FacturaMapper.a_dominio(filas[i]) for i in ids if i in filas]
+
+    def bloquear(self, id_factura: int):
+        # SQLite omite FOR UPDATE: ahí las escrituras ya se serializan por el bloqueo de la base
+        self.session.execute(select(FacturaDB.id_factura).where(FacturaDB.id_factura == id_factura).with_for_update())
+
+    def guardar(self, aggregate: FacturaAggregate):
+        self.guardar_muchos([aggregate])
+
+    def guardar_muchos(self, aggregates: Sequence[FacturaAggregate]):
+        if not aggregates:
+            return
+        session = self.session
+        existentes = self._filas_por_id(FacturaDB.id_factura, (a.root.id_factura for a in aggregates))
+        filas = [FacturaMapper.a_fila(a, existentes.get(a.root.id_factura)) for a in aggregates]
+        session.add_all(filas)
+        session.flush()  # INSERT por lotes de raíces, líneas y totales; las líneas reemplazadas se borran
+        for aggregate, fila in zip(aggregates, filas):
+            aggregate.root.id_factura = fila.id_factura
+            aggregate.root.totales.id_factura = fila.id_factura
+
+    def iterar(self, fecha_desde: Optional[date] = None, fecha_hasta: Optional[date] = None,
+               tamano_bloque: int = 500) -> Iterator[FacturaAggregate]:
+        return self._iterar_por_bloques(FacturaDB.id_factura, FacturaDB.fecha_emision, fecha_desde, fecha_hasta,
+                                        tamano_bloque, FacturaMapper.a_dominio)
+
+    def obtener_fechas_emision(self, ids: Iterable[int]) -> Dict[int, date]:
+        ids = set(ids)
+        if not ids:
+            return {}
+        return dict(self.session.execute(
+            select(FacturaDB.id_factura, FacturaDB.fecha_emision).where(FacturaDB.id_factura.in_(ids))
+        ).all())
+
+    def obtener_costos_vendidos(self, id_factura: int) -> Dict[int, Money]:
+        # Promedio en micros enteros, con un solo redondeo por producto
+        m = MovimientoInventarioDB
+        unidades, costos = defaultdict(int), defaultdict(int)
+        for id_producto, cantidad, costo in self.session.execute(
+            select(m.id_producto, m.cantidad, m.costo_unitario_aplicado)
+            .where(m.id_factura == id_factura, m.tipo_movimiento == 'SALIDA')
+        ):
+            unidades[id_producto] += cantidad
+            costos[id_producto] += cantidad * Money.de_decimal(costo).micros
+        return {p: Money(dividir_redondeando(costos[p], unidades[p])) for p in unidades}
+
+class NotaCreditoRepositorySQL(_RepositorioSQL, NotaCreditoRepository):
+    def obtener_por_id(self, id: int) -> Optional[NotaCreditoAggregate]:
+        fila = self.session.get(NotaCreditoDB, id)
+        return NotaCreditoMapper.a_dominio(fila) if fila else None
+
+    def obtener_muchos(self, ids: Iterable[int]) -> List[NotaCreditoAggregate]:
+        ids = list(ids)
+        filas = self._filas_por_id(NotaCreditoDB.id_nota_credito, ids)
+        return [NotaCreditoMapper.a_dominio(filas[i]) for i in ids if i in filas]
+
+    def guardar(self, aggregate: NotaCreditoAggregate):
+        session = self.session
+        nota = aggregate.root
+        existente = session.get(NotaCreditoDB, nota.id_nota_credito) if nota.id_nota_credito is not None else None
+        fila = NotaCreditoMapper.a_fila(aggregate, existente)
+        session.add(fila)
+        session.flush()
+        nota.id_nota_credito = fila.id_nota_credito
+        nota.totales.id_nota_credito = fila.id_nota_credito
+
+    def iterar(self, fecha_desde: Optional[date] = None, fecha_hasta: Optional[date] = None,
+               tamano_bloque: int = 500) -> Iterator[NotaCreditoAggregate]:
+        return self._iterar_por_bloques(NotaCreditoDB.id_nota_credito, NotaCreditoDB.fecha_emision, fecha_desde,
+                                        fecha_hasta, tamano_bloque, NotaCreditoMapper.a_dominio)
+
+    def obtener_cantidades_acreditadas(self, id_factura: int) -> Dict[int, int]:
+        filas = self.session.execute(
+            select(LineaNotaCreditoDB.id_producto, func.sum(LineaNotaCreditoDB.cantidad))
+            .join(NotaCreditoDB, NotaCreditoDB.id_nota_credito == LineaNotaCreditoDB.id_nota_credito)
+            .where(NotaCreditoDB.id_factura_modificada == id_factura)
+            .group_by(LineaNotaCreditoDB.id_producto)
+        ).all()
+        return {id_producto: int(cantidad) for id_producto, cantidad in filas}
+
+class CodigoImpuestoRepositorySQL(_RepositorioSQL, CodigoImpuestoRepository):
+    def obtener_por_entidad(self, id_entidad: UUID) -> List[CodigoImpuesto]:
+        filas = self.session.scalars(
+            select(TaxCodeDB).where(TaxCodeDB.entity_id == id_entidad, TaxCodeDB.deleted_at.is_(None))
+        ).all()
+        return [CodigoImpuesto(codigo=f.code, nombre=f.name, tarifa=f.rate, id_tax_code=f.tax_code_id,
+                               id_entidad=f.entity_id, id_cuenta=f.account_id) for f in filas]
+
+class PeriodoFiscalRepositorySQL(_RepositorioSQL, PeriodoFiscalRepository):
+    def obtener_por_entidad(self, id_entidad: UUID) -> List[PeriodoFiscal]:
+        filas = self.session.scalars(
+            select(FiscalPeriodDB)
+            .where(FiscalPeriodDB.entity_id == id_entidad, FiscalPeriodDB.deleted_at.is_(None))
+            .order_by(FiscalPeriodDB.start_date)
+        ).all()
+        return [self._a_dominio(f) for f in filas]
+
+    def obtener_cerrados(self, ids_periodo: Iterable[UUID]) -> List[PeriodoFiscal]:
+        ids_periodo = set(ids_periodo)
+        if not ids_periodo:
+            return []
+        filas = self.session.scalars(
+            select(FiscalPeriodDB)
+            .where(FiscalPeriodDB.period_id.in_(ids_periodo), FiscalPeriodDB.is_closed == True)
+        ).all()
+        return [self._a_dominio(f) for f in filas]
+
+    def cerrar(self, id_periodo: UUID):
+        # Condicionado a is_closed = 0: de dos cierres simultáneos solo uno actualiza la fila
+        resultado = self.session.execute(
+            update(FiscalPeriodDB)
+            .where(FiscalPeriodDB.period_id == id_periodo, FiscalPeriodDB.is_closed == False,
+                   FiscalPeriodDB.deleted_at.is_(None))
+            .values(is_closed=True, updated_at=datetime.now())
+        )
+        if resultado.rowcount != 1:
+            raise ValueError(f"Período fiscal {id_periodo} no existe o ya está cerrado.")
+
+    @staticmethod
+    def _a_dominio(f: FiscalPeriodDB) -> PeriodoFiscal:
+        return PeriodoFiscal(id_periodo=f.period_id, id_entidad=f.entity_id, codigo=f.period_code,
+                             fecha_inicio=f.start_date, fecha_fin=f.end_date, cerrado=f.is_closed)
+
+class CuentasProductoRepositorySQL(_RepositorioSQL, CuentasProductoRepository):
+    def obtener_cuentas(self, id_entidad: UUID, ids_producto: Iterable[int]) -> Dict[int, CuentasProducto]:
+        codigos = {str(i) for i in ids_producto}
+        if not codigos:
+            return {}
+        filas = self.session.execute(
+            select(ProductDB.code, ProductDB.revenue_account_id, ProductDB.cost_account_id,
+                   ProductDB.inventory_account_id)
+            .where(ProductDB.entity_id == id_entidad, ProductDB.code.in_(codigos), ProductDB.deleted_at.is_(None))
+        ).all()
+        return {int(codigo): CuentasProducto(int(codigo), ingreso, costo, inventario)
+                for codigo, ingreso, costo, inventario in filas}
+
+class AsientoContableRepositorySQL(_RepositorioSQL, AsientoContableRepository):
+    def guardar_muchos(self, asientos: Sequence[AsientoContable]):
+        # Dos INSERT multi-fila (executemany) por llamada: uno para journal_entry y otro para todas las ledger_line.
+        # Los ids vienen del dominio, no hace falta RETURNING para enlazar las líneas
+        if not asientos:
+            return
+        ahora = datetime.now()
+        self.session.execute(insert(JournalEntryDB), [
+            {
+                'entry_id': a.id_asiento,
+                'entity_id': a.id_entidad,
+                'period_id': a.id_periodo,
+                'entry_date': a.fecha,
+                'description': a.descripcion[:150],
+                'is_posted': a.contabilizado,
+                'created_at': ahora,
+            } for a in asientos
+        ])
+        self.session.execute(insert(LedgerLineDB), [
+            {
+                'line_id': l.id_linea,
+                'entry_id': a.id_asiento,
+                'account_id': l.id_cuenta,
+                'debit': l.debe.a_decimal(),
+                'credit': l.haber.a_decimal(),
+                'currency_code': a.moneda,
+                'amount_foreign': l.monto_extranjero.a_decimal() if l.monto_extranjero is not None else None,
+                'cost_center_id': l.id_centro_costo,
+                'project_id': l.id_proyecto,
+                'partner_id': l.id_socio,
+                'created_at': ahora,
+            } for a in asientos for l in a.lineas
+        ])
+
+    def contar_sin_contabilizar(self, id_entidad: UUID, id_periodo: UUID) -> int:
+        return self.session.scalar(
+            select(func.count()).select_from(JournalEntryDB)
+            .where(JournalEntryDB.entity_id == id_entidad, JournalEntryDB.period_id == id_periodo,
+                   JournalEntryDB.is_posted == False, JournalEntryDB.deleted_at.is_(None))
+        )
+
+    def obtener_descuadrados(self, id_entidad: UUID, id_periodo: UUID, limite: int = 10) -> List[UUID]:
+        # Diferencia de al menos medio centavo: en SQLite las sumas de DECIMAL son de punto flotante
+        return list(self.session.scalars(
+            select(JournalEntryDB.entry_id)
+            .join(LedgerLineDB, LedgerLineDB.entry_id == JournalEntryDB.entry_id)
+            .where(JournalEntryDB.entity_id == id_entidad, JournalEntryDB.period_id == id_periodo,
+                   JournalEntryDB.is_posted == True, JournalEntryDB.deleted_at.is_(None))
+            .group_by(JournalEntryDB.entry_id)
+            .having(func.abs(func.sum(LedgerLineDB.debit) - func.sum(LedgerLineDB.credit)) >= Decimal('0.005'))
+            .limit(limite)
+        ))
+
+class PlantillaAsientoRepositorySQL(_RepositorioSQL, PlantillaAsientoRepository):
+    # Versión de una plantilla: el created_at/updated_at más reciente entre journal_template y sus líneas.
+    # journal_template_line no tiene deleted_at: quien borre líneas debe actualizar updated_at de la plantilla.
+    def obtener_muchos(self, ids: Iterable[UUID]) -> Dict[UUID, PlantillaAsiento]:
+        ids = set(ids)
+        if not ids:
+            return {}
+        filas = self.session.scalars(
+            select(JournalTemplateDB)
+            .where(JournalTemplateDB.template_id.in_(ids), JournalTemplateDB.deleted_at.is_(None))
+        ).all()
+        return {f.template_id: self._a_dominio(f) for f in filas}
+
+    def obtener_versiones(self, ids: Iterable[UUID]) -> Dict[UUID, Optional[datetime]]:
+        ids = set(ids)
+        if not ids:
+            return {}
+        versiones = dict(self.session.execute(
+            select(JournalTemplateDB.template_id,
+                   func.coalesce(JournalTemplateDB.updated_at, JournalTemplateDB.created_at))
+            .where(JournalTemplateDB.template_id.in_(ids), JournalTemplateDB.deleted_at.is_(None))
+        ).all())
+        lineas = self.session.execute(
+            select(JournalTemplateLineDB.template_id,
+                   func.max(func.coalesce(JournalTemplateLineDB.updated_at, JournalTemplateLineDB.created_at)))
+            .where(JournalTemplateLineDB.template_id.in_(versiones.keys()))
+            .group_by(JournalTemplateLineDB.template_id)
+        ).all() if versiones else ()
+        for id_plantilla, ultima_linea in lineas:
+            versiones[id_plantilla] = _mas_reciente(versiones[id_plantilla], ultima_linea)
+        return versiones
+
+    @staticmethod
+    def _a_dominio(f: JournalTemplateDB) -> PlantillaAsiento:
+        version = f.updated_at or f.created_at
+        for linea in f.lineas:
+            version = _mas_reciente(version, linea.updated_at or linea.created_at)
+        return PlantillaAsiento(
+            id_plantilla=f.template_id, id_entidad=f.entity_id, codigo=f.code, nombre=f.name, activa=f.is_active,
+            actualizado_en=version,
+            lineas=[LineaPlantilla(id_linea=l.line_id, lado_normal=l.normal_side, expresion_monto=l.amount_expression,
+                                   id_cuenta=l.account_id, categoria_cuenta=l.account_category,
+                                   moneda=l.currency_code, id_centro_costo=l.cost_center_id,
+                                   id_proyecto=l.project_id, tipo_socio=l.partner_type) for l in f.lineas]
+        )
+
+class CuentaContableRepositorySQL(_RepositorioSQL, CuentaContableRepository):
+    def obtener_por_entidad(self, id_entidad: UUID) -> List[CuentaContable]:
+        filas = self.session.scalars(
+            select(AccountDB).where(AccountDB.entity_id == id_entidad, AccountDB.deleted_at.is_(None))
+        ).all()
+        return [CuentaContable(id_cuenta=f.account_id, id_entidad=f.entity_id, codigo=f.account_code,
+                               nombre=f.account_name, categoria=f.category, lado_normal=f.normal_side,
+                               id_cuenta_padre=f.parent_account_id, nivel=f.level, imputable=f.is_postable)
+                for f in filas]
+
+class SaldoCuentaRepositorySQL(_RepositorioSQL, SaldoCuentaRepository):
+    def acumular(self, saldos: Sequence[SaldoCuenta]):
+        # Un solo upsert por lotes sobre la clave única (account_id, period_id, cost_center_key): la fila se crea
+        # o se le suman los incrementos en la misma sentencia, sin leer antes. Dos transacciones que crean el
+        # mismo saldo no lo duplican: la segunda espera a la primera y suma sobre su fila.
+        if not saldos:
+            return
+        por_clave: Dict[ClaveSaldo, SaldoCuenta] = {}
+        for s in saldos:  # Una fila por clave: el upsert no puede tocar la misma fila dos veces
+            acumulado = por_clave.setdefault(s.clave, SaldoCuenta(s.id_entidad, *s.clave))
+            acumulado.debe += s.debe
+            acumulado.haber += s.haber
+            acumulado.lineas += s.lineas
+        # En orden de clave: dos transacciones que tocan los mismos saldos los bloquean en el mismo orden
+        filas = sorted(self._filas(por_clave.values(), datetime.now()),
+                       key=lambda f: (str(f['account_id']), str(f['period_id']), str(f['cost_center_key'])))
+        self.session.execute(self._upsert(), filas)
+
+    def _upsert(self):
+        tabla = AccountBalanceDB.__table__
+        dialecto = self.session.get_bind().dialect.name
+        if dialecto in ('sqlite', 'postgresql'):
+            sentencia = (sqlite.insert if dialecto == 'sqlite' else postgresql.insert)(tabla)
+            nueva = sentencia.excluded
+            return sentencia.on_conflict_do_update(
+                index_elements=[tabla.c.account_id, tabla.c.period_id, tabla.c.cost_center_key],
+                set_={'debit_total': tabla.c.debit_total + nueva.debit_total,
+                      'credit_total': tabla.c.credit_total + nueva.credit_total,
+                      'line_count': tabla.c.line_count + nueva.line_count, 'updated_at': nueva.updated_at})
+        if dialecto == 'mysql':
+            sentencia = mysql.insert(tabla)
+            nueva = sentencia.inserted
+            return sentencia.on_duplicate_key_update(
+                debit_total=tabla.c.debit_total + nueva.debit_total,
+                credit_total=tabla.c.credit_total + nueva.credit_total,
+                line_count=tabla.c.line_count + nueva.line_count, updated_at=nueva.updated_at)
+        raise ValueError(f"Saldos: sin upsert para el dialecto {dialecto}.")
+
+    def obtener_totales(self, id_entidad: UUID, id_periodo: UUID,
+                        id_centro_costo: Optional[UUID] = None) -> Dict[UUID, Tuple[int, int]]:
+        return self._totales(AccountBalanceDB, id_entidad, [AccountBalanceDB.period_id == id_periodo], id_centro_costo)
+
+    def obtener_totales_periodos(self, id_entidad: UUID, ids_periodo: Iterable[UUID],
+                                 id_centro_costo: Optional[UUID] = None) -> Dict[UUID, Tuple[int, int]]:
+        ids_periodo = set(ids_periodo)
+        if not ids_periodo:
+            return {}
+        return self._totales(AccountBalanceDB, id_entidad, [AccountBalanceDB.period_id.in_(ids_periodo)],
+                             id_centro_costo)
+
+    def reconstruir(self, id_entidad: UUID, id_periodo: Optional[UUID] = None) -> List[SaldoCuenta]:
+        # Un GROUP BY sobre ledger_line de los asientos contabilizados; reemplaza los saldos existentes
+        filtros = [JournalEntryDB.entity_id == id_entidad, JournalEntryDB.is_posted == True,
+                   JournalEntryDB.deleted_at.is_(None)]
+        borrar = delete(AccountBalanceDB).where(AccountBalanceDB.entity_id == id_entidad)
+        if id_periodo is not None:
+            filtros.append(JournalEntryDB.period_id == id_periodo)
+            borrar = borrar.where(AccountBalanceDB.period_id == id_periodo)
+        filas = self.session.execute(
+            select(LedgerLineDB.account_id, JournalEntryDB.period_id, LedgerLineDB.cost_center_id,
+                   func.sum(LedgerLineDB.debit), func.sum(LedgerLineDB.credit), func.count())
+            .join(JournalEntryDB, JournalEntryDB.entry_id == LedgerLineDB.entry_id)
+            .where(*filtros)
+            .group_by(LedgerLineDB.account_id, JournalEntryDB.period_id, LedgerLineDB.cost_center_id)
+        ).all()
+        self.session.execute(borrar)
+        saldos = [SaldoCuenta(id_entidad, cuenta, periodo, centro, _centavos(debe), _centavos(haber), lineas)
+                  for cuenta, periodo, centro, debe, haber, lineas in filas]
+        self._insertar(saldos, datetime.now())
+        return saldos
+
+    def guardar_cierre(self, saldos: Sequence[SaldoCuenta]):
+        if saldos:
+            ahora = datetime.now()
+            self.session.execute(insert(PeriodClosingBalanceDB), [
+                {
+                    'closing_balance_id': uuid4(),
+                    'entity_id': s.id_entidad,
+                    'period_id': s.id_periodo,
+                    'account_id': s.id_cuenta,
+                    'cost_center_id': s.id_centro_costo,
+                    'debit_total': Money(s.debe).a_decimal(),
+                    'credit_total': Money(s.haber).a_decimal(),
+                    'line_count': s.lineas,
+                    'created_at': ahora,
+                } for s in saldos
+            ])
+
+    def obtener_cierre(self, id_entidad: UUID, id_periodo: UUID) -> List[SaldoCuenta]:
+        return self._saldos(PeriodClosingBalanceDB, id_entidad, id_periodo)
+
+    def obtener_totales_cierre(self, id_entidad: UUID, id_periodo: UUID,
+                               id_centro_costo: Optional[UUID] = None) -> Dict[UUID, Tuple[int, int]]:
+        return self._totales(PeriodClosingBalanceDB, id_entidad, [PeriodClosingBalanceDB.period_id == id_periodo],
+                             id_centro_costo)
+
+    def _totales(self, modelo, id_entidad: UUID, filtros: list,
+                 id_centro_costo: Optional[UUID]) -> Dict[UUID, Tuple[int, int]]:
+        # account_balance o period_closing_balance: mismas columnas, agrupadas por cuenta
+        filtros = [modelo.entity_id == id_entidad, *filtros]
+        if id_centro_costo is not None:
+            filtros.append(modelo.cost_center_id == id_centro_costo)
+        filas = self.session.execute(
+            select(modelo.account_id, func.sum(modelo.debit_total), func.sum(modelo.credit_total))
+            .where(*filtros)
+            .group_by(modelo.account_id)
+        ).all()
+        return {cuenta: (_centavos(debe), _centavos(haber)) for cuenta, debe, haber in filas}
+
+    def _saldos(self, modelo, id_entidad: UUID, id_periodo: UUID) -> List[SaldoCuenta]:
+        filas = self.session.execute(
+            select(modelo.account_id, modelo.cost_center_id, modelo.debit_total, modelo.credit_total,
+                   modelo.line_count)
+            .where(modelo.entity_id == id_entidad, modelo.period_id == id_periodo)
+        ).all()
+        return [SaldoCuenta(id_entidad, cuenta, id_periodo, centro, _centavos(debe), _centavos(haber), lineas)
+                for cuenta, centro, debe, haber, lineas in filas]
+
+    def _insertar(self, saldos: Sequence[SaldoCuenta], ahora: datetime):
+        if saldos:
+            self.session.execute(insert(AccountBalanceDB), self._filas(saldos, ahora))
+
+    @staticmethod
+    def _filas(saldos: Iterable[SaldoCuenta], ahora: datetime) -> List[dict]:
+        return [
+            {
+                'balance_id': uuid4(),
+                'entity_id': s.id_entidad,
+                'account_id': s.id_cuenta,
+                'period_id': s.id_periodo,
+                'cost_center_id': s.id_centro_costo,
+                'cost_center_key': SIN_CENTRO_COSTO if s.id_centro_costo is None else s.id_centro_costo,
+                'debit_total': Money(s.debe).a_decimal(),
+                'credit_total': Money(s.haber).a_decimal(),
+                'line_count': s.lineas,
+                'updated_at': ahora,
+            } for s in saldos
+        ]
+
+class TipoCambioRepositorySQL(_RepositorioSQL, TipoCambioRepository):
+    def obtener_desde(self, desde: Optional[datetime] = None) -> List[TipoCambio]:
+        # En orden de fecha: cada serie en memoria crece por el final
+        actualizado = func.coalesce(ExchangeRateDB.updated_at, ExchangeRateDB.created_at)
+        consulta = select(ExchangeRateDB.from_currency, ExchangeRateDB.to_currency, ExchangeRateDB.rate_date,
+                          ExchangeRateDB.rate, actualizado)
+        if desde is not None:
+            consulta = consulta.where(actualizado >= desde)
+        filas = self.session.execute(consulta.order_by(ExchangeRateDB.rate_date)).all()
+        return [TipoCambio(origen.strip(), destino.strip(), fecha, Money.de_decimal(tasa).micros, en)
+                for origen, destino, fecha, tasa, en in filas]
+
+    def obtener_moneda_base(self, id_entidad: UUID) -> str:
+        moneda = self.session.scalar(
+            select(AccountingEntityDB.base_currency)
+            .where(AccountingEntityDB.entity_id == id_entidad, AccountingEntityDB.deleted_at.is_(None))
+        )
+        if moneda is None:
+            raise ValueError(f"Entidad contable {id_entidad} no existe.")
+        return moneda.strip()
+
+def _centavos(valor) -> int:
+    # DECIMAL(18, 2) -> micros; redondea a centavos el ruido de motores sin decimal exacto (SQLite)
+    return redondear_a_centavos(Money.de_decimal(valor or 0).micros)
+
+def _mas_reciente(a: Optional[datetime], b: Optional[datetime]) -> Optional[datetime]:
+    return b if a is None or (b is not None and b > a) else a
@@ -0,0 +1,80 @@
+# infrastructure/persistence/unidad_de_trabajo.py
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, TypeVar
+from sqlalchemy.orm import Session, scoped_session
+from domain.repositories.lote_repository import ConflictoConcurrencia
+from infrastructure.persistence.sql_repository import (
+    AsientoContableRepositorySQL, CodigoImpuestoRepositorySQL, CuentaContableRepositorySQL, CuentasProductoRepositorySQL,
+    FacturaRepositorySQL, LoteRepositorySQL, MovimientoInventarioRepositorySQL, NotaCreditoRepositorySQL,
+    PeriodoFiscalRepositorySQL, PlantillaAsientoRepositorySQL, ProductoRepositorySQL, SaldoCuentaRepositorySQL,
+    TipoCambioRepositorySQL
+)
+
+T = TypeVar('T')
+
+class UnidadDeTrabajoSQL:
+    # Una sesión y una transacción por petición: commit al salir sin errores, rollback si hay excepción.
+    # Los repositorios resuelven la sesión actual del registro, por lo que comparten esa transacción.
+    def __init__(self, sesiones: scoped_session):
+        self.sesiones = sesiones
+        self.facturas = FacturaRepositorySQL(sesiones)
+        self.notas_credito = NotaCreditoRepositorySQL(sesiones)
+        self.lotes = LoteRepositorySQL(sesiones)
+        self.movimientos = MovimientoInventarioRepositorySQL(sesiones)
+        self.productos = ProductoRepositorySQL(sesiones)
+        self.codigos_impuesto = CodigoImpuestoRepositorySQL(sesiones)
+        self.asientos = AsientoContableRepositorySQL(sesiones)
+        self.periodos = PeriodoFiscalRepositorySQL(sesiones)
+        self.cuentas_producto = CuentasProductoRepositorySQL(sesiones)
+        self.plantillas = PlantillaAsientoRepositorySQL(sesiones)
+        self.cuentas_contables = CuentaContableRepositorySQL(sesiones)
+        self.saldos = SaldoCuentaRepositorySQL(sesiones)
+        self.tipos_cambio = TipoCambioRepositorySQL(sesiones)
+        self._al_revertir: List[Callable[[], None]] = []
+        self._al_confirmar: List[Callable[[], None]] = []
+
+    def al_revertir(self, callback: Callable[[], None]):
+        # Para descartar cachés en memoria (e.g., IndiceLotesFIFO) que ya reflejan cambios no confirmados
+        self._al_revertir.append(callback)
+
+    def al_confirmar(self, callback: Callable[[], None]):
+        # Después del commit: lo que esas cachés registraron como pendiente ya está en la base
+        self._al_confirmar.append(callback)
+
+    @property
+    def session(self) -> Session:
+        return self.sesiones()  # La del hilo actual: una misma unidad puede usarse desde varios hilos
+
+    @contextmanager
+    def punto_de_guardado(self) -> Iterator[None]:
+        # SAVEPOINT en la transacción actual: si el bloque falla se deshace solo lo que escribió
+        with self.session.begin_nested():
+            yield
+
+    def ejecutar(self, operacion: Callable[[], T], reintentos: int = 3) -> T:
+        # Ejecuta la operación en su propia transacción y la repite completa, en una transacción nueva,
+        # si otro hilo o proceso modificó los mismos lotes entre la lectura y la escritura
+        for intento in range(reintentos + 1):
+            try:
+                with self:
+                    return operacion()
+            except ConflictoConcurrencia:
+                if intento == reintentos:
+                    raise
+
+    def __enter__(self) -> 'UnidadDeTrabajoSQL':
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        try:
+            if tipo is None:
+                self.session.commit()
+                for callback in self._al_confirmar:
+                    callback()
+            else:
+                self.session.rollback()
+                for callback in self._al_revertir:
+                    callback()
+        finally:
+            self.sesiones.remove()  # Devuelve la conexión al pool
+        return False
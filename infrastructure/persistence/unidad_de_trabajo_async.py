@@ -0,0 +1,59 @@
+# infrastructure/persistence/unidad_de_trabajo_async.py
+from typing import Awaitable, Callable, TypeVar
+from sqlalchemy.ext.asyncio import AsyncSession, async_scoped_session
+from domain.repositories.lote_repository import ConflictoConcurrencia
+from infrastructure.persistence.async_sql_repository import (
+    AsyncFacturaRepositorySQL, AsyncLoteRepositorySQL, AsyncNotaCreditoRepositorySQL
+)
+from infrastructure.persistence.sql_repository import (
+    AsientoContableRepositorySQL, CuentasProductoRepositorySQL, PeriodoFiscalRepositorySQL, SaldoCuentaRepositorySQL
+)
+
+T = TypeVar('T')
+
+class UnidadDeTrabajoAsync:
+    # Igual que UnidadDeTrabajoSQL, con una sesión por tarea de asyncio en lugar de por hilo:
+    # varias tareas pueden usar la misma unidad a la vez, cada una en su propia transacción.
+    def __init__(self, sesiones: async_scoped_session):
+        self.sesiones = sesiones
+        self.facturas = AsyncFacturaRepositorySQL(sesiones)
+        self.notas_credito = AsyncNotaCreditoRepositorySQL(sesiones)
+        self.lotes = AsyncLoteRepositorySQL(sesiones)
+        # Repositorios síncronos de contabilización sobre la sesión de la tarea: solo dentro de en_sincrono()
+        sincrona = lambda: self.sesiones().sync_session
+        self.asientos = AsientoContableRepositorySQL(sincrona)
+        self.periodos = PeriodoFiscalRepositorySQL(sincrona)
+        self.cuentas_producto = CuentasProductoRepositorySQL(sincrona)
+        self.saldos = SaldoCuentaRepositorySQL(sincrona)
+
+    @property
+    def session(self) -> AsyncSession:
+        return self.sesiones()  # La de la tarea actual
+
+    async def en_sincrono(self, operacion: Callable[[], T]) -> T:
+        # Código síncrono (e.g., ContabilizadorDocumentos) en la transacción de la tarea, sin bloquear el event loop
+        return await self.session.run_sync(lambda _: operacion())
+
+    async def ejecutar(self, operacion: Callable[[], Awaitable[T]], reintentos: int = 3) -> T:
+        # La operación se repite completa, en una transacción nueva, si otra tarea, hilo o proceso
+        # modificó los mismos lotes entre la lectura y la escritura
+        for intento in range(reintentos + 1):
+            try:
+                async with self:
+                    return await operacion()
+            except ConflictoConcurrencia:
+                if intento == reintentos:
+                    raise
+
+    async def __aenter__(self) -> 'UnidadDeTrabajoAsync':
+        return self
+
+    async def __aexit__(self, tipo, valor, traza):
+        try:
+            if tipo is None:
+                await self.session.commit()
+            else:
+                await self.session.rollback()
+        finally:
+            await self.sesiones.remove()  # Devuelve la conexión al pool
+        return False
@@ -0,0 +1,327 @@
+# infrastructure/sri/xml_sri.py
+import gzip
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from io import StringIO
+from itertools import islice
+from typing import IO, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from xml.sax.saxutils import escape, quoteattr
+from domain.entities.bases_impuestos import bases_por_grupo, ice_linea
+from domain.entities.codigo_impuesto import TIPO_EXENTO, TIPO_NO_OBJETO
+from domain.entities.factura import Factura
+from domain.entities.nota_credito import NotaCredito
+from domain.value_objects.money import Money, aplicar_porcentaje, redondear_a_centavos
+
+# Comprobantes electrónicos del SRI (factura 01 y nota de crédito 04, versión 1.1.0) escritos en streaming,
+# etiqueta por etiqueta sobre el flujo de salida: ningún documento se construye como árbol en memoria.
+
+VERSION = '1.1.0'
+COD_FACTURA = '01'
+COD_NOTA_CREDITO = '04'
+IMPUESTO_IVA = '2'
+IMPUESTO_ICE = '3'
+_CODIGOS_PORCENTAJE_IVA = {
+    Decimal('0'): '0', Decimal('12'): '2', Decimal('14'): '3', Decimal('15'): '4', Decimal('5'): '5',
+    Decimal('8'): '8', Decimal('13'): '10',
+}
+_CODIGO_NO_OBJETO = '6'
+_CODIGO_EXENTO = '7'
+_FORMAS_PAGO = {'efectivo': '01', 'tarjeta de debito': '16', 'tarjeta de débito': '16', 'tarjeta': '19',
+                'tarjeta de credito': '19', 'tarjeta de crédito': '19', 'transferencia': '20'}
+_CONSUMIDOR_FINAL = '9999999999999'
+
+FechasSustento = Callable[[Iterable[int]], Dict[int, date]]  # id_factura -> fecha_emision
+
+@dataclass(frozen=True)
+class ConfiguracionSRI:
+    ambiente: str = '1'          # 1 pruebas, 2 producción
+    tipo_emision: str = '1'      # 1 emisión normal
+    establecimiento: str = '001'
+    punto_emision: str = '001'
+    moneda: str = 'DOLAR'
+
+def clave_acceso(fecha: date, cod_doc: str, ruc: str, secuencial: str, config: ConfiguracionSRI) -> str:
+    # 48 dígitos + dígito verificador
+    codigo_numerico = secuencial[-8:]
+    clave = (f"{fecha:%d%m%Y}{cod_doc}{ruc}{config.ambiente}{config.establecimiento}{config.punto_emision}"
+             f"{secuencial}{codigo_numerico}{config.tipo_emision}")
+    return clave + digito_verificador(clave)
+
+def digito_verificador(digitos: str) -> str:
+    # Módulo 11 con pesos 2..7 desde la derecha; 11 -> 0 y 10 -> 1
+    total = sum(int(digito) * (2 + i % 6) for i, digito in enumerate(reversed(digitos)))
+    verificador = 11 - total % 11
+    return str({11: 0, 10: 1}.get(verificador, verificador))
+
+def _secuencial(numero: Optional[int]) -> str:
+    return f"{numero or 0:09d}"
+
+def _dos_decimales(valor: Money) -> str:
+    return str(valor.a_decimal().quantize(Decimal('0.01'), ROUND_HALF_UP))
+
+def _seis_decimales(valor: Union[Money, int]) -> str:
+    decimal = valor.a_decimal() if isinstance(valor, Money) else Decimal(valor)
+    return str(decimal.quantize(Decimal('0.000001')))
+
+def _tipo_identificacion(identificacion: str) -> str:
+    if identificacion == _CONSUMIDOR_FINAL:
+        return '07'
+    if identificacion.isdigit() and len(identificacion) == 13:
+        return '04'  # RUC
+    if identificacion.isdigit() and len(identificacion) == 10:
+        return '05'  # Cédula
+    return '06'      # Pasaporte
+
+def _codigo_porcentaje_iva(tipo: str, tarifa: Decimal) -> str:
+    if tipo == TIPO_EXENTO:
+        return _CODIGO_EXENTO
+    if tipo == TIPO_NO_OBJETO:
+        return _CODIGO_NO_OBJETO
+    try:
+        return _CODIGOS_PORCENTAJE_IVA[Decimal(tarifa).normalize()]
+    except KeyError:
+        raise ValueError(f"Tarifa de IVA sin código SRI: {tarifa}") from None
+
+def _codigo_ice(linea) -> str:
+    codigo = linea.codigo_ice or ''
+    return codigo[3:] if codigo.upper().startswith('ICE') else codigo  # 'ICE3011' -> '3011'
+
+class EscritorXMLSRI:
+    # Escribe comprobantes uno tras otro sobre un flujo de texto; no retiene nada entre documentos
+    # Escritura directa con escape() en lugar de xml.sax XMLGenerator: mismo resultado, sin sus cuatro
+    # llamadas y el estado de etiqueta pendiente por cada elemento hoja (hay ~50 por documento)
+    def __init__(self, salida: IO[str], config: ConfiguracionSRI = ConfiguracionSRI()):
+        self._escribir = salida.write
+        self.config = config
+
+    def declaracion(self):
+        self._escribir('<?xml version="1.0" encoding="utf-8"?>\n')
+
+    def abrir(self, nombre: str, atributos: Optional[Dict[str, str]] = None):
+        if atributos:
+            self._escribir(f"<{nombre}{''.join(f' {k}={quoteattr(v)}' for k, v in atributos.items())}>")
+        else:
+            self._escribir(f"<{nombre}>")
+
+    def cerrar(self, nombre: str):
+        self._escribir(f"</{nombre}>")
+
+    def salto(self):
+        self._escribir('\n')
+
+    def documento(self, documento, fecha_sustento: Optional[date] = None):
+        raiz = getattr(documento, 'root', documento)  # Aggregate o entidad raíz
+        if isinstance(raiz, Factura):
+            self.factura(raiz)
+        elif isinstance(raiz, NotaCredito):
+            self.nota_credito(raiz, fecha_sustento)
+        else:
+            raise ValueError(f"Documento no exportable al SRI: {type(raiz).__name__}")
+
+    def factura(self, factura: Factura):
+        secuencial = _secuencial(factura.id_factura)
+        self.abrir('factura', {'id': 'comprobante', 'version': VERSION})
+        self._info_tributaria(factura, COD_FACTURA, secuencial)
+        totales = factura.totales
+        self.abrir('infoFactura')
+        self._elemento('fechaEmision', f"{factura.fecha_emision:%d/%m/%Y}")
+        self._comprador(factura.identificacion_adquiriente)
+        self._elemento('totalSinImpuestos', _dos_decimales(totales.valor_subtotal))
+        self._elemento('totalDescuento', _dos_decimales(totales.descuento_comercial))
+        self._total_con_impuestos(factura.lineas, totales.moneda)
+        self._elemento('propina', '0.00')
+        self._elemento('importeTotal', _dos_decimales(totales.valor_total))
+        self._elemento('moneda', self.config.moneda)
+        self.abrir('pagos')
+        self.abrir('pago')
+        tipo = factura.forma_pago.tipo or ''
+        self._elemento('formaPago', tipo if tipo.isdigit() else _FORMAS_PAGO.get(tipo.lower(), '20'))
+        self._elemento('total', _dos_decimales(totales.valor_total))
+        self.cerrar('pago')
+        self.cerrar('pagos')
+        self.cerrar('infoFactura')
+        self.abrir('detalles')
+        for linea in factura.lineas:
+            self.abrir('detalle')
+            self._elemento('codigoPrincipal', str(linea.id_producto))
+            self._elemento('descripcion', linea.descripcion or '')
+            self._elemento('cantidad', _seis_decimales(linea.cantidad))
+            self._elemento('precioUnitario', _seis_decimales(linea.precio_unitario.monto))
+            self._elemento('descuento', '0.00')  # precio_unitario ya incluye el descuento aplicado
+            self._elemento('precioTotalSinImpuesto', _dos_decimales(linea.valor_total))
+            self._impuestos_linea(linea)
+            self.cerrar('detalle')
+        self.cerrar('detalles')
+        self.cerrar('factura')
+
+    def nota_credito(self, nota: NotaCredito, fecha_sustento: Optional[date] = None):
+        secuencial = _secuencial(nota.id_nota_credito)
+        self.abrir('notaCredito', {'id': 'comprobante', 'version': VERSION})
+        self._info_tributaria(nota, COD_NOTA_CREDITO, secuencial)
+        totales = nota.totales
+        self.abrir('infoNotaCredito')
+        self._elemento('fechaEmision', f"{nota.fecha_emision:%d/%m/%Y}")
+        self._comprador(nota.identificacion_adquiriente)
+        self._elemento('codDocModificado', COD_FACTURA)
+        self._elemento('numDocModificado', f"{self.config.establecimiento}-{self.config.punto_emision}-"
+                                           f"{_secuencial(nota.id_factura_modificada)}")
+        if fecha_sustento is not None:
+            self._elemento('fechaEmisionDocSustento', f"{fecha_sustento:%d/%m/%Y}")
+        self._elemento('totalSinImpuestos', _dos_decimales(totales.valor_subtotal))
+        self._elemento('valorModificacion', _dos_decimales(totales.valor_total))
+        self._elemento('moneda', self.config.moneda)
+        self._total_con_impuestos(nota.lineas, totales.moneda)
+        self._elemento('motivo', nota.motivo_modificacion.descripcion)
+        self.cerrar('infoNotaCredito')
+        self.abrir('detalles')
+        for linea in nota.lineas:
+            self.abrir('detalle')
+            self._elemento('codigoInterno', str(linea.id_producto))
+            self._elemento('descripcion', linea.descripcion or '')
+            self._elemento('cantidad', _seis_decimales(linea.cantidad))
+            self._elemento('precioUnitario', _seis_decimales(linea.valor_item_cobrado))
+            self._elemento('descuento', '0.00')
+            self._elemento('precioTotalSinImpuesto', _dos_decimales(linea.valor_total))
+            self._impuestos_linea(linea)
+            self.cerrar('detalle')
+        self.cerrar('detalles')
+        self.cerrar('notaCredito')
+
+    def _info_tributaria(self, documento, cod_doc: str, secuencial: str):
+        config = self.config
+        ruc = documento.ruc_emisor.numero
+        direccion = documento.direccion_matriz
+        self.abrir('infoTributaria')
+        self._elemento('ambiente', config.ambiente)
+        self._elemento('tipoEmision', config.tipo_emision)
+        self._elemento('razonSocial', documento.razon_social_emisor)
+        self._elemento('ruc', ruc)
+        self._elemento('claveAcceso', clave_acceso(documento.fecha_emision, cod_doc, ruc, secuencial, config))
+        self._elemento('codDoc', cod_doc)
+        self._elemento('estab', config.establecimiento)
+        self._elemento('ptoEmi', config.punto_emision)
+        self._elemento('secuencial', secuencial)
+        self._elemento('dirMatriz', ", ".join(p for p in (direccion.calle, direccion.ciudad) if p))
+        self.cerrar('infoTributaria')
+
+    def _comprador(self, identificacion: str):
+        # El dominio no guarda la razón social del comprador: se usa su identificación
+        tipo = _tipo_identificacion(identificacion)
+        self._elemento('tipoIdentificacionComprador', tipo)
+        self._elemento('razonSocialComprador', 'CONSUMIDOR FINAL' if tipo == '07' else identificacion)
+        self._elemento('identificacionComprador', identificacion)
+
+    def _total_con_impuestos(self, lineas, moneda: str):
+        # Mismas bases y redondeo que los totales del documento (bases_por_grupo / resumir)
+        ice_por_codigo: Dict[str, List[int]] = {}
+        for linea in lineas:
+            if linea.tarifa_ice:
+                acumulado = ice_por_codigo.setdefault(_codigo_ice(linea), [0, 0])
+                acumulado[0] += linea.valor_total.micros
+                acumulado[1] += ice_linea(linea.valor_total.micros, linea.tarifa_ice)
+        self.abrir('totalConImpuestos')
+        for (tipo, tarifa), (base, ice) in bases_por_grupo(lineas, moneda).items():
+            iva = 0 if tipo in (TIPO_EXENTO, TIPO_NO_OBJETO) else redondear_a_centavos(aplicar_porcentaje(base + ice, tarifa))
+            self._total_impuesto(IMPUESTO_IVA, _codigo_porcentaje_iva(tipo, tarifa), base + ice, iva, moneda)
+        for codigo, (base, ice) in ice_por_codigo.items():
+            self._total_impuesto(IMPUESTO_ICE, codigo, base, ice, moneda)
+        self.cerrar('totalConImpuestos')
+
+    def _total_impuesto(self, codigo: str, codigo_porcentaje: str, base: int, valor: int, moneda: str):
+        self.abrir('totalImpuesto')
+        self._elemento('codigo', codigo)
+        self._elemento('codigoPorcentaje', codigo_porcentaje)
+        self._elemento('baseImponible', _dos_decimales(Money(base, moneda)))
+        self._elemento('valor', _dos_decimales(Money(valor, moneda)))
+        self.cerrar('totalImpuesto')
+
+    def _impuestos_linea(self, linea):
+        valor = linea.valor_total
+        ice = ice_linea(valor.micros, linea.tarifa_ice)
+        base_iva = valor.micros + ice
+        exenta = linea.tipo_impuesto in (TIPO_EXENTO, TIPO_NO_OBJETO)
+        tarifa = Decimal('0') if exenta else linea.porcentaje_iva
+        self.abrir('impuestos')
+        self._impuesto(IMPUESTO_IVA, _codigo_porcentaje_iva(linea.tipo_impuesto, linea.porcentaje_iva), tarifa,
+                       Money(base_iva, valor.moneda),
+                       Money(0 if exenta else redondear_a_centavos(aplicar_porcentaje(base_iva, tarifa)), valor.moneda))
+        if ice:
+            self._impuesto(IMPUESTO_ICE, _codigo_ice(linea), linea.tarifa_ice, valor, Money(ice, valor.moneda))
+        self.cerrar('impuestos')
+
+    def _impuesto(self, codigo: str, codigo_porcentaje: str, tarifa: Decimal, base: Money, valor: Money):
+        self.abrir('impuesto')
+        self._elemento('codigo', codigo)
+        self._elemento('codigoPorcentaje', codigo_porcentaje)
+        self._elemento('tarifa', f"{Decimal(tarifa).normalize():f}")  # 150, no 1.5E+2
+        self._elemento('baseImponible', _dos_decimales(base))
+        self._elemento('valor', _dos_decimales(valor))
+        self.cerrar('impuesto')
+
+    def _elemento(self, nombre: str, texto: str):
+        self._escribir(f"<{nombre}>{escape(texto)}</{nombre}>")
+
+def a_xml(documento, config: ConfiguracionSRI = ConfiguracionSRI(), fecha_sustento: Optional[date] = None) -> str:
+    # Un comprobante completo con su declaración, listo para firmar y enviar al SRI
+    salida = StringIO()
+    escritor = EscritorXMLSRI(salida, config)
+    escritor.declaracion()
+    escritor.documento(documento, fecha_sustento)
+    return salida.getvalue()
+
+def _serializar_bloque(documentos: List[Tuple[object, Optional[date]]], config: ConfiguracionSRI) -> str:
+    # Tarea de un proceso del pool: recibe las entidades raíz (no los aggregates) y devuelve el fragmento XML
+    salida = StringIO()
+    escritor = EscritorXMLSRI(salida, config)
+    for raiz, fecha_sustento in documentos:
+        escritor.documento(raiz, fecha_sustento)
+    return salida.getvalue()
+
+def exportar(documentos: Iterable, destino: Union[str, IO[str]], config: ConfiguracionSRI = ConfiguracionSRI(),
+             procesos: int = 1, tamano_bloque: int = 200, fechas_sustento: Optional[FechasSustento] = None) -> int:
+    # Exportación masiva (auditoría): todos los comprobantes bajo <comprobantes>, en el orden de entrada.
+    # destino: ruta (gzip si termina en .gz) o flujo de texto. Memoria acotada por bloque, no por total:
+    # consume la entrada por bloques (e.g., FacturaRepository.iterar) y cada bloque se escribe al terminar.
+    if isinstance(destino, str):
+        abrir = gzip.open if destino.endswith('.gz') else open
+        with abrir(destino, 'wt', encoding='utf-8') as salida:
+            return exportar(documentos, salida, config, procesos, tamano_bloque, fechas_sustento)
+
+    escritor = EscritorXMLSRI(destino, config)
+    escritor.declaracion()
+    escritor.abrir('comprobantes')
+    escritor.salto()
+    total = 0
+    bloques = _bloques(documentos, tamano_bloque, fechas_sustento)
+    if procesos <= 1:
+        for bloque in bloques:
+            destino.write(_serializar_bloque(bloque, config))
+            total += len(bloque)
+    else:
+        with ProcessPoolExecutor(procesos) as pool:
+            pendientes = deque()  # En orden de entrada; a lo sumo 2 bloques por proceso en vuelo
+            for bloque in bloques:
+                if len(pendientes) >= 2 * procesos:
+                    destino.write(pendientes.popleft().result())
+                pendientes.append(pool.submit(_serializar_bloque, bloque, config))
+                total += len(bloque)
+            while pendientes:
+                destino.write(pendientes.popleft().result())
+    escritor.cerrar('comprobantes')
+    escritor.salto()
+    return total
+
+def _bloques(documentos: Iterable, tamano_bloque: int,
+             fechas_sustento: Optional[FechasSustento]) -> Iterable[List[Tuple[object, Optional[date]]]]:
+    # Las fechas de las facturas modificadas por las notas de crédito se resuelven una vez por bloque
+    entrada = iter(documentos)
+    while True:
+        raices = [getattr(d, 'root', d) for d in islice(entrada, tamano_bloque)]
+        if not raices:
+            return
+        ids = {r.id_factura_modificada for r in raices if isinstance(r, NotaCredito)}
+        fechas = fechas_sustento(ids) if ids and fechas_sustento else {}
+        yield [(r, fechas.get(r.id_factura_modificada) if isinstance(r, NotaCredito) else None) for r in raices]
@@ -0,0 +1,71 @@
+# tests/test_async_factura_service.py
+import asyncio
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import uuid4
+from sqlalchemy import func, select
+from domain.services.async_factura_service import AsyncFacturaService
+from domain.services.async_inventario_service import AsyncInventarioService
+from domain.services.contabilizacion import ContabilizadorDocumentos, CuentasContabilizacion
+from domain.value_objects.direccion import Direccion
+from infrastructure.persistence.database import (
+    ConfiguracionBD, crear_engine, crear_engine_async, crear_sesiones, crear_sesiones_async
+)
+from infrastructure.persistence.modelos import (
+    Base, FiscalPeriodDB, JournalEntryDB, LedgerLineDB, LoteDB, ProductDB
+)
+from infrastructure.persistence.unidad_de_trabajo_async import UnidadDeTrabajoAsync
+
+ENTIDAD = uuid4()
+DATOS = {
+    'id_sucursal': 1,
+    'id_bodega': 1,
+    'ruc_emisor': '1790012345001',
+    'identificacion_adquiriente': '0912345678',
+    'direccion_matriz': Direccion('Av. Amazonas', 'Quito'),
+    'razon_social_emisor': 'Prometeo S.A.',
+    'lineas': [{'id_producto': 1, 'cantidad': 15, 'precio_unitario': '2.50'}],
+}
+
+def nueva_base(tmp_path) -> ConfiguracionBD:
+    config = ConfiguracionBD(url=f"sqlite:///{tmp_path / 'async.db'}")
+    engine = crear_engine(config)
+    Base.metadata.create_all(engine)
+    session = crear_sesiones(engine)()
+    hoy, ahora = date.today(), datetime.now()
+    session.add(FiscalPeriodDB(period_id=uuid4(), entity_id=ENTIDAD, period_code=f"{hoy:%Y}",
+                               start_date=date(hoy.year, 1, 1), end_date=date(hoy.year, 12, 31), created_at=ahora))
+    session.add(ProductDB(product_id=uuid4(), entity_id=ENTIDAD, code='1', name='Producto 1', type='GOOD',
+                          revenue_account_id=uuid4(), cost_account_id=uuid4(), inventory_account_id=uuid4(),
+                          created_at=ahora))
+    session.add(LoteDB(id_producto=1, id_bodega=1, fecha_entrada=date(2024, 1, 1), cantidad_restante=20,
+                       costo_unitario=Decimal('1.00'), version=0))
+    session.commit()
+    session.close()
+    engine.dispose()
+    return config
+
+def test_emision_asincrona_contabiliza_en_la_misma_transaccion(tmp_path):
+    config = nueva_base(tmp_path)
+
+    async def emitir():
+        engine = crear_engine_async(config)
+        uow = UnidadDeTrabajoAsync(crear_sesiones_async(engine))
+        contabilizador = ContabilizadorDocumentos(uow.asientos, uow.cuentas_producto, uow.periodos,
+                                                  CuentasContabilizacion(uuid4(), uuid4()), id_entidad=ENTIDAD)
+        servicio = AsyncFacturaService(uow.facturas, AsyncInventarioService(uow.lotes),
+                                       contabilizador=contabilizador, en_sincrono=uow.en_sincrono)
+        try:
+            return await uow.ejecutar(lambda: servicio.crear_y_emitir_factura(DATOS))
+        finally:
+            await engine.dispose()
+
+    aggregate = asyncio.run(emitir())
+    engine = crear_engine(config)
+    session = crear_sesiones(engine)()
+    descripciones = session.scalars(select(JournalEntryDB.description)).all()
+    debe, haber = session.execute(select(func.sum(LedgerLineDB.debit), func.sum(LedgerLineDB.credit))).one()
+    session.close()
+    engine.dispose()
+    assert descripciones == [f"Factura {aggregate.root.id_factura}"]
+    assert debe == haber > 0
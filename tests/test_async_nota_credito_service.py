@@ -0,0 +1,109 @@
+# tests/test_async_nota_credito_service.py
+import asyncio
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+from sqlalchemy import func, select, update
+from domain.services.async_inventario_service import AsyncInventarioService
+from domain.services.async_nota_credito_service import AsyncNotaCreditoService
+from domain.services.contabilizacion import (
+    ContabilizadorDocumentos, CuentasContabilizacion, descripcion_nota_credito
+)
+from domain.services.factura_service import FacturaService
+from domain.services.inventario_service import InventarioService
+from domain.value_objects.direccion import Direccion
+from infrastructure.persistence.database import (
+    ConfiguracionBD, crear_engine, crear_engine_async, crear_sesiones, crear_sesiones_async
+)
+from infrastructure.persistence.modelos import (
+    Base, FacturaDB, FiscalPeriodDB, JournalEntryDB, LedgerLineDB, LoteDB, ProductDB
+)
+from infrastructure.persistence.unidad_de_trabajo import UnidadDeTrabajoSQL
+from infrastructure.persistence.unidad_de_trabajo_async import UnidadDeTrabajoAsync
+
+DIRECCION = Direccion('Av. Amazonas', 'Quito')
+ENTIDAD = uuid4()
+
+def nueva_base(tmp_path) -> tuple:
+    # Factura de ayer por 4 unidades del producto 1; devuelve (configuración, id de la factura)
+    config = ConfiguracionBD(url=f"sqlite:///{tmp_path / 'async_notas.db'}")
+    engine = crear_engine(config)
+    Base.metadata.create_all(engine)
+    uow = UnidadDeTrabajoSQL(crear_sesiones(engine))
+    hoy, ahora = date.today(), datetime.now()
+    with uow:
+        uow.session.add(FiscalPeriodDB(period_id=uuid4(), entity_id=ENTIDAD, period_code=f"{hoy:%Y}",
+                                       start_date=date(hoy.year, 1, 1), end_date=date(hoy.year, 12, 31),
+                                       created_at=ahora))
+        uow.session.add(ProductDB(product_id=uuid4(), entity_id=ENTIDAD, code='1', name='Producto 1', type='GOOD',
+                                  revenue_account_id=uuid4(), cost_account_id=uuid4(),
+                                  inventory_account_id=uuid4(), created_at=ahora))
+        uow.session.add(LoteDB(id_producto=1, id_bodega=1, fecha_entrada=date(2024, 1, 1), cantidad_restante=10,
+                               costo_unitario=Decimal('1.00'), version=0))
+    with uow:
+        factura = FacturaService(uow.facturas, InventarioService(uow.lotes)).crear_y_emitir_factura({
+            'id_sucursal': 1, 'id_bodega': 1, 'ruc_emisor': '1790012345001',
+            'identificacion_adquiriente': '0912345678', 'direccion_matriz': DIRECCION,
+            'razon_social_emisor': 'Prometeo S.A.',
+            'lineas': [{'id_producto': 1, 'cantidad': 4, 'precio_unitario': '9.00'}],
+        })
+        ayer = date.today() - timedelta(days=1)
+        uow.session.execute(update(FacturaDB).where(FacturaDB.id_factura == factura.root.id_factura)
+                            .values(fecha_emision=ayer, fecha_autorizacion=ayer))
+    engine.dispose()
+    return config, factura.root.id_factura
+
+def datos_nota(id_factura: int, cantidad: int) -> dict:
+    return {'id_sucursal': 1, 'id_factura_modificada': id_factura, 'ruc_emisor': '1790012345001',
+            'identificacion_adquiriente': '0912345678', 'direccion_matriz': DIRECCION,
+            'razon_social_emisor': 'Prometeo S.A.', 'motivo': 'Devolución',
+            'lineas': [{'id_producto': 1, 'cantidad': cantidad}]}
+
+def test_notas_concurrentes_no_acreditan_mas_de_lo_facturado(tmp_path):
+    config, id_factura = nueva_base(tmp_path)
+
+    async def emitir():
+        engine = crear_engine_async(config)
+        uow = UnidadDeTrabajoAsync(crear_sesiones_async(engine))
+        servicio = AsyncNotaCreditoService(uow.notas_credito, uow.facturas, AsyncInventarioService(uow.lotes))
+        try:
+            resultados = await asyncio.gather(*(
+                uow.ejecutar(lambda: servicio.crear_y_emitir_nota_credito(datos_nota(id_factura, 3)))
+                for _ in range(2)
+            ), return_exceptions=True)
+            async with uow:
+                acreditadas = await uow.notas_credito.obtener_cantidades_acreditadas(id_factura)
+            return resultados, acreditadas, servicio._cerrojos_factura
+        finally:
+            await engine.dispose()
+
+    resultados, acreditadas, cerrojos = asyncio.run(emitir())
+    rechazadas = [r for r in resultados if isinstance(r, Exception)]
+    assert len(rechazadas) == 1 and isinstance(rechazadas[0], ValueError)
+    assert acreditadas == {1: 3}
+    assert cerrojos == {}  # Ninguno queda después de la última nota
+
+def test_nota_asincrona_contabiliza_en_la_misma_transaccion(tmp_path):
+    config, id_factura = nueva_base(tmp_path)
+
+    async def emitir():
+        engine = crear_engine_async(config)
+        uow = UnidadDeTrabajoAsync(crear_sesiones_async(engine))
+        contabilizador = ContabilizadorDocumentos(uow.asientos, uow.cuentas_producto, uow.periodos,
+                                                  CuentasContabilizacion(uuid4(), uuid4()), id_entidad=ENTIDAD)
+        servicio = AsyncNotaCreditoService(uow.notas_credito, uow.facturas, AsyncInventarioService(uow.lotes),
+                                           contabilizador=contabilizador, en_sincrono=uow.en_sincrono)
+        try:
+            return await uow.ejecutar(lambda: servicio.crear_y_emitir_nota_credito(datos_nota(id_factura, 2)))
+        finally:
+            await engine.dispose()
+
+    nota = asyncio.run(emitir())
+    engine = crear_engine(config)
+    session = crear_sesiones(engine)()
+    descripciones = session.scalars(select(JournalEntryDB.description)).all()
+    debe, haber = session.execute(select(func.sum(LedgerLineDB.debit), func.sum(LedgerLineDB.credit))).one()
+    session.close()
+    engine.dispose()
+    assert descripciones == [descripcion_nota_credito(nota)]
+    assert debe == haber > 0
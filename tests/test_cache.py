@@ -0,0 +1,47 @@
+# tests/test_cache.py
+from decimal import Decimal
+import pytest
+from domain.value_objects.money import Money
+from domain.value_objects.precio import Precio
+from infrastructure.persistence.cache import ProductoRepositoryCache
+from infrastructure.persistence.modelos import ProductoDB
+
+PRECIO_ANTERIOR, PRECIO_NUEVO = Money.de_decimal('2.50'), Money.de_decimal('3.00')
+
+@pytest.fixture
+def productos(uow):
+    with uow:
+        uow.session.add(ProductoDB(id_producto=1, nombre_producto='Producto 1', precio_base=Decimal('2.50')))
+    productos = ProductoRepositoryCache(uow.productos)
+    uow.al_confirmar(productos.confirmar)
+    uow.al_revertir(productos.revertir)
+    with uow:
+        productos.obtener_por_id(1)  # Queda en caché
+    return productos
+
+def precio_en_cache(productos) -> Money:
+    return productos.cache.obtener(1).precio_base.monto
+
+def cambiar_precio(productos):
+    producto = productos.obtener_por_id(1)
+    producto.root.actualizar_precio(Precio(PRECIO_NUEVO))
+    productos.guardar(producto)
+
+def test_guardar_invalida_despues_del_commit(uow, productos):
+    with uow:
+        cambiar_precio(productos)
+        assert precio_en_cache(productos) == PRECIO_ANTERIOR  # Los demás hilos siguen leyendo lo confirmado
+        assert productos.obtener_por_id(1).root.precio_base.monto == PRECIO_NUEVO  # Quien guardó ve su cambio
+    assert productos.cache.obtener(1) is None
+    with uow:
+        assert productos.obtener_por_id(1).root.precio_base.monto == PRECIO_NUEVO
+    assert precio_en_cache(productos) == PRECIO_NUEVO
+
+def test_guardar_revertido_conserva_la_cache(uow, productos):
+    with pytest.raises(RuntimeError):
+        with uow:
+            cambiar_precio(productos)
+            raise RuntimeError("Falla antes del commit")
+    assert precio_en_cache(productos) == PRECIO_ANTERIOR
+    with uow:
+        assert productos.obtener_por_id(1).root.precio_base.monto == PRECIO_ANTERIOR
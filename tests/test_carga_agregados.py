@@ -0,0 +1,90 @@
+# tests/test_carga_agregados.py
+# Cada agregado se reconstruye en un número fijo de consultas, sin importar cuántas líneas o inventarios tenga
+# ni cuántos se pidan a obtener_muchos
+from contextlib import contextmanager
+from decimal import Decimal
+import pytest
+from sqlalchemy import event
+from domain.services.factura_service import FacturaService
+from domain.services.inventario_service import InventarioService
+from domain.services.nota_credito_service import construir_nota_credito, lineas_nota_desde
+from domain.value_objects.direccion import Direccion
+from infrastructure.persistence.modelos import InventarioDB, ProductoDB
+
+DIRECCION = Direccion('Av. Amazonas', 'Quito')
+
+@contextmanager
+def contar_consultas(engine):
+    sentencias = []
+    registrar = lambda conn, cursor, sentencia, parametros, contexto, executemany: sentencias.append(sentencia)
+    event.listen(engine, 'before_cursor_execute', registrar)
+    try:
+        yield sentencias
+    finally:
+        event.remove(engine, 'before_cursor_execute', registrar)
+
+@pytest.fixture
+def facturas(uow, crear_lotes):
+    # Cinco facturas de 1 a 5 líneas, cada una con productos distintos
+    crear_lotes(*[(p, 1, 100, '1.00') for p in range(1, 6)])
+    servicio = FacturaService(uow.facturas, InventarioService(uow.lotes))
+    lote_datos = [{
+        'id_sucursal': 1,
+        'id_bodega': 1,
+        'ruc_emisor': '1790012345001',
+        'identificacion_adquiriente': '0912345678',
+        'direccion_matriz': DIRECCION,
+        'razon_social_emisor': 'Prometeo S.A.',
+        'lineas': [{'id_producto': p, 'cantidad': 2, 'precio_unitario': '2.50'} for p in range(1, n + 1)],
+    } for n in range(1, 6)]
+    with uow:
+        resultados = list(servicio.crear_y_emitir_facturas(lote_datos))
+    assert all(r.exitosa for r in resultados)
+    return [r.aggregate.root.id_factura for r in resultados]
+
+def test_facturas_en_consultas_fijas(engine, uow, facturas):
+    with uow, contar_consultas(engine) as una:
+        factura = uow.facturas.obtener_por_id(facturas[-1])
+    with uow, contar_consultas(engine) as todas:
+        cargadas = uow.facturas.obtener_muchos(reversed(facturas))
+    assert len(factura.root.lineas) == 5
+    assert [f.root.id_factura for f in cargadas] == facturas[::-1]
+    assert [len(f.root.lineas) for f in cargadas] == [5, 4, 3, 2, 1]
+    assert (len(una), len(todas)) == (2, 2)  # Raíz con sus totales (joined) y las líneas (selectin)
+
+def test_notas_credito_en_consultas_fijas(engine, uow, facturas):
+    ids = []
+    with uow:
+        for id_factura in facturas:
+            factura = uow.facturas.obtener_por_id(id_factura)
+            datos = {'id_sucursal': 1, 'id_factura_modificada': id_factura, 'ruc_emisor': '1790012345001',
+                     'identificacion_adquiriente': '0912345678', 'direccion_matriz': DIRECCION,
+                     'razon_social_emisor': 'Prometeo S.A.', 'motivo': 'Devolución',
+                     'lineas': [{'id_producto': l.id_producto, 'cantidad': 1} for l in factura.root.lineas]}
+            nota = construir_nota_credito(datos)
+            with nota.edicion():
+                nota.agregar_lineas(list(lineas_nota_desde(datos, factura)))
+            uow.notas_credito.guardar(nota)
+            ids.append(nota.root.id_nota_credito)
+    with uow, contar_consultas(engine) as una:
+        nota = uow.notas_credito.obtener_por_id(ids[-1])
+    with uow, contar_consultas(engine) as todas:
+        cargadas = uow.notas_credito.obtener_muchos(ids)
+    assert len(nota.root.lineas) == 5
+    assert [len(n.root.lineas) for n in cargadas] == [1, 2, 3, 4, 5]
+    assert (len(una), len(todas)) == (2, 2)
+
+def test_productos_en_consultas_fijas(engine, uow):
+    with uow:
+        uow.session.add_all([
+            ProductoDB(id_producto=p, nombre_producto=f'Producto {p}', precio_base=Decimal('2.50'),
+                       inventarios=[InventarioDB(id_bodega=b, cantidad_stock=10 * b) for b in range(1, p + 1)])
+            for p in range(1, 6)
+        ])
+    with uow, contar_consultas(engine) as una:
+        producto = uow.productos.obtener_por_id(5)
+    with uow, contar_consultas(engine) as todos:
+        cargados = uow.productos.obtener_muchos(range(1, 7))  # El 6 no existe y se omite
+    assert len(producto.inventarios) == 5
+    assert [len(p.inventarios) for p in cargados] == [1, 2, 3, 4, 5]
+    assert (len(una), len(todos)) == (2, 2)  # Productos e inventarios (selectin)
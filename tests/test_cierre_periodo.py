@@ -0,0 +1,80 @@
+# tests/test_cierre_periodo.py
+from datetime import date, datetime
+from uuid import uuid4
+import pytest
+from sqlalchemy import select
+from domain.entities.asiento_contable import AsientoContable
+from domain.services.cierre_periodo import CierrePeriodoService
+from domain.services.contabilizacion import ContabilizadorDocumentos, CuentasContabilizacion
+from infrastructure.persistence.modelos import AccountBalanceDB, FiscalPeriodDB
+
+ENTIDAD, CAJA, VENTAS, CENTRO = uuid4(), uuid4(), uuid4(), uuid4()
+ENERO, FEBRERO, MARZO = uuid4(), uuid4(), uuid4()
+
+def periodos(uow):
+    with uow:
+        uow.session.add_all([
+            FiscalPeriodDB(period_id=i, entity_id=ENTIDAD, period_code=f'2025-{mes:02d}', start_date=date(2025, mes, 1),
+                           end_date=date(2025, mes, 28), created_at=datetime(2025, 1, 1))
+            for mes, i in ((1, ENERO), (2, FEBRERO), (3, MARZO))
+        ])
+
+def asiento(id_periodo, fecha, micros, id_centro_costo=None) -> AsientoContable:
+    asiento = AsientoContable(id_entidad=ENTIDAD, id_periodo=id_periodo, fecha=fecha, descripcion='Venta')
+    asiento.registrar(CAJA, micros)
+    asiento.registrar(VENTAS, -micros)
+    asiento.lineas[-1].id_centro_costo = id_centro_costo
+    return asiento
+
+def contabilizador(uow) -> ContabilizadorDocumentos:
+    return ContabilizadorDocumentos(uow.asientos, uow.cuentas_producto, uow.periodos,
+                                    CuentasContabilizacion(CAJA, uuid4()), id_entidad=ENTIDAD, saldo_repo=uow.saldos)
+
+def cierre(uow, id_periodo):
+    return sorted((s.id_cuenta == CAJA, s.id_centro_costo is not None, s.debe, s.haber, s.lineas)
+                  for s in uow.saldos.obtener_cierre(ENTIDAD, id_periodo))
+
+def test_cierres_sucesivos_arrastran_los_saldos(uow):
+    periodos(uow)
+    cierres = CierrePeriodoService(uow.periodos, uow.asientos, uow.saldos)
+    contable = contabilizador(uow)
+    for micros in (1_000_000, 2_500_000):  # Dos lotes sobre los mismos saldos sin centro de costo
+        with uow:
+            contable.guardar([asiento(ENERO, date(2025, 1, 10), micros)])
+    with uow:
+        contable.guardar([asiento(ENERO, date(2025, 1, 20), 500_000, CENTRO)])
+    with uow:
+        filas = uow.session.scalars(select(AccountBalanceDB).where(AccountBalanceDB.period_id == ENERO)).all()
+        assert len(filas) == 3  # Caja, ventas sin centro y ventas con centro: el upsert no duplica la fila NULL
+        assert cierres.cerrar(ENTIDAD, ENERO).cerrado
+    with uow:
+        contable.guardar([asiento(FEBRERO, date(2025, 2, 5), 4_000_000),
+                          asiento(FEBRERO, date(2025, 2, 6), 10_000, CENTRO)])
+    with uow:
+        cierres.cerrar(ENTIDAD, FEBRERO)
+
+    with uow:
+        assert cierre(uow, ENERO) == [(False, False, 0, 3_500_000, 2), (False, True, 0, 500_000, 1),
+                                      (True, False, 4_000_000, 0, 3)]
+        assert cierre(uow, FEBRERO) == [(False, False, 0, 7_500_000, 3), (False, True, 0, 510_000, 2),
+                                        (True, False, 8_010_000, 0, 5)]
+        with pytest.raises(ValueError, match='Período 2025-01 cerrado'):
+            contable.guardar([asiento(ENERO, date(2025, 1, 30), 1_000_000)])
+
+def test_cierre_fallido_se_revierte_con_la_transaccion(uow):
+    periodos(uow)
+    cierres = CierrePeriodoService(uow.periodos, uow.asientos, uow.saldos)
+    descuadrado = AsientoContable(id_entidad=ENTIDAD, id_periodo=ENERO, fecha=date(2025, 1, 10),
+                                  descripcion='Descuadrado')
+    descuadrado.registrar(CAJA, 1_000_000)
+    descuadrado.registrar(VENTAS, -990_000)
+    with uow:
+        uow.asientos.guardar_muchos([descuadrado])
+    with pytest.raises(ValueError, match='Período 2025-01: asientos descuadrados'):
+        with uow:
+            cierres.cerrar(ENTIDAD, ENERO)
+    with uow:
+        assert not uow.periodos.obtener_cerrados([ENERO])
+    with pytest.raises(ValueError, match='el período anterior 2025-01 no está cerrado'):
+        with uow:
+            cierres.cerrar(ENTIDAD, FEBRERO)
@@ -0,0 +1,41 @@
+# tests/test_entidades_compactas.py
+import copy
+from decimal import Decimal
+from uuid import uuid4
+import pytest
+from domain.entities.asiento_contable import LineaAsiento
+from domain.entities.linea_factura import LineaFactura
+from domain.entities.linea_nota_credito import LineaNotaCredito
+from domain.entities.movimiento_inventario import MovimientoInventario
+from domain.value_objects.money import Money
+from domain.value_objects.precio import Precio
+
+def entidades():
+    return [
+        LineaFactura(1, 'Café', 3, Precio.de_decimal(Decimal('4.125'))),
+        LineaNotaCredito(1, 'Café', 1, Money.de_decimal('4.125')),
+        MovimientoInventario(1, 1, 'SALIDA', 3, Money.de_decimal('1.00'), id_factura=7),
+        LineaAsiento(uuid4(), Money.de_decimal('1.00'), Money.cero()),
+    ]
+
+@pytest.mark.parametrize('entidad', entidades(), ids=lambda e: type(e).__name__)
+def test_sin_dict_por_instancia(entidad):
+    assert not hasattr(entidad, '__dict__')
+    with pytest.raises(AttributeError):
+        entidad.cantidad_typo = 1  # Un error de tipeo ya no crea un atributo nuevo en silencio
+
+def test_lineas_conservan_el_comportamiento_de_dataclass():
+    linea = LineaFactura(1, 'Café', 3, Precio.de_decimal(Decimal('4.125')))
+    assert linea.valor_total == Money.de_decimal('12.38')  # Calculado en __post_init__, a centavos
+    assert linea == LineaFactura(1, 'Café', 3, Precio.de_decimal(Decimal('4.125')))
+    assert (linea.porcentaje_iva, linea.tarifa_ice, linea.id_linea_factura) == (Decimal('12'), Decimal('0'), None)
+    copia = copy.copy(linea)
+    copia.aplicar_descuento(Decimal('10'))
+    assert copia.valor_total == Money.de_decimal('11.14') and linea.valor_total == Money.de_decimal('12.38')
+    with pytest.raises(ValueError, match='Cantidad debe ser positiva.'):
+        LineaNotaCredito(1, 'Café', 0, Money.de_decimal('1.00'))
+
+def test_movimiento_expone_sus_campos_por_nombre():
+    movimiento = MovimientoInventario(1, 2, 'ENTRADA', 5, Money.de_decimal('1.50'), id_nota_credito=3)
+    assert (movimiento.id_bodega, movimiento.id_factura, movimiento.id_nota_credito) == (2, None, 3)
+    assert repr(movimiento) == "<MovimientoInventario producto=1 bodega=2 tipo=ENTRADA cantidad=5 costo=1.50 USD>"
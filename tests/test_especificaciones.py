@@ -0,0 +1,76 @@
+# tests/test_especificaciones.py
+from datetime import date, timedelta
+import pytest
+from domain.aggregates import factura_aggregate, nota_credito_aggregate
+from domain.aggregates.factura_aggregate import FacturaAggregate
+from domain.aggregates.nota_credito_aggregate import NotaCreditoAggregate
+from domain.specifications.specification import EspecificacionFecha, Specification, SpecificationCompilada
+
+class Regla(Specification):
+    # Cumple si el candidato (un conjunto) contiene su clave; registra cada evaluación
+    def __init__(self, clave, evaluadas):
+        self.clave = clave
+        self.evaluadas = evaluadas
+
+    @property
+    def nombre(self) -> str:
+        return self.clave
+
+    def is_satisfied_by(self, candidato) -> bool:
+        self.evaluadas.append(self.clave)
+        return self.clave in candidato
+
+class AntesDeHoy(EspecificacionFecha):
+    def is_satisfied_by(self, fecha) -> bool:
+        return fecha < self.hoy()
+
+def test_compilada_aplana_la_conjuncion_en_orden_y_corta_en_la_primera_falla():
+    evaluadas = []
+    a, b, c, d = (Regla(clave, evaluadas) for clave in 'abcd')
+    compilada = ((a & b) & (c & d)).compilar()
+    assert [nombre for nombre, _ in compilada.chequeos] == ['a', 'b', 'c', 'd']
+    assert not compilada.is_satisfied_by({'a', 'c', 'd'})
+    assert evaluadas == ['a', 'b']
+    evaluadas.clear()
+    assert compilada.fallas({'a', 'c'}) == ['b', 'd']
+    assert evaluadas == ['a', 'b', 'c', 'd']  # fallas reporta todas las reglas
+
+def test_or_y_not_conservan_su_nombre():
+    evaluadas = []
+    a, b, c = (Regla(clave, evaluadas) for clave in 'abc')
+    compilada = SpecificationCompilada.desde([a | b, ~c])
+    assert [nombre for nombre, _ in compilada.chequeos] == ['(a | b)', '~c']
+    assert compilada.evaluate_many([{'a'}, {'c'}, {'b', 'c'}, set()]) == {1: ['(a | b)', '~c'], 2: ['~c'],
+                                                                         3: ['(a | b)']}
+
+def test_reglas_de_fecha_quedan_fijadas_al_compilar():
+    regla = AntesDeHoy()
+    fijada = regla.compilar(hoy=date(2024, 1, 10))
+    assert fijada.is_satisfied_by(date(2024, 1, 9)) and not fijada.is_satisfied_by(date(2024, 1, 10))
+    negada = (~regla).compilar(hoy=date(2024, 1, 10))  # También dentro de una composición
+    assert negada.is_satisfied_by(date(2024, 1, 10)) and not negada.is_satisfied_by(date(2024, 1, 9))
+    assert regla.is_satisfied_by(date.today() - timedelta(days=1)) and regla._hoy is None  # La original no cambia
+
+@pytest.mark.parametrize('modulo, clase', [(factura_aggregate, FacturaAggregate),
+                                           (nota_credito_aggregate, NotaCreditoAggregate)])
+def test_invariantes_se_compilan_una_vez_por_dia(monkeypatch, modulo, clase):
+    class Fecha(date):
+        actual = date(2024, 3, 5)
+
+        @classmethod
+        def today(cls):
+            return cls.actual
+
+    monkeypatch.setattr(modulo, 'date', Fecha)
+    monkeypatch.setattr(clase, '_compiladas', None)
+    compiladas = []
+    desde = SpecificationCompilada.desde
+    monkeypatch.setattr(SpecificationCompilada, 'desde',
+                        classmethod(lambda cls, specs, hoy=None: compiladas.append(hoy) or desde(specs, hoy)))
+
+    primera = clase._invariantes()
+    assert clase._invariantes() is primera and compiladas == [date(2024, 3, 5)]
+    Fecha.actual = date(2024, 3, 6)
+    segunda = clase._invariantes()
+    assert segunda is not primera and clase._invariantes() is segunda
+    assert compiladas == [date(2024, 3, 5), date(2024, 3, 6)]
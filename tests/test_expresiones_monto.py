@@ -0,0 +1,123 @@
+# tests/test_expresiones_monto.py
+from datetime import datetime, timedelta
+from uuid import uuid4
+import pytest
+from sqlalchemy import update
+from domain.entities.plantilla_asiento import LADO_CREDITO, LADO_DEBITO, LineaPlantilla, PlantillaAsiento
+from domain.entities.totales_factura import TotalesFactura
+from domain.services.expresiones_monto import compilar_expresion
+from domain.services.plantillas_asiento import CompiladorPlantillas, PlantillaCompilada
+from domain.value_objects.money import Money
+from infrastructure.persistence.modelos import JournalTemplateDB, JournalTemplateLineDB
+
+def totales(subtotal='100.00', iva='12.00', ice='0.00') -> TotalesFactura:
+    return TotalesFactura(id_factura=1, valor_subtotal=Money.de_decimal(subtotal), valor_iva=Money.de_decimal(iva),
+                          valor_ice=Money.de_decimal(ice))
+
+def evaluar(texto: str, documento=None) -> Money:
+    return Money(compilar_expresion(texto).evaluar(documento or totales()))
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('1 + 2 * 3', '7'),
+    ('(1 + 2) * 3', '9'),
+    ('10 - 4 - 3', '3'),  # Asociativa por la izquierda
+    ('12 / 2 / 3', '2'),
+    ('-valor_subtotal + 5', '-95'),
+    ('- -2', '2'),
+    ('2 * -3', '-6'),
+    ('+valor_iva', '12'),
+    ('valor_subtotal * 30%', '30'),
+    ('valor_subtotal * 12.5% + valor_iva', '24.5'),
+    ('2 / 3', '0.666667'),  # Mitad hacia arriba a la micro-unidad
+    ('-2 / 3', '-0.666667'),
+    ('redondear(valor_subtotal / 3)', '33.33'),
+    ('redondear(0.005)', '0.01'),
+    ('redondear(-0.005)', '-0.01'),
+    ('min(valor_iva, 10) + max(1, 2, valor_ice) + abs(-1)', '13'),
+    ('VALOR_SUBTOTAL', '100'),
+])
+def test_gramatica(texto, esperado):
+    assert evaluar(texto) == Money.de_decimal(esperado)
+
+def test_pliega_constantes_al_compilar():
+    assert compilar_expresion('max(1, 2) * (3 + 12%) - abs(-1)').constante == 5_240_000
+    expresion = compilar_expresion('valor_subtotal * (2 + 3)')
+    assert (expresion.constante, expresion.campos) == (None, frozenset({'valor_subtotal'}))
+    assert Money(expresion.evaluar(totales())) == Money.de_decimal('500')
+
+@pytest.mark.parametrize('texto, mensaje', [
+    ('1 / 0', "División por cero en la expresión de monto."),
+    ('valor_subtotal / (2 - 2)', "División por cero en la expresión de monto."),
+    ('valor_foo + 1', "Expresión inválida 'valor_foo + 1': campo desconocido 'valor_foo' (posición 0)"),
+    ('1 + raiz(4)', "Expresión inválida '1 + raiz(4)': función desconocida 'raiz' (posición 4)"),
+    ('min(1)', "Expresión inválida 'min(1)': número de argumentos inválido para min() (posición 6)"),
+    ('1 $ 2', "Expresión inválida '1 $ 2': carácter no permitido '$' (posición 2)"),
+    ('(1 + 2', "Expresión inválida '(1 + 2': se esperaba ')' (posición 6)"),
+    ('1 2', "Expresión inválida '1 2': símbolo inesperado '2' (posición 2)"),
+    ('   ', "Expresión de monto vacía."),
+    ('1' * 201, "Expresión de monto de más de 200 caracteres."),
+    ('(' * 33 + '1' + ')' * 33, f"Expresión inválida '{'(' * 33}1{')' * 33}': anidamiento excesivo (posición 33)"),
+    ('-' * 33 + '1', f"Expresión inválida '{'-' * 33}1': anidamiento excesivo (posición 33)"),
+])
+def test_errores_de_compilacion(texto, mensaje):
+    with pytest.raises(ValueError) as error:
+        compilar_expresion(texto)
+    assert str(error.value) == mensaje
+
+def test_profundidad_maxima_admitida():
+    assert evaluar('(' * 32 + '1' + ')' * 32) == Money.de_decimal('1')
+
+def test_division_por_cero_al_evaluar():
+    expresion = compilar_expresion('valor_subtotal / valor_ice')
+    with pytest.raises(ValueError, match='División por cero en la expresión de monto.'):
+        expresion.evaluar(totales())
+
+def test_evaluar_y_evaluar_lote_coinciden():
+    expresiones = ['valor_subtotal * 30%', 'redondear(valor_iva / 3) - valor_ice', 'valor_subtotal * 30%',
+                   'max(valor_subtotal - 50, 0)', '1.5']
+    plantilla = PlantillaCompilada(PlantillaAsiento(
+        uuid4(), uuid4(), 'VENTA', 'Venta',
+        [LineaPlantilla(uuid4(), LADO_DEBITO if i % 2 else LADO_CREDITO, e) for i, e in enumerate(expresiones)]))
+    documentos = [totales(f'{10 * i}.25', f'{i}.37', f'{i % 3}.10') for i in range(20)]
+    assert plantilla.evaluar_lote(documentos) == [plantilla.evaluar(d) for d in documentos]
+    assert plantilla.evaluar_lote([]) == []
+
+def test_error_de_plantilla_indica_la_linea():
+    linea = LineaPlantilla(uuid4(), LADO_DEBITO, 'valor_foo')
+    with pytest.raises(ValueError, match=f"Plantilla VENTA, línea {linea.id_linea}: .*campo desconocido"):
+        PlantillaCompilada(PlantillaAsiento(uuid4(), uuid4(), 'VENTA', 'Venta', [linea]))
+
+def test_compilador_recompila_solo_la_plantilla_que_cambio(uow):
+    creada = datetime(2024, 1, 1)
+    ids = [uuid4(), uuid4()]
+    lineas = [uuid4(), uuid4()]
+    with uow:
+        uow.session.add_all([
+            JournalTemplateDB(template_id=i, entity_id=uuid4(), code=f'P{n}', name=f'Plantilla {n}', created_at=creada,
+                              lineas=[JournalTemplateLineDB(line_id=l, normal_side=LADO_DEBITO,
+                                                            amount_expression='valor_subtotal', created_at=creada)])
+            for n, (i, l) in enumerate(zip(ids, lineas))
+        ])
+    compilador = CompiladorPlantillas(uow.plantillas)
+    with uow:
+        compilador.obtener_muchos(ids)
+        primera = compilador.obtener(ids[0])
+    assert compilador.compilaciones == 2
+
+    with uow:
+        uow.session.execute(update(JournalTemplateLineDB).where(JournalTemplateLineDB.line_id == lineas[0])
+                            .values(amount_expression='valor_iva', updated_at=creada + timedelta(days=1)))
+    with uow:
+        compiladas = compilador.obtener_muchos(ids)
+    assert compilador.compilaciones == 3  # Solo la plantilla con la línea modificada
+    assert compiladas[ids[0]] is not primera and compiladas[ids[0]].evaluar(totales()) == (12_000_000,)
+    assert compiladas[ids[1]].evaluar(totales()) == (100_000_000,)
+
+    with uow:
+        uow.session.execute(update(JournalTemplateDB).where(JournalTemplateDB.template_id == ids[0])
+                            .values(deleted_at=creada + timedelta(days=2)))
+    with uow:
+        with pytest.raises(ValueError, match='no existe'):
+            compilador.obtener(ids[0])
+        compilador.obtener(ids[1])
+    assert compilador.compilaciones == 3
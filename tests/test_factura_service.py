@@ -0,0 +1,123 @@
+# tests/test_factura_service.py
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import uuid4
+from sqlalchemy import func, select, update
+from domain.services.contabilizacion import ContabilizadorDocumentos, CuentasContabilizacion
+from domain.services.factura_service import FacturaService
+from domain.services.inventario_service import InventarioService
+from domain.value_objects.direccion import Direccion
+from domain.value_objects.money import Money
+from infrastructure.persistence.modelos import (
+    FacturaDB, FiscalPeriodDB, JournalEntryDB, LedgerLineDB, LoteDB, MovimientoInventarioDB, ProductDB
+)
+
+def datos_factura(cantidad: int = 15, **extra) -> dict:
+    datos = {
+        'id_sucursal': 1,
+        'id_bodega': 1,
+        'ruc_emisor': '1790012345001',
+        'identificacion_adquiriente': '0912345678',
+        'direccion_matriz': Direccion('Av. Amazonas', 'Quito'),
+        'razon_social_emisor': 'Prometeo S.A.',
+        'lineas': [{'id_producto': 1, 'cantidad': cantidad, 'precio_unitario': '2.50'}],
+    }
+    datos.update(extra)
+    return datos
+
+def test_emite_y_persiste_una_factura(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'), (1, 1, 10, '2.00'))
+    servicio = FacturaService(uow.facturas, InventarioService(uow.lotes))
+    with uow:
+        aggregate = servicio.crear_y_emitir_factura(datos_factura())
+    # Sin forma de pago en los datos se cobra el total
+    assert aggregate.root.forma_pago.valor == aggregate.root.totales.valor_total
+    with uow:
+        guardada = uow.facturas.obtener_por_id(aggregate.root.id_factura)
+        restantes = [l.cantidad_restante for l in uow.lotes.obtener_lotes_antiguos(1, 1)]
+    assert guardada.root.forma_pago.tipo == 'Efectivo'
+    assert guardada.root.forma_pago.valor == aggregate.root.totales.valor_total
+    assert restantes == [5]
+
+def test_forma_pago_de_los_datos(uow, crear_lotes):
+    crear_lotes((1, 1, 20, '1.00'))
+    servicio = FacturaService(uow.facturas, InventarioService(uow.lotes))
+    with uow:
+        aggregate = servicio.crear_y_emitir_factura(datos_factura(forma_pago={'tipo': 'Tarjeta', 'valor': '100'}))
+    assert aggregate.root.forma_pago.tipo == 'Tarjeta'
+    assert aggregate.root.forma_pago.valor == Money.de_decimal(Decimal('100'))
+
+def test_lote_reporta_cada_factura(uow, crear_lotes):
+    crear_lotes((1, 1, 40, '1.00'))
+    servicio = FacturaService(uow.facturas, InventarioService(uow.lotes))
+    lote_datos = [datos_factura(), datos_factura(cantidad=100), datos_factura(forma_pago={'valor': '0.01'}),
+                  datos_factura()]
+    with uow:
+        resultados = list(servicio.crear_y_emitir_facturas(lote_datos, tamano_bloque=3))
+    assert [r.posicion for r in resultados] == [0, 1, 2, 3]
+    assert [r.exitosa for r in resultados] == [True, False, False, True]
+    assert 'Stock insuficiente' in resultados[1].error
+    assert 'FormaPagoValida' in resultados[2].error
+    with uow:
+        assert [l.cantidad_restante for l in uow.lotes.obtener_lotes_antiguos(1, 1)] == [10]
+
+def test_error_inesperado_revierte_y_reporta_todo_el_bloque(uow, crear_lotes):
+    crear_lotes((1, 1, 40, '1.00'))
+    servicio = FacturaService(uow.facturas, InventarioService(uow.lotes))
+    invalida = datos_factura()
+    invalida['lineas'][0]['precio_unitario'] = 'no es precio'  # decimal.InvalidOperation: no es ValueError
+    lote_datos = [datos_factura(cantidad=100), datos_factura(), invalida, datos_factura(), datos_factura()]
+    with uow:
+        resultados = list(servicio.crear_y_emitir_facturas(lote_datos, tamano_bloque=4))
+    assert [r.posicion for r in resultados] == [0, 1, 2, 3, 4]
+    assert [r.exitosa for r in resultados] == [False, False, False, False, True]
+    assert 'Stock insuficiente' in resultados[0].error
+    assert all(r.error.startswith('Bloque revertido') for r in resultados[1:4])
+    with uow:
+        # Solo la factura del segundo bloque consumió lotes
+        assert [l.cantidad_restante for l in uow.lotes.obtener_lotes_antiguos(1, 1)] == [25]
+
+def test_movimientos_de_salida_llevan_el_id_de_la_factura(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'), (1, 1, 10, '2.00'))
+    servicio = FacturaService(uow.facturas, InventarioService(uow.lotes))
+    with uow:
+        unica = servicio.crear_y_emitir_factura(datos_factura())
+    with uow:
+        resultados = list(servicio.crear_y_emitir_facturas([datos_factura(cantidad=2), datos_factura(cantidad=1)]))
+        en_bloque = [r.aggregate.root.id_factura for r in resultados]
+    with uow:
+        filas = uow.session.execute(
+            select(MovimientoInventarioDB.tipo_movimiento, MovimientoInventarioDB.cantidad,
+                   MovimientoInventarioDB.id_factura).order_by(MovimientoInventarioDB.id_movimiento)
+        ).all()
+    assert [tuple(f) for f in filas] == [
+        ('SALIDA', 10, unica.root.id_factura), ('SALIDA', 5, unica.root.id_factura),
+        ('SALIDA', 2, en_bloque[0]), ('SALIDA', 1, en_bloque[1]),
+    ]
+
+def test_conflicto_al_confirmar_deshace_facturas_y_asientos_del_bloque(uow, crear_lotes):
+    crear_lotes((1, 1, 40, '1.00'))
+    entidad, hoy, ahora = uuid4(), date.today(), datetime.now()
+    with uow:
+        uow.session.add(FiscalPeriodDB(period_id=uuid4(), entity_id=entidad, period_code=f"{hoy:%Y}",
+                                       start_date=date(hoy.year, 1, 1), end_date=date(hoy.year, 12, 31),
+                                       created_at=ahora))
+        uow.session.add(ProductDB(product_id=uuid4(), entity_id=entidad, code='1', name='Producto 1', type='GOOD',
+                                  revenue_account_id=uuid4(), cost_account_id=uuid4(),
+                                  inventory_account_id=uuid4(), created_at=ahora))
+    inventario = InventarioService(uow.lotes)
+    contabilizador = ContabilizadorDocumentos(uow.asientos, uow.cuentas_producto, uow.periodos,
+                                              CuentasContabilizacion(uuid4(), uuid4()), id_entidad=entidad)
+    servicio = FacturaService(uow.facturas, inventario, contabilizador=contabilizador,
+                              punto_de_guardado=uow.punto_de_guardado)
+    with uow:
+        inventario.precargar_lotes([(1, 1)])
+        uow.session.execute(update(LoteDB).values(version=LoteDB.version + 1))  # Otro proceso tocó el lote
+        resultados = list(servicio.crear_y_emitir_facturas([datos_factura(), datos_factura()]))
+    assert all(r.error.startswith('Bloque revertido: ConflictoConcurrencia') for r in resultados)
+    with uow:
+        filas = [uow.session.scalar(select(func.count()).select_from(modelo))
+                 for modelo in (FacturaDB, JournalEntryDB, LedgerLineDB, MovimientoInventarioDB)]
+        restantes = [l.cantidad_restante for l in uow.lotes.obtener_lotes_antiguos(1, 1)]
+    assert filas == [0, 0, 0, 0]
+    assert restantes == [40]
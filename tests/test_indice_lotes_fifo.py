@@ -0,0 +1,66 @@
+# tests/test_indice_lotes_fifo.py
+# Las colas del índice son por hilo: lo que otro hilo escribe en los lotes no debe verse como falta de stock
+import threading
+import pytest
+from sqlalchemy import select
+from domain.services.inventario_service import FUSION_ULTIMO, InventarioService
+from domain.value_objects.money import Money
+from infrastructure.persistence.modelos import LoteDB
+
+def en_otro_hilo(operacion):
+    hilo = threading.Thread(target=operacion)
+    hilo.start()
+    hilo.join()
+
+def cantidades(uow):
+    with uow:
+        return uow.session.scalars(select(LoteDB.cantidad_restante).order_by(LoteDB.id_lote)).all()
+
+def test_despacho_ve_lotes_creados_por_otro_hilo(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'))
+    inventario = InventarioService(uow.lotes)
+    with uow:
+        inventario.registrar_salida_fifo(1, 1, 5, factura_id=1)
+    en_otro_hilo(lambda: uow.ejecutar(lambda: inventario.registrar_entrada(1, 1, 10, Money.de_decimal('2.00'))))
+    with uow:  # La cola de este hilo solo tiene el primer lote: la del otro hilo se relee antes de fallar
+        movimientos = inventario.registrar_salida_fifo(1, 1, 12, factura_id=2)
+    assert [m.cantidad for m in movimientos] == [5, 7]
+    assert cantidades(uow) == [0, 3]
+
+def test_lote_ampliado_por_otro_hilo_reintenta_con_la_cola_releida(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'))
+    inventario = InventarioService(uow.lotes, politica_fusion=FUSION_ULTIMO)
+    with uow:
+        inventario.registrar_salida_fifo(1, 1, 5, factura_id=1)
+    # El otro hilo suma al mismo lote: la copia de este hilo queda con 5 y una version vieja
+    en_otro_hilo(lambda: uow.ejecutar(lambda: inventario.registrar_entrada(1, 1, 10, Money.de_decimal('1.00'))))
+    intentos = []
+
+    def despachar():
+        intentos.append(1)
+        return inventario.registrar_salida_fifo(1, 1, 12, factura_id=2)
+
+    movimientos = uow.ejecutar(despachar)
+    assert len(intentos) == 2 and [m.cantidad for m in movimientos] == [12]
+    assert cantidades(uow) == [3]
+
+def test_sin_stock_sigue_siendo_error_de_validacion(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'))
+    inventario = InventarioService(uow.lotes)
+    with pytest.raises(ValueError, match="Stock insuficiente"):
+        with uow:
+            inventario.registrar_salida_fifo(1, 1, 11, factura_id=1)
+    assert cantidades(uow) == [10]
+
+def test_lote_nuevo_revertido_deja_de_ser_el_ultimo(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'))
+    inventario = InventarioService(uow.lotes, politica_fusion=FUSION_ULTIMO)
+    with uow:
+        with pytest.raises(RuntimeError):
+            with inventario.unidad_de_trabajo():
+                inventario.registrar_entrada(1, 1, 4, Money.de_decimal('2.00'))
+                raise RuntimeError("falla después de la entrada")
+        assert inventario.indice_lotes.ultimo(1, 1).cantidad_restante == 10
+    with uow:  # El último de la cola vuelve a ser el lote de apertura, con el que se fusiona
+        inventario.registrar_entrada(1, 1, 5, Money.de_decimal('1.00'))
+    assert cantidades(uow) == [15]
@@ -0,0 +1,128 @@
+# tests/test_metricas.py
+import logging
+import pytest
+from sqlalchemy import update
+from domain.services.factura_service import FacturaService, construir_factura, forma_pago_desde, lineas_desde
+from domain.services.instrumentacion import metricas
+from domain.services.inventario_service import InventarioService
+from domain.value_objects.direccion import Direccion
+from domain.value_objects.money import Money
+from infrastructure.metricas.sinks import ExportadorPrometheus, RegistroMetricas, SinkLogging
+from infrastructure.persistence.modelos import LoteDB
+
+DATOS = {
+    'id_sucursal': 1,
+    'id_bodega': 1,
+    'ruc_emisor': '1790012345001',
+    'identificacion_adquiriente': '0912345678',
+    'direccion_matriz': Direccion('Av. Amazonas', 'Quito'),
+    'razon_social_emisor': 'Prometeo S.A.',
+    'lineas': [{'id_producto': 1, 'cantidad': 15, 'precio_unitario': '2.50'}],
+}
+
+@pytest.fixture
+def registro():
+    registro = RegistroMetricas()
+    metricas.activar(registro)
+    yield registro
+    metricas.desactivar()
+
+def test_emision_registra_especificaciones_lecturas_y_una_escritura(uow, crear_lotes, registro):
+    crear_lotes((1, 1, 10, '1.00'), (1, 1, 10, '2.00'))
+    servicio = FacturaService(uow.facturas, InventarioService(uow.lotes))
+    with uow:
+        servicio.crear_y_emitir_factura(DATOS)
+    assert registro.histograma('emision_segundos', documento='factura').cantidad == 1
+    assert registro.histograma('especificacion_segundos', documento='factura',
+                               especificacion='FormaPagoValida').cantidad == 1
+    assert registro.histograma('lotes_lectura_segundos', consulta='obtener_lotes_antiguos').cantidad == 1
+    por_linea = registro.histograma('lotes_por_linea')
+    assert (por_linea.cantidad, por_linea.suma) == (1, 2)
+    # Las unidades anidadas (emitir dentro de la del servicio) se integran en la raíz: una sola escritura
+    assert registro.contador('lotes_actualizar_total') == 1
+    assert registro.contador('lotes_escritos_total') == 2
+    assert registro.histograma('lotes_actualizar_segundos').cantidad == 1
+
+def test_emitir_no_repite_la_verificacion_sin_cambios(uow, crear_lotes, registro):
+    crear_lotes((1, 1, 30, '1.00'))
+    inventario = InventarioService(uow.lotes)
+
+    def verificaciones():
+        return registro.histograma('especificacion_segundos', documento='factura',
+                                   especificacion='FormaPagoValida').cantidad
+
+    aggregate = construir_factura(DATOS)
+    with aggregate.edicion():
+        aggregate.agregar_lineas(list(lineas_desde(DATOS)))
+        aggregate.root.forma_pago = forma_pago_desde(DATOS, aggregate.root.totales.valor_total)
+    assert verificaciones() == 1  # Al cerrar la edición
+    with uow, inventario.unidad_de_trabajo():
+        aggregate.emitir(inventario)
+        uow.facturas.guardar(aggregate)
+    assert verificaciones() == 1  # Sin cambios desde entonces: no se repite
+    aggregate = construir_factura(DATOS)
+    with uow, inventario.unidad_de_trabajo(), aggregate.edicion():
+        aggregate.agregar_lineas(list(lineas_desde(DATOS)))
+        aggregate.root.forma_pago = forma_pago_desde(DATOS, aggregate.root.totales.valor_total)
+        aggregate.emitir(inventario)  # Pendiente: se verifica al emitir y ya no al cerrar la edición
+        uow.facturas.guardar(aggregate)
+    assert verificaciones() == 2
+
+def test_recargar_tambien_se_mide(uow, crear_lotes, registro):
+    crear_lotes((1, 1, 10, '1.00'))
+    inventario = InventarioService(uow.lotes)
+    with uow:
+        inventario.registrar_salida_fifo(1, 1, 5, factura_id=1)
+    crear_lotes((1, 1, 10, '2.00'))  # Fuera de la cola de este hilo: el despacho relee antes de fallar
+    with uow:
+        assert [m.cantidad for m in inventario.registrar_salida_fifo(1, 1, 12, factura_id=2)] == [5, 7]
+    assert registro.histograma('lotes_lectura_segundos', consulta='obtener_lotes_antiguos').cantidad == 2
+
+def test_conflicto_al_escribir_se_cuenta_y_no_escribe(uow, crear_lotes, registro):
+    crear_lotes((1, 1, 10, '1.00'))
+    inventario = InventarioService(uow.lotes)
+    inventario.precargar_lotes([(1, 1)])
+    with uow:
+        uow.session.execute(update(LoteDB).values(version=LoteDB.version + 1))
+    intentos = []
+
+    def despachar():
+        intentos.append(1)
+        inventario.registrar_salida_fifo(1, 1, 5, factura_id=1)
+
+    uow.ejecutar(despachar)
+    assert len(intentos) == 2
+    assert registro.contador('conflictos_concurrencia_total') == 1
+    assert registro.contador('lotes_actualizar_total') == 1
+    assert registro.histograma('lotes_lectura_segundos', consulta='obtener_lotes_antiguos_muchos').cantidad == 1
+
+def test_desactivada_no_registra(uow, crear_lotes):
+    registro = RegistroMetricas()
+    metricas.activar(registro)
+    metricas.desactivar()
+    crear_lotes((1, 1, 10, '1.00'))
+    with uow:
+        InventarioService(uow.lotes).registrar_entrada(1, 1, 5, Money.de_decimal('1.00'))
+    assert list(registro.contadores()) == [] and list(registro.histogramas()) == []
+
+def test_exportador_prometheus():
+    exportador = ExportadorPrometheus()
+    exportador.contar('lotes_actualizar_total', 3)
+    for valor in (0.0005, 0.002, 10):
+        exportador.observar('emision_segundos', valor, (('documento', 'fac"tura'),))
+    texto = exportador.texto().splitlines()
+    assert texto[:2] == ['# TYPE prometeo_lotes_actualizar_total counter', 'prometeo_lotes_actualizar_total 3']
+    assert texto[2] == '# TYPE prometeo_emision_segundos histogram'
+    assert 'prometeo_emision_segundos_bucket{documento="fac\\"tura",le="0.001"} 1' in texto
+    assert 'prometeo_emision_segundos_bucket{documento="fac\\"tura",le="5"} 2' in texto
+    assert 'prometeo_emision_segundos_bucket{documento="fac\\"tura",le="+Inf"} 3' in texto
+    assert texto[-1] == 'prometeo_emision_segundos_count{documento="fac\\"tura"} 3'
+    exportador.limpiar()
+    assert exportador.texto() == '\n'
+
+def test_sink_logging(caplog):
+    sink = SinkLogging()
+    with caplog.at_level(logging.DEBUG, logger='prometeo.metricas'):
+        sink.contar('lotes_actualizar_total', 2)
+        sink.observar('lotes_por_linea', 3, (('documento', 'factura'),))
+    assert caplog.messages == ['lotes_actualizar_total +2', 'lotes_por_linea{documento="factura"} 3']
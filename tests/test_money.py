@@ -0,0 +1,61 @@
+# tests/test_money.py
+from decimal import Decimal
+import pytest
+from domain.value_objects.money import Money, aplicar_porcentaje, dividir_redondeando, redondear_a_centavos
+
+@pytest.mark.parametrize('numerador, denominador, esperado', [
+    (5, 2, 3), (-5, 2, -3),  # Mitad exacta: se aleja de cero
+    (7, 2, 4), (-7, 2, -4),
+    (4, 3, 1), (-4, 3, -1),  # Bajo la mitad
+    (5, 3, 2), (-5, 3, -2),  # Sobre la mitad
+    (1, 2, 1), (-1, 2, -1), (0, 7, 0),
+    (149_999, 100_000, 1), (150_000, 100_000, 2), (-150_000, 100_000, -2),
+])
+def test_dividir_redondeando_mitad_hacia_arriba(numerador, denominador, esperado):
+    assert dividir_redondeando(numerador, denominador) == esperado
+
+@pytest.mark.parametrize('micros, esperado', [
+    (1_005_000, 1_010_000), (1_004_999, 1_000_000), (-1_005_000, -1_010_000), (-1_004_999, -1_000_000),
+    (5_000, 10_000), (-5_000, -10_000), (4_999, 0), (-4_999, 0), (1_230_000, 1_230_000),
+])
+def test_redondear_a_centavos(micros, esperado):
+    assert redondear_a_centavos(micros) == esperado
+    assert Money(micros).redondear() == Money(esperado)
+
+@pytest.mark.parametrize('texto', ['0', '1', '-1', '0.000001', '-0.000001', '2.50', '-2.50', '1234567890.123456',
+                                   '-0.333333'])
+def test_de_decimal_ida_y_vuelta(texto):
+    valor = Decimal(texto)
+    money = Money.de_decimal(valor)
+    assert money.a_decimal() == valor
+    assert Money.de_decimal(money.a_decimal()) == money
+    assert Money.de_decimal(texto) == money
+
+@pytest.mark.parametrize('texto, micros', [
+    ('0.0000005', 1), ('-0.0000005', -1), ('0.0000004', 0), ('2.4999995', 2_500_000), ('-2.4999995', -2_500_000),
+])
+def test_de_decimal_redondea_a_la_micro_unidad(texto, micros):
+    assert Money.de_decimal(texto).micros == micros
+
+def test_negativos():
+    credito = -Money.de_decimal('10.25')
+    assert credito.micros == -10_250_000 and not credito.es_positivo()
+    assert credito + Money.de_decimal('10.25') == Money.cero()
+    assert Money.de_decimal('1.00') - Money.de_decimal('3.50') == Money.de_decimal('-2.50')
+    assert credito * 3 == 3 * credito == Money.de_decimal('-30.75')
+    assert credito < Money.cero() <= Money.cero()
+    assert str(Money.de_decimal('-2.345')) == '-2.35 USD'
+    assert Money.de_decimal('-100').por_porcentaje(Decimal('12.5')) == Money.de_decimal('-12.5')
+
+def test_porcentaje_redondea_la_mitad_hacia_arriba():
+    assert aplicar_porcentaje(5, Decimal('10')) == 1  # 0.5 micros
+    assert aplicar_porcentaje(-5, Decimal('10')) == -1
+    assert aplicar_porcentaje(4, Decimal('10')) == 0
+
+def test_operaciones_validan_moneda_y_tipo():
+    with pytest.raises(ValueError, match='Monedas distintas: USD y EUR.'):
+        Money.de_decimal('1') + Money.de_decimal('1', 'EUR')
+    with pytest.raises(TypeError):
+        Money.de_decimal('1') + 1
+    with pytest.raises(TypeError):
+        Money.de_decimal('1') * Decimal('1.5')  # Sin redondeo implícito: por_porcentaje
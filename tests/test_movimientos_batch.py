@@ -0,0 +1,62 @@
+# tests/test_movimientos_batch.py
+import pytest
+from domain.entities.movimiento_inventario import MovimientoInventario
+from domain.entities.movimientos_batch import MovimientosBatch
+from domain.services.inventario_service import InventarioService
+from domain.value_objects.money import Money
+
+def movimiento(producto, cantidad, costo, **extra) -> MovimientoInventario:
+    return MovimientoInventario(producto, 1, extra.pop('tipo', 'SALIDA'), cantidad, Money.de_decimal(costo), **extra)
+
+def campos(m: MovimientoInventario) -> tuple:
+    return tuple(getattr(m, campo) for campo in MovimientoInventario.__slots__)
+
+def test_ida_y_vuelta_por_columnas():
+    originales = [
+        movimiento(1, 3, '1.000001', id_factura=7),
+        movimiento(2, 1, '0', tipo='ENTRADA', id_nota_credito=4, fecha='2024-03-05', observaciones='Devolución'),
+        movimiento(1, 2, '2.50'),
+    ]
+    batch = MovimientosBatch.desde(originales)
+    assert len(batch) == 3 and [campos(m) for m in batch] == [campos(m) for m in originales]
+    assert campos(batch[-2]) == campos(originales[1])
+    assert list(batch.id_factura) == [7, -1, -1]  # Sin id: centinela en la columna, None al materializar
+    assert batch.nbytes == 3 * (8 * 6 + 1)
+
+def test_extender_desplaza_los_extras_y_suma_costos_exactos():
+    batch = MovimientosBatch.desde([movimiento(1, 3, '0.333333')])
+    otro = MovimientosBatch.desde([movimiento(2, 2, '1.10', observaciones='Muestra'), movimiento(1, 1, '0.000001')])
+    batch.extender(otro)
+    batch.extender(MovimientosBatch('EUR'))  # Vacío: no cambia nada
+    assert [m.observaciones for m in batch] == [None, 'Muestra', None]
+    assert batch.costo_por_producto() == {1: 1_000_000, 2: 2_200_000}
+    assert batch.costo_total() == Money.de_decimal('3.20')
+
+def test_mezclar_monedas_se_rechaza():
+    batch = MovimientosBatch.desde([movimiento(1, 1, '1.00')])
+    with pytest.raises(ValueError, match='Costo en EUR, movimientos en USD.'):
+        batch.agregar(1, 1, 'SALIDA', 1, Money.de_decimal('1.00', 'EUR'))
+    with pytest.raises(ValueError, match='Movimientos en EUR y USD.'):
+        batch.extender(MovimientosBatch.desde([MovimientoInventario(1, 1, 'SALIDA', 1,
+                                                                    Money.de_decimal('1', 'EUR'))]))
+    assert len(batch) == 1
+
+def test_despacho_columnar_y_en_lista(uow, crear_lotes):
+    crear_lotes((1, 1, 2, '1.00'), (1, 1, 5, '1.50'), (2, 1, 10, '3.00'))
+    inventario = InventarioService(uow.lotes)
+    with uow:
+        columnar = inventario.registrar_salida_fifo(1, 1, 4, factura_id=1, columnar=True)
+        lista = inventario.registrar_salida_fifo(2, 1, 4, factura_id=1)
+    assert isinstance(columnar, MovimientosBatch) and isinstance(lista, list)
+    assert [(m.cantidad, m.costo_unitario_aplicado) for m in columnar] == [(2, Money.de_decimal('1.00')),
+                                                                           (2, Money.de_decimal('1.50'))]
+    assert [campos(m) for m in lista] == [(2, 1, 'SALIDA', 4, Money.de_decimal('3.00'), 1, None, None, None)]
+
+def test_movimientos_en_la_moneda_del_lote(uow):
+    inventario = InventarioService(uow.lotes)
+    with uow:
+        entrada = inventario.registrar_entrada(1, 1, 10, Money.de_decimal('2.50', 'EUR'), columnar=True)
+        salida = inventario.registrar_salida_fifo(1, 1, 4, factura_id=1, columnar=True)
+    assert entrada.moneda == salida.moneda == 'EUR'
+    assert salida.costo_total() == Money.de_decimal('10.00', 'EUR')
+    assert [m.costo_unitario_aplicado for m in salida] == [Money.de_decimal('2.50', 'EUR')]
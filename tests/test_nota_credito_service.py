@@ -0,0 +1,123 @@
+# tests/test_nota_credito_service.py
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import select, update
+from domain.services.factura_service import FacturaService
+from domain.services.indice_devoluciones import IndiceDevoluciones
+from domain.services.inventario_service import InventarioService
+from domain.services.nota_credito_service import NotaCreditoService
+from domain.value_objects.direccion import Direccion
+from domain.value_objects.money import Money
+from infrastructure.persistence.modelos import FacturaDB, LoteDB, MovimientoInventarioDB
+
+def emitir_factura(uow, inventario: InventarioService, lineas) -> int:
+    # Factura de ayer: una nota de crédito debe emitirse después de su factura
+    datos = {
+        'id_sucursal': 1,
+        'id_bodega': 1,
+        'ruc_emisor': '1790012345001',
+        'identificacion_adquiriente': '0912345678',
+        'direccion_matriz': Direccion('Av. Amazonas', 'Quito'),
+        'razon_social_emisor': 'Prometeo S.A.',
+        'lineas': [{'id_producto': p, 'cantidad': c, 'precio_unitario': '9.00'} for p, c in lineas],
+    }
+    with uow:
+        id_factura = FacturaService(uow.facturas, inventario).crear_y_emitir_factura(datos).root.id_factura
+        ayer = date.today() - timedelta(days=1)
+        uow.session.execute(update(FacturaDB).where(FacturaDB.id_factura == id_factura)
+                            .values(fecha_emision=ayer, fecha_autorizacion=ayer))
+    return id_factura
+
+def datos_nota(id_factura: int, lineas) -> dict:
+    return {
+        'id_sucursal': 1,
+        'id_factura_modificada': id_factura,
+        'ruc_emisor': '1790012345001',
+        'identificacion_adquiriente': '0912345678',
+        'direccion_matriz': Direccion('Av. Amazonas', 'Quito'),
+        'razon_social_emisor': 'Prometeo S.A.',
+        'motivo': 'Devolución',
+        'lineas': [{'id_producto': p, 'cantidad': c, 'valor_item_cobrado': '9.00'} for p, c in lineas],
+    }
+
+def test_devolucion_reingresa_al_costo_de_venta_con_el_id_de_la_nota(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'), (1, 1, 10, '2.00'))
+    inventario = InventarioService(uow.lotes)
+    id_factura = emitir_factura(uow, inventario, [(1, 15)])  # 10 a 1.00 y 5 a 2.00
+    with uow:
+        assert uow.facturas.obtener_costos_vendidos(id_factura) == {1: Money.de_decimal('1.333333')}
+        servicio = NotaCreditoService(uow.notas_credito, uow.facturas, inventario)
+        nota = servicio.crear_y_emitir_nota_credito(datos_nota(id_factura, [(1, 2)]))
+    with uow:
+        entrada = uow.session.execute(
+            select(MovimientoInventarioDB.cantidad, MovimientoInventarioDB.costo_unitario_aplicado,
+                   MovimientoInventarioDB.id_nota_credito)
+            .where(MovimientoInventarioDB.tipo_movimiento == 'ENTRADA')
+        ).one()
+        lote = uow.session.scalars(select(LoteDB).order_by(LoteDB.id_lote.desc())).first()
+    assert (entrada.cantidad, Money.de_decimal(entrada.costo_unitario_aplicado), entrada.id_nota_credito) == \
+        (2, Money.de_decimal('1.333333'), nota.root.id_nota_credito)
+    assert (lote.cantidad_restante, Money.de_decimal(lote.costo_unitario)) == (2, Money.de_decimal('1.333333'))
+
+def test_lineas_de_los_datos_y_limite_devolvible(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'), (2, 1, 10, '3.00'))
+    inventario = InventarioService(uow.lotes)
+    id_factura = emitir_factura(uow, inventario, [(1, 4), (2, 3)])
+    servicio = NotaCreditoService(uow.notas_credito, uow.facturas, inventario)
+    with uow:
+        nota = servicio.crear_y_emitir_nota_credito(datos_nota(id_factura, [(1, 3), (2, 3)]))
+    assert [(l.id_producto, l.cantidad) for l in nota.root.lineas] == [(1, 3), (2, 3)]
+    with uow:
+        with pytest.raises(ValueError, match='LineasValidasContraFactura'):
+            servicio.crear_y_emitir_nota_credito(datos_nota(id_factura, [(1, 2)]))  # Queda 1 devolvible
+    with uow:
+        restante = servicio.crear_y_emitir_nota_credito(datos_nota(id_factura, [(1, 1)]))
+    assert restante.root.lineas[0].cantidad == 1
+
+def test_nota_revertida_no_descuenta_del_indice(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'))
+    inventario = InventarioService(uow.lotes)
+    id_factura = emitir_factura(uow, inventario, [(1, 4)])
+    devoluciones = IndiceDevoluciones(uow.notas_credito)
+    uow.al_revertir(devoluciones.revertir)
+    uow.al_confirmar(devoluciones.confirmar)
+    servicio = NotaCreditoService(uow.notas_credito, uow.facturas, inventario, indice_devoluciones=devoluciones)
+    with pytest.raises(RuntimeError):
+        with uow:
+            servicio.crear_y_emitir_nota_credito(datos_nota(id_factura, [(1, 4)]))
+            raise RuntimeError("Falla después de emitir, antes del commit")
+    with uow:
+        nota = servicio.crear_y_emitir_nota_credito(datos_nota(id_factura, [(1, 4)]))
+    assert nota.root.lineas[0].cantidad == 4
+
+def test_la_base_rechaza_lo_que_el_indice_de_otro_proceso_aun_no_ve(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'))
+    inventario = InventarioService(uow.lotes)
+    id_factura = emitir_factura(uow, inventario, [(1, 4)])
+    servicio = NotaCreditoService(uow.notas_credito, uow.facturas, inventario)
+    otro_proceso = NotaCreditoService(uow.notas_credito, uow.facturas, inventario)
+    with uow:
+        servicio.crear_y_emitir_nota_credito(datos_nota(id_factura, [(1, 1)]))  # Su índice: quedan 3
+    with uow:
+        otro_proceso.crear_y_emitir_nota_credito(datos_nota(id_factura, [(1, 3)]))
+    with pytest.raises(ValueError, match=r'Cantidad acreditada supera la facturada para los productos \[1\]'):
+        with uow:  # La nota ya se había guardado: la transacción se revierte
+            servicio.crear_y_emitir_nota_credito(datos_nota(id_factura, [(1, 2)]))
+    with uow:
+        assert uow.notas_credito.obtener_cantidades_acreditadas(id_factura) == {1: 4}
+        # La verificación fallida descartó la entrada: la siguiente nota ve lo acreditado en la base
+        with pytest.raises(ValueError, match='LineasValidasContraFactura'):
+            servicio.crear_y_emitir_nota_credito(datos_nota(id_factura, [(1, 1)]))
+
+def test_indice_acotado_y_sin_cerrojos_al_terminar(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'))
+    inventario = InventarioService(uow.lotes)
+    facturas = [emitir_factura(uow, inventario, [(1, 2)]) for _ in range(3)]
+    devoluciones = IndiceDevoluciones(uow.notas_credito, capacidad=2)
+    uow.al_confirmar(devoluciones.confirmar)
+    servicio = NotaCreditoService(uow.notas_credito, uow.facturas, inventario, indice_devoluciones=devoluciones)
+    for id_factura in facturas:
+        with uow:
+            servicio.crear_y_emitir_nota_credito(datos_nota(id_factura, [(1, 1)]))
+    assert list(devoluciones._devolvibles) == facturas[1:]  # La menos reciente salió
+    assert devoluciones._cerrojos_factura == {} and devoluciones._pendientes == set()
@@ -0,0 +1,102 @@
+# tests/test_reproduccion_fifo.py
+from datetime import date, timedelta
+from decimal import Decimal
+from sqlalchemy import insert, select, update
+from domain.services.factura_service import FacturaService
+from domain.services.inventario_service import InventarioService
+from domain.services.reproduccion_fifo import ReproductorCostosFIFO
+from domain.value_objects.direccion import Direccion
+from domain.value_objects.money import Money
+from infrastructure.persistence.modelos import LoteDB, MovimientoInventarioDB
+
+def emitir(uow, inventario: InventarioService, producto: int, cantidad: int):
+    datos = {
+        'id_sucursal': 1,
+        'id_bodega': 1,
+        'ruc_emisor': '1790012345001',
+        'identificacion_adquiriente': '0912345678',
+        'direccion_matriz': Direccion('Av. Amazonas', 'Quito'),
+        'razon_social_emisor': 'Prometeo S.A.',
+        'lineas': [{'id_producto': producto, 'cantidad': cantidad, 'precio_unitario': '9.00'}],
+    }
+    with uow:
+        FacturaService(uow.facturas, inventario).crear_y_emitir_factura(datos)
+
+def costos_salida(uow, producto: int):
+    with uow:
+        return [Money.de_decimal(c) for c in uow.session.scalars(
+            select(MovimientoInventarioDB.costo_unitario_aplicado)
+            .where(MovimientoInventarioDB.id_producto == producto, MovimientoInventarioDB.tipo_movimiento == 'SALIDA')
+            .order_by(MovimientoInventarioDB.id_movimiento)
+        )]
+
+def test_lotes_sin_entrada_son_stock_de_apertura(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'), (1, 1, 10, '2.00'))
+    inventario = InventarioService(uow.lotes)
+    emitir(uow, inventario, 1, 15)  # Un movimiento por lote consumido: 10 a 1.00 y 5 a 2.00
+    emitir(uow, inventario, 1, 3)
+    esperado = costos_salida(uow, 1)
+    assert esperado == [Money.de_decimal('1.00'), Money.de_decimal('2.00'), Money.de_decimal('2.00')]
+    with uow:
+        resultado = ReproductorCostosFIFO(uow.movimientos, procesos=1).recalcular(date.today())
+    assert (resultado.corregidos, resultado.fallidos) == (0, {})
+
+    # Un costo alterado se corrige con las capas de apertura
+    with uow:
+        uow.session.execute(update(MovimientoInventarioDB).values(costo_unitario_aplicado=Decimal('7')))
+    with uow:
+        resultado = ReproductorCostosFIFO(uow.movimientos, procesos=1).recalcular(date.today())
+    assert (resultado.corregidos, resultado.fallidos) == (3, {})
+    assert costos_salida(uow, 1) == esperado
+
+def test_apertura_antes_de_las_compras_registradas(uow, crear_lotes):
+    crear_lotes((1, 1, 5, '1.00'))
+    inventario = InventarioService(uow.lotes)
+    with uow:
+        inventario.registrar_entrada(1, 1, 10, Money.de_decimal('3.00'), fecha=date.today() - timedelta(days=2))
+    emitir(uow, inventario, 1, 8)  # 5 de apertura a 1.00 y 3 de la compra a 3.00
+    esperado = [Money.de_decimal('1.00'), Money.de_decimal('3.00')]
+    assert costos_salida(uow, 1) == esperado
+    with uow:
+        uow.session.execute(update(MovimientoInventarioDB).where(MovimientoInventarioDB.tipo_movimiento == 'SALIDA')
+                            .values(costo_unitario_aplicado=Decimal('7')))
+    with uow:
+        resultado = ReproductorCostosFIFO(uow.movimientos, procesos=1).recalcular(date.today())
+    assert (resultado.corregidos, resultado.fallidos) == (2, {})
+    assert costos_salida(uow, 1) == esperado
+
+def test_lotes_de_entradas_registradas_no_son_apertura(uow, crear_lotes):
+    # Lote de apertura anterior a cantidad_inicial y ya agotado: la compra registrada no debe cubrir su faltante
+    crear_lotes((1, 1, 5, '1.00'))
+    inventario = InventarioService(uow.lotes)
+    with uow:
+        inventario.registrar_entrada(1, 1, 10, Money.de_decimal('3.00'), fecha=date.today() - timedelta(days=2))
+    emitir(uow, inventario, 1, 8)
+    esperado = costos_salida(uow, 1)
+    assert esperado == [Money.de_decimal('1.00'), Money.de_decimal('3.00')]
+    with uow:
+        uow.session.execute(update(LoteDB).where(LoteDB.costo_unitario == Decimal('1')).values(cantidad_inicial=None))
+        uow.session.execute(update(MovimientoInventarioDB).where(MovimientoInventarioDB.tipo_movimiento == 'SALIDA')
+                            .values(costo_unitario_aplicado=Decimal('7')))
+    with uow:
+        resultado = ReproductorCostosFIFO(uow.movimientos, procesos=1).recalcular(date.today())
+    assert (resultado.corregidos, resultado.fallidos) == (2, {})
+    assert costos_salida(uow, 1) == esperado
+
+def test_fallas_por_producto_no_detienen_la_reproduccion(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'))
+    inventario = InventarioService(uow.lotes)
+    emitir(uow, inventario, 1, 4)
+    with uow:
+        uow.session.execute(update(MovimientoInventarioDB).values(costo_unitario_aplicado=Decimal('7')))
+        # Producto 2 sin lotes y con una salida sin entradas: su historial no se puede reproducir
+        uow.session.execute(insert(MovimientoInventarioDB), [{
+            'id_producto': 2, 'id_bodega': 1, 'tipo_movimiento': 'SALIDA', 'cantidad': 3,
+            'costo_unitario_aplicado': Decimal('5'), 'id_factura': 99, 'fecha': date.today(),
+        }])
+    with uow:
+        resultado = ReproductorCostosFIFO(uow.movimientos, procesos=1).recalcular(date.today())
+    assert resultado.corregidos == 1
+    assert list(resultado.fallidos) == [(2, 1)] and 'Stock insuficiente' in resultado.fallidos[(2, 1)]
+    assert costos_salida(uow, 1) == [Money.de_decimal('1.00')]
+    assert costos_salida(uow, 2) == [Money.de_decimal('5')]
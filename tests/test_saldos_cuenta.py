@@ -0,0 +1,41 @@
+# tests/test_saldos_cuenta.py
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from domain.entities.saldo_cuenta import SaldoCuenta
+from infrastructure.persistence.modelos import SIN_CENTRO_COSTO, AccountBalanceDB
+
+ENTIDAD, CUENTA, PERIODO, CENTRO = uuid4(), uuid4(), uuid4(), uuid4()
+
+def filas(uow):
+    with uow:
+        return sorted((f.cost_center_id is not None, f.debit_total, f.credit_total, f.line_count)
+                      for f in uow.session.scalars(select(AccountBalanceDB)))
+
+def test_acumular_suma_sobre_la_misma_fila_con_y_sin_centro(engine, uow):
+    sentencias = []
+    registrar = lambda conn, cursor, sentencia, *resto: sentencias.append(sentencia)
+    event.listen(engine, 'before_cursor_execute', registrar)
+    for _ in range(2):
+        with uow:
+            uow.saldos.acumular([
+                SaldoCuenta(ENTIDAD, CUENTA, PERIODO, None, 1_500_000, 0, 1),
+                SaldoCuenta(ENTIDAD, CUENTA, PERIODO, CENTRO, 0, 2_000_000, 2),
+                SaldoCuenta(ENTIDAD, CUENTA, PERIODO, None, 500_000, 0, 1),  # Misma clave en el mismo lote
+            ])
+    event.remove(engine, 'before_cursor_execute', registrar)
+    assert len(sentencias) == 2 and all('ON CONFLICT' in s for s in sentencias)  # Un upsert por llamada, sin leer
+    assert filas(uow) == [(False, Decimal('4.00'), Decimal('0.00'), 4), (True, Decimal('0.00'), Decimal('4.00'), 4)]
+
+def test_clave_unica_admite_una_sola_fila_sin_centro(uow):
+    with uow:
+        uow.saldos.acumular([SaldoCuenta(ENTIDAD, CUENTA, PERIODO, None, 1_000_000, 0, 1)])
+    with pytest.raises(IntegrityError):
+        with uow:
+            uow.session.add(AccountBalanceDB(balance_id=uuid4(), entity_id=ENTIDAD, account_id=CUENTA,
+                                             period_id=PERIODO, cost_center_key=SIN_CENTRO_COSTO,
+                                             updated_at=datetime.now()))
+            uow.session.flush()
@@ -0,0 +1,86 @@
+# tests/test_sql_repository.py
+from datetime import date
+import pytest
+from sqlalchemy import select
+from domain.entities.lote import Lote
+from domain.entities.movimiento_inventario import MovimientoInventario
+from domain.repositories.lote_repository import ConflictoConcurrencia
+from domain.value_objects.money import Money
+from infrastructure.persistence.modelos import LoteDB, MovimientoInventarioDB
+
+def movimiento(tipo: str, cantidad: int, id_factura=None, id_nota_credito=None) -> MovimientoInventario:
+    return MovimientoInventario(1, 1, tipo, cantidad, Money.de_decimal('1.50'), id_factura=id_factura,
+                                id_nota_credito=id_nota_credito)
+
+def test_actualiza_lotes_e_incrementa_version(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'), (1, 1, 10, '2.00'))
+    with uow:
+        primero, segundo = uow.lotes.obtener_lotes_antiguos(1, 1)
+        primero.cantidad_restante, segundo.cantidad_restante = 0, 7
+        uow.lotes.actualizar_muchos([segundo, primero])
+    assert (primero.version, segundo.version) == (1, 1)
+    with uow:
+        filas = uow.session.execute(select(LoteDB.cantidad_restante, LoteDB.version).order_by(LoteDB.id_lote)).all()
+    assert [tuple(f) for f in filas] == [(0, 1), (7, 1)]
+
+def test_version_desactualizada_es_conflicto(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'), (1, 1, 10, '2.00'))
+    with uow:
+        primero, segundo = uow.lotes.obtener_lotes_antiguos(1, 1)
+    with uow:
+        otro = uow.lotes.obtener_lotes_antiguos(1, 1)[1]
+        otro.cantidad_restante = 9
+        uow.lotes.actualizar(otro)
+    primero.cantidad_restante, segundo.cantidad_restante = 5, 5
+    with pytest.raises(ConflictoConcurrencia) as error:
+        with uow:
+            uow.lotes.actualizar_muchos([primero, segundo])
+    assert [l.id_lote for l in error.value.lotes] == [segundo.id_lote]
+    with uow:  # La transacción se revirtió completa, también el lote que sí se había escrito
+        assert [l.cantidad_restante for l in uow.lotes.obtener_lotes_antiguos(1, 1)] == [10, 9]
+
+def test_conflicto_indistinguible_reporta_todos_los_lotes(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'), (1, 1, 10, '2.00'))
+    with uow:
+        lotes = uow.lotes.obtener_lotes_antiguos(1, 1)
+    with uow:
+        otro = uow.lotes.obtener_lotes_antiguos(1, 1)[1]
+        otro.cantidad_restante = 5  # La misma cantidad que escribirá el despacho desactualizado
+        uow.lotes.actualizar(otro)
+    for lote in lotes:
+        lote.cantidad_restante = 5
+    with pytest.raises(ConflictoConcurrencia) as error:
+        with uow:
+            uow.lotes.actualizar_muchos(lotes)
+    assert sorted(l.id_lote for l in error.value.lotes) == sorted(l.id_lote for l in lotes)
+
+def test_inserta_lotes_nuevos_y_movimientos_con_sus_documentos(uow):
+    nuevo = Lote(None, 1, 1, date(2024, 3, 1), 4, Money.de_decimal('1.50'))
+    with uow:
+        uow.lotes.actualizar_muchos([], [movimiento('SALIDA', 3, id_factura=7),
+                                         movimiento('ENTRADA', 4, id_nota_credito=2),
+                                         movimiento('ENTRADA', 6)], [nuevo])
+    assert nuevo.id_lote is not None and nuevo.version == 0
+    with uow:
+        filas = uow.session.execute(
+            select(MovimientoInventarioDB.tipo_movimiento, MovimientoInventarioDB.cantidad,
+                   MovimientoInventarioDB.id_factura, MovimientoInventarioDB.id_nota_credito,
+                   MovimientoInventarioDB.fecha).order_by(MovimientoInventarioDB.id_movimiento)
+        ).all()
+        lote = uow.session.get(LoteDB, nuevo.id_lote)
+        assert (lote.cantidad_restante, lote.version) == (4, 0)
+    assert [tuple(f) for f in filas] == [
+        ('SALIDA', 3, 7, None, date.today()), ('ENTRADA', 4, None, 2, date.today()),
+        ('ENTRADA', 6, None, None, date.today()),
+    ]
+
+def test_salida_sin_factura_no_se_escribe(uow, crear_lotes):
+    crear_lotes((1, 1, 10, '1.00'))
+    with pytest.raises(ValueError, match='SALIDA sin id_factura'):
+        with uow:
+            lote = uow.lotes.obtener_lotes_antiguos(1, 1)[0]
+            lote.cantidad_restante = 7
+            uow.lotes.actualizar_muchos([lote], [movimiento('SALIDA', 3)])
+    with uow:
+        assert uow.lotes.obtener_lotes_antiguos(1, 1)[0].cantidad_restante == 10
+        assert uow.session.scalars(select(MovimientoInventarioDB)).all() == []
@@ -0,0 +1,80 @@
+# tests/test_tipos_cambio.py
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+import pytest
+from sqlalchemy import update
+from domain.services.tipos_cambio import TiposCambioService
+from domain.value_objects.money import ESCALA, Money
+from infrastructure.persistence.modelos import AccountingEntityDB, ExchangeRateDB
+
+ENTIDAD = uuid4()
+CREADA = datetime(2024, 1, 1, 12, 0)
+
+def tasa(origen, destino, fecha, valor, creada=CREADA) -> ExchangeRateDB:
+    return ExchangeRateDB(rate_id=uuid4(), from_currency=origen, to_currency=destino, rate_date=fecha,
+                          rate=Decimal(valor), created_at=creada)
+
+def servicio(uow, *tasas, **opciones) -> TiposCambioService:
+    with uow:
+        uow.session.add(AccountingEntityDB(entity_id=ENTIDAD, name='Prometeo', base_currency='USD',
+                                           created_at=CREADA))
+        uow.session.add_all(tasas)
+    return TiposCambioService(uow.tipos_cambio, ENTIDAD, refresco_segundos=None, **opciones)
+
+def test_par_directo_e_inverso(uow):
+    tipos = servicio(uow, tasa('EUR', 'USD', date(2024, 3, 1), '1.10'))
+    with uow:
+        assert tipos.tasa('EUR', 'USD', date(2024, 3, 5)) == (1_100_000, ESCALA)
+        assert tipos.tasa('USD', 'EUR', date(2024, 3, 5)) == (ESCALA, 1_100_000)
+        assert tipos.convertir(Money.de_decimal('11', 'USD'), 'EUR', date(2024, 3, 5)) == Money.de_decimal('10', 'EUR')
+        with pytest.raises(ValueError, match='Sin tipo de cambio EUR/USD al 2024-02-29.'):
+            tipos.tasa('EUR', 'USD', date(2024, 2, 29))
+
+def test_gana_la_mas_reciente_entre_par_e_inversa(uow):
+    tipos = servicio(uow, tasa('EUR', 'USD', date(2024, 3, 1), '1.10'), tasa('USD', 'EUR', date(2024, 3, 10), '0.80'))
+    with uow:
+        assert tipos.tasa('EUR', 'USD', date(2024, 3, 5)) == (1_100_000, ESCALA)
+        assert tipos.tasa('EUR', 'USD', date(2024, 3, 10)) == (ESCALA, 800_000)
+        assert tipos.tasa('USD', 'EUR', date(2024, 3, 5)) == (ESCALA, 1_100_000)
+
+def test_cruce_por_la_moneda_base(uow):
+    tipos = servicio(uow, tasa('EUR', 'USD', date(2024, 3, 1), '1.10'), tasa('USD', 'JPY', date(2024, 3, 1), '150'),
+                     tasa('GBP', 'USD', date(2024, 3, 2), '1.25'))
+    with uow:
+        assert tipos.tasa('EUR', 'JPY', date(2024, 3, 5)) == (1_100_000 * 150_000_000, ESCALA * ESCALA)
+        assert tipos.tasa('JPY', 'EUR', date(2024, 3, 5)) == (ESCALA * ESCALA, 150_000_000 * 1_100_000)
+        # Un solo redondeo: 1 EUR = 1.10 / 1.25 GBP
+        assert tipos.convertir(Money.de_decimal('1', 'EUR'), 'GBP', date(2024, 3, 5)) == Money.de_decimal('0.88', 'GBP')
+        with pytest.raises(ValueError, match='Sin tipo de cambio EUR/GBP al 2024-03-01.'):
+            tipos.tasa('EUR', 'GBP', date(2024, 3, 1))  # GBP aún sin tasa
+        with pytest.raises(ValueError, match='Sin tipo de cambio EUR/CHF'):
+            tipos.tasa('EUR', 'CHF', date(2024, 3, 5))
+
+def test_refresco_incremental(uow):
+    tipos = servicio(uow, tasa('EUR', 'USD', date(2024, 3, 1), '1.10'), solapamiento=timedelta(minutes=5))
+    with uow:
+        assert tipos.refrescar() == 1
+        assert tipos.tasa('EUR', 'USD', date(2024, 3, 5)) == (1_100_000, ESCALA)
+        assert tipos.refrescar() == 1  # Solo la ventana de solapamiento: la misma fila, sin cambios
+    with uow:
+        # Confirmada tarde con una marca anterior a la última leída, y una tasa corregida
+        uow.session.add(tasa('EUR', 'USD', date(2024, 3, 4), '1.12', creada=CREADA - timedelta(minutes=2)))
+        uow.session.add(tasa('GBP', 'USD', date(2024, 3, 1), '1.25', creada=CREADA - timedelta(hours=1)))
+        uow.session.execute(update(ExchangeRateDB).where(ExchangeRateDB.rate_date == date(2024, 3, 1),
+                                                         ExchangeRateDB.from_currency == 'EUR')
+                            .values(rate=Decimal('1.11'), updated_at=CREADA + timedelta(days=1)))
+    with uow:
+        assert tipos.refrescar() == 2  # Fuera de la ventana: la de GBP no se vuelve a leer
+        assert tipos.tasa('EUR', 'USD', date(2024, 3, 3)) == (1_110_000, ESCALA)
+        assert tipos.tasa('EUR', 'USD', date(2024, 3, 5)) == (1_120_000, ESCALA)
+        with pytest.raises(ValueError, match='Sin tipo de cambio GBP/USD'):
+            tipos.tasa('GBP', 'USD', date(2024, 3, 5))
+        assert tipos.refrescar() == 1  # Ahora la ventana cuelga de la actualización
+
+def test_fracciones_resueltas_acotadas(uow):
+    tipos = servicio(uow, tasa('EUR', 'USD', date(2024, 3, 1), '1.10'), max_resueltas=3)
+    with uow:
+        for dia in range(1, 11):
+            tipos.tasa('EUR', 'USD', date(2024, 3, dia))
+    assert list(tipos._resueltas) == [('EUR', 'USD', date(2024, 3, dia).toordinal()) for dia in (8, 9, 10)]
@@ -0,0 +1,90 @@
+# tests/test_totales.py
+from decimal import Decimal
+import random
+import pytest
+from domain.entities.codigo_impuesto import TIPO_EXENTO, TIPO_NO_OBJETO
+from domain.entities.factura import Factura
+from domain.entities.linea_factura import LineaFactura
+from domain.entities.linea_nota_credito import LineaNotaCredito
+from domain.entities.nota_credito import NotaCredito
+from domain.entities.totales_factura import TotalesFactura
+from domain.value_objects.direccion import Direccion
+from domain.value_objects.money import Money
+from domain.value_objects.motivo_modificacion import MotivoModificacion
+from domain.value_objects.precio import Precio
+
+DIRECCION = Direccion('Av. Amazonas & Naciones Unidas', 'Quito')
+MOTIVO = MotivoModificacion('Devolución')
+
+def linea(id_producto, precio, cantidad=1, **impuestos) -> LineaFactura:
+    return LineaFactura(id_producto, f'Producto {id_producto}', cantidad, Precio.de_decimal(Decimal(precio)),
+                        **impuestos)
+
+def test_totales_por_tarifa_e_ice():
+    factura = Factura(1, '0912345678', 'Prometeo', DIRECCION)
+    factura.agregar_linea(linea(1, '10.00', 3))
+    factura.agregar_linea(linea(2, '5.00', 2, porcentaje_iva=Decimal('15'), tarifa_ice=Decimal('10')))
+    factura.agregar_linea(linea(3, '4.00', porcentaje_iva=Decimal('0')))
+    factura.agregar_linea(linea(4, '7.50', porcentaje_iva=Decimal('0'), tipo_impuesto=TIPO_EXENTO))
+    factura.agregar_linea(linea(5, '2.25', porcentaje_iva=Decimal('0'), tipo_impuesto=TIPO_NO_OBJETO))
+    totales = factura.totales
+    assert totales.valor_subtotal == Money.de_decimal('53.75')
+    assert totales.base_imponible_12 == Money.de_decimal('40.00')
+    assert totales.base_imponible_0 == Money.de_decimal('4.00')
+    assert totales.base_imponible_exenta_iva == Money.de_decimal('7.50')
+    assert totales.base_imponible_no_objeto_iva == Money.de_decimal('2.25')
+    assert totales.valor_ice == Money.de_decimal('1.00')
+    assert totales.valor_iva == Money.de_decimal('5.25')  # 30 * 12% + (10 + 1 de ICE) * 15%
+    assert totales.valor_total == Money.de_decimal('60.00')
+
+def test_iva_se_redondea_por_tarifa_y_no_por_linea():
+    factura = Factura(1, '0912345678', 'Prometeo', DIRECCION)
+    for i in range(3):
+        factura.agregar_linea(linea(i, '0.04'))  # 0.0048 de IVA cada una: 0 por línea, 0.01 sobre la base
+    assert factura.totales.valor_iva == Money.de_decimal('0.01')
+
+def test_operaciones_incrementales_coinciden_con_el_recalculo():
+    azar = random.Random(7)
+    factura = Factura(1, '0912345678', 'Prometeo', DIRECCION)
+    for paso in range(300):
+        accion = azar.random()
+        if accion < 0.5 or not factura.lineas:
+            factura.agregar_linea(linea(paso, f'{azar.randrange(1, 5000) / 100:.2f}', azar.randrange(1, 5),
+                                        porcentaje_iva=azar.choice([Decimal('0'), Decimal('12'), Decimal('15')]),
+                                        tarifa_ice=azar.choice([Decimal('0'), Decimal('0'), Decimal('150')])))
+        elif accion < 0.7:
+            factura.quitar_linea(azar.choice(factura.lineas))
+        elif accion < 0.9:
+            factura.aplicar_descuento_linea(azar.choice(factura.lineas), Decimal(azar.randrange(0, 50)))
+        else:
+            factura.agregar_lineas([linea(paso * 10 + i, '1.99', porcentaje_iva=Decimal('15')) for i in range(3)])
+        factura.verificar_totales()
+    recalculo = TotalesFactura(0)
+    recalculo.actualizar_desde_lineas(factura.lineas)
+    assert recalculo == factura.totales
+
+def test_quitar_todas_las_lineas_deja_totales_en_cero():
+    factura = Factura(1, '0912345678', 'Prometeo', DIRECCION)
+    lineas = [linea(1, '3.33', 3, tarifa_ice=Decimal('150')), linea(2, '1.01', porcentaje_iva=Decimal('15'))]
+    factura.agregar_lineas(lineas)
+    for actual in list(lineas):
+        factura.quitar_linea(actual)
+    assert factura.totales == TotalesFactura(0)
+    with pytest.raises(ValueError, match='Línea no pertenece a la factura.'):
+        factura.quitar_linea(lineas[0])
+
+def test_nota_credito_ajuste_incremental():
+    nota = NotaCredito(1, 10, '0912345678', 'Prometeo', DIRECCION, motivo_modificacion=MOTIVO)
+    devuelta = LineaNotaCredito(1, 'Café', 2, Money.de_decimal('4.125'))
+    nota.agregar_lineas([devuelta, LineaNotaCredito(2, 'Libro', 1, Money.de_decimal('7.50'),
+                                                     porcentaje_iva=Decimal('0'), tipo_impuesto=TIPO_EXENTO)])
+    assert nota.totales.valor_total == Money.de_decimal('16.74')  # 8.25 + 0.99 de IVA + 7.50 exenta
+    nota.ajustar_valor_linea(devuelta, Money.de_decimal('3.00'))
+    assert nota.totales.valor_subtotal == Money.de_decimal('13.50')
+    assert nota.totales.valor_iva == Money.de_decimal('0.72')
+    nota.verificar_totales()
+
+def test_linea_en_otra_moneda_se_rechaza():
+    nota = NotaCredito(1, 10, '0912345678', 'Prometeo', DIRECCION, motivo_modificacion=MOTIVO)
+    with pytest.raises(ValueError, match='Línea en EUR, totales en USD.'):
+        nota.agregar_linea(LineaNotaCredito(1, 'Café', 1, Money.de_decimal('4.00', 'EUR')))
@@ -0,0 +1,113 @@
+# tests/test_xml_sri.py
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from xml.sax.saxutils import XMLGenerator
+from xml.sax.xmlreader import AttributesImpl
+import pytest
+from domain.aggregates.factura_aggregate import FacturaAggregate
+from domain.aggregates.nota_credito_aggregate import NotaCreditoAggregate
+from domain.entities.codigo_impuesto import TIPO_EXENTO
+from domain.entities.linea_factura import LineaFactura
+from domain.entities.linea_nota_credito import LineaNotaCredito
+from domain.value_objects.direccion import Direccion
+from domain.value_objects.forma_pago import FormaPago
+from domain.value_objects.money import Money
+from domain.value_objects.precio import Precio
+from infrastructure.sri.xml_sri import (
+    ConfiguracionSRI, EscritorXMLSRI, a_xml, clave_acceso, digito_verificador, exportar
+)
+
+DIRECCION = Direccion('Av. Amazonas & Naciones Unidas', 'Quito')
+
+class EscritorXMLGenerator(EscritorXMLSRI):
+    # El escritor anterior: cada elemento a través de xml.sax XMLGenerator
+    def __init__(self, salida, config: ConfiguracionSRI = ConfiguracionSRI()):
+        super().__init__(salida, config)
+        self._xml = XMLGenerator(salida, encoding='utf-8', short_empty_elements=False)
+
+    def declaracion(self):
+        self._xml.startDocument()
+
+    def abrir(self, nombre, atributos=None):
+        self._xml.startElement(nombre, AttributesImpl(atributos or {}))
+
+    def cerrar(self, nombre):
+        self._xml.endElement(nombre)
+
+    def salto(self):
+        self._xml.ignorableWhitespace('\n')
+
+    def _elemento(self, nombre, texto):
+        self._xml.startElement(nombre, AttributesImpl({}))
+        self._xml.characters(texto)
+        self._xml.endElement(nombre)
+
+def factura() -> FacturaAggregate:
+    aggregate = FacturaAggregate.crear_nueva(1, '1790012345001', '0912345678', DIRECCION, 'Prometeo & Hijos <S.A.>',
+                                             id_bodega=1)
+    lineas = [
+        LineaFactura(1, 'Café "premium" <1kg>', 3, Precio.de_decimal(Decimal('4.125'))),
+        LineaFactura(2, '', 1, Precio.de_decimal(Decimal('10.00')), porcentaje_iva=Decimal('15')),
+        LineaFactura(3, 'Cigarrillos', 2, Precio.de_decimal(Decimal('5.00')), codigo_ice='ICE3011',
+                     tarifa_ice=Decimal('150')),
+        LineaFactura(4, 'Libro', 1, Precio.de_decimal(Decimal('7.50')), porcentaje_iva=Decimal('0'),
+                     tipo_impuesto=TIPO_EXENTO),
+    ]
+    with aggregate.edicion():
+        aggregate.agregar_lineas(lineas)
+        aggregate.root.forma_pago = FormaPago('Tarjeta', aggregate.root.totales.valor_total)
+    aggregate.root.id_factura = 123
+    return aggregate
+
+def nota_credito() -> NotaCreditoAggregate:
+    aggregate = NotaCreditoAggregate.crear_nueva(1, '1790012345001', 123, '1790012345001', DIRECCION,
+                                                 'Prometeo & Hijos <S.A.>', 'Devolución')
+    with aggregate.edicion():
+        aggregate.agregar_lineas([LineaNotaCredito(1, 'Café', 1, Money.de_decimal('4.125'))])
+    aggregate.root.id_nota_credito = 7
+    return aggregate
+
+@pytest.mark.parametrize('digitos, esperado', [
+    ('41261533', '6'),  # Ejemplo de la ficha técnica de comprobantes electrónicos del SRI
+    ('211020110117921467390011002001000000001123456781', '3'),  # Clave 2110201101179214673900110020010000000011234567813
+    ('0', '0'),  # 11 -> 0
+    ('6', '1'),  # 10 -> 1
+])
+def test_digito_verificador_modulo_11(digitos, esperado):
+    assert digito_verificador(digitos) == esperado
+
+def test_clave_de_acceso():
+    config = ConfiguracionSRI(ambiente='2', establecimiento='002', punto_emision='003')
+    clave = clave_acceso(date(2011, 10, 21), '01', '1792146739001', '000000123', config)
+    assert clave[:-1] == '21102011' '01' '1792146739001' '2' '002' '003' '000000123' '00000123' '1'
+    assert clave[-1] == digito_verificador(clave[:-1]) and len(clave) == 49
+
+@pytest.mark.parametrize('documento, fecha_sustento', [(factura, None), (nota_credito, date(2024, 3, 5))])
+def test_igual_al_escritor_anterior(documento, fecha_sustento):
+    documento = documento()
+    salida = StringIO()
+    anterior = EscritorXMLGenerator(salida)
+    anterior.declaracion()
+    anterior.documento(documento, fecha_sustento)
+    assert a_xml(documento, fecha_sustento=fecha_sustento) == salida.getvalue()
+
+def test_tarifas_sin_notacion_cientifica():
+    xml = a_xml(factura())
+    assert '<tarifa>150</tarifa>' in xml and '<tarifa>12</tarifa>' in xml and '<tarifa>0</tarifa>' in xml
+
+def test_exportacion_igual_al_escritor_anterior():
+    documentos = [factura(), nota_credito(), factura()]
+    fechas = lambda ids: {i: date(2024, 3, 5) for i in ids}
+    salida = StringIO()
+    anterior = EscritorXMLGenerator(salida)
+    anterior.declaracion()
+    anterior.abrir('comprobantes')
+    anterior.salto()
+    for documento in documentos:
+        anterior.documento(documento, date(2024, 3, 5) if isinstance(documento, NotaCreditoAggregate) else None)
+    anterior.cerrar('comprobantes')
+    anterior.salto()
+    actual = StringIO()
+    assert exportar(documentos, actual, tamano_bloque=2, fechas_sustento=fechas) == 3
+    assert actual.getvalue() == salida.getvalue()